@@ -0,0 +1,102 @@
+import bisect
+import csv
+import numpy
+import re
+
+from scipy import sparse
+
+from . import models
+
+# Roster slot and player name of each lineup spot in a contest export
+LINEUP_PLAYER = re.compile(r"((D)|(CPT)|(CNSTR)) [A-z]+ [A-z]*( Jr)?")
+
+MAX_LINEUP_SIZE = 6
+
+# Entries scored and saved per batch, to bound the size of the score matrix in memory
+ENTRY_BATCH_SIZE = 1000
+
+
+class PlayerPrefixMap:
+    '''
+    Resolves lineup names to contest players by name prefix, the way a unique
+    name__startswith lookup would, from a sorted in-memory list of player names.
+    '''
+    def __init__(self, names):
+        self.names = sorted((name, index) for index, name in enumerate(names))
+        self.keys = [name for name, _ in self.names]
+
+    def find(self, alias):
+        start = bisect.bisect_left(self.keys, alias)
+        matches = []
+        for name, index in self.names[start:]:
+            if not name.startswith(alias):
+                break
+            matches.append(index)
+
+        if len(matches) == 0:
+            raise Exception(f'There is no player named {alias}.')
+        elif len(matches) > 1:
+            raise Exception(f'There are {len(matches)} players named {alias}.')
+        return matches[0]
+
+
+def read_contest_entries(path):
+    '''
+    Parses a contest export into (entry id, entry name, lineup string, lineup names) rows,
+    skipping entries without a lineup.
+    '''
+    entries = []
+    with open(path, mode='r') as entries_file:
+        csv_reader = csv.DictReader(entries_file)
+
+        for row in csv_reader:
+            lineup = [item[0].strip().replace('á', 'a') for item in LINEUP_PLAYER.finditer(row['Lineup'])]
+            if len(lineup) > 0:
+                entries.append((row['EntryId'], row['EntryName'], row['Lineup'], lineup))
+
+    return entries
+
+
+def import_contest_entries(contest, players, player_scores):
+    '''
+    Creates the contest's entries from its entries file in bulk.
+
+    Lineup names are resolved to players through an in-memory prefix map, and the sim
+    scores of each batch of entries are the product of a sparse entry x player incidence
+    matrix and the player x iteration score matrix.
+    '''
+    entries = read_contest_entries(contest.entries_file.path)
+    prefix_map = PlayerPrefixMap([p.name for p in players])
+
+    lineups = []
+    for entry_id, _, _, lineup in entries:
+        try:
+            lineups.append([prefix_map.find(alias) for alias in lineup[:MAX_LINEUP_SIZE]])
+        except Exception as e:
+            raise Exception(f'Could not resolve the lineup of entry {entry_id}: {e}')
+
+    for start in range(0, len(entries), ENTRY_BATCH_SIZE):
+        batch = lineups[start:start + ENTRY_BATCH_SIZE]
+        rows = numpy.repeat(numpy.arange(len(batch)), [len(lineup) for lineup in batch])
+        columns = numpy.array([index for lineup in batch for index in lineup], dtype=numpy.int64)
+        incidence = sparse.csr_matrix(
+            (numpy.ones(len(columns)), (rows, columns)),
+            shape=(len(batch), len(players))
+        )
+        sim_scores = incidence @ player_scores
+
+        contest_entries = []
+        for offset, lineup in enumerate(batch):
+            entry_id, entry_name, lineup_str, _ = entries[start + offset]
+            contest_entries.append(models.ContestEntry(
+                contest=contest,
+                entry_id=entry_id,
+                entry_name=entry_name,
+                lineup_str=lineup_str,
+                sim_scores=sim_scores[offset].tolist(),
+                **{f'player_{slot + 1}': players[index] for slot, index in enumerate(lineup)}
+            ))
+
+        models.ContestEntry.objects.bulk_create(contest_entries)
+
+    return len(entries)
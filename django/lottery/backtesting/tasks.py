@@ -1,9 +1,7 @@
 from ast import alias
-import csv
 import logging
 import numpy
 import pandas
-import re
 import sys
 import time
 
@@ -12,7 +10,7 @@ from contextlib import contextmanager
 
 
 from configuration.models import BackgroundTask
-from . import models
+from . import contest_import, models
 
 from lottery.celery import app
 
@@ -33,63 +31,6 @@ def lock_task(key, timeout=None):
             lock.release()
 
 
-@shared_task
-def process_contest_entry(entry_id, entry_name, lineup_str, lineup, contest_id):
-    contest = models.Contest.objects.get(id=contest_id)
-
-    alias1 = lineup[0].strip().replace('á', 'a')
-    player1 = models.ContestEntryPlayer.objects.get(
-        contest=contest,
-        name__startswith=alias1
-    )
-
-    # lineup list has emptry string as first elemenet
-    if len(lineup) > 1:
-        alias2 = lineup[1].strip().replace('á', 'a')
-        player2 = models.ContestEntryPlayer.objects.get(
-            contest=contest,
-            name__startswith=alias2
-        )
-    if len(lineup) > 2:
-        alias3 = lineup[2].strip().replace('á', 'a')
-        player3 = models.ContestEntryPlayer.objects.get(
-            contest=contest,
-            name__startswith=alias3
-        )
-    if len(lineup) > 3:
-        alias4 = lineup[3].strip().replace('á', 'a')
-        player4 = models.ContestEntryPlayer.objects.get(
-            contest=contest,
-            name__startswith=alias4
-        )
-    if len(lineup) > 4:
-        alias5 = lineup[4].strip().replace('á', 'a')
-        player5 = models.ContestEntryPlayer.objects.get(
-            contest=contest,
-            name__startswith=alias5
-        )
-    if len(lineup) > 5:
-        alias6 = lineup[5].strip().replace('á', 'a')
-        player6 = models.ContestEntryPlayer.objects.get(
-            contest=contest,
-            name__startswith=alias6
-        )
-
-    entry = models.ContestEntry.objects.create(
-        contest=contest,
-        entry_id=entry_id,
-        entry_name=entry_name,
-        lineup_str=lineup_str,
-        player_1=player1,
-        player_2=player2,
-        player_3=player3,
-        player_4=player4,
-        player_5=player5,
-        player_6=player6
-    )
-    entry.simulate()
-
-
 @shared_task
 def process_contest(contest_id, task_id):
     task = None
@@ -112,43 +53,21 @@ def process_contest(contest_id, task_id):
             contest.num_iterations = len(df_sim.columns)
             contest.save()
 
-            for _, row in df_sim.iterrows():
-                models.ContestEntryPlayer.objects.create(
+            players = models.ContestEntryPlayer.objects.bulk_create([
+                models.ContestEntryPlayer(
                     contest=contest,
-                    name=row.name,
+                    name=name,
                     scores=row.to_list()
-                )   
+                ) for name, row in df_sim.iterrows()
+            ])
+            player_scores = df_sim.to_numpy(dtype=numpy.float64)
 
             # Process entries from contest file
             if contest.entries_file:
                 models.ContestEntry.objects.filter(contest=contest).delete()
-                try:
-                    with open(contest.entries_file.path, mode='r') as entries_file:
-                        csv_reader = csv.DictReader(entries_file)
-                        
-                        jobs = []
-                        for row in csv_reader:
-                            lineup = []
-                            for item in re.finditer(r"((D)|(CPT)|(CNSTR)) [A-z]+ [A-z]*( Jr)?", row['Lineup']):
-                                lineup.append(item[0])
-
-                            if len(lineup) > 0:
-                                jobs.append(
-                                    process_contest_entry.si(
-                                        row['EntryId'],
-                                        row['EntryName'],
-                                        row['Lineup'],
-                                        lineup,
-                                        contest.id
-                                    )
-                                )
-
-                        chord(jobs,
-                            process_contest_complete.si(contest.id, task.id)
-                        )()
-                except ValueError:
-                    pass            
-            
+                num_entries = contest_import.import_contest_entries(contest, players, player_scores)
+                logger.info(f'Imported {num_entries} entries for {contest}.')
+
             if contest.prizes_file:
                 models.ContestPrize.objects.filter(contest=contest).delete()
 
@@ -161,29 +80,6 @@ def process_contest(contest_id, task_id):
                     models.ContestPrize(**vals) for vals in df_prizes.to_dict('records')
                 )   
 
-    except Exception as e:
-        if task is not None:
-            task.status = 'error'
-            task.content = f'There was a problem processing contest: {e}'
-            task.save()
-
-        logger.error("Unexpected error: " + str(sys.exc_info()[0]))
-        logger.exception("error info: " + str(sys.exc_info()[1]) + "\n" + str(sys.exc_info()[2]))
-
-
-@shared_task
-def process_contest_complete(contest_id, task_id):
-    task = None
-
-    try:
-        try:
-            task = BackgroundTask.objects.get(id=task_id)
-        except BackgroundTask.DoesNotExist:
-            time.sleep(0.2)
-            task = BackgroundTask.objects.get(id=task_id)
-
-        contest = models.Contest.objects.get(id=contest_id)
-
         task.status = 'success'
         task.content = f'{contest} processed.'
         task.save()
@@ -0,0 +1,202 @@
+import json
+import logging
+import threading
+import time
+
+import requests
+
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Status codes that are retried after a backoff rather than treated as a failed request
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class HarvestError(Exception):
+    pass
+
+
+class TokenBucket:
+    '''
+    Thread-safe token bucket: allows bursts of up to capacity requests and refills at rate
+    tokens per second. acquire() blocks until a token is available.
+    '''
+    def __init__(self, rate, capacity=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = self.clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+
+            self.sleep(wait)
+
+
+class HarvestClient:
+    '''
+    Fetches JSON from a site API over a pool of keep-alive connections shared by up to
+    concurrency worker threads, with every request (including retries) paced by a token
+    bucket. Responses with a retryable status, or a payload is_valid rejects, are retried
+    with exponential backoff.
+    '''
+    def __init__(self, rate=2.0, burst=4, concurrency=4, max_retries=3, backoff=5.0, retry_statuses=RETRY_STATUSES, timeout=30):
+        self.limiter = TokenBucket(rate, burst)
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.retry_statuses = retry_statuses
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get_json(self, url, headers=None, params=None, is_valid=None):
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+
+            try:
+                response = self.session.get(url, headers=headers, params=params, timeout=self.timeout)
+                error = None
+
+                if response.status_code in self.retry_statuses:
+                    error = f'HTTP Status {response.status_code}'
+                elif response.status_code >= 300:
+                    raise HarvestError(f'HTTP Status {response.status_code} for {url}')
+                else:
+                    data = response.json()
+                    if is_valid is None or is_valid(data):
+                        return data
+                    error = f'Invalid payload {json.dumps(data)[:200]}'
+            except (requests.ConnectionError, requests.Timeout, ValueError) as e:
+                error = str(e)
+
+            if attempt >= self.max_retries:
+                raise HarvestError(f'{error} for {url} after {attempt + 1} attempts')
+
+            wait = self.backoff * 2 ** attempt
+            logger.warning(f'{error} for {url}. Retrying in {wait}s.')
+            time.sleep(wait)
+            attempt += 1
+
+    def map(self, fn, items):
+        '''
+        Calls fn on every item across the worker threads and returns the results in order.
+        A call that raises yields its exception in place of a result.
+        '''
+        def call(item):
+            try:
+                return fn(item)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            return list(executor.map(call, items))
+
+
+def load_cursor(last_page_processed, cursor_json):
+    '''
+    Returns the pages completed past the contiguous last_page_processed watermark.
+    '''
+    if not cursor_json:
+        return set()
+    return set(p for p in json.loads(cursor_json).get('completed_pages', []) if p >= last_page_processed)
+
+
+def advance_cursor(last_page_processed, completed_pages):
+    '''
+    Moves the watermark over every contiguous completed page. Returns the new watermark and
+    the cursor JSON of the pages still completed out of order beyond it.
+    '''
+    completed_pages = set(completed_pages)
+    while last_page_processed in completed_pages:
+        completed_pages.remove(last_page_processed)
+        last_page_processed += 1
+
+    return last_page_processed, json.dumps({'completed_pages': sorted(completed_pages)})
+
+
+def pending_pages(num_pages, last_page_processed, completed_pages):
+    return [page for page in range(last_page_processed, num_pages) if page not in completed_pages]
+
+
+def run_harvest(client, num_pages, last_page_processed, cursor_json, fetch_page, save_page, fetch_lineup, save_lineups, save_cursor, window=20):
+    '''
+    Harvests a paged contest in windows of pages. Each window's pages are fetched
+    concurrently, then saved in page order; the lineups of the entries they contain are
+    then fetched concurrently and saved together. fetch_page and fetch_lineup run on the
+    worker threads and must not touch the database, the save callbacks run on the calling
+    thread.
+
+    save_page(page, rows) returns the (entry key, lineup request) pairs still missing a
+    lineup, save_lineups receives (entry key, lineup) pairs and save_cursor(watermark,
+    cursor_json, pct_complete) persists progress after every window. A page is completed
+    once its listing and all of its lineups are saved, so an interrupted harvest resumes
+    from the cursor. Returns the pages that failed.
+    '''
+    completed = load_cursor(last_page_processed, cursor_json)
+    pages = pending_pages(num_pages, last_page_processed, completed)
+    failed = []
+
+    for start in range(0, len(pages), window):
+        window_pages = pages[start:start + window]
+        listings = client.map(fetch_page, window_pages)
+
+        lineup_requests = []
+        lineup_pages = []
+        window_failed = set()
+        for page, rows in zip(window_pages, listings):
+            if isinstance(rows, Exception):
+                logger.error(f'Page {page + 1} failed: {rows}')
+                window_failed.add(page)
+                continue
+
+            for key, request in save_page(page, rows):
+                lineup_requests.append((key, request))
+                lineup_pages.append(page)
+
+        lineups = client.map(fetch_lineup, [request for _, request in lineup_requests])
+
+        saved = []
+        for (key, _), page, lineup in zip(lineup_requests, lineup_pages, lineups):
+            if isinstance(lineup, Exception):
+                logger.error(f'Lineup {key} on page {page + 1} failed: {lineup}')
+                window_failed.add(page)
+            else:
+                saved.append((key, lineup))
+        save_lineups(saved)
+
+        completed.update(page for page in window_pages if page not in window_failed)
+        failed += sorted(window_failed)
+
+        last_page_processed, cursor_json = advance_cursor(last_page_processed, completed)
+        completed = load_cursor(last_page_processed, cursor_json)
+        save_cursor(last_page_processed, cursor_json, min(start + window, len(pages)) / max(len(pages), 1))
+
+    return failed
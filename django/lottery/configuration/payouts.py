@@ -0,0 +1,65 @@
+import numpy
+
+# Upper bound on entries x iterations ranked in memory at once
+MAX_BLOCK_ELEMENTS = 10000000
+
+
+def cumulative_prizes(prizes, num_entries):
+    '''
+    Returns an array where entry r is the total prize money paid to ranks 1 through r, for
+    r = 0..num_entries. prizes is an iterable of (min_rank, max_rank, prize).
+    '''
+    prize_by_rank = numpy.zeros(num_entries + 1, dtype=numpy.float64)
+    for min_rank, max_rank, prize in prizes:
+        if min_rank <= num_entries:
+            prize_by_rank[min_rank:min(max_rank, num_entries) + 1] = float(prize)
+    return numpy.cumsum(prize_by_rank)
+
+
+def block_payouts(scores, cum_prizes):
+    '''
+    Ranks every iteration of an (entries x iterations) score matrix in one sort, highest
+    score first; entries tied for a rank split the prizes of every rank they cover, which
+    is the difference of cum_prizes across the tied range divided by the number of tied
+    entries.
+
+    Returns (iterations x entries) matrices of the entry at each sorted position, the
+    0-based rank shared by its tie group and its payout.
+    '''
+    num_entries = scores.shape[0]
+    scores = numpy.array(scores.T)
+    scores[numpy.isnan(scores)] = -numpy.inf
+
+    order = numpy.argsort(-scores, axis=1)
+    ranked = numpy.take_along_axis(scores, order, axis=1)
+
+    # first and last (exclusive) sorted position of each entry's tie group
+    positions = numpy.arange(num_entries)
+    new_group = numpy.ones(ranked.shape, dtype=bool)
+    new_group[:, 1:] = ranked[:, 1:] != ranked[:, :-1]
+    group_start = numpy.maximum.accumulate(numpy.where(new_group, positions, 0), axis=1)
+
+    group_end_marker = numpy.ones(ranked.shape, dtype=bool)
+    group_end_marker[:, :-1] = new_group[:, 1:]
+    group_end = numpy.minimum.accumulate(numpy.where(group_end_marker, positions + 1, num_entries)[:, ::-1], axis=1)[:, ::-1]
+
+    ranked_payouts = (cum_prizes[group_end] - cum_prizes[group_start]) / (group_end - group_start)
+
+    return order, group_start, ranked_payouts
+
+
+def block_winnings(scores, cum_prizes):
+    '''
+    Returns the total winnings of each entry over a block of iterations of an
+    (entries x iterations) score matrix.
+    '''
+    order, _, ranked_payouts = block_payouts(scores, cum_prizes)
+    return numpy.bincount(order.ravel(), weights=ranked_payouts.ravel(), minlength=scores.shape[0])
+
+
+def iteration_blocks(num_entries, start, stop):
+    '''
+    Splits iterations start..stop into ranges small enough to rank in memory.
+    '''
+    block_size = max(1, MAX_BLOCK_ELEMENTS // max(num_entries, 1))
+    return [(i, min(i + block_size, stop)) for i in range(start, stop, block_size)]
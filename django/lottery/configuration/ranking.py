@@ -0,0 +1,12 @@
+import numpy
+
+
+def ordinal_ranks(values):
+    '''
+    Row-wise equivalent of scipy.stats.rankdata(method='ordinal'): 1-based ranks with ties
+    broken by column order.
+    '''
+    ranks = numpy.empty(values.shape, dtype=numpy.int64)
+    order = numpy.argsort(values, axis=-1, kind='stable')
+    numpy.put_along_axis(ranks, order, numpy.arange(1, values.shape[-1] + 1), axis=-1)
+    return ranks
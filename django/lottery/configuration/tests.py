@@ -1,3 +1,135 @@
-from django.test import TestCase
+import json
+import threading
 
-# Create your tests here.
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+from django.test import SimpleTestCase
+
+from . import harvest
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+    '''
+    Local site API for harvest tests. Each path is answered with the next of its scripted
+    (status, payload) responses, repeating the last one, and every request is recorded.
+    '''
+    daemon_threads = True
+
+    def __init__(self, responses):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.responses = {path: list(scripted) for path, scripted in responses.items()}
+        self.requests = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def next_response(self, path):
+        with self.lock:
+            self.requests.append(path)
+            scripted = self.responses.get(path, [(404, {})])
+            return scripted.pop(0) if len(scripted) > 1 else scripted[0]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        status, payload = self.server.next_response(self.path)
+        body = json.dumps(payload).encode()
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class HarvestTestCase(SimpleTestCase):
+    def start_server(self, responses):
+        server = StubServer(responses)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def get_client(self, max_retries=3):
+        client = harvest.HarvestClient(rate=1000, burst=10, concurrency=4, max_retries=max_retries, backoff=0)
+        self.addCleanup(client.close)
+        return client
+
+    def contest_responses(self, num_pages, entries_per_page=2):
+        '''
+        Scripted pages of entry ids and one lineup per entry.
+        '''
+        responses = {}
+        for page in range(num_pages):
+            entry_ids = [page * entries_per_page + index for index in range(entries_per_page)]
+            responses[f'/pages/{page}'] = [(200, {'entries': entry_ids})]
+            for entry_id in entry_ids:
+                responses[f'/lineups/{entry_id}'] = [(200, {'players': [entry_id]})]
+        return responses
+
+    def harvest(self, server, client, num_pages, last_page_processed=0, cursor_json=None):
+        saved = {'pages': [], 'lineups': {}, 'cursors': []}
+
+        def save_page(page, rows):
+            saved['pages'].append(page)
+            return [(entry_id, entry_id) for entry_id in rows['entries']]
+
+        def save_lineups(lineups):
+            saved['lineups'].update(lineups)
+
+        def save_cursor(watermark, cursor, pct_complete):
+            saved['cursors'].append((watermark, json.loads(cursor)))
+
+        failed = harvest.run_harvest(
+            client,
+            num_pages,
+            last_page_processed,
+            cursor_json,
+            lambda page: client.get_json(f'{server.url}/pages/{page}'),
+            save_page,
+            lambda entry_id: client.get_json(f'{server.url}/lineups/{entry_id}'),
+            save_lineups,
+            save_cursor,
+            window=2
+        )
+        return failed, saved
+
+    def test_retries_unavailable_responses(self):
+        server = self.start_server({'/pages/0': [(503, {}), (503, {}), (200, {'entries': [1]})]})
+
+        data = self.get_client().get_json(f'{server.url}/pages/0')
+
+        self.assertEqual(data, {'entries': [1]})
+        self.assertEqual(server.requests, ['/pages/0'] * 3)
+
+    def test_failed_page_holds_watermark(self):
+        responses = self.contest_responses(3)
+        responses['/pages/1'] = [(500, {})]
+        server = self.start_server(responses)
+
+        failed, saved = self.harvest(server, self.get_client(max_retries=1), 3)
+
+        self.assertEqual(failed, [1])
+        self.assertEqual(sorted(saved['pages']), [0, 2])
+        self.assertEqual(sorted(saved['lineups']), [0, 1, 4, 5])
+        self.assertEqual(server.requests.count('/pages/1'), 2)
+        self.assertEqual(saved['cursors'][-1], (1, {'completed_pages': [2]}))
+
+    def test_resumes_from_cursor(self):
+        server = self.start_server(self.contest_responses(4))
+
+        failed, saved = self.harvest(server, self.get_client(), 4, last_page_processed=1, cursor_json=json.dumps({'completed_pages': [2]}))
+
+        self.assertEqual(failed, [])
+        self.assertEqual(sorted(saved['pages']), [1, 3])
+        self.assertEqual(sorted(saved['lineups']), [2, 3, 6, 7])
+        self.assertNotIn('/pages/0', server.requests)
+        self.assertNotIn('/pages/2', server.requests)
+        self.assertEqual(saved['cursors'][-1], (4, {'completed_pages': []}))
@@ -0,0 +1,18 @@
+# Generated by Django 2.2 on 2022-02-15 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fanduel', '0009_contest_is_main_slate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contest',
+            name='harvest_cursor',
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
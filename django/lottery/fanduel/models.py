@@ -76,6 +76,7 @@ class Contest(models.Model):
     num_entries = models.PositiveIntegerField(default=0)
     contest_json = models.TextField(blank=True, null=True)
     last_page_processed = models.IntegerField(default=0)
+    harvest_cursor = models.TextField(blank=True, null=True)
 
     def __str__(self):
         return f'{self.name}'
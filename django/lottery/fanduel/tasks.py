@@ -1,12 +1,13 @@
 import json
 import logging
+import math
 import pandas
-import random
 import requests
 import sys
 import time
 
 from celery import shared_task, chord, group
+from configuration import harvest
 from configuration.models import BackgroundTask
 from contextlib import contextmanager
 
@@ -17,41 +18,57 @@ from lottery.celery import app
 logger = logging.getLogger(__name__)
 
 
-def index_in_cool_down_range(index):
-    cool_down_ranges = [
-        {'start': 150, 'end': 155},
-        {'start': 250, 'end': 255},
-        {'start': 350, 'end': 355},
-        {'start': 450, 'end': 455},
-        {'start': 550, 'end': 555},
-        {'start': 650, 'end': 655},
-        {'start': 750, 'end': 755},
-        {'start': 850, 'end': 855},
-        {'start': 950, 'end': 955},
-        {'start': 1050, 'end': 1055},
-        {'start': 1150, 'end': 1155},
-        {'start': 1250, 'end': 1255},
-        {'start': 1350, 'end': 1355},
-        {'start': 1450, 'end': 1455},
-        {'start': 1550, 'end': 1555},
-        {'start': 1650, 'end': 1655},
-        {'start': 1750, 'end': 1755},
-        {'start': 1850, 'end': 1855},
-        {'start': 1950, 'end': 1955},
-        {'start': 2050, 'end': 1055},
-        {'start': 2150, 'end': 2155},
-        {'start': 2250, 'end': 2255},
-        {'start': 2350, 'end': 2355},
-        {'start': 2450, 'end': 2455},
-        {'start': 2550, 'end': 2555},
-        {'start': 2650, 'end': 2655},
-        {'start': 2750, 'end': 2755},
-        {'start': 2850, 'end': 2855},
-        {'start': 2950, 'end': 2955},
-        {'start': 3050, 'end': 21055},
-    ]
-
-    return any(d['start'] <= index and d['end'] > index for d in cool_down_ranges)
+ENTRIES_PAGE_SIZE = 10
+
+# Request pacing for a contest harvest: requests per second, burst size and parallel connections
+HARVEST_RATE = 2.0
+HARVEST_BURST = 4
+HARVEST_CONCURRENCY = 4
+
+LINEUP_PARAMS = (
+    ('include_projections', 'false'),
+    ('content_sources', 'NUMBERFIRE,ROTOWIRE,ROTOGRINDERS'),
+)
+
+
+def get_entries_page(client, entries_url, page):
+    params = [('include_projections', 'false'), ('page_size', str(ENTRIES_PAGE_SIZE))]
+    if page > 0:
+        params.insert(1, ('page', str(page + 1)))
+
+    data = client.get_json(entries_url, headers=models.GET_ENTRIES_HEADERS, params=params)
+    return [{'entry_id': str(entry.get('id')), 'entry_url': entry.get('_url')} for entry in data.get('entries')]
+
+
+def get_entry_lineup(client, entry_url):
+    data = client.get_json(entry_url, headers=models.GET_LINEUP_HEADERS, params=LINEUP_PARAMS)
+    return {
+        'username': data.get('users')[0].get('username'),
+        'entry_json': json.dumps(data.get('players')),
+    }
+
+
+def save_entries_page(contest, rows):
+    '''
+    Upserts a page of entries in bulk and returns the (entry pk, entry url) of those still
+    missing a lineup.
+    '''
+    entry_ids = [row.get('entry_id') for row in rows]
+    existing = set(contest.entries.filter(entry_id__in=entry_ids).values_list('entry_id', flat=True))
+
+    models.ContestEntry.objects.bulk_create([
+        models.ContestEntry(contest=contest, **row) for row in rows if row.get('entry_id') not in existing
+    ])
+
+    return list(contest.entries.filter(entry_id__in=entry_ids, entry_json=None).values_list('id', 'entry_url'))
+
+
+def save_entry_lineups(lineups):
+    models.ContestEntry.objects.bulk_update(
+        [models.ContestEntry(id=entry_id, **lineup) for entry_id, lineup in lineups],
+        ['username', 'entry_json']
+    )
+
 
 # ensures that tasks only run once at most!
 @contextmanager
@@ -142,77 +159,56 @@ def get_contest_data(contest_id, task_id):
 
 
 @shared_task
-def get_entries_page_for_contest(contest_id, page, num_pages):
-    contest = models.Contest.objects.get(id=contest_id)
-    
-    if page == 0:
-        params = (
-            ('include_projections', 'false'),
-            ('page_size', '10'),
-        )
-    else:
-        params = (
-            ('include_projections', 'false'),
-            ('page', str(page+1)),
-            ('page_size', '10'),
-        )
-
-    if index_in_cool_down_range(page):
-        seconds_to_wait = random.randint(60, 120)
-        print('Waiting {}s...'.format(seconds_to_wait))
-        time.sleep(seconds_to_wait)
-    elif page > 0:
-        seconds_to_wait = random.randint(5, 10)
-        print('Waiting {}s...'.format(seconds_to_wait))
-        time.sleep(seconds_to_wait)
-        
-    print(f'Page -- {page+1} out of {num_pages}')
-    response = requests.get(contest.entries_url, headers=models.GET_ENTRIES_HEADERS, params=params)
-    
-    if response.status_code < 300:
-        data = response.json()
-        
-        # process entries from page 
-        for entry in data.get('entries'):
-            entry_id = entry.get('id')
-            entry_url = entry.get('_url')
-
-            models.ContestEntry.objects.get_or_create(
-                entry_id=entry_id,
-                contest=contest,
-                entry_url=entry_url
-            )
+def harvest_contest_entries(contest_id, task_id):
+    task = None
 
-            get_lineup_for_entry(entry_id)
+    try:
+        try:
+            task = BackgroundTask.objects.get(id=task_id)
+        except BackgroundTask.DoesNotExist:
+            time.sleep(0.2)
+            task = BackgroundTask.objects.get(id=task_id)
 
-        contest.last_page_processed = page + 1
-        contest.save()
-    else:
-        print(f'HTTP Status {response.status_code}')
+        contest = models.Contest.objects.get(id=contest_id)
+        num_pages = math.ceil(contest.num_entries / ENTRIES_PAGE_SIZE)
+
+        def save_cursor(last_page_processed, harvest_cursor, pct_complete):
+            contest.last_page_processed = last_page_processed
+            contest.harvest_cursor = harvest_cursor
+            contest.save(update_fields=['last_page_processed', 'harvest_cursor'])
+
+            task.pct_complete = pct_complete
+            task.save(update_fields=['pct_complete'])
+
+        with harvest.HarvestClient(rate=HARVEST_RATE, burst=HARVEST_BURST, concurrency=HARVEST_CONCURRENCY) as client:
+            failed = harvest.run_harvest(
+                client,
+                num_pages,
+                contest.last_page_processed,
+                contest.harvest_cursor,
+                lambda page: get_entries_page(client, contest.entries_url, page),
+                lambda page, rows: save_entries_page(contest, rows),
+                lambda entry_url: get_entry_lineup(client, entry_url),
+                save_entry_lineups,
+                save_cursor
+            )
 
+        if len(failed) > 0:
+            task.status = 'warning'
+            task.content = f'{len(failed)} pages of {contest.name} could not be retrieved. Get entries again to resume.'
+        else:
+            task.status = 'success'
+            task.content = f'Entries for {contest.name} retrieved and saved.'
+        task.save()
 
-@shared_task
-def get_lineup_for_entry(entry_id):
-    seconds_to_wait = random.randint(1, 2)
-    print(f'Getting entry {entry_id}')
-    print('Waiting {}s...'.format(seconds_to_wait))
-    time.sleep(seconds_to_wait)
-
-    entry = models.ContestEntry.objects.get(entry_id=entry_id)
-    params = (
-        ('include_projections', 'false'),
-        ('content_sources', 'NUMBERFIRE,ROTOWIRE,ROTOGRINDERS'),
-    )
+    except Exception as e:
+        if task is not None:
+            task.status = 'error'
+            task.content = f'There was a problem getting contest entries: {e}'
+            task.save()
 
-    response = requests.get(entry.entry_url, headers=models.GET_LINEUP_HEADERS, params=params)
-    
-    if response.status_code < 300:
-        data = response.json()
-        entry.username = data.get('users')[0].get('username')
-        entry.entry_json = json.dumps(data.get('players'))
-        entry.save()
-    else:
-        print(f'HTTP Status {response.status_code}.')
+        logger.error("Unexpected error: " + str(sys.exc_info()[0]))
+        logger.exception("error info: " + str(sys.exc_info()[1]) + "\n" + str(sys.exc_info()[2]))
 
 
 @shared_task
@@ -0,0 +1,214 @@
+import numpy
+
+from configuration.ranking import ordinal_ranks
+
+from . import models
+
+# Iterations simulated by each execute_sim_batch task
+SIM_BATCH_SIZE = 1000
+
+# Finishing positions that score constructor bonuses
+POINTS_POSITIONS = 10
+PODIUM_POSITIONS = 3
+
+
+def load_sim_inputs(race_sim):
+    '''
+    Loads everything a race simulation needs from the database into plain arrays, so
+    iterations can be simulated and scored without touching the ORM.
+    '''
+    drivers = list(race_sim.outcomes.filter(dk_position='D').order_by('starting_position', 'id').values_list(
+        'id', 'driver__team_id', 'starting_position', 'speed_min', 'speed_max', 'incident_rate', 'pct_laps_led_min', 'pct_laps_led_max'
+    ))
+    constructors = list(race_sim.outcomes.filter(dk_position='CNSTR').order_by('id').values_list('constructor_id', flat=True))
+
+    # teammate index map: each driver's teammate, and each constructor's two drivers (-1 when missing)
+    team_drivers = {}
+    for index, driver in enumerate(drivers):
+        team_drivers.setdefault(driver[1], []).append(index)
+
+    teammates = numpy.full(len(drivers), -1, dtype=numpy.int64)
+    for index, driver in enumerate(drivers):
+        others = [i for i in team_drivers.get(driver[1]) if i != index]
+        if len(others) > 0:
+            teammates[index] = others[0]
+
+    constructor_drivers = numpy.full((len(constructors), 2), -1, dtype=numpy.int64)
+    for index, constructor_id in enumerate(constructors):
+        members = team_drivers.get(constructor_id, [])[:2]
+        constructor_drivers[index, :len(members)] = members
+
+    nl_profiles = list(race_sim.nl_profiles.all().values_list('leader_count', 'probability'))
+    fl_profiles = list(race_sim.fl_profiles.all().order_by('fp_rank').values_list('fp_rank', 'probability'))
+    ll_profiles = list(race_sim.ll_profiles.all().order_by('fp_rank').values_list('fp_rank', 'pct_laps_led_min', 'pct_laps_led_max'))
+
+    # scoring lookup vectors, indexed by place differential + offset and by finishing position
+    scoring = models.SITE_SCORING.get('draftkings')
+    differentials = [int(d) for d in scoring.get('place_differential').keys()]
+    pd_offset = -min(differentials)
+    pd_points = numpy.zeros(max(differentials) + pd_offset + 1)
+    for differential, points in scoring.get('place_differential').items():
+        pd_points[int(differential) + pd_offset] = points
+
+    fp_points = numpy.zeros(max(len(drivers), len(scoring.get('finishing_position'))) + 1)
+    for position, points in scoring.get('finishing_position').items():
+        fp_points[int(position)] = points
+
+    return {
+        'scheduled_laps': race_sim.race.scheduled_laps,
+        'starting_positions': numpy.array([d[2] for d in drivers], dtype=numpy.int64),
+        'speed_min': numpy.array([d[3] for d in drivers], dtype=numpy.int64),
+        'speed_max': numpy.array([d[4] for d in drivers], dtype=numpy.int64),
+        'incident_rates': numpy.array([d[5] for d in drivers], dtype=numpy.float64),
+        'pct_laps_led_min': numpy.array([d[6] for d in drivers], dtype=numpy.float64),
+        'pct_laps_led_max': numpy.array([d[7] for d in drivers], dtype=numpy.float64),
+        'teammates': teammates,
+        'constructor_drivers': constructor_drivers,
+        'nl_counts': numpy.array([p[0] for p in nl_profiles], dtype=numpy.int64),
+        'nl_cum_probs': numpy.cumsum([p[1] for p in nl_profiles]),
+        'fl_ranks': numpy.array([p[0] for p in fl_profiles], dtype=numpy.int64),
+        'fl_cum_probs': numpy.cumsum([p[1] for p in fl_profiles]),
+        'll_ranks': numpy.array([p[0] for p in ll_profiles], dtype=numpy.int64),
+        'll_pct_min': numpy.array([p[1] for p in ll_profiles], dtype=numpy.float64),
+        'll_pct_max': numpy.array([p[2] for p in ll_profiles], dtype=numpy.float64),
+        'pd_offset': pd_offset,
+        'pd_points': pd_points,
+        'fp_points': fp_points,
+        'fastest_lap': scoring.get('fastest_lap'),
+        'laps_led': scoring.get('laps_led'),
+        'classified': scoring.get('classified'),
+        'defeated_teammate': scoring.get('defeated_teammate'),
+        'constructor_bonuses': scoring.get('constructor_bonuses'),
+    }
+
+
+def pick_profiles(cum_probs, num_iterations, rng):
+    '''
+    Draws one profile per iteration from cumulative profile probabilities. Returns the
+    profile index of each iteration, or len(cum_probs) when the draw falls past the last one.
+    '''
+    return numpy.searchsorted(cum_probs, rng.random(num_iterations), side='left')
+
+
+def assign_laps_led(inputs, finishing_order, num_iterations, rng):
+    '''
+    Returns an (iterations x positions + 1) matrix of laps led by finishing position.
+
+    Each iteration draws its number of leaders, then awards the first that many laps led
+    profiles a whole percentage between the tighter of the profile's and its driver's
+    bounds, scaled so that all scheduled laps are led.
+    '''
+    num_drivers = finishing_order.shape[1]
+    ll_by_rank = numpy.zeros((num_iterations, num_drivers + 1), dtype=numpy.int64)
+
+    ranks = inputs['ll_ranks']
+    valid = (ranks >= 1) & (ranks <= num_drivers)
+    ranks = ranks[valid]
+    if len(ranks) == 0 or len(inputs['nl_counts']) == 0:
+        return ll_by_rank
+
+    nl_index = pick_profiles(inputs['nl_cum_probs'], num_iterations, rng)
+    num_leaders = numpy.append(inputs['nl_counts'], 0)[nl_index]
+
+    leaders = finishing_order[:, ranks - 1]
+    pct_min = numpy.maximum(inputs['pct_laps_led_min'][leaders], inputs['ll_pct_min'][valid])
+    pct_max = numpy.minimum(inputs['pct_laps_led_max'][leaders], inputs['ll_pct_max'][valid])
+
+    low = (pct_min * 100).astype(numpy.int64)
+    high = numpy.maximum((pct_max * 100).astype(numpy.int64), 1) + 1
+    awards = numpy.where(pct_min < pct_max, rng.integers(low, numpy.maximum(high, low + 1)), low)
+    awards = awards * (numpy.flatnonzero(valid) < num_leaders[:, None])
+
+    total = awards.sum(axis=1, keepdims=True)
+    laps = numpy.divide(awards, total, out=numpy.zeros(awards.shape), where=total > 0)
+    ll_by_rank[:, ranks] = (laps * inputs['scheduled_laps']).astype(numpy.int64)
+
+    return ll_by_rank
+
+
+def assign_fastest_lap(inputs, num_drivers, num_iterations, rng):
+    '''
+    Returns an (iterations x positions + 1) matrix flagging the finishing position that set
+    the fastest lap in each iteration.
+    '''
+    fl_by_rank = numpy.zeros((num_iterations, num_drivers + 1), dtype=numpy.int64)
+    if len(inputs['fl_ranks']) == 0:
+        return fl_by_rank
+
+    fl_index = pick_profiles(inputs['fl_cum_probs'], num_iterations, rng)
+    awarded = numpy.flatnonzero(fl_index < len(inputs['fl_ranks']))
+    ranks = inputs['fl_ranks'][fl_index[awarded]]
+    in_field = (ranks >= 1) & (ranks <= num_drivers)
+    fl_by_rank[awarded[in_field], ranks[in_field]] = 1
+
+    return fl_by_rank
+
+
+def simulate_race(inputs, num_iterations, rng=None):
+    '''
+    Simulates and scores num_iterations races at once.
+
+    Returns (iterations x drivers) matrices of DNFs, finishing positions, laps led, fastest
+    laps and DraftKings scores, and an (iterations x constructors) matrix of constructor
+    DraftKings scores.
+    '''
+    if rng is None:
+        rng = numpy.random.default_rng()
+
+    num_drivers = len(inputs['starting_positions'])
+    shape = (num_iterations, num_drivers)
+
+    # 1. DNFs, 2. speed values (DNFs always finish behind classified drivers), 3. finishing position
+    dnf = (rng.random(shape) < inputs['incident_rates']).astype(numpy.int64)
+    speed = rng.integers(inputs['speed_min'], inputs['speed_max'] + 1, size=shape) + rng.random(shape)
+    speed = numpy.where(dnf == 1, 9999 + rng.random(shape), speed)
+
+    finishing_order = numpy.argsort(speed, axis=1, kind='stable')
+    fp = ordinal_ranks(speed)
+
+    # 4-5. laps led and 6. fastest lap are awarded by finishing position
+    ll = numpy.take_along_axis(assign_laps_led(inputs, finishing_order, num_iterations, rng), fp, axis=1)
+    fl = numpy.take_along_axis(assign_fastest_lap(inputs, num_drivers, num_iterations, rng), fp, axis=1)
+
+    differentials = numpy.clip(inputs['starting_positions'] - fp + inputs['pd_offset'], 0, len(inputs['pd_points']) - 1)
+
+    teammates = inputs['teammates']
+    has_teammate = teammates >= 0
+    defeated_teammate = has_teammate & (fp < fp[:, numpy.where(has_teammate, teammates, 0)])
+
+    dk = (
+        inputs['pd_points'][differentials] +
+        inputs['fastest_lap'] * fl +
+        inputs['fp_points'][fp] +
+        inputs['laps_led'] * ll +
+        inputs['classified'] * (dnf == 0) +
+        inputs['defeated_teammate'] * defeated_teammate
+    )
+
+    c_dk = numpy.zeros((num_iterations, len(inputs['constructor_drivers'])))
+    if len(inputs['constructor_drivers']) > 0:
+        members = inputs['constructor_drivers']
+        has_member = members >= 0
+        members = numpy.where(has_member, members, 0)
+
+        c_fp = numpy.where(has_member, fp[:, members], len(inputs['fp_points']) - 1)
+        c_dnf = numpy.where(has_member, dnf[:, members], 1)
+
+        bonuses = inputs['constructor_bonuses']
+        c_dk = (
+            (inputs['fp_points'][c_fp] * has_member).sum(axis=2) +
+            inputs['fastest_lap'] * (fl[:, members] * has_member).sum(axis=2) +
+            inputs['laps_led'] * (ll[:, members] * has_member).sum(axis=2) +
+            bonuses.get('both_classified') * (c_dnf == 0).all(axis=2) +
+            bonuses.get('both_in_points') * (c_fp <= POINTS_POSITIONS).all(axis=2) +
+            bonuses.get('both_on_podium') * (c_fp <= PODIUM_POSITIONS).all(axis=2)
+        )
+
+    return {
+        'dnf': dnf,
+        'fp': fp,
+        'll': ll,
+        'fl': fl,
+        'dk': dk,
+        'c_dk': c_dk,
+    }
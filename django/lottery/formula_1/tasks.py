@@ -9,14 +9,11 @@ import os
 import pandas
 import pandasql
 import requests
-import scipy
 import sys
 import time
 import traceback
 import uuid
 
-from random import random, uniform, randrange
-
 from celery import shared_task, chord, group, chain
 from contextlib import contextmanager
 
@@ -32,6 +29,7 @@ from pydfs_lineup_optimizer import Site, Sport, Player, get_optimizer
 
 from . import models
 from . import optimize
+from . import simulation
 
 from lottery.celery import app
 
@@ -270,11 +268,14 @@ def execute_sim(sim_id, task_id):
             task = BackgroundTask.objects.get(id=task_id)
 
         race_sim = models.RaceSim.objects.get(id=sim_id)
-        
+        batches = [
+            min(simulation.SIM_BATCH_SIZE, race_sim.iterations - start) for start in range(0, race_sim.iterations, simulation.SIM_BATCH_SIZE)
+        ]
+
         if race_sim.run_with_gto:
             chain(
                 group([
-                    execute_sim_iteration.si(sim_id) for _ in range(0, race_sim.iterations)
+                    execute_sim_batch.si(sim_id, num_iterations) for num_iterations in batches
                 ]),
                 calc_sim_scores.s(sim_id, task_id),
                 find_driver_gto.si(
@@ -287,7 +288,7 @@ def execute_sim(sim_id, task_id):
             )()
         else:
             chord([
-                execute_sim_iteration.si(sim_id) for _ in range(0, race_sim.iterations)
+                execute_sim_batch.si(sim_id, num_iterations) for num_iterations in batches
             ], calc_sim_scores.s(sim_id, task_id))()
 
     except Exception as e:
@@ -300,144 +301,18 @@ def execute_sim(sim_id, task_id):
         logger.exception("error info: " + str(sys.exc_info()[1]) + "\n" + str(sys.exc_info()[2]))
 
 
-def find_teammate_index(sim_drivers, driver):
-    for index, d in enumerate(sim_drivers):
-        # print(f'{d.get_teammate()} == {driver}: {d.get_teammate() == driver}')
-        if d.get_teammate() == driver:
-            return index
-    return -1
-
-
-def find_driver_index(sim_drivers, driver):
-    for index, d in enumerate(sim_drivers):
-        if d == driver:
-            return index
-    return -1
-
-
 @shared_task
-def execute_sim_iteration(sim_id):
+def execute_sim_batch(sim_id, num_iterations):
     race_sim = models.RaceSim.objects.get(id=sim_id)
-    drivers = race_sim.outcomes.filter(dk_position='D').order_by('starting_position', 'id')
-    constructors = race_sim.outcomes.filter(dk_position='CNSTR').order_by('id')
-
-    race_drivers = list(drivers.values_list('driver__driver_id', flat=True))  # tracks drivers still in race
-    driver_ids = list(drivers.values_list('driver__driver_id', flat=True))
-    driver_names = list(drivers.values_list('driver__full_name', flat=True))
-    driver_starting_positions = list(drivers.values_list('starting_position', flat=True))
-
-    driver_sp_mins = list(drivers.values_list('speed_min', flat=True))
-    driver_sp_maxes = list(drivers.values_list('speed_max', flat=True))
-
-    driver_fl = [0 for _ in drivers]
-    driver_ll = [0 for _ in drivers]
-
-    # 1. Assign driver DNFs (if any) by rand() < driver incident rate
-    driver_dnfs = [1 if random() < driver.incident_rate else 0 for driver in drivers]
-
-    # 2. Assign driver speed value as randbetween(speed min, speed max)
-    sp_values = [randrange(driver.speed_min, driver.speed_max+1) + random() if driver_dnfs[index] < 1 else 9999 + random() for index, driver in enumerate(drivers)]
-
-    # 3. Assign driver FP as rank(driver_speed_value)
-    fp_ranks = scipy.stats.rankdata(sp_values, method='ordinal')
-
-    # 4. Determine how many drivers get LL
-    ll_laps = race_sim.race.scheduled_laps
-    nl_profiles = race_sim.nl_profiles.all()
-    nl_rand_prob = random()
-    num_leaders = 0
-    nl_cum = 0
-    for nlp in nl_profiles:
-        nl_cum += nlp.probability
-        if nl_rand_prob <= nl_cum:
-            num_leaders = nlp.leader_count
-            break
-    # num_leaders = scipy.stats.poisson.rvs(race_sim.ll_mean) + 1
-
-    # 5. Assign LL as randbetween(max(driver min, fp min), min(driver max, fp max))
-    ll_vals = []  # holds actual LL values
-    ll_pct_values = []  # holds LL pct values
-
-    # -- determine the pct values to award
-    for p in race_sim.ll_profiles.all().order_by('fp_rank')[:num_leaders]:
-        driver_index = int(numpy.where(fp_ranks == p.fp_rank)[0][0])
-        driver = drivers[driver_index]
-        pct_min = max(driver.pct_laps_led_min, p.pct_laps_led_min)
-        pct_max = min(driver.pct_laps_led_max, p.pct_laps_led_max)
-
-        award_pct = randrange(int(pct_min*100), max(int(pct_max*100), 1) + 1, 1) if pct_min < pct_max else int(pct_min*100)
-        ll_pct_values.append(award_pct)
-
-    # -- scale values such that 100% is awarded and convert to actual LL values
-    for index, v in enumerate(ll_pct_values):
-        new_v = v/sum(ll_pct_values)
-        new_v = int(new_v*ll_laps)  # actual value
-        p = race_sim.ll_profiles.all().order_by('fp_rank')[index]
-        driver_index = int(numpy.where(fp_ranks == p.fp_rank)[0][0])
-        driver_ll[driver_index] = new_v
-
-    # 6. Assign FL
-    fl_prob = random()
-    fp_rank = 0
-    cum = 0
-    for flp in race_sim.fl_profiles.all().order_by('fp_rank'):
-        cum += flp.probability
-        
-        if fl_prob <= cum:
-            fp_rank = flp.fp_rank
-            break
-
-    driver_index = int(numpy.where(fp_ranks == fp_rank)[0][0])
-    driver_fl[driver_index] = 1
-
-    logger.info(drivers)
-
-    driver_dk = [
-        (models.SITE_SCORING.get('draftkings').get('place_differential').get(str(driver_starting_positions[index] - fp_ranks.tolist()[index])) + 
-        models.SITE_SCORING.get('draftkings').get('fastest_lap') * driver_fl[index] + 
-        models.SITE_SCORING.get('draftkings').get('finishing_position').get(str(fp_ranks.tolist()[index])) + 
-        models.SITE_SCORING.get('draftkings').get('laps_led') * driver_ll[index] + 
-        (models.SITE_SCORING.get('draftkings').get('classified') if driver_dnfs[index] == 0 else 0) +
-        (models.SITE_SCORING.get('draftkings').get('defeated_teammate') if fp_ranks.tolist()[index] < fp_ranks.tolist()[find_teammate_index(drivers, d)] else 0)) for index, d in enumerate(drivers)
-    ]
-
-    constructor_dk = []
-    for index, c in enumerate(constructors):
-        teammates = c.get_team_drivers()
-
-        constructor_dk.append(
-            models.SITE_SCORING.get('draftkings').get('finishing_position').get(str(fp_ranks.tolist()[find_driver_index(drivers, teammates[0])])) + 
-            models.SITE_SCORING.get('draftkings').get('finishing_position').get(str(fp_ranks.tolist()[find_driver_index(drivers, teammates[1])])) +
-            models.SITE_SCORING.get('draftkings').get('fastest_lap') * driver_fl[find_driver_index(drivers, teammates[0])] + 
-            models.SITE_SCORING.get('draftkings').get('fastest_lap') * driver_fl[find_driver_index(drivers, teammates[1])] + 
-            models.SITE_SCORING.get('draftkings').get('laps_led') * driver_ll[find_driver_index(drivers, teammates[0])] + 
-            models.SITE_SCORING.get('draftkings').get('laps_led') * driver_ll[find_driver_index(drivers, teammates[1])] + 
-            (models.SITE_SCORING.get('draftkings').get('constructor_bonuses').get('both_classified') if int(driver_dnfs[find_driver_index(drivers, teammates[0])]) == 0 and int(driver_dnfs[find_driver_index(drivers, teammates[1])]) == 0 else 0) + 
-            (models.SITE_SCORING.get('draftkings').get('constructor_bonuses').get('both_in_points') if fp_ranks.tolist()[find_driver_index(drivers, teammates[0])] <= 10 and fp_ranks.tolist()[find_driver_index(drivers, teammates[1])] <= 10 else 0) + 
-            (models.SITE_SCORING.get('draftkings').get('constructor_bonuses').get('both_on_podium') if fp_ranks.tolist()[find_driver_index(drivers, teammates[0])] <= 3 and fp_ranks.tolist()[find_driver_index(drivers, teammates[1])] <= 3 else 0)
-        )
-
-    # df_race = pandas.DataFrame({
-    #     'driver_id': driver_ids,
-    #     'driver': driver_names,
-    #     'sp': driver_starting_positions,
-    #     'speed_min': driver_sp_mins,
-    #     'speed_max': driver_sp_maxes,
-    #     'dnf': driver_dnfs,
-    #     'speed': sp_values,
-    #     'fp': fp_ranks,
-    #     'fl': driver_fl,
-    #     'll': driver_ll,
-    #     'dk': driver_dk
-    # })
+    results = simulation.simulate_race(simulation.load_sim_inputs(race_sim), num_iterations)
 
     return {
-        'dnf': driver_dnfs,
-        'fp': fp_ranks.tolist(),
-        'll': driver_ll,
-        'fl': driver_fl,
-        'dk': driver_dk,
-        'c_dk': constructor_dk
+        'dnf': results.get('dnf').tolist(),
+        'fp': results.get('fp').tolist(),
+        'll': results.get('ll').tolist(),
+        'fl': results.get('fl').tolist(),
+        'dk': results.get('dk').tolist(),
+        'c_dk': results.get('c_dk').tolist()
     }
 
 
@@ -459,12 +334,13 @@ def calc_sim_scores(results, sim_id, task_id):
         driver_ids = list(drivers.values_list('driver__driver_id', flat=True))
         constructor_ids = list(constructors.values_list('constructor__id', flat=True))
 
-        dnf_list = [obj.get('dnf') for obj in results]
-        fp_list = [obj.get('fp') for obj in results]
-        fl_list = [obj.get('fl') for obj in results]
-        ll_list = [obj.get('ll') for obj in results]
-        dk_list = [obj.get('dk') for obj in results]
-        c_dk_list = [obj.get('c_dk') for obj in results]
+        # each batch result holds one row per iteration
+        dnf_list = [row for obj in results for row in obj.get('dnf')]
+        fp_list = [row for obj in results for row in obj.get('fp')]
+        fl_list = [row for obj in results for row in obj.get('fl')]
+        ll_list = [row for obj in results for row in obj.get('ll')]
+        dk_list = [row for obj in results for row in obj.get('dk')]
+        c_dk_list = [row for obj in results for row in obj.get('c_dk')]
 
         df_dnf = pandas.DataFrame(dnf_list, columns=driver_ids)
         df_fp = pandas.DataFrame(fp_list, columns=driver_ids)
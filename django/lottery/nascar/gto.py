@@ -0,0 +1,90 @@
+import numpy
+
+# Drivers in a DraftKings NASCAR lineup
+LINEUP_SIZE = 6
+
+# Sim iterations solved by each make_optimals_for_gto task
+GTO_BATCH_SIZE = 1000
+
+
+def top_lineups(scores, salaries, salary_cap, num_lineups=1, lineup_size=LINEUP_SIZE):
+    '''
+    Returns up to num_lineups distinct highest scoring lineups of lineup_size drivers whose
+    total salary fits under salary_cap, best first, as (score, tuple of driver indices).
+
+    Drivers are searched depth-first in descending score order. A branch is cut as soon as
+    the best scores still available cannot beat the worst lineup kept, or the cheapest
+    salaries still available cannot fit under the cap.
+    '''
+    num_drivers = len(scores)
+    if num_drivers < lineup_size:
+        return []
+
+    order = numpy.argsort(-numpy.asarray(scores), kind='stable')
+    sorted_scores = numpy.asarray(scores, dtype=numpy.float64)[order].tolist()
+    sorted_salaries = numpy.asarray(salaries)[order].tolist()
+    order = order.tolist()
+
+    # score_sums[i] = sum of the i best scores, so the best k drivers from i on sum to score_sums[i + k] - score_sums[i]
+    score_sums = [0.0]
+    for score in sorted_scores:
+        score_sums.append(score_sums[-1] + score)
+
+    # min_salaries[i][k] = cheapest total salary of k drivers from position i on
+    min_salaries = [[0] * lineup_size for _ in range(num_drivers + 1)]
+    remaining = []
+    for i in range(num_drivers - 1, -1, -1):
+        remaining = sorted(remaining + [sorted_salaries[i]])[:lineup_size]
+        for k in range(1, lineup_size):
+            min_salaries[i][k] = sum(remaining[:k]) if k <= len(remaining) else float('inf')
+    for k in range(1, lineup_size):
+        min_salaries[num_drivers][k] = float('inf')
+
+    best = []  # (score, lineup) sorted best first
+    chosen = []
+
+    def search(start, score, salary):
+        need = lineup_size - len(chosen)
+        if need == 0:
+            best.append((score, tuple(sorted(order[i] for i in chosen))))
+            best.sort(key=lambda lineup: -lineup[0])
+            del best[num_lineups:]
+            return
+
+        for i in range(start, num_drivers - need + 1):
+            threshold = best[-1][0] if len(best) == num_lineups else float('-inf')
+            if score + score_sums[i + need] - score_sums[i] <= threshold:
+                break  # later drivers score less, so no later branch can do better
+
+            if salary + sorted_salaries[i] + min_salaries[i + 1][need - 1] > salary_cap:
+                continue
+
+            chosen.append(i)
+            search(i + 1, score + sorted_scores[i], salary + sorted_salaries[i])
+            chosen.pop()
+
+    search(0, 0.0, 0)
+    return best
+
+
+def solve_iterations(score_matrix, salaries, salary_cap, num_lineups=1, lineup_size=LINEUP_SIZE):
+    '''
+    Finds the top lineups for every iteration of a (drivers x iterations) score matrix.
+
+    Returns the optimal lineup of each iteration as an (iterations x lineup_size) array of
+    driver indices, and a dict of lineup (sorted tuple of driver indices) -> number of
+    iterations it was among the top num_lineups.
+    '''
+    optimals = []
+    counts = {}
+
+    for iteration in range(score_matrix.shape[1]):
+        lineups = top_lineups(score_matrix[:, iteration], salaries, salary_cap, num_lineups, lineup_size)
+        if len(lineups) == 0:
+            continue
+
+        optimals.append(lineups[0][1])
+        for _, lineup in lineups:
+            counts[lineup] = counts.get(lineup, 0) + 1
+
+    return numpy.array(optimals, dtype=numpy.int64).reshape((-1, lineup_size)), counts
@@ -0,0 +1,34 @@
+# Generated by Django 2.2 on 2022-12-15 11:30
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nascar', '0109_slatebuildlineupmatchup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='slatebuildlineup',
+            name='rank_median',
+            field=models.FloatField(db_index=True, default=0.0),
+        ),
+        migrations.AddField(
+            model_name='slatebuildlineup',
+            name='rank_s75',
+            field=models.FloatField(db_index=True, default=0.0),
+        ),
+        migrations.AddField(
+            model_name='slatebuildlineup',
+            name='rank_s90',
+            field=models.FloatField(db_index=True, default=0.0),
+        ),
+        migrations.AddField(
+            model_name='slatebuildlineup',
+            name='sim_score_ranks',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), blank=True, null=True, size=None),
+        ),
+    ]
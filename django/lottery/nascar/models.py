@@ -917,6 +917,10 @@ class SlateBuildLineup(models.Model):
     median = models.FloatField(db_index=True, default=0.0)
     s75 = models.FloatField(db_index=True, default=0.0)
     s90 = models.FloatField(db_index=True, default=0.0)
+    sim_score_ranks = ArrayField(models.IntegerField(), null=True, blank=True)
+    rank_median = models.FloatField(db_index=True, default=0.0)
+    rank_s75 = models.FloatField(db_index=True, default=0.0)
+    rank_s90 = models.FloatField(db_index=True, default=0.0)
 
     class Meta:
         verbose_name = 'Lineup'
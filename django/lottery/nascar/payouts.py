@@ -0,0 +1,4 @@
+from configuration.payouts import block_winnings, cumulative_prizes, iteration_blocks
+
+# Sim iterations paid out by each simulate_contest_block task
+CONTEST_BATCH_SIZE = 1000
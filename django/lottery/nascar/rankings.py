@@ -0,0 +1,95 @@
+import numpy
+
+# Upper bound on lineups x iterations sorted in memory at once
+MAX_BLOCK_ELEMENTS = 20000000
+
+# Lineups saved per bulk_update
+SAVE_BATCH_SIZE = 1000
+
+
+def load_score_matrix(rows, num_iterations):
+    '''
+    Builds a float32 (lineups x iterations) matrix from (id, sim_scores) rows. Returns the ids
+    and the matrix; missing or short score lists are padded with nan.
+    '''
+    ids = []
+    scores = numpy.full((len(rows), num_iterations), numpy.nan, dtype=numpy.float32)
+    for index, (lineup_id, sim_scores) in enumerate(rows):
+        ids.append(lineup_id)
+        if sim_scores is not None and len(sim_scores) > 0:
+            scores[index, :min(len(sim_scores), num_iterations)] = sim_scores[:num_iterations]
+    return ids, scores
+
+
+def rank_scores(scores):
+    '''
+    Replaces each iteration column of a (lineups x iterations) float32 score matrix with the
+    lineups' ranks in that iteration, highest score first, ties sharing the best rank
+    (pandas rank(method='min', ascending=False)). Lineups without a score rank last.
+
+    Columns are ranked in blocks sized to keep memory bounded and the ranks are written
+    back into the score matrix, which is returned.
+    '''
+    num_lineups, num_iterations = scores.shape
+    if num_lineups == 0:
+        return scores
+
+    block_size = max(1, MAX_BLOCK_ELEMENTS // num_lineups)
+    positions = numpy.arange(num_lineups)
+
+    for start in range(0, num_iterations, block_size):
+        block = scores[:, start:start + block_size].T
+        block = numpy.where(numpy.isnan(block), -numpy.inf, block)
+
+        order = numpy.argsort(-block, axis=1)
+        ranked = numpy.take_along_axis(block, order, axis=1)
+
+        new_group = numpy.ones(ranked.shape, dtype=bool)
+        new_group[:, 1:] = ranked[:, 1:] != ranked[:, :-1]
+        ranks = numpy.maximum.accumulate(numpy.where(new_group, positions, 0), axis=1) + 1
+
+        block_ranks = numpy.empty(ranks.shape, dtype=numpy.float32)
+        numpy.put_along_axis(block_ranks, order, ranks, axis=1)
+        scores[:, start:start + block_size] = block_ranks.T
+
+    return scores
+
+
+def summarize_ranks(ranks):
+    '''
+    Returns rank_median, rank_s75 and rank_s90 for each row of a rank matrix. Lower ranks are
+    better, so the 75th and 90th percentile outcomes are the 25th and 10th percentile ranks.
+    '''
+    rank_median, rank_s75, rank_s90 = numpy.percentile(ranks, [50, 25, 10], axis=1)
+    return {
+        'rank_median': rank_median,
+        'rank_s75': rank_s75,
+        'rank_s90': rank_s90,
+    }
+
+
+def save_rankings(model, ids, ranks, save_ranks=False):
+    '''
+    Bulk-writes rank_median, rank_s75 and rank_s90 for the lineups of model with the given
+    ids, one row of ranks per id. The full sim_score_ranks are only written when save_ranks
+    is set.
+    '''
+    if len(ids) == 0:
+        return
+
+    summary = summarize_ranks(ranks)
+    fields = ['rank_median', 'rank_s75', 'rank_s90']
+    if save_ranks:
+        fields.append('sim_score_ranks')
+
+    for start in range(0, len(ids), SAVE_BATCH_SIZE):
+        lineups = []
+        for index in range(start, min(start + SAVE_BATCH_SIZE, len(ids))):
+            lineup = model(id=ids[index])
+            for field in ['rank_median', 'rank_s75', 'rank_s90']:
+                setattr(lineup, field, float(summary[field][index]))
+            if save_ranks:
+                lineup.sim_score_ranks = ranks[index].astype(numpy.int64).tolist()
+            lineups.append(lineup)
+
+        model.objects.bulk_update(lineups, fields)
@@ -0,0 +1,421 @@
+import math
+import numpy
+
+from configuration.ranking import ordinal_ranks
+
+from . import models
+
+# Iterations simulated by each execute_sim_batch task
+SIM_BATCH_SIZE = 1000
+
+# Mean pit road penalties per caution (or per green flag stage) by series
+PIT_PENALTY_MEANS = {
+    1: 1.09375,
+    2: 1.366071429,
+}
+DEFAULT_PIT_PENALTY_MEAN = 1.421052632
+
+# Caution caps: at most 3 in stage 1, 6 through stage 2 and 10 overall
+STAGE_1_MAX_CAUTIONS = 3
+STAGE_2_MAX_CAUTIONS = 6
+MAX_CAUTIONS = 10
+
+# Speed rank penalty for damage (D) or DNF taken in a stage, by number of stages in the race
+DAMAGE_RANK_OFFSETS = {
+    4: {3: 2.1, 2: 4.1, 1: 6.1},
+    3: {3: 1.1, 2: 3.1, 1: 6.1},
+}
+
+NO_DAMAGE = 0
+MINOR_DAMAGE = 1
+MEDIUM_DAMAGE = 2
+DNF = 3
+
+GREEN = 0
+YELLOW = 1
+
+
+def load_sim_inputs(race_sim):
+    '''
+    Loads everything a race simulation needs from the database into plain arrays and lists,
+    so iterations can be simulated without touching the ORM.
+    '''
+    race = race_sim.race
+    num_stages = race.num_stages()
+
+    drivers = list(race_sim.outcomes.all().order_by('starting_position', 'id').values_list(
+        'driver__nascar_driver_id', 'starting_position', 'speed_min', 'speed_max', 'crash_rate'
+    ))
+    crash_rates = numpy.array([d[4] for d in drivers], dtype=numpy.float64)
+    crash_rate_sum = crash_rates.sum()
+
+    damage_profiles = []
+    for p in race_sim.damage_profiles.all().order_by('min_cars_involved'):
+        weights = numpy.array([
+            int(p.prob_no_damage * 100),
+            int(p.prob_minor_damage * 100),
+            int(p.prob_medium_damage * 100),
+            int(p.prob_dnf * 100)
+        ], dtype=numpy.float64)
+        damage_profiles.append((p.min_cars_involved, p.max_cars_involved, numpy.cumsum(weights / weights.sum())[:-1]))
+
+    # floor and ceiling impact of a penalty by [stage - 1, GREEN/YELLOW]; nan when there is no profile
+    penalty_impacts = numpy.full((num_stages, 2, 2), numpy.nan)
+    for p in race_sim.penalty_profiles.filter(stage__gte=1, stage__lte=num_stages):
+        penalty_impacts[p.stage - 1, GREEN if p.is_green else YELLOW] = [p.floor_impact, p.ceiling_impact]
+
+    scoring = models.SITE_SCORING.get('draftkings')
+    fp_points = numpy.zeros(max(len(drivers), len(scoring.get('finishing_position'))) + 1)
+    for position, points in scoring.get('finishing_position').items():
+        fp_points[int(position)] = points
+
+    return {
+        'num_stages': num_stages,
+        'scheduled_laps': race.scheduled_laps,
+        'laps_per_caution': race_sim.laps_per_caution,
+        'pit_penalty_mean': PIT_PENALTY_MEANS.get(race.series, DEFAULT_PIT_PENALTY_MEAN),
+        'early_stage_caution_mean': race_sim.early_stage_caution_mean,
+        'early_stage_cutoffs': numpy.cumsum([
+            race_sim.early_stage_caution_prob_debris,
+            race_sim.early_stage_caution_prob_accident_small,
+            race_sim.early_stage_caution_prob_accident_medium
+        ]),
+        'final_stage_caution_mean': race_sim.final_stage_caution_mean,
+        'final_stage_cutoffs': numpy.cumsum([
+            race_sim.final_stage_caution_prob_debris,
+            race_sim.final_stage_caution_prob_accident_small,
+            race_sim.final_stage_caution_prob_accident_medium
+        ]),
+        'track_variance': race_sim.track_variance,
+        'track_variance_late_restart': race_sim.track_variance_late_restart,
+        'driver_ids': [d[0] for d in drivers],
+        'starting_positions': numpy.array([d[1] for d in drivers], dtype=numpy.int64),
+        'speed_min': numpy.array([d[2] for d in drivers], dtype=numpy.float64),
+        'speed_max': numpy.array([d[3] for d in drivers], dtype=numpy.float64),
+        'crash_weights': numpy.round(crash_rates / crash_rate_sum * 100) if crash_rate_sum > 0 else numpy.zeros(len(drivers)),
+        'max_cars_involved': max([p[1] for p in damage_profiles], default=0),
+        'damage_profiles': damage_profiles,
+        'penalty_impacts': penalty_impacts,
+        'fl_profiles': list(race_sim.fl_profiles.all().order_by('eligible_speed_min').values_list(
+            'pct_fastest_laps_min', 'pct_fastest_laps_max', 'cum_fastest_laps_min', 'cum_fastest_laps_max', 'eligible_speed_min', 'eligible_speed_max'
+        )),
+        'll_profiles': list(race_sim.ll_profiles.all().order_by('rank_order').values_list(
+            'pct_laps_led_min', 'pct_laps_led_max', 'cum_laps_led_min', 'cum_laps_led_max', 'rank_order'
+        )),
+        'place_differential': scoring.get('place_differential'),
+        'fastest_laps': scoring.get('fastest_laps'),
+        'laps_led': scoring.get('laps_led'),
+        'fp_points': fp_points,
+    }
+
+
+def get_damage_cdf(inputs, num_cars):
+    '''
+    Returns the cumulative probabilities of no damage, minor damage, medium damage and DNF
+    for a car in a wreck involving num_cars cars.
+    '''
+    for min_cars, max_cars, cdf in inputs['damage_profiles']:
+        if min_cars <= num_cars <= max_cars:
+            return cdf
+    raise Exception(f'There is no damage profile for {num_cars} cars.')
+
+
+def simulate_incidents(inputs, rng):
+    '''
+    Simulates cautions, damage and pit road penalties for one race.
+
+    Returns per-driver arrays: dnf_stage (0 when the driver finished), damage_stage and
+    severe_damage for the last damage taken, minor/medium damage flags, penalty flags by
+    [stage - 1, GREEN/YELLOW] and the damage and penalty labels, plus the total number of
+    cautions and whether there was a late caution.
+    '''
+    num_drivers = len(inputs['driver_ids'])
+    num_stages = inputs['num_stages']
+    crash_weights = inputs['crash_weights']
+
+    in_race = numpy.ones(num_drivers, dtype=bool)
+    dnf_stage = numpy.zeros(num_drivers, dtype=numpy.int64)
+    damage_stage = numpy.zeros(num_drivers, dtype=numpy.int64)
+    severe_damage = numpy.zeros(num_drivers, dtype=bool)
+    minor_damage = numpy.zeros(num_drivers, dtype=bool)
+    medium_damage = numpy.zeros(num_drivers, dtype=bool)
+    penalties = numpy.zeros((num_stages, 2, num_drivers), dtype=bool)
+    damage_labels = [None] * num_drivers
+    penalty_labels = [None] * num_drivers
+
+    total_cautions = 0
+    late_caution = False
+
+    for stage in range(1, num_stages + 1):
+        if stage < num_stages:
+            num_cautions = rng.poisson(inputs['early_stage_caution_mean'])
+            if stage == 1:
+                num_cautions = min(num_cautions, STAGE_1_MAX_CAUTIONS)
+            elif stage == 2:
+                num_cautions = min(num_cautions, STAGE_2_MAX_CAUTIONS - total_cautions)
+            cutoffs = inputs['early_stage_cutoffs']
+        else:
+            num_cautions = min(rng.poisson(inputs['final_stage_caution_mean']), MAX_CAUTIONS - total_cautions)
+            cutoffs = inputs['final_stage_cutoffs']
+
+        total_cautions += num_cautions
+
+        # For each caution, assign damage
+        for _ in range(num_cautions):
+            num_remaining = int(in_race.sum())
+            c_val = rng.random()
+            if c_val <= cutoffs[0]:
+                min_cars, max_cars = -1, 0
+            elif c_val <= cutoffs[1]:
+                min_cars, max_cars = min(1, num_remaining), min(2, num_remaining)
+            elif c_val <= cutoffs[2]:
+                min_cars, max_cars = min(3, num_remaining), min(6, num_remaining)
+            else:
+                min_cars, max_cars = min(7, num_remaining), min(inputs['max_cars_involved'], num_remaining)
+
+            num_cars = max(math.ceil(rng.uniform(min_cars - 1, max_cars)), 0)
+            if num_cars == 0:
+                continue
+
+            # wreck involvement is weighted by crash rate among drivers still in the race
+            eligible = numpy.flatnonzero(in_race & (crash_weights > 0))
+            if len(eligible) == 0:
+                continue
+
+            # weighted sampling without replacement: smallest exponential keys scaled by weight
+            keys = rng.exponential(size=len(eligible)) / crash_weights[eligible]
+            involved = eligible[numpy.argsort(keys)[:num_cars]]
+            damage = numpy.searchsorted(get_damage_cdf(inputs, num_cars), rng.random(len(involved)), side='right')
+
+            for driver, value in zip(involved.tolist(), damage.tolist()):
+                if value == MINOR_DAMAGE:
+                    minor_damage[driver] = True
+                    damage_labels[driver] = f'{stage}d'
+                elif value == MEDIUM_DAMAGE:
+                    medium_damage[driver] = True
+                    damage_labels[driver] = f'{stage}D'
+                elif value == DNF:
+                    in_race[driver] = False
+                    dnf_stage[driver] = stage
+                    damage_labels[driver] = f'{stage}DNF'
+
+                if value != NO_DAMAGE:
+                    damage_stage[driver] = stage
+                    severe_damage[driver] = value != MINOR_DAMAGE
+
+        # assign penalties based on number of cautions: green flag penalties when the stage
+        # ran caution-free, otherwise yellow flag penalties for each caution, plus yellow flag
+        # penalties under the stage-end caution
+        remaining = numpy.flatnonzero(in_race)
+        if len(remaining) > 0:
+            flag = GREEN if num_cautions == 0 else YELLOW
+            num_penalties = rng.poisson(inputs['pit_penalty_mean'], max(num_cautions, 1)).sum()
+            penalties[stage - 1, flag, remaining[rng.integers(0, len(remaining), num_penalties)]] = True
+
+            if stage < num_stages:
+                num_penalties = rng.poisson(inputs['pit_penalty_mean'])
+                penalties[stage - 1, YELLOW, remaining[rng.integers(0, len(remaining), num_penalties)]] = True
+
+        for driver in numpy.flatnonzero(in_race & penalties[stage - 1].any(axis=0)):
+            penalty_labels[driver] = f'{stage}G' if penalties[stage - 1, GREEN, driver] else f'{stage}Y'
+
+        # Was there a late caution
+        if stage == num_stages:
+            if num_cautions == 1:
+                late_caution = rng.random() < 0.50
+            elif num_cautions == 2:
+                late_caution = rng.random() < 0.75
+            elif num_cautions >= 3:
+                late_caution = True
+
+    return {
+        'dnf_stage': dnf_stage,
+        'damage_stage': damage_stage,
+        'severe_damage': severe_damage,
+        'minor_damage': minor_damage,
+        'medium_damage': medium_damage,
+        'penalties': penalties,
+        'damage_labels': damage_labels,
+        'penalty_labels': penalty_labels,
+        'total_cautions': total_cautions,
+        'late_caution': late_caution,
+    }
+
+
+def draw_profile_laps(profiles, total_laps, rng):
+    '''
+    Draws the number of laps awarded to each fastest laps or laps led profile, retrying each
+    draw up to 10 times to keep the running total inside the profile's cumulative range.
+    '''
+    values = []
+    cum = 0
+    for pct_min, pct_max, cum_pct_min, cum_pct_max, *_ in profiles:
+        low = int(pct_min * 100)
+        high = max(int(pct_max * 100), 1) + 1
+        pct = rng.integers(low, high) if pct_min < pct_max else low
+        cum_min = int(cum_pct_min * total_laps)
+        cum_max = int(cum_pct_max * total_laps)
+        v = max(int((pct / 100) * total_laps), 1)
+
+        attempts = 0
+        while (cum + v < cum_min or cum + v > cum_max) and attempts < 10:
+            pct = rng.integers(low, high)
+            v = max(int((pct / 100) * total_laps), 1)
+            attempts += 1
+
+        if attempts == 10:
+            break
+
+        cum += v
+        values.append(v)
+
+        if cum >= total_laps:  # if we run out before we get to the last profile
+            break
+
+    return values
+
+
+def assign_fastest_laps(inputs, osr, total_cautions, rng):
+    '''
+    Returns the fastest laps of each driver given their incident-free speed ranks.
+    '''
+    caution_laps = int((total_cautions + inputs['num_stages'] - 1) * inputs['laps_per_caution'])
+    fl_laps = inputs['scheduled_laps'] - caution_laps
+    driver_at_rank = numpy.argsort(osr)
+
+    driver_fl = numpy.zeros(len(osr), dtype=numpy.int64)
+    fl_vals = draw_profile_laps(inputs['fl_profiles'], fl_laps, rng)
+    for fl_val, profile in zip(fl_vals, inputs['fl_profiles']):
+        driver_fl[driver_at_rank[rng.integers(profile[4], profile[5] + 1) - 1]] = fl_val
+
+    # there may be remaining FL, extra FL goes to top 5 guys 1 or 2 laps at a time
+    fl_laps_remaining = fl_laps - sum(fl_vals)
+    if fl_laps_remaining > 0:
+        tranches = rng.integers(1, 3, size=fl_laps_remaining)
+        num_tranches = int(numpy.searchsorted(numpy.cumsum(tranches), fl_laps_remaining)) + 1
+        tranches = tranches[:num_tranches]
+        tranches[-1] -= tranches.sum() - fl_laps_remaining
+        numpy.add.at(driver_fl, driver_at_rank[rng.integers(1, 6, size=num_tranches) - 1], tranches)
+
+    return driver_fl
+
+
+def assign_laps_led(inputs, fl_ranks, rng):
+    '''
+    Returns the laps led of each driver given their fastest lap ranks (1 = most fastest laps).
+    '''
+    ll_laps = inputs['scheduled_laps']
+    driver_at_rank = numpy.argsort(fl_ranks)
+
+    driver_ll = numpy.zeros(len(fl_ranks), dtype=numpy.int64)
+    ll_vals = draw_profile_laps(inputs['ll_profiles'], ll_laps, rng)
+    for ll_val, profile in zip(ll_vals, inputs['ll_profiles']):
+        driver_ll[driver_at_rank[profile[4] - 1]] = ll_val
+
+    # there may be remaining LL, assign to the 2nd or 3rd ranked drivers in tranches of 5
+    ll_laps_remaining = ll_laps - sum(ll_vals)
+    if ll_laps_remaining > 0:
+        tranches = numpy.full(math.ceil(ll_laps_remaining / 5), 5)
+        tranches[-1] = ll_laps_remaining - 5 * (len(tranches) - 1)
+        numpy.add.at(driver_ll, driver_at_rank[rng.integers(2, 4, size=len(tranches)) - 1], tranches)
+
+    return driver_ll
+
+
+def simulate_race(inputs, num_iterations, rng=None):
+    '''
+    Simulates num_iterations races and returns (iterations x drivers) matrices keyed like
+    the results sim_execution_complete expects: osr, sr, fp, fl, ll and dk as arrays, dam
+    and pen as lists of label lists.
+
+    Incidents and lap awards are drawn per iteration from in-memory arrays; speeds, ranks,
+    finishing positions and scores are computed for the whole batch at once.
+    '''
+    rng = rng if rng is not None else numpy.random.default_rng()
+    num_drivers = len(inputs['driver_ids'])
+    num_stages = inputs['num_stages']
+    shape = (num_iterations, num_drivers)
+
+    incidents = [simulate_incidents(inputs, rng) for _ in range(num_iterations)]
+    dnf_stage = numpy.array([i['dnf_stage'] for i in incidents]).reshape(shape)
+    damage_stage = numpy.array([i['damage_stage'] for i in incidents]).reshape(shape)
+    severe_damage = numpy.array([i['severe_damage'] for i in incidents]).reshape(shape)
+    minor_damage = numpy.array([i['minor_damage'] for i in incidents]).reshape(shape)
+    medium_damage = numpy.array([i['medium_damage'] for i in incidents]).reshape(shape)
+    penalties = numpy.array([i['penalties'] for i in incidents]).reshape((num_iterations, num_stages, 2, num_drivers))
+    late_caution = numpy.array([i['late_caution'] for i in incidents], dtype=bool)
+    dnf = dnf_stage > 0
+
+    # Assign incident-free speed values
+    # Note: We must capture a driver's speed without incidents to accurately assign FL and LL; This ensures that damaged cars sometimes get FL and LL depending on when they took damage
+    speed = rng.uniform(inputs['speed_min'], inputs['speed_max'] + 0.1, size=shape) + rng.random(shape)
+    osr = ordinal_ranks(speed)
+
+    # Adjust incident-free speed ranks for damage (driver ranks move down based on when damage occurs)
+    offsets = numpy.zeros(num_stages + 1)
+    for stage, offset in DAMAGE_RANK_OFFSETS[4 if num_stages == 4 else 3].items():
+        if stage <= num_stages:
+            offsets[stage] = offset
+    osr = ordinal_ranks(osr + numpy.where(severe_damage, offsets[damage_stage], 0.0))
+
+    # Assign adjusted speed from incident-free speed by applying damage; DNFs always fall to the bottom, but keep them in order stage to stage
+    adjusted_speed = numpy.where(
+        dnf,
+        999 + (num_stages - dnf_stage + 1) * 1000 + rng.random(shape),
+        numpy.where(
+            medium_damage,
+            rng.uniform(20, 40, size=shape),
+            numpy.where(minor_damage, speed + rng.uniform(0, 5, size=shape), speed)
+        )
+    )
+    sr = ordinal_ranks(adjusted_speed)
+
+    # Assign finishing position, widening the range of drivers running 6th-20th by the race variance
+    race_variance = numpy.where(late_caution, inputs['track_variance_late_restart'], inputs['track_variance'])[:, numpy.newaxis]
+    variance = numpy.where((sr > 5) & (sr <= 20), race_variance, 0.0)
+    flr = sr - variance
+    ceil = sr + variance
+
+    penalty_impacts = inputs['penalty_impacts']
+    penalized = penalties & ~dnf[:, numpy.newaxis, numpy.newaxis, :]
+    missing = numpy.isnan(penalty_impacts[:, :, 0])
+    if (penalized & missing[numpy.newaxis, :, :, numpy.newaxis]).any():
+        stage, flag = numpy.argwhere(missing & penalized.any(axis=(0, 3)))[0]
+        raise Exception(f'There is no {"green" if flag == GREEN else "yellow"} flag penalty profile for stage {stage + 1}.')
+
+    impacts = numpy.nan_to_num(penalty_impacts)
+    ceil = ceil + numpy.einsum('bsfd,sf->bd', penalized, impacts[:, :, 0])
+    flr = flr + numpy.einsum('bsfd,sf->bd', penalized, impacts[:, :, 1])
+
+    fp_vals = numpy.where(dnf, adjusted_speed, flr + (ceil - flr) * rng.random(shape) + rng.random(shape))
+    fp = ordinal_ranks(fp_vals)
+
+    # Assign fastest laps
+    fl = numpy.array([
+        assign_fastest_laps(inputs, osr[index], incident['total_cautions'], rng) for index, incident in enumerate(incidents)
+    ]).reshape(shape)
+
+    # Assign laps led, finding eligible drivers by giving each driver a randbetween(0, FL%), then ranking each driver
+    fl_rank_vals = rng.uniform(fl * 0.25, fl + 0.1) + rng.random(shape)
+    fl_ranks = num_drivers + 1 - ordinal_ranks(fl_rank_vals)
+    ll = numpy.array([
+        assign_laps_led(inputs, fl_ranks[index], rng) for index in range(num_iterations)
+    ]).reshape(shape)
+
+    dk = (
+        inputs['place_differential'] * (inputs['starting_positions'] - fp) +
+        inputs['fastest_laps'] * fl +
+        inputs['fp_points'][fp] +
+        inputs['laps_led'] * ll
+    )
+
+    return {
+        'osr': osr,
+        'sr': sr,
+        'fp': fp,
+        'll': ll,
+        'fl': fl,
+        'dk': dk,
+        'dam': [i['damage_labels'] for i in incidents],
+        'pen': [i['penalty_labels'] for i in incidents],
+    }
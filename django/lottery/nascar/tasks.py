@@ -9,7 +9,6 @@ import psycopg2
 # import modin.pandas as pandas
 import re
 import requests
-import scipy
 import sqlalchemy
 import sys
 import time
@@ -18,8 +17,6 @@ import uuid
 
 from psycopg2.extensions import register_adapter, AsIs
 
-from random import random, uniform, randrange
-
 from celery import shared_task, chord, group, chain
 from contextlib import contextmanager
 
@@ -31,10 +28,13 @@ from django.db.models import Q, F, ExpressionWrapper, FloatField
 from django.db import transaction
 
 from configuration.models import BackgroundTask
-from pydfs_lineup_optimizer import Site, Sport, Player, get_optimizer
 
+from . import gto
 from . import models
 from . import optimize
+from . import payouts
+from . import rankings
+from . import simulation
 
 from lottery.celery import app
 
@@ -755,10 +755,14 @@ def execute_sim(sim_id, task_id):
             task = BackgroundTask.objects.get(id=task_id)
 
         race_sim = models.RaceSim.objects.get(id=sim_id)
+        batches = [
+            min(simulation.SIM_BATCH_SIZE, race_sim.iterations - start) for start in range(0, race_sim.iterations, simulation.SIM_BATCH_SIZE)
+        ]
+
         if race_sim.run_with_gto:
             chain(
                 chord([
-                    execute_sim_iteration.si(sim_id) for _ in range(0, race_sim.iterations)
+                    execute_sim_batch.si(sim_id, num_iterations) for num_iterations in batches
                 ], sim_execution_complete.s(sim_id, task_id)),
                 find_driver_gto.si(
                     race_sim.id,
@@ -770,7 +774,7 @@ def execute_sim(sim_id, task_id):
             )()
         else:
             chord([
-                execute_sim_iteration.si(sim_id) for _ in range(0, race_sim.iterations)
+                execute_sim_batch.si(sim_id, num_iterations) for num_iterations in batches
             ], sim_execution_complete.s(sim_id, task_id))()
 
     except Exception as e:
@@ -784,601 +788,19 @@ def execute_sim(sim_id, task_id):
 
 
 @shared_task
-def execute_sim_iteration(sim_id):
+def execute_sim_batch(sim_id, num_iterations):
     race_sim = models.RaceSim.objects.get(id=sim_id)
-    drivers = race_sim.outcomes.all().order_by('starting_position', 'id')
-    crash_rate_sum = drivers.aggregate(crash_rate_sum=Sum('crash_rate')).get('crash_rate_sum')
-    
-    if race_sim.race.series == 1:
-        pit_penalty_mean = 1.09375
-    elif race_sim.race.series == 2:
-        pit_penalty_mean = 1.366071429
-    else:
-        pit_penalty_mean = 1.421052632
-    
-    # for n in range(1, race_sim.iterations+1):
-    race_drivers = list(drivers.values_list('driver__nascar_driver_id', flat=True))  # tracks drivers still in race
-    driver_ids = list(drivers.values_list('driver__nascar_driver_id', flat=True))
-    driver_names = list(drivers.values_list('driver__full_name', flat=True))
-    driver_starting_positions = list(drivers.values_list('starting_position', flat=True))
-
-    driver_dnfs = [None for driver in drivers]
-    driver_sp_mins = list(drivers.values_list('speed_min', flat=True))
-    driver_sp_maxes = list(drivers.values_list('speed_max', flat=True))
-    # driver_bp_sp_mins = list(drivers.values_list('best_possible_speed', flat=True))
-    # driver_bp_sp_maxes = list(drivers.values_list('worst_possible_speed', flat=True))
-
-    driver_s1_penalties = [None for driver in drivers]
-    # driver_s1_ranks = [None for driver in drivers]
-    # driver_s1_mins = [None for driver in drivers]
-    # driver_s1_maxes = [None for driver in drivers]
-    # driver_s1_fl = [0 for driver in drivers]
-    
-    driver_s2_penalties = [None for driver in drivers]
-    # driver_s2_ranks = [None for driver in drivers]
-    # driver_s2_mins = [None for driver in drivers]
-    # driver_s2_maxes = [None for driver in drivers]
-    # driver_s2_fl = [0 for driver in drivers]
-    
-    driver_s3_penalties = [None for driver in drivers]
-    # driver_s3_ranks = [None for driver in drivers]
-    # driver_s3_mins = [None for driver in drivers]
-    # driver_s3_maxes = [None for driver in drivers]
-    # driver_s3_fl = [0 for driver in drivers]
-
-    if race_sim.race.num_stages() > 3:
-        driver_s4_penalties = [None for driver in drivers]
-        # driver_s4_ranks = [None for driver in drivers]
-        # driver_s4_fl = [0 for driver in drivers]
-
-    driver_fl = [0 for driver in drivers]
-    driver_ll = [0 for driver in drivers]
-    driver_damage = [None for driver in drivers]
-    driver_penalty = [None for driver in drivers]
-
-    minor_damage_drivers = []
-    medium_damage_drivers = []
-    dnf_drivers = []
-
-    stage_1_green_penalty_drivers = []
-    stage_1_yellow_penalty_drivers = []
-    stage_2_green_penalty_drivers = []
-    stage_2_yellow_penalty_drivers = []
-    stage_3_green_penalty_drivers = []
-    stage_3_yellow_penalty_drivers = []
-    stage_4_green_penalty_drivers = []
-    stage_4_yellow_penalty_drivers = []
-
-    late_caution = False
-    total_cautions = 0
-
-    for stage in range(1, race_sim.race.num_stages() + 1):
-        # num_laps = race_sim.race.get_laps_for_stage(stage)
-        # print(f'Stage {stage}: {num_laps} laps')
-
-        # Find # of cautions & caution type thresholds
-
-        if stage < race_sim.race.num_stages():
-            num_cautions = scipy.stats.poisson.rvs(race_sim.early_stage_caution_mean)
-            if stage == 1 and num_cautions > 3:
-                num_cautions = 3
-            if stage == 2 and total_cautions + num_cautions > 6:
-                num_cautions = 6 - total_cautions
-
-            debris_caution_cutoff = race_sim.early_stage_caution_prob_debris
-            accident_small_caution_cutoff = race_sim.early_stage_caution_prob_accident_small
-            accident_medium_caution_cutoff = race_sim.early_stage_caution_prob_accident_medium
-            # accident_major_caution_cutoff = race_sim.early_stage_caution_prob_accident_major
-        else:
-            num_cautions = scipy.stats.poisson.rvs(race_sim.final_stage_caution_mean)
-            if total_cautions + num_cautions > 10:
-                num_cautions = 10 - total_cautions
-
-            debris_caution_cutoff = race_sim.final_stage_caution_prob_debris
-            accident_small_caution_cutoff = race_sim.final_stage_caution_prob_accident_small
-            accident_medium_caution_cutoff = race_sim.final_stage_caution_prob_accident_medium
-            # accident_major_caution_cutoff = race_sim.final_stage_caution_prob_accident_major
-
-        total_cautions += num_cautions
-        # print(f'  There are {num_cautions} cautions.')
-
-        # For each caution, assign damage
-        max_drivers = race_sim.damage_profiles.all().order_by('-max_cars_involved').first().max_cars_involved
-        for _ in range(0, num_cautions):
-            c_val = random()
-            if c_val <= debris_caution_cutoff:
-                min_cars = -1
-                max_cars = 0
-            elif c_val <= debris_caution_cutoff + accident_small_caution_cutoff:
-                min_cars = min(1, len(race_drivers))
-                max_cars = min(2, len(race_drivers))
-            elif c_val <= debris_caution_cutoff + accident_small_caution_cutoff + accident_medium_caution_cutoff:
-                min_cars = min(3, len(race_drivers))
-                max_cars = min(6, len(race_drivers))
-            else:
-                min_cars = min(7, len(race_drivers))
-                max_cars = min(max_drivers, len(race_drivers))
-
-            num_cars = max(math.ceil(uniform(min_cars - 1, max_cars)), 0)
-            # print(f'Caution {caution + 1}: {num_cars} involved.')
-
-            # assign damage
-            involved_cars = []
-            for _ in range(0, num_cars):
-                # create probabilty pool for wreck involvement based on remaining race drivers
-                crash_pool = [] 
-                for driver in drivers.filter(driver__nascar_driver_id__in=race_drivers):
-                    n = round((driver.crash_rate / crash_rate_sum) * 100)
-                    for _ in range(0, n):
-                        crash_pool.append(driver)
-                involved_car_index = round(uniform(0, len(crash_pool)-1))
-                involved_car = crash_pool[involved_car_index]
-
-                while involved_car.id in involved_cars:
-                    involved_car_index = round(uniform(0, len(crash_pool)-1))
-                    involved_car = crash_pool[involved_car_index]
-
-                involved_cars.append(involved_car.id)
-
-                # assign damage using no damage (0), minor damage (1), damage (2), and DNF (3) percentages based on the caution type (small, medium, major)
-                damage_profile = race_sim.get_damage_profile(num_cars)
-                
-                damage_options = [0 for _ in range(0, int(damage_profile.prob_no_damage * 100))]
-                damage_options += [1 for _ in range(0, int(damage_profile.prob_minor_damage * 100))]
-                damage_options += [2 for _ in range(0, int(damage_profile.prob_medium_damage * 100))]
-                damage_options += [3 for _ in range(0, int(damage_profile.prob_dnf * 100))]
-
-                damage_index = round(uniform(0, len(damage_options)-1))
-                damage_value = damage_options[damage_index]
-                
-                driver_index = driver_ids.index(involved_car.driver.nascar_driver_id)
-
-                if damage_value == 0:
-                    # print(f'{involved_car} [{involved_car.id}] takes no damage')
-                    pass
-                elif damage_value == 1:
-                    # print(f'{involved_car} [{involved_car.id}] takes minor damage')
-                    minor_damage_drivers.append(involved_car)
-                    driver_damage[driver_index] = f'{stage}d'
-                elif damage_value == 2:
-                    # print(f'{involved_car} [{involved_car.id}] takes medium damage')
-                    medium_damage_drivers.append(involved_car)
-                    driver_damage[driver_index] = f'{stage}D'
-                else:
-                    # print(f'{involved_car} [{involved_car.id}] is out of the race')
-                    race_drivers = list(filter((involved_car.id).__ne__, race_drivers))
-                    dnf_drivers.append(involved_car)
-                    driver_damage[driver_index] = f'{stage}DNF'
-
-        # assign penalties based on number of cautions
-        if num_cautions == 0:
-            num_penalties = scipy.stats.poisson.rvs(pit_penalty_mean)
-            # print(f'There are {num_penalties} penalties')
-
-            # all penalties are green flag
-            for _ in range(0, num_penalties):
-                penalized_driver = race_drivers[round(uniform(0, len(race_drivers)-1))]
-                # print(f'{drivers.get(driver__nascar_driver_id=penalized_driver)} had a green flag penalty')
-
-                if stage == 1:
-                    stage_1_green_penalty_drivers.append(drivers.get(driver__nascar_driver_id=penalized_driver))
-                elif stage == 2:
-                    stage_2_green_penalty_drivers.append(drivers.get(driver__nascar_driver_id=penalized_driver))
-                elif stage == 3:
-                    stage_3_green_penalty_drivers.append(drivers.get(driver__nascar_driver_id=penalized_driver))
-                else:
-                    stage_4_green_penalty_drivers.append(drivers.get(driver__nascar_driver_id=penalized_driver))
-        else:
-            # generate penalties for each caution
-            for _ in range(0, num_cautions):
-                num_penalties = scipy.stats.poisson.rvs(pit_penalty_mean)
-                # print(f'There are {num_penalties} penalties')
-
-                # all penalties are yellow flag
-                for _ in range(0, num_penalties):
-                    penalized_driver = race_drivers[round(uniform(0, len(race_drivers)-1))]
-                    # print(f'{drivers.get(driver__nascar_driver_id=penalized_driver)} had a yellow flag penalty')
-
-                    if stage == 1:
-                        stage_1_yellow_penalty_drivers.append(drivers.get(driver__nascar_driver_id=penalized_driver))
-                    elif stage == 2:
-                        stage_2_yellow_penalty_drivers.append(drivers.get(driver__nascar_driver_id=penalized_driver))
-                    elif stage == 3:
-                        stage_3_yellow_penalty_drivers.append(drivers.get(driver__nascar_driver_id=penalized_driver))
-                    else:
-                        stage_4_yellow_penalty_drivers.append(drivers.get(driver__nascar_driver_id=penalized_driver))
-
-        if stage < race_sim.race.num_stages():
-            # add stage caution penalties
-            num_penalties = scipy.stats.poisson.rvs(pit_penalty_mean)
-            # print(f'There are {num_penalties} end of stage penalties')
-            
-            for _ in range(0, num_penalties):
-                penalized_driver = race_drivers[round(uniform(0, len(race_drivers)-1))]
-                # print(f'{drivers.get(driver__nascar_driver_id=penalized_driver)} had a yellow flag penalty')
-
-                if stage == 1:
-                    stage_1_yellow_penalty_drivers.append(drivers.get(driver__nascar_driver_id=penalized_driver))
-                elif stage == 2:
-                    stage_2_yellow_penalty_drivers.append(drivers.get(driver__nascar_driver_id=penalized_driver))
-                elif stage == 3:
-                    stage_3_yellow_penalty_drivers.append(drivers.get(driver__nascar_driver_id=penalized_driver))
-                else:
-                    stage_4_yellow_penalty_drivers.append(drivers.get(driver__nascar_driver_id=penalized_driver))
-
-        # Update dnfs, penalties after each stage
-        # speed = []
-        for index, driver in enumerate(drivers):
-            if driver in dnf_drivers:
-                if driver_dnfs[index] is None:  # make sure driver didn't dnf in previous stage
-                    # Did driver DNF?
-                    driver_dnfs[index] = stage
-                # speed.append(9999*(race_sim.race.num_stages()-driver_dnfs[index]+1)+index)  # DNFs always fall to the bottom, but keep them in order stage to stage
-            else:
-                # Assign speed
-                if stage == 1:
-                    # Did driver have a penalty?
-                    if driver in stage_1_green_penalty_drivers:
-                        driver_s1_penalties[index] = 'G'
-                        driver_penalty[index] = '1G'
-                    elif driver in stage_1_yellow_penalty_drivers:
-                        driver_s1_penalties[index] = 'Y'
-                        driver_penalty[index] = '1Y'
-
-                    # flr = driver.speed_min
-                    # ceil = driver.speed_max
-                elif stage == 2:
-                    # Did driver have a penalty?
-                    if driver in stage_2_green_penalty_drivers:
-                        driver_s2_penalties[index] = 'G'
-                        driver_penalty[index] = '2G'
-                    elif driver in stage_2_yellow_penalty_drivers:
-                        driver_s2_penalties[index] = 'Y'
-                        driver_penalty[index] = '2Y'
-
-                    # flr = driver_s1_mins[index]
-                    # ceil = driver_s1_maxes[index]
-                elif stage == 3:
-                    # Did driver have a penalty?
-                    if driver in stage_3_green_penalty_drivers:
-                        driver_s3_penalties[index] = 'G'
-                        driver_penalty[index] = '3G'
-                    elif driver in stage_3_yellow_penalty_drivers:
-                        driver_s3_penalties[index] = 'Y'
-                        driver_penalty[index] = '3Y'
-
-                    # flr = driver_s2_mins[index]
-                    # ceil = driver_s2_maxes[index]
-                elif stage == 4:
-            # Did driver have a penalty?
-                    if driver in stage_4_green_penalty_drivers:
-                        driver_s4_penalties[index] = 'G'
-                        driver_penalty[index] = '4G'
-                    elif driver in stage_4_yellow_penalty_drivers:
-                        driver_s4_penalties[index] = 'Y'
-                        driver_penalty[index] = '4Y'
-
-        # Was there a late caution
-        if stage == race_sim.race.num_stages():
-            val = random()
-            if num_cautions == 1:
-                late_caution = val < 0.50
-            elif num_cautions == 2:
-                late_caution = val < 0.75
-            elif num_cautions >= 3:
-                late_caution = True
-
-    speed = []
-    adjusted_speed = []
-
-    # Assign incident-free speed values
-    # Note: We must capture a driver's speed without incidents to accurately assign FL and LL; This ensures that damaged cars sometimes get FL and LL depending on when they took damage
-    for index, driver in enumerate(drivers):
-        flr = driver.speed_min
-        ceil = driver.speed_max
-        d_sr = uniform(flr, ceil+0.1) + random()
-        speed.append(d_sr)
-
-    # Rank incident-free speed
-    orig_speed_ranks = scipy.stats.rankdata(speed, method='ordinal')
-
-    # Adjust incident-free speed ranks for damage (driver ranks move down based on when damage occurs)
-    for index, driver in enumerate(drivers):
-        if race_sim.race.num_stages() == 4:
-            if driver_damage[index] == '3DNF' or driver_damage[index] == '3D':
-                orig_speed_ranks[index] += 2.1
-            elif driver_damage[index] == '2DNF' or driver_damage[index] == '2D':
-                orig_speed_ranks[index] += 4.1
-            elif driver_damage[index] == '1DNF' or driver_damage[index] == '1D':
-                orig_speed_ranks[index] += 6.1
-        else:
-            if driver_damage[index] == '3DNF' or driver_damage[index] == '3D':
-                orig_speed_ranks[index] += 1.1
-            elif driver_damage[index] == '2DNF' or driver_damage[index] == '2D':
-                orig_speed_ranks[index] += 3.1
-            elif driver_damage[index] == '1DNF' or driver_damage[index] == '1D':
-                orig_speed_ranks[index] += 6.1
-    orig_speed_ranks = scipy.stats.rankdata(orig_speed_ranks, method='ordinal')
-
-    # Assign adjusted speed from incident-free speed by applying damage
-    for index, driver in enumerate(drivers):
-        if driver in dnf_drivers:
-            val = 999 + (race_sim.race.num_stages()-driver_dnfs[index]+1) * 1000 + random()  # DNFs always fall to the bottom, but keep them in order stage to stage
-            adjusted_speed.append(val)
-        else:
-            # flr = driver.speed_min
-            # ceil = driver.speed_max
-            
-            # Did driver take damage
-            if driver in medium_damage_drivers:  # medium damage means new speed is between 20 and 40
-                adjusted_speed.append(uniform(20, 40))
-            elif driver in minor_damage_drivers:  # minor damage means adjust speed between 0 and 5
-                adjustment_value = uniform(0, 5)
-                adjusted_speed.append(speed[index] + adjustment_value)
-            else:
-                adjusted_speed.append(speed[index])  # no damage, adjusted speed = incident-free speed
-
-    # Rank adjusted speed
-    final_ranks = scipy.stats.rankdata(adjusted_speed, method='ordinal')
-
-    # Calculate race variance based on late caution
-    if late_caution:
-        race_variance = race_sim.track_variance_late_restart
-    else:
-        race_variance = race_sim.track_variance
-    
-    # if total_cautions <= 7:
-    #     race_variance += 0
-    # elif total_cautions <= 10:
-    #     race_variance += 1
-    # elif total_cautions <= 13:
-    #     race_variance += 2
-    # elif total_cautions >= 14:
-    #     race_variance += 3
-
-    # Assign finishing position
-    fp_vals = []
-    for index, final_sp in enumerate(final_ranks):
-        flr = final_sp - race_variance if final_sp > 5 and final_sp <= 20 else final_sp
-        ceil = final_sp + race_variance if final_sp > 5 and final_sp <= 20 else final_sp
-
-        driver = drivers[index]
-        # print(f'{driver}; flr = {flr}; ceil = {ceil}; final_sp = {final_sp}')
-        if driver_dnfs[index] is not None:
-            # DNF drivers stay where they are
-            fp_vals.append(adjusted_speed[index])
-        else:
-            if driver in stage_1_green_penalty_drivers:
-                ceil += race_sim.get_penalty_profile(1, True).floor_impact
-                flr += race_sim.get_penalty_profile(1, True).ceiling_impact
-            if driver in stage_1_yellow_penalty_drivers:
-                ceil += race_sim.get_penalty_profile(1, False).floor_impact
-                flr += race_sim.get_penalty_profile(1, False).ceiling_impact
-            if driver in stage_2_green_penalty_drivers:
-                ceil += race_sim.get_penalty_profile(2, True).floor_impact
-                flr += race_sim.get_penalty_profile(2, True).ceiling_impact
-            if driver in stage_2_yellow_penalty_drivers:
-                ceil += race_sim.get_penalty_profile(2, False).floor_impact
-                flr += race_sim.get_penalty_profile(2, False).ceiling_impact
-            if driver in stage_3_green_penalty_drivers:
-                ceil += race_sim.get_penalty_profile(3, True).floor_impact
-                flr += race_sim.get_penalty_profile(3, True).ceiling_impact
-            if driver in stage_3_yellow_penalty_drivers:
-                ceil += race_sim.get_penalty_profile(3, False).floor_impact
-                flr += race_sim.get_penalty_profile(3, False).ceiling_impact
-            if driver in stage_4_green_penalty_drivers:
-                ceil += race_sim.get_penalty_profile(4, True).floor_impact
-                flr += race_sim.get_penalty_profile(4, True).ceiling_impact
-            if driver in stage_4_yellow_penalty_drivers:
-                ceil += race_sim.get_penalty_profile(4, False).floor_impact
-                flr += race_sim.get_penalty_profile(4, False).ceiling_impact
-        
-            # mu = numpy.average([flr, ceil])
-            # stdev = numpy.std([mu, ceil, flr], dtype=numpy.float64)
-            # fp_vals.append(numpy.random.normal(mu, stdev, 1)[0] + random())
-            fp_vals.append(uniform(flr, ceil) + random())
-    fp_ranks = scipy.stats.rankdata(fp_vals, method='ordinal')
-    # print(fp_ranks)
-
-    # Assign fastest laps
-    caution_laps = int((total_cautions + race_sim.race.num_stages() - 1) * race_sim.laps_per_caution)
-    # logger.info(f'total_cautions = {total_cautions}')
-    # logger.info(f'race_sim.race.num_stages() = {race_sim.race.num_stages()}')
-    # logger.info(f'race_sim.laps_per_caution = {race_sim.laps_per_caution}')
-    # logger.info(f'caution_laps = {caution_laps}')
-    fl_laps = race_sim.race.scheduled_laps - caution_laps
-    # fl_vals = [max(int(randrange(int(p.pct_laps_led_min*100), int(p.pct_laps_led_max*100), 1)/100 * fl_laps), 1) for p in race_sim.fl_profiles.all().order_by('-pct_laps_led_min')]
-
-    fl_vals = []
-    cum = 0
-    for p in race_sim.fl_profiles.all().order_by('eligible_speed_min'):
-        pct = randrange(int(p.pct_fastest_laps_min*100), max(int(p.pct_fastest_laps_max*100), 1) + 1, 1) if p.pct_fastest_laps_min < p.pct_fastest_laps_max else int(p.pct_fastest_laps_min*100)
-        cum_min = int(p.cum_fastest_laps_min * fl_laps)
-        cum_max = int(p.cum_fastest_laps_max * fl_laps)
-        v = max(int((pct/100) * fl_laps), 1)
-        
-        attempts = 0
-        while (cum + v < cum_min or cum + v > cum_max) and attempts < 10:
-            pct = randrange(int(p.pct_fastest_laps_min*100), max(int(p.pct_fastest_laps_max*100), 1) + 1, 1)
-            v = max(int((pct/100) * fl_laps), 1)
-            attempts += 1
-            # print(f'cum = {cum}; pct = {pct}; min = {int(p.pct_fastest_laps_min*100)}; max = {int(p.pct_fastest_laps_max*100)+1}')
-        
-        if attempts == 10:
-            break
-
-        cum += v
-        fl_vals.append(v)
-
-        if cum >= fl_laps:  # if we run out before we get to the last profile
-            break
-
-    # logger.info(f'fl_vals = {sum(fl_vals)}')
-    # logger.info(f'fl_laps = {fl_laps}')
-    fl_laps_assigned = []
-    profiles = list(race_sim.fl_profiles.all().order_by('eligible_speed_min'))
-    for index, fl_val in enumerate(fl_vals):
-    # for index, flp in enumerate(race_sim.fl_profiles.all().order_by('-pct_fastest_laps_min')):
-        flp = profiles[index]
-        fl_index = randrange(flp.eligible_speed_min, flp.eligible_speed_max+1)
-        # while fl_index in fl_laps_assigned:  # only assign FL to drivers that haven't gotten any yet
-        #     fl_index = randrange(flp.eligible_speed_min, flp.eligible_speed_max+1)
-
-        sp_index = int(numpy.where(orig_speed_ranks == fl_index)[0][0])
-        # if fl_val >= 30 and orig_speed_ranks.tolist()[sp_index] >= 5:
-        #     print(f'fl_index={fl_index}; sp_index={sp_index}; fl_val={fl_val}; driver={drivers[sp_index]}')
-        driver_fl[sp_index] = fl_val # fl_vals[index]
-        fl_laps_assigned.append(fl_val)
-        # logger.info(f'index = {index}; fl_val = {fl_val}; fl_index = {fl_index}; fl_laps_assigned = {sum(fl_laps_assigned)}')
-        
-    # logger.info(f'interim_fl_laps_assigned = {sum(fl_laps_assigned)}')
-    fl_laps_remaining = fl_laps - sum(fl_laps_assigned)
-
-    # there may be remaining FL, assign using lowest profile
-    # flp = race_sim.fl_profiles.all().order_by('-pct_fastest_laps_min').last()
-    while fl_laps_remaining > 0:
-        fl_index = randrange(1, 6)  # extra FL goes to top 5 guys
-        sp_index = int(numpy.where(orig_speed_ranks == fl_index)[0][0])
-        fl_val = min(fl_laps_remaining, randrange(1, 3))
-        fl_laps_remaining -= fl_val
-        # logger.info(f'assigning {fl_val}')
-        # logger.info(f'fl_laps_remaining = {fl_laps_remaining}')
-        # print(f'fl_index={fl_index}; sp_index={sp_index}; fl_val={fl_val}')
-        driver_fl[sp_index] += fl_val
-        fl_laps_assigned.append(fl_val)
-
-    # logger.info(f'fl_laps_assigned = {sum(fl_laps_assigned)}')
-    # logger.info(f'driver_fl = {sum(driver_fl)}')
-
-    # Assign laps led
-    ll_laps = race_sim.race.scheduled_laps
-    # ll_vals = [max(int(randrange(int(p.pct_laps_led_min*100), int(p.pct_laps_led_max*100), 1)/100 * ll_laps), 1) for p in race_sim.ll_profiles.all().order_by('-pct_laps_led_min')]
-    
-    # -- First determine the number of LL awarded to each rank
-    ll_vals = []
-    cum = 0
-    for p in race_sim.ll_profiles.all().order_by('rank_order'):
-        pct = randrange(int(p.pct_laps_led_min*100), max(int(p.pct_laps_led_max*100), 1) + 1, 1) if p.pct_laps_led_min < p.pct_laps_led_max else int(p.pct_laps_led_min*100)
-        cum_min = int(p.cum_laps_led_min * ll_laps)
-        cum_max = int(p.cum_laps_led_max * ll_laps)
-        v = max(int((pct/100) * ll_laps), 1)
-
-        attempts = 0
-        while (cum + v < cum_min or cum + v > cum_max) and attempts < 10:
-            pct = randrange(int(p.pct_laps_led_min*100), max(int(p.pct_laps_led_max*100), 1) + 1, 1)
-            v = max(int((pct/100) * ll_laps), 1)
-            attempts += 1
-            # print(f'cum = {cum}; pct = {pct}; min = {int(p.pct_laps_led_min*100)}; max = {int(p.pct_laps_led_max*100)+1}')
-        
-        if attempts == 10:
-            break
-        
-        cum += v
-        ll_vals.append(v)
-
-        if cum >= ll_laps:  # if we run out before we get to the last profile
-            break
-
-    # logger.info(f'll_vals = {sum(ll_vals)}')
-    # logger.info(f'cum = {cum}')
-
-    # -- Next find eligible drivers for LL by giving each driver a randbetween(0, FL%), then ranking each driver
-    fl_rank_vals = []
-    for i in range(0, len(driver_fl)):
-        fl_rank_vals.append(uniform(driver_fl[i]*0.25, driver_fl[i]+0.1) + random())
-    fl_ranks = len(fl_rank_vals) + 1 - scipy.stats.rankdata(fl_rank_vals, method='ordinal')
-
-    # -- Finally, award LL to drivers based on FL ranks
-    ll_laps_assigned = []
-    profiles = list(race_sim.ll_profiles.all().order_by('rank_order'))
-    for index, ll_val in enumerate(ll_vals):
-    # for index, llp in enumerate(race_sim.ll_profiles.all().order_by('-pct_laps_led_min')):
-        llp = profiles[index]
-        ll_index = int(numpy.where(fl_ranks == llp.rank_order)[0][0])
-        # ll_index = int(numpy.where(orig_speed_ranks == llp.rank_order)[0][0])
-        # ll_index = randrange(llp.eligible_fl_min, llp.eligible_fl_max+1)
-        # print(f'index = {index}; llp = {llp}; ll_val = {ll_val}; ll_index = {ll_index}')
-        # while ll_index in ll_laps_assigned:  # only assign LL to drivers that haven't gotten any yet
-        #     ll_index = randrange(llp.eligible_fl_min, llp.eligible_fl_max+1)
-
-        # sp_index = int(numpy.where(final_ranks == ll_index)[0][0])
-        driver_ll[ll_index] = ll_val # ll_vals[index]
-        ll_laps_assigned.append(ll_val)
-
-    ll_laps_remaining = ll_laps - sum(ll_laps_assigned)
-    # logger.info(f'interim_ll_laps_assigned = {sum(ll_laps_assigned)}')
-    # logger.info(f'll_laps_remaining = {ll_laps_remaining}')
-        
-    # there may be remaining LL, assign using lowest profile in tranches of 5
-    # llp = race_sim.ll_profiles.all().order_by('-rank_order').last()
-    while ll_laps_remaining > 0:
-        ll_index = int(numpy.where(fl_ranks == randrange(2, 4))[0][0])
-        # ll_index = int(numpy.where(orig_speed_ranks == randrange(1, 11))[0][0])
-        # while ll_index in ll_laps_assigned:  # only assign LL to drivers that haven't gotten any yet
-        #     ll_index = randrange(1, 21)
-
-        # sp_index = int(numpy.where(final_ranks == ll_index)[0][0])
-        ll_val = min(ll_laps_remaining, 5)
-        driver_ll[ll_index] += ll_val
-        ll_laps_remaining -= ll_val
-        ll_laps_assigned.append(ll_val)
-
-    # logger.info(f'll_laps_assigned = {sum(ll_laps_assigned)}')
-    # logger.info(f'driver_ll = {sum(driver_ll)}')
-
-    driver_dk = [
-        (models.SITE_SCORING.get('draftkings').get('place_differential') * (driver_starting_positions[index] - fp_ranks.tolist()[index]) + 
-        models.SITE_SCORING.get('draftkings').get('fastest_laps') * driver_fl[index] + 
-        models.SITE_SCORING.get('draftkings').get('finishing_position').get(str(fp_ranks.tolist()[index])) + 
-        models.SITE_SCORING.get('draftkings').get('laps_led') * driver_ll[index]) for index, d in enumerate(drivers)
-    ]
-
-    df_race = pandas.DataFrame({
-        'driver_id': driver_ids,
-        'driver': driver_names,
-        'sp': driver_starting_positions,
-        'speed_min': driver_sp_mins,
-        'speed_max': driver_sp_maxes,
-        # 'best_possible': driver_bp_sp_mins,
-        # 'worst_possible': driver_bp_sp_maxes,
-        'dnf': driver_dnfs,
-        's1_penalty': driver_s1_penalties,
-        # 's1_rank': driver_s1_ranks,
-        # 's1_fl': driver_s1_fl,
-        # 's1_min': driver_s1_mins,
-        # 's1_max': driver_s1_maxes,
-        's2_penalty': driver_s2_penalties,
-        # 's2_rank': driver_s2_ranks,
-        # 's2_fl': driver_s2_fl,
-        # 's2_min': driver_s2_mins,
-        # 's2_max': driver_s2_maxes,
-        's3_penalty': driver_s3_penalties,
-        # 's3_fl': driver_s3_fl,
-    })
-
-    if race_sim.race.num_stages() > 3:
-        # df_race['s3_min'] = driver_s3_mins
-        # df_race['s3_max'] = driver_s3_maxes
-        df_race['s4_penalty'] = driver_s4_penalties
-        # df_race['s4_rank'] = driver_s4_ranks
-
-    df_race['sr'] = final_ranks
-    df_race['fp'] = fp_ranks
-    df_race['fl'] = driver_fl
-    df_race['ll'] = driver_ll
-
-    # print(df_race)
-    # df_race.to_csv('data/race.csv')
+    results = simulation.simulate_race(simulation.load_sim_inputs(race_sim), num_iterations)
 
     return {
-        'osr': orig_speed_ranks.tolist(),
-        'sr': final_ranks.tolist(),
-        'fp': fp_ranks.tolist(),
-        'll': driver_ll,
-        'fl': driver_fl,
-        'dk': driver_dk,
-        'dam': driver_damage,
-        'pen': driver_penalty
+        'osr': results.get('osr').tolist(),
+        'sr': results.get('sr').tolist(),
+        'fp': results.get('fp').tolist(),
+        'll': results.get('ll').tolist(),
+        'fl': results.get('fl').tolist(),
+        'dk': results.get('dk').tolist(),
+        'dam': results.get('dam'),
+        'pen': results.get('pen')
     }
 
 
@@ -1399,14 +821,15 @@ def sim_execution_complete(results, sim_id, task_id):
         driver_ids = list(drivers.values_list('driver__nascar_driver_id', flat=True))
         driver_names = list(drivers.values_list('driver__full_name', flat=True))
 
-        osr_list = [obj.get('osr') for obj in results]
-        sr_list = [obj.get('sr') for obj in results]
-        fp_list = [obj.get('fp') for obj in results]
-        fl_list = [obj.get('fl') for obj in results]
-        ll_list = [obj.get('ll') for obj in results]
-        dk_list = [obj.get('dk') for obj in results]
-        dam_list = [obj.get('dam') for obj in results]
-        pen_list = [obj.get('pen') for obj in results]
+        # each batch result holds one row per iteration
+        osr_list = [row for obj in results for row in obj.get('osr')]
+        sr_list = [row for obj in results for row in obj.get('sr')]
+        fp_list = [row for obj in results for row in obj.get('fp')]
+        fl_list = [row for obj in results for row in obj.get('fl')]
+        ll_list = [row for obj in results for row in obj.get('ll')]
+        dk_list = [row for obj in results for row in obj.get('dk')]
+        dam_list = [row for obj in results for row in obj.get('dam')]
+        pen_list = [row for obj in results for row in obj.get('pen')]
 
         df_osr = pandas.DataFrame(osr_list, columns=driver_ids)
         df_sr = pandas.DataFrame(sr_list, columns=driver_ids)
@@ -1490,13 +913,13 @@ def find_driver_gto(sim_id, task_id):
 
         # delete old sim lineups
         race_sim.sim_lineups.all().delete()
-        scores = [d.dk_scores for d in race_sim.outcomes.all().order_by('starting_position')]
 
         jobs = []
-        for i in range(0, race_sim.iterations):
+        for start in range(0, race_sim.iterations, gto.GTO_BATCH_SIZE):
             jobs.append(make_optimals_for_gto.si(
-                [s[i] for s in scores],
-                list(race_sim.outcomes.exclude(dk_name=None).order_by('starting_position').values_list('id', flat=True)),
+                race_sim.id,
+                start,
+                min(start + gto.GTO_BATCH_SIZE, race_sim.iterations),
                 'draftkings',
                 race_sim.optimal_lineups_per_iteration
             ))
@@ -1538,80 +961,29 @@ def find_driver_gto(sim_id, task_id):
 
 
 @shared_task
-def make_optimals_for_gto(iterations_scores, driver_ids, site, num_lineups=1):
-    if site == 'fanduel':
-        optimizer = get_optimizer(Site.FANDUEL, Sport.NASCAR)
-    else:
-        optimizer = get_optimizer(Site.DRAFTKINGS, Sport.NASCAR)
-
-    drivers = models.RaceSimDriver.objects.filter(id__in=driver_ids)
-    sim = drivers[0].sim
-    player_list = []
-
-    for index, driver in enumerate(drivers.order_by('starting_position')):
-        if ' ' in driver.driver.full_name:
-            first = driver.driver.full_name.split(' ')[0]
-            last = driver.driver.full_name.split(' ')[-1]
-        else:
-            first = driver.driver.full_name
-            last = ''
-
-        fppg = iterations_scores[index]
-
-        player = Player(
-            driver.driver.nascar_driver_id,
-            first,
-            last,
-            ['D'],
-            'Nasca',
-            driver.dk_salary if site == 'draftkings' else driver.fd_salary,
-            float(fppg),
-        )
-
-        player_list.append(player)
-
-    optimizer.load_players(player_list)
-
-    optimized_lineups = optimizer.optimize(
-        n=num_lineups,
-        randomness=False, 
+def make_optimals_for_gto(sim_id, start, stop, site, num_lineups=1):
+    race_sim = models.RaceSim.objects.get(id=sim_id)
+    drivers = list(race_sim.outcomes.exclude(dk_name=None).order_by('starting_position', 'id').values_list(
+        'id',
+        'dk_salary' if site == 'draftkings' else 'fd_salary',
+        'dk_scores' if site == 'draftkings' else 'fd_scores'
+    ))
+
+    driver_ids = numpy.array([d[0] for d in drivers], dtype=numpy.int64)
+    salaries = numpy.array([d[1] for d in drivers], dtype=numpy.int64)
+    scores = numpy.array([d[2][start:stop] for d in drivers], dtype=numpy.float64)
+
+    optimals, counts = gto.solve_iterations(
+        scores,
+        salaries,
+        models.SITE_SCORING.get(site).get('max_salary'),
+        num_lineups
     )
-    
-    optimal_lineup = None
-    for index, l in enumerate(optimized_lineups):
-        lineup = [p.id for p in l.players]
-        
-        if index == 0:
-            optimal_lineup = lineup
-        
-        existing = models.RaceSimLineup.objects.filter(
-            sim=sim,
-            player_1__driver__nascar_driver_id__in=lineup,
-            player_2__driver__nascar_driver_id__in=lineup,
-            player_3__driver__nascar_driver_id__in=lineup,
-            player_4__driver__nascar_driver_id__in=lineup,
-            player_5__driver__nascar_driver_id__in=lineup,
-            player_6__driver__nascar_driver_id__in=lineup
-        )
-        
-        if existing.count() > 0:
-            sim_lineup = existing[0]
-            sim_lineup.count += 1
-            sim_lineup.save()
-        else:
-            sim_lineup = models.RaceSimLineup.objects.create(
-                sim=sim,
-                player_1=models.RaceSimDriver.objects.get(sim=sim, driver__nascar_driver_id=lineup[0]),
-                player_2=models.RaceSimDriver.objects.get(sim=sim, driver__nascar_driver_id=lineup[1]),
-                player_3=models.RaceSimDriver.objects.get(sim=sim, driver__nascar_driver_id=lineup[2]),
-                player_4=models.RaceSimDriver.objects.get(sim=sim, driver__nascar_driver_id=lineup[3]),
-                player_5=models.RaceSimDriver.objects.get(sim=sim, driver__nascar_driver_id=lineup[4]),
-                player_6=models.RaceSimDriver.objects.get(sim=sim, driver__nascar_driver_id=lineup[5]),
-                total_salary=sum([lp.salary for lp in l])
-            )
-            sim_lineup.simulate()
 
-    return optimal_lineup
+    return {
+        'optimals': driver_ids[optimals].tolist(),
+        'lineups': [driver_ids[list(lineup)].tolist() + [count] for lineup, count in counts.items()]
+    }
 
 
 @shared_task
@@ -1626,51 +998,55 @@ def finalize_gto(results, sim_id, task_id):
             task = BackgroundTask.objects.get(id=task_id)
         
         race_sim = models.RaceSim.objects.get(id=sim_id)
+        drivers = {d.id: d for d in race_sim.outcomes.all()}
 
-        df_results = pandas.DataFrame(results)
+        # driver exposure in the optimal lineup of each iteration
+        optimals = numpy.array([lineup for result in results for lineup in result.get('optimals')], dtype=numpy.int64)
+        exposures = pandas.Series(optimals.flatten()).value_counts()
+        for driver in drivers.values():
+            driver.gto = exposures.get(driver.id, 0) / race_sim.iterations
+        models.RaceSimDriver.objects.bulk_update(drivers.values(), ['gto'])
 
-        d_count_0 = df_results[0].value_counts()
-        d_count_1 = df_results[1].value_counts()
-        d_count_2 = df_results[2].value_counts()
-        d_count_3 = df_results[3].value_counts()
-        d_count_4 = df_results[4].value_counts()
-        d_count_5 = df_results[5].value_counts()
+        # merge lineup counts across batches
+        counts = {}
+        for result in results:
+            for lineup in result.get('lineups'):
+                key = tuple(lineup[:gto.LINEUP_SIZE])
+                counts[key] = counts.get(key, 0) + lineup[gto.LINEUP_SIZE]
 
-        for driver in race_sim.outcomes.all():
-            count = 0
-            
-            try:
-                count += d_count_0.loc[driver.driver.nascar_driver_id]
-            except KeyError:
-                pass
-            
-            try:
-                count += d_count_1.loc[driver.driver.nascar_driver_id]
-            except KeyError:
-                pass
-            
-            try:
-                count += d_count_2.loc[driver.driver.nascar_driver_id]
-            except KeyError:
-                pass
-            
-            try:
-                count += d_count_3.loc[driver.driver.nascar_driver_id]
-            except KeyError:
-                pass
-            
-            try:
-                count += d_count_4.loc[driver.driver.nascar_driver_id]
-            except KeyError:
-                pass
-            
-            try:
-                count += d_count_5.loc[driver.driver.nascar_driver_id]
-            except KeyError:
-                pass
-                            
-            driver.gto = count / race_sim.iterations
-            driver.save()
+        lineups = [
+            models.RaceSimLineup(
+                sim=race_sim,
+                player_1=drivers.get(key[0]),
+                player_2=drivers.get(key[1]),
+                player_3=drivers.get(key[2]),
+                player_4=drivers.get(key[3]),
+                player_5=drivers.get(key[4]),
+                player_6=drivers.get(key[5]),
+                total_salary=sum([drivers.get(driver_id).dk_salary for driver_id in key]),
+                count=count
+            ) for key, count in counts.items()
+        ]
+
+        # simulate every lineup at once
+        if len(lineups) > 0:
+            driver_rows = {driver_id: index for index, driver_id in enumerate(drivers.keys())}
+            dk_scores = numpy.array([d.dk_scores[:race_sim.iterations] for d in drivers.values()], dtype=numpy.float64)
+            dk_op = numpy.array([d.dk_op for d in drivers.values()], dtype=numpy.float64)
+            lineup_rows = numpy.array([[driver_rows[driver_id] for driver_id in key] for key in counts.keys()], dtype=numpy.int64)
+
+            sim_scores = dk_scores[lineup_rows].sum(axis=1)
+            median, s75, s90 = numpy.percentile(sim_scores, [50, 75, 90], axis=1)
+            dup_projections = numpy.prod(dk_op[lineup_rows], axis=1) * race_sim.dk_contest_entries
+
+            for index, lineup in enumerate(lineups):
+                lineup.sim_scores = sim_scores[index].tolist()
+                lineup.median = median[index]
+                lineup.s75 = s75[index]
+                lineup.s90 = s90[index]
+                lineup.dup_projection = round(dup_projections[index], 2)
+
+            models.RaceSimLineup.objects.bulk_create(lineups, batch_size=1000)
         
         task.status = 'success'
         task.content = f'GTO for {race_sim} complete.'
@@ -1687,7 +1063,7 @@ def finalize_gto(results, sim_id, task_id):
 
 
 @shared_task
-def rank_optimal_lineups(sim_id, task_id):
+def rank_optimal_lineups(sim_id, task_id, save_ranks=False):
     task = None
 
     try:
@@ -1697,82 +1073,12 @@ def rank_optimal_lineups(sim_id, task_id):
             time.sleep(0.2)
             task = BackgroundTask.objects.get(id=task_id)
         
-        start = time.time()
-        race_sim = models.RaceSim.objects.get(id=sim_id)
-        a = [[l.id] + l.sim_scores for l in race_sim.sim_lineups.all()]
-        df_lineups = pandas.DataFrame(a, columns=['id'] + [i for i in range(0, race_sim.iterations)])
-        # print(df_lineups)
-        # df_lineups.set_index('id')
-        df_lineups = df_lineups.set_index('id')
-        print(f'loading dataframe took {time.time() - start}s')
-        start = time.time()
-        
-        df_lineup_ranks = df_lineups.rank(method='min', ascending=False)
-        print(f'ranking took {time.time() - start}s')
-        start = time.time()
-
-        chord([
-            save_sim_lineup_ranking.si(l.id, df_lineup_ranks.loc[l.id].tolist()) for l in race_sim.sim_lineups.all().iterator()
-        ], sim_lineup_ranking_complete.si(sim_id, task_id))()
-
-        # for l in race_sim.sim_lineups.all().iterator():
-        #     ranks = df_lineup_ranks.loc[l.id]
-        #     print(f'getting ranks took {time.time() - start}s')
-        #     start = time.time()
-        #     l.sim_score_ranks = ranks.tolist()
-        #     print(f'storing ranks took {time.time() - start}s')
-        #     start = time.time()
-        #     l.rank_median = numpy.median(l.sim_score_ranks)
-        #     print(f'median took {time.time() - start}s')
-        #     start = time.time()
-        #     l.rank_s75 = l.get_rank_percentile_sim_score(25)
-        #     print(f'75th took {time.time() - start}s')
-        #     start = time.time()
-        #     l.rank_s90 = l.get_rank_percentile_sim_score(10)
-        #     print(f'90th took {time.time() - start}s')
-        #     start = time.time()
-        #     l.save()
-        #     print(f'saving took {time.time() - start}s')
-        #     start = time.time()
-        # print(f'saving all took {time.time() - start}s')
-        # start = time.time()
-        
-        # task.status = 'success'
-        # task.content = f'Optimals ranked for {race_sim}.'
-        # task.save()
-
-    except Exception as e:
-        if task is not None:
-            task.status = 'error'
-            task.content = f'There was an error ranking optimals for {race_sim}: {e}'
-            task.save()
-
-        logger.error("Unexpected error: " + str(sys.exc_info()[0]))
-        logger.exception("error info: " + str(sys.exc_info()[1]) + "\n" + str(sys.exc_info()[2]))
-
-
-@shared_task
-def save_sim_lineup_ranking(lineup_id, rankings):
-    l = models.RaceSimLineup.objects.get(id=lineup_id)
-    l.sim_score_ranks = rankings
-    l.rank_median = numpy.median(l.sim_score_ranks)
-    l.rank_s75 = l.get_rank_percentile_sim_score(25)
-    l.rank_s90 = l.get_rank_percentile_sim_score(10)
-    l.save()
-
-
-@shared_task
-def sim_lineup_ranking_complete(sim_id, task_id):
-    task = None
-
-    try:
-        try:
-            task = BackgroundTask.objects.get(id=task_id)
-        except BackgroundTask.DoesNotExist:
-            time.sleep(0.2)
-            task = BackgroundTask.objects.get(id=task_id)
-
         race_sim = models.RaceSim.objects.get(id=sim_id)
+        lineup_ids, scores = rankings.load_score_matrix(
+            list(race_sim.sim_lineups.all().values_list('id', 'sim_scores')),
+            race_sim.iterations
+        )
+        rankings.save_rankings(models.RaceSimLineup, lineup_ids, rankings.rank_scores(scores), save_ranks=save_ranks)
 
         task.status = 'success'
         task.content = f'Optimals ranked for {race_sim}.'
@@ -2762,7 +2068,7 @@ def complete_random_lineup_creation(build_id, task_id):
 
 
 @shared_task
-def rank_build_lineups(build_id, task_id):
+def rank_build_lineups(build_id, task_id, save_ranks=False):
     task = None
 
     try:
@@ -2772,64 +2078,40 @@ def rank_build_lineups(build_id, task_id):
             time.sleep(0.2)
             task = BackgroundTask.objects.get(id=task_id)
         
-        start = time.time()
         build = models.SlateBuild.objects.get(id=build_id)
-        a = [[l.id] + l.sim_scores for l in build.lineups.all()]
-        df_lineups = pandas.DataFrame(a, columns=['id'] + [i for i in range(0, build.sim.iterations)])
-        df_lineups = df_lineups.set_index('id')
-        print(f'loading dataframe took {time.time() - start}s')
-        start = time.time()
-        
-        df_lineup_ranks = df_lineups.rank(method='min', ascending=False)
-        print(f'ranking took {time.time() - start}s')
-        start = time.time()
 
-        chain(
-            chord([
-                save_build_lineup_ranking.si(l.id, df_lineup_ranks.loc[l.id].tolist()) for l in build.lineups.all().iterator()
-            ], build_lineup_ranking_complete.si(build_id, task_id)),
-            clean_lineups.si(
-                build_id,
-                BackgroundTask.objects.create(
-                    name='Clean Lineups',
-                    user=task.user
-                ).id
-            )
-        )()
-
-    except Exception as e:
-        if task is not None:
-            task.status = 'error'
-            task.content = f'There was an error ranking lineups for {build}: {e}'
-            task.save()
-
-        logger.error("Unexpected error: " + str(sys.exc_info()[0]))
-        logger.exception("error info: " + str(sys.exc_info()[1]) + "\n" + str(sys.exc_info()[2]))
-
-
-@shared_task
-def save_build_lineup_ranking(lineup_id, rankings):
-    l = models.SlateBuildLineup.objects.get(id=lineup_id)
-    l.rank(rankings)
-
-
-@shared_task
-def build_lineup_ranking_complete(build_id, task_id):
-    task = None
-
-    try:
-        try:
-            task = BackgroundTask.objects.get(id=task_id)
-        except BackgroundTask.DoesNotExist:
-            time.sleep(0.2)
-            task = BackgroundTask.objects.get(id=task_id)
-
-        build = models.SlateBuild.objects.get(id=build_id)
+        # score each lineup from the build's player outcomes
+        player_outcomes = {
+            slate_player_id: numpy.array(sim_scores[:build.sim.iterations], dtype=numpy.float32) for slate_player_id, sim_scores in build.projections.exclude(sim_scores=None).values_list('slate_player_id', 'sim_scores')
+        }
+        no_outcomes = numpy.full(build.sim.iterations, numpy.nan, dtype=numpy.float32)
+        lineups = list(build.lineups.all().values_list(
+            'id',
+            'slate_lineup__player_1',
+            'slate_lineup__player_2',
+            'slate_lineup__player_3',
+            'slate_lineup__player_4',
+            'slate_lineup__player_5',
+            'slate_lineup__player_6'
+        ))
+        lineup_ids, scores = rankings.load_score_matrix(
+            [(l[0], numpy.sum([player_outcomes.get(p, no_outcomes) for p in l[1:] if p is not None], axis=0)) for l in lineups],
+            build.sim.iterations
+        )
+        rankings.save_rankings(models.SlateBuildLineup, lineup_ids, rankings.rank_scores(scores), save_ranks=save_ranks)
 
         task.status = 'success'
         task.content = f'Lineups ranked for {build}.'
         task.save()
 
+        clean_lineups.delay(
+            build_id,
+            BackgroundTask.objects.create(
+                name='Clean Lineups',
+                user=task.user
+            ).id
+        )
+
     except Exception as e:
         if task is not None:
             task.status = 'error'
@@ -3084,21 +2366,9 @@ def start_contest_simulation(backtest_id, task_id):
         backtest = models.ContestBacktest.objects.get(id=backtest_id)
         backtest.entry_outcomes.all().delete()
 
-        prizes = backtest.contest.prizes.all()
-        prize_lookup = {}
-        for prize in prizes:
-            for rank in range(prize.min_rank, prize.max_rank+1):
-                prize_lookup[float(rank)] = float(prize.prize)
-
-        a = [[l.id] + l.sim_scores for l in backtest.contest.entries.all().order_by('entry_id').iterator()]
-        df_lineups = pandas.DataFrame(a, columns=['id'] + [i for i in range(0, backtest.contest.sim.iterations)])
-        df_lineups = df_lineups.set_index('id')
-
-        chunk_size = 2000
+        iterations = backtest.contest.sim.iterations
         chord([
-            chord([
-                simulate_contest_by_iteration.si(prize_lookup, backtest.id, df_lineups[i + j].to_json(orient='index')) for i in range(0, chunk_size)
-            ], combine_contest_sim_results.s()) for j in range(0, backtest.contest.sim.iterations, chunk_size)
+            simulate_contest_block.si(backtest.id, start, min(start + payouts.CONTEST_BATCH_SIZE, iterations)) for start in range(0, iterations, payouts.CONTEST_BATCH_SIZE)
         ], contest_simulation_complete.s(
             backtest.id, 
             task.id
@@ -3114,48 +2384,32 @@ def start_contest_simulation(backtest_id, task_id):
 
 
 @shared_task
-def simulate_contest_by_iteration(prize_lookup, backtest_id, lineups, exclude_lineups_with_username=None):
+def simulate_contest_block(backtest_id, start, stop):
+    '''
+    Returns the total winnings of every contest entry, ordered by entry_id, over sim
+    iterations start..stop. Entry scores are streamed from the database in blocks small
+    enough to rank in memory.
+    '''
     backtest = models.ContestBacktest.objects.get(id=backtest_id)
-    entries = backtest.contest.entries.all().order_by('entry_id')
-
-    if exclude_lineups_with_username is not None:
-        entries = entries.exclude(entry_name__istartswith=exclude_lineups_with_username)
-
-    # start = time.time()
-    # a = [[l.id, l.sim_scores[iteration]] for l in entries.iterator()]
-    # logger.info(f'creating lineup arrays took {time.time() - start}s')
-    # start = time.time()
-    # df_lineups = pandas.DataFrame(a, columns=['entry_id', 'score'])
-    df_lineups = pandas.read_json(lineups, orient='index')
-    # df_lineups['backtest_id'] = backtest.id
-    # df_lineups['iteration'] = iteration
-    # df_lineups['id'] = df_lineups['entry_id']
-    # logger.info(f'loading lineups dataframe took {time.time() - start}s')
-    # start = time.time()
-    # df_lineups = df_lineups.set_index('id')
-    # logger.info(f'setting lineups dataframe index took {time.time() - start}s')
-    # start = time.time()
-    df_lineups['rank'] = df_lineups[0].rank(method='min', ascending=False)
-    # logger.info(f'ranking lineups took {time.time() - start}s')
-    # start = time.time()
-    df_lineups['rank_count'] = df_lineups['rank'].map(df_lineups['rank'].value_counts())
-    rank_counts = df_lineups['rank'].value_counts()
-    df_lineups['prize'] = df_lineups['rank'].map(lambda x: numpy.mean([prize_lookup.get(str(float(r)), 0.0) for r in range(int(x),int(x)+rank_counts[x])]))
-    # logger.info(f'payouts took {time.time() - start}s')
-
-    return df_lineups['prize'].to_list()
+    contest = backtest.contest
+    num_entries = contest.entries.count()
+    cum_prizes = payouts.cumulative_prizes(contest.prizes.all().values_list('min_rank', 'max_rank', 'prize'), num_entries)
+
+    winnings = numpy.zeros(num_entries, dtype=numpy.float64)
+    for block_start, block_stop in payouts.iteration_blocks(num_entries, start, stop):
+        df_scores = pandas.read_sql(
+            f'SELECT sim_scores[{block_start + 1}:{block_stop}] AS scores FROM nascar_contestentry WHERE contest_id = %(contest_id)s ORDER BY entry_id, id',
+            engine,
+            params={'contest_id': contest.id}
+        )
+        scores = numpy.full((num_entries, block_stop - block_start), numpy.nan, dtype=numpy.float32)
+        for index, entry_scores in enumerate(df_scores['scores']):
+            if entry_scores:
+                scores[index, :len(entry_scores)] = entry_scores
 
+        winnings += payouts.block_winnings(scores, cum_prizes)
 
-@shared_task
-def combine_contest_sim_results(results):        
-    total_result = None
-    for result in results:
-        if total_result is None:
-            total_result = numpy.array(result)
-        else:
-            total_result += numpy.array(result)
-    
-    return total_result.tolist()
+    return winnings.tolist()
 
 
 @shared_task
@@ -3178,7 +2432,7 @@ def contest_simulation_complete(results, backtest_id, task_id):
             else:
                 total_result += numpy.array(result)
         
-        entries = backtest.contest.entries.all().order_by('entry_id')
+        entries = backtest.contest.entries.all().order_by('entry_id', 'id')
         df_result = pandas.DataFrame.from_records(entries.values('id'))
         df_result['entry_id'] = df_result['id']
         df_result['backtest_id'] = backtest.id
@@ -32,6 +32,7 @@ from fanduel import models as fanduel_models
 from yahoo import models as yahoo_models
 
 from . import models
+from . import sim_store
 from . import tasks
 
 
@@ -975,13 +976,13 @@ class SlateAdmin(admin.ModelAdmin):
 
     def sim_slates(self, request, queryset):
         group([
-            tasks.simulate_game.s(
-                slate_game.id,
+            tasks.simulate_games.s(
+                list(slate.games.all().values_list('id', flat=True)),
                 BackgroundTask.objects.create(
-                    name=f'Simulate {slate_game}',
+                    name=f'Simulate {slate}',
                     user=request.user
                 ).id
-            ) for slate_game in models.SlateGame.objects.filter(slate__in=queryset)
+            ) for slate in queryset
         ])()
 
         messages.add_message(
@@ -1060,15 +1061,13 @@ class SlateAdmin(admin.ModelAdmin):
 
         slate = get_object_or_404(models.Slate, pk=pk)
 
-        group([
-            tasks.simulate_game.s(
-                slate_game.id,
-                BackgroundTask.objects.create(
-                    name=f'Simulate {slate_game}',
-                    user=request.user
-                ).id
-            ) for slate_game in slate.games.all()
-        ])()
+        tasks.simulate_games.delay(
+            list(slate.games.all().values_list('id', flat=True)),
+            BackgroundTask.objects.create(
+                name=f'Simulate {slate}',
+                user=request.user
+            ).id
+        )
 
         messages.add_message(
             request,
@@ -4201,8 +4200,9 @@ class BuildPlayerProjectionAdmin(admin.ModelAdmin):
     get_rts_proj.short_description = 'RTS'
 
     def get_median_sim_score(self, obj):
-        if obj.slate_player.projection.sim_scores and len(obj.slate_player.projection.sim_scores) > 0:
-            return numpy.median(obj.slate_player.projection.sim_scores)
+        outcomes = sim_store.get_sim_outcomes(obj.slate_player.projection)
+        if outcomes is not None and len(outcomes) > 0:
+            return numpy.median(outcomes)
         return None
     get_median_sim_score.short_description = 'sMU'
 
@@ -0,0 +1,163 @@
+import numpy
+import time
+
+from django.db.models import Count, Max
+
+from . import models
+
+# Seconds an alias index is trusted before the Alias table is checked for changes
+INDEX_TTL = 60
+
+# Closest aliases saved as hints with a MissingAlias
+NUM_HINTS = 3
+
+# field -> alias index, kept for the life of the process
+_indexes = {}
+
+
+def get_alias_field(site):
+    '''
+    Returns the Alias field holding player names for a site or projection source.
+    '''
+    if site == 'draftkings':
+        return 'dk_name'
+    elif site == 'fanduel':
+        return 'fd_name'
+    elif site.startswith('4for4'):
+        return 'four4four_name'
+    elif site.startswith('awesemo_own'):
+        return 'awesemo_ownership_name'
+    elif site.startswith('awesemo'):
+        return 'awesemo_name'
+    elif site == 'etr_all':
+        return 'etr_all_name'
+    elif site.startswith('etr'):
+        return 'etr_name'
+    elif site.startswith('tda'):
+        return 'tda_name'
+    elif site == 'rg_all':
+        return 'rg_all_name'
+    elif site.startswith('rg'):
+        return 'rg_name'
+    elif site.startswith('fc'):
+        return 'fc_name'
+    elif site.startswith('rts'):
+        return 'rts_name'
+    elif site.startswith('yahoo'):
+        return 'yahoo_name'
+    elif site.startswith('rotogrinders'):
+        return 'rg_name'
+    elif site.startswith('sabersim'):
+        return 'ss_name'
+    elif site.startswith('dailyroto'):
+        return 'dr_name'
+    elif site.startswith('linestar'):
+        return 'linestar_name'
+    raise Exception('{} is not a supported site yet.'.format(site))
+
+
+def get_table_version():
+    return models.Alias.objects.aggregate(count=Count('id'), last_id=Max('id'))
+
+
+class AliasIndex:
+    '''
+    All aliases of one name field held in memory: an exact-match map from name to the
+    first alias id with it, and a character count matrix that scores every alias against
+    a name at once, exactly as difflib's SequenceMatcher.quick_ratio does.
+    '''
+    def __init__(self, field):
+        rows = list(models.Alias.objects.order_by('id').values_list('id', field))
+
+        self.version = get_table_version()
+        self.loaded = time.monotonic()
+        self.ids = numpy.array([alias_id for alias_id, _ in rows], dtype=numpy.int64)
+
+        self.exact = {}
+        for alias_id, name in rows:
+            if name is not None:
+                self.exact.setdefault(name, alias_id)
+
+        names = [(name or '').lower() for _, name in rows]
+        self.alphabet = {c: i for i, c in enumerate(sorted(set(''.join(names))))}
+        self.lengths = numpy.array([len(name) for name in names], dtype=numpy.int64)
+        self.counts = numpy.zeros((len(names), len(self.alphabet)), dtype=numpy.int32)
+        for row, name in enumerate(names):
+            for c in name:
+                self.counts[row, self.alphabet[c]] += 1
+
+    def is_current(self):
+        if time.monotonic() - self.loaded < INDEX_TTL:
+            return True
+
+        self.loaded = time.monotonic()
+        return get_table_version() == self.version
+
+    def quick_ratios(self, player_name):
+        name = player_name.lower()
+        query = numpy.zeros(len(self.alphabet), dtype=numpy.int32)
+        for c in name:
+            if c in self.alphabet:
+                query[self.alphabet[c]] += 1
+
+        matches = numpy.minimum(self.counts, query).sum(axis=1)
+        length = self.lengths + len(name)
+        return numpy.divide(2.0 * matches, length, out=numpy.ones(len(length)), where=length > 0)
+
+    def closest(self, player_name, num_hints=NUM_HINTS):
+        '''
+        Returns the ids of the num_hints best scoring aliases, ties in id order.
+        '''
+        order = numpy.argsort(-self.quick_ratios(player_name), kind='stable')
+        return [int(alias_id) for alias_id in self.ids[order[:num_hints]]]
+
+
+def get_index(field):
+    index = _indexes.get(field)
+    if index is None or not index.is_current():
+        index = AliasIndex(field)
+        _indexes[field] = index
+    return index
+
+
+def find_aliases(player_names, site):
+    '''
+    Resolves a batch of player names for a site to Alias objects, or None for names without
+    an alias. Each unmatched name records a MissingAlias with its three closest aliases.
+
+    Names are matched against the in-memory index, and a name the index misses is checked
+    against the table before it is reported, so an alias added since the index was loaded
+    is still found (and the index reloaded).
+    '''
+    field = get_alias_field(site)
+    index = get_index(field)
+
+    alias_ids = [index.exact.get(player_name) for player_name in player_names]
+
+    missing = []
+    for position, player_name in enumerate(player_names):
+        if alias_ids[position] is not None:
+            continue
+
+        alias = models.Alias.objects.filter(**{field: player_name}).order_by('id').first()
+        if alias is not None:
+            _indexes.pop(field, None)
+            alias_ids[position] = alias.id
+        else:
+            missing.append(player_name)
+
+    if len(missing) > 0:
+        missing_aliases = []
+        for player_name in missing:
+            hints = index.closest(player_name)
+            missing_aliases.append(models.MissingAlias(
+                player_name=player_name,
+                site=site,
+                alias_1_id=hints[0],
+                alias_2_id=hints[1],
+                alias_3_id=hints[2],
+            ))
+        models.MissingAlias.objects.bulk_create(missing_aliases)
+
+    aliases = models.Alias.objects.in_bulk([alias_id for alias_id in alias_ids if alias_id is not None])
+    return [aliases.get(alias_id) if alias_id is not None else None for alias_id in alias_ids]
@@ -0,0 +1,178 @@
+import numpy
+
+from django.db import connection
+from sklearn.neighbors import KDTree
+
+from . import simulation
+
+# Comparable historical pairs a player pair's correlation is estimated from
+KNN_NEIGHBORS = 50
+
+# Historical pairs are drawn from main slates before this date
+KNN_CUTOFF_DATE = '2022-02-28'
+
+# Projections are compared at their stored precision when memoizing correlations
+PROJECTION_DIGITS = 2
+
+CORR_LABELS = [
+    'qb', 'rb1', 'rb2', 'rb3', 'wr1', 'wr2', 'wr3', 'wr4', 'wr5', 'te1', 'te2', 'k', 'dst',
+    'opp qb', 'opp rb1', 'opp rb2', 'opp rb3', 'opp wr1', 'opp wr2', 'opp wr3', 'opp wr4', 'opp wr5', 'opp te1', 'opp te2', 'opp k', 'opp dst',
+]
+
+# Kickers are not estimated by kNN; these are their fixed correlations with each slot of
+# their own team and of the opposing team, in CORR_LABELS order.
+K_SLOT = 11
+K_TEAM_CORR = [0.1, 0.06, 0.06, 0.06, 0.05, 0.0, 0.01, 0.0, 0.0, 0.05, 0.04, 1.0, 0.13]
+K_OPP_CORR = [-0.03, -0.07, -0.08, -0.09, 0.01, 0.07, -0.01, -0.01, -0.01, 0.0, 0.0, -0.05, -0.33]
+
+TEAM_PAIRS_SQL = '''
+    SELECT  p1_proj.projection       as p1_proj,
+            p2_proj.projection       as p2_proj,
+            p1.fantasy_points        as p1_actual,
+            p2.fantasy_points        as p2_actual
+    FROM nfl_slateplayer p1
+    INNER JOIN nfl_slateplayer p2 on {join}
+    LEFT JOIN nfl_slate slate ON slate.id = p1.slate_id
+    LEFT JOIN nfl_slateplayerprojection p1_proj ON p1_proj.slate_player_id = p1.id
+    LEFT JOIN nfl_slateplayerprojection p2_proj ON p2_proj.slate_player_id = p2.id
+    WHERE slate.is_main_slate = true
+        AND slate.site = %s
+        AND p1.site_pos = %s
+        AND p2.site_pos = %s
+        AND slate.datetime < %s
+        AND p1.fantasy_points >= 1.0
+        AND p2.fantasy_points >= 1.0
+'''
+SAME_TEAM_JOIN = 'p1.team = p2.team AND p1.slate_id = p2.slate_id'
+OPP_TEAM_JOIN = 'p1.team <> p2.team AND p1.slate_game_id = p2.slate_game_id'
+
+# (site, pos1, pos2, same_team) -> pair table, kept for the life of the worker
+_pair_tables = {}
+
+# (site, pos1, pos2, same_team, proj1, proj2) -> correlation
+_corr_cache = {}
+
+
+def get_pair_table(site, pos1, pos2, same_team):
+    '''
+    Returns the historical pairs of pos1 and pos2 players on the same (or opposing) team as
+    float32 projection and actual score arrays, with a KD-tree over the projections. Tables
+    are built with one query the first time they are needed.
+    '''
+    key = (site, pos1, pos2, same_team)
+    table = _pair_tables.get(key)
+    if table is not None:
+        return table
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            TEAM_PAIRS_SQL.format(join=SAME_TEAM_JOIN if same_team else OPP_TEAM_JOIN),
+            [site, pos1, pos2, KNN_CUTOFF_DATE]
+        )
+        rows = numpy.array(cursor.fetchall(), dtype=numpy.float32).reshape((-1, 4))
+
+    # pairs without a projection can never be a nearest neighbor
+    rows = rows[~numpy.isnan(rows[:, :2]).any(axis=1)]
+
+    table = {
+        'tree': KDTree(rows[:, :2]) if len(rows) > 0 else None,
+        'p1_actual': rows[:, 2],
+        'p2_actual': rows[:, 3],
+    }
+    _pair_tables[key] = table
+    return table
+
+
+def pearson_rows(a, b):
+    '''
+    Row-wise Pearson correlation of two matrices, nan where either row is constant.
+    '''
+    a = a - a.mean(axis=1, keepdims=True)
+    b = b - b.mean(axis=1, keepdims=True)
+    den = numpy.sqrt((a * a).sum(axis=1) * (b * b).sum(axis=1))
+    return numpy.divide((a * b).sum(axis=1), den, out=numpy.full(len(a), numpy.nan), where=den > 0)
+
+
+def find_knn_corrs(site, queries):
+    '''
+    Estimates the correlation of each player pair in queries from the actual scores of the
+    KNN_NEIGHBORS historical pairs of the same positions whose projections are closest.
+    Each query is (pos1, pos2, same_team, proj1, proj2).
+
+    Pairs sharing a pair table are answered with a single tree query, and results are
+    memoized by positions and rounded projections.
+    '''
+    results = [None] * len(queries)
+    groups = {}
+    for index, (pos1, pos2, same_team, proj1, proj2) in enumerate(queries):
+        proj1 = round(float(proj1), PROJECTION_DIGITS)
+        proj2 = round(float(proj2), PROJECTION_DIGITS)
+
+        # pair tables are mirrored, so each pair of positions is only materialized once
+        if pos2 < pos1:
+            pos1, pos2, proj1, proj2 = pos2, pos1, proj2, proj1
+
+        key = (site, pos1, pos2, same_team, proj1, proj2)
+        if key in _corr_cache:
+            results[index] = _corr_cache.get(key)
+        else:
+            groups.setdefault(key[:4], {}).setdefault((proj1, proj2), []).append(index)
+
+    for (site, pos1, pos2, same_team), points in groups.items():
+        table = get_pair_table(site, pos1, pos2, same_team)
+        projections = list(points.keys())
+
+        if table.get('tree') is None:
+            corrs = numpy.full(len(projections), numpy.nan)
+        else:
+            k = min(KNN_NEIGHBORS, len(table.get('p1_actual')))
+            _, neighbors = table.get('tree').query(numpy.array(projections, dtype=numpy.float32), k=k)
+            corrs = numpy.round(pearson_rows(
+                table.get('p1_actual')[neighbors].astype(numpy.float64),
+                table.get('p2_actual')[neighbors].astype(numpy.float64)
+            ), 4)
+
+        for (proj1, proj2), corr in zip(projections, corrs):
+            _corr_cache[(site, pos1, pos2, same_team, proj1, proj2)] = corr
+            for index in points.get((proj1, proj2)):
+                results[index] = corr
+
+    return results
+
+
+def get_knn_corr_matrix(game):
+    '''
+    Returns the kNN correlation matrix of a game's simulation slots, in CORR_LABELS order,
+    with every player pair of the game estimated in one batch. Returns None when the game
+    does not fill every non-kicker slot.
+    '''
+    slots = simulation.get_game_sim_slots(game)
+    num_team_slots = len(CORR_LABELS) // 2
+
+    if any(projection is None for index, projection in enumerate(slots) if index % num_team_slots != K_SLOT):
+        return None
+
+    corr = numpy.eye(len(slots))
+    pairs = []
+    queries = []
+    for i in range(len(slots)):
+        for j in range(i + 1, len(slots)):
+            same_team = i // num_team_slots == j // num_team_slots
+
+            if i % num_team_slots == K_SLOT or j % num_team_slots == K_SLOT:
+                other = j if i % num_team_slots == K_SLOT else i
+                corr[i, j] = (K_TEAM_CORR if same_team else K_OPP_CORR)[other % num_team_slots]
+            else:
+                pairs.append((i, j))
+                queries.append((
+                    slots[i].slate_player.site_pos,
+                    slots[j].slate_player.site_pos,
+                    same_team,
+                    slots[i].projection,
+                    slots[j].projection
+                ))
+
+    for (i, j), value in zip(pairs, find_knn_corrs(game.slate.site, queries)):
+        corr[i, j] = value
+
+    return numpy.triu(corr) + numpy.triu(corr, 1).T
@@ -0,0 +1,196 @@
+import csv
+import numpy
+import re
+
+from . import models, sim_store
+
+# Player ids in field exports: DraftKings wraps them in parentheses after the name,
+# FanDuel starts each cell with them
+DK_PLAYER_ID = re.compile(r'\(([0-9]*)\)')
+FD_PLAYER_ID = re.compile(r'[0-9-]*')
+
+CLASSIC_SLOTS = ['qb', 'rb1', 'rb2', 'wr1', 'wr2', 'wr3', 'te', 'flex', 'dst']
+DK_SHOWDOWN_SLOTS = ['cpt', 'flex1', 'flex2', 'flex3', 'flex4', 'flex5']
+FD_SHOWDOWN_SLOTS = ['cpt', 'flex1', 'flex2', 'flex3', 'flex4']
+
+# Field lineups scored per batch, to bound the size of the score matrix in memory
+SCORE_BATCH_SIZE = 1000
+
+
+def parse_player_id(pattern, cell):
+    match = pattern.search(cell)
+    if match is None:
+        raise Exception(f'Could not find a player id in {cell}')
+    return match.group(1) if pattern.groups else match.group(0)
+
+
+def read_field_upload(path, pattern, num_slots):
+    '''
+    Parses a field lineup export into a list of handles and a matching list of player id rows.
+    '''
+    handles = []
+    player_ids = []
+
+    with open(path, mode='r') as lineups_file:
+        csv_reader = csv.reader(lineups_file)
+
+        for index, row in enumerate(csv_reader):
+            if index > 0:  # skip header
+                handles.append(row[0])
+                player_ids.append([parse_player_id(pattern, cell) for cell in row[1:num_slots + 1]])
+
+    return handles, player_ids
+
+
+def lineup_key(player_ids, showdown):
+    '''
+    Returns the canonical key of a lineup from its player ids in slot order. The captain
+    (showdown) or QB and DST (classic) stay in place, every other slot is order independent.
+    '''
+    if showdown:
+        return (player_ids[0], tuple(sorted(p for p in player_ids[1:] if p is not None)))
+    return (player_ids[0], player_ids[-1], tuple(sorted(player_ids[1:-1])))
+
+
+def get_lineup_index(lineups, slots, showdown):
+    '''
+    Returns a dict of canonical lineup key -> list of lineup ids for all lineups, loaded
+    with a single query.
+    '''
+    index = {}
+    for row in lineups.values_list('id', *[f'{slot}_id' for slot in slots]):
+        index.setdefault(lineup_key(row[1:], showdown), []).append(row[0])
+    return index
+
+
+def score_field(rows, player_outcomes):
+    '''
+    Returns the (lineups x iterations) sim scores of rows of slate player ids.
+    '''
+    scores = numpy.zeros((len(rows), player_outcomes.shape[1]), dtype=numpy.float64)
+    for slot in range(rows.shape[1]):
+        scores += player_outcomes[rows[:, slot]]
+    return scores
+
+
+def import_field_lineups(build, player_sim_scores, pattern, slots):
+    '''
+    Imports the build's field lineup upload in bulk.
+
+    The upload is parsed into a matrix of slate player ids, each entry is matched to a
+    possible lineup through an in-memory index keyed on its canonical player tuple, lineups
+    not yet on the slate are created together, and the field lineups are scored in
+    vectorized batches and saved with one bulk_create.
+    '''
+    if not build.field_lineup_upload:
+        return
+
+    showdown = build.slate.is_showdown
+    if showdown:
+        build.field_sd_lineups_to_beat.all().delete()
+        lineup_model = models.SlateSDLineup
+        field_model = models.FieldSDLineupToBeat
+        possible_lineups = build.slate.possible_sd_lineups.all()
+    else:
+        build.field_lineups_to_beat.all().delete()
+        lineup_model = models.SlateLineup
+        field_model = models.FieldLineupToBeat
+        possible_lineups = build.slate.possible_lineups.all()
+
+    handles, site_ids = read_field_upload(build.field_lineup_upload.path, pattern, len(slots))
+    if len(handles) == 0:
+        return
+
+    # map site player ids to slate players; an id shared by several slate players only
+    # fails the import if an entry uses it
+    slate_players = {}
+    salaries = {}
+    ambiguous = set()
+    for slate_player_id, player_id, salary in models.SlatePlayer.objects.filter(slate=build.slate).values_list('id', 'player_id', 'salary'):
+        if player_id in slate_players:
+            ambiguous.add(player_id)
+        slate_players.setdefault(player_id, slate_player_id)
+        salaries[slate_player_id] = salary
+
+    # player outcomes as one matrix, indexed by slate player id through outcome_rows
+    outcome_rows = {}
+    outcome_vectors = []
+    for player_id, slate_player_id in slate_players.items():
+        if player_id in player_sim_scores:
+            outcome_rows[slate_player_id] = len(outcome_vectors)
+            outcome_vectors.append(numpy.asarray(player_sim_scores[player_id], dtype=numpy.float64))
+    player_outcomes = numpy.stack(outcome_vectors)
+
+    rows = []
+    for handle, player_ids in zip(handles, site_ids):
+        missing = [player_id for player_id in player_ids if player_id not in slate_players]
+        if len(missing) > 0:
+            raise Exception(f'Lineup for {handle} has players not on the slate: {", ".join(missing)}')
+
+        duplicated = [player_id for player_id in player_ids if player_id in ambiguous]
+        if len(duplicated) > 0:
+            raise Exception(f'Lineup for {handle} has players with more than one slate player: {", ".join(duplicated)}')
+        rows.append([slate_players[player_id] for player_id in player_ids])
+
+        missing = [player_id for player_id in player_ids if slate_players[player_id] not in outcome_rows]
+        if len(missing) > 0:
+            raise Exception(f'Lineup for {handle} has players without sim outcomes: {", ".join(missing)}')
+
+    lineup_index = get_lineup_index(possible_lineups, slots, showdown)
+
+    # resolve every entry against the index, collecting lineups that must be created
+    keys = []
+    new_lineups = {}
+    for handle, row in zip(handles, rows):
+        key = lineup_key(row, showdown)
+        keys.append(key)
+
+        matches = lineup_index.get(key, [])
+        if len(matches) > 1:
+            raise Exception(f'There were {len(matches)} duplicate lineups found for {handle} among all possible lineups.')
+        elif len(matches) == 0 and key not in new_lineups:
+            total_salary = sum([salaries[p] for p in row])
+            if total_salary > build.slate.salary_thresholds[1]:
+                raise Exception(f'Lineup for {handle} exceeds salary cap.')
+
+            new_lineups[key] = lineup_model(
+                slate=build.slate,
+                total_salary=total_salary,
+                **{f'{slot}_id': p for slot, p in zip(slots, row)}
+            )
+
+    player_rows = numpy.array([[outcome_rows[p] for p in row] for row in rows], dtype=numpy.int64)
+
+    if len(new_lineups) > 0:
+        new_keys = list(new_lineups.keys())
+        first_entry = {}
+        for index, key in enumerate(keys):
+            first_entry.setdefault(key, index)
+
+        new_rows = player_rows[[first_entry[key] for key in new_keys]]
+        for start in range(0, len(new_keys), SCORE_BATCH_SIZE):
+            scores = score_field(new_rows[start:start + SCORE_BATCH_SIZE], player_outcomes)
+            for key, lineup_scores in zip(new_keys[start:start + SCORE_BATCH_SIZE], scores):
+                sim_store.set_sim_outcomes(new_lineups[key], lineup_scores)
+
+        created = lineup_model.objects.bulk_create([new_lineups[key] for key in new_keys], batch_size=SCORE_BATCH_SIZE)
+        for key, lineup in zip(new_keys, created):
+            lineup_index[key] = [lineup.id]
+
+    field_lineups = []
+    for start in range(0, len(rows), SCORE_BATCH_SIZE):
+        scores = score_field(player_rows[start:start + SCORE_BATCH_SIZE], player_outcomes)
+        median, s75, s90 = numpy.percentile(scores, [50, 75, 90], axis=1)
+
+        for offset in range(len(scores)):
+            index = start + offset
+            field_lineups.append(field_model(
+                build=build,
+                opponent_handle=handles[index],
+                slate_lineup_id=lineup_index[keys[index]][0],
+                median=median[offset],
+                s75=s75[offset],
+                s90=s90[offset]
+            ))
+
+    field_model.objects.bulk_create(field_lineups, batch_size=SCORE_BATCH_SIZE)
@@ -0,0 +1,105 @@
+import numpy
+
+# Classic lineup slots in SlateLineup column order
+LINEUP_SLOTS = ['qb', 'rb1', 'rb2', 'wr1', 'wr2', 'wr3', 'te', 'flex', 'dst']
+
+# Maximum number of players per position in a classic lineup
+MAX_PLAYERS_PER_POSITION = {
+    'QB': 1,
+    'RB': 3,
+    'WR': 4,
+    'TE': 2,
+}
+
+# Candidates generated per batch, and how many batches to try before giving up
+MIN_BATCH_SIZE = 5000
+MAX_BATCHES = 200
+
+
+def _random_subsets(rng, pool, size, num_samples):
+    '''
+    Draws num_samples uniformly random size-element subsets of pool, each in pool order
+    (the same ordering itertools.combinations produces).
+    '''
+    picks = numpy.argsort(rng.random((num_samples, len(pool))), axis=1)[:, :size]
+    picks.sort(axis=1)
+    return pool[picks]
+
+
+def sample_lineups(qb, rbs, wrs, tes, flexes, dsts, salaries, positions, salary_thresholds, num_lineups, rng=None):
+    '''
+    Returns up to num_lineups unique random classic lineups for a QB as an (n x 9) array of
+    player indices in LINEUP_SLOTS order.
+
+    qb is a player index; rbs, wrs, tes, flexes and dsts are arrays of player indices.
+    salaries and positions are arrays indexed by player index. Candidates are generated in
+    large batches and the salary band, positional limits, duplicate players and duplicate
+    lineups are all applied as vectorized masks.
+    '''
+    rng = rng if rng is not None else numpy.random.default_rng()
+    rbs, wrs, tes, flexes, dsts = [numpy.asarray(pool, dtype=numpy.int64) for pool in [rbs, wrs, tes, flexes, dsts]]
+    salaries = numpy.asarray(salaries)
+    positions = numpy.asarray(positions)
+
+    lineups = []
+    seen = set()
+    num_found = 0
+    batch_size = max(MIN_BATCH_SIZE, num_lineups * 10)
+
+    if len(rbs) < 2 or len(wrs) < 3 or len(tes) == 0 or len(flexes) == 0 or len(dsts) == 0:
+        return numpy.empty((0, len(LINEUP_SLOTS)), dtype=numpy.int64)
+
+    for _ in range(MAX_BATCHES):
+        if num_found >= num_lineups:
+            break
+
+        candidates = numpy.column_stack([
+            numpy.full(batch_size, qb, dtype=numpy.int64),
+            _random_subsets(rng, rbs, 2, batch_size),
+            _random_subsets(rng, wrs, 3, batch_size),
+            tes[rng.integers(0, len(tes), batch_size)],
+            flexes[rng.integers(0, len(flexes), batch_size)],
+            dsts[rng.integers(0, len(dsts), batch_size)],
+        ])
+
+        total_salaries = salaries[candidates].sum(axis=1)
+        valid = (total_salaries >= salary_thresholds[0]) & (total_salaries <= salary_thresholds[1])
+
+        candidate_positions = positions[candidates]
+        for position, max_players in MAX_PLAYERS_PER_POSITION.items():
+            valid &= (candidate_positions == position).sum(axis=1) <= max_players
+
+        # the sorted player list is the canonical key of a lineup; adjacent equal
+        # entries mean the same player was drawn twice
+        keys = numpy.sort(candidates, axis=1)
+        valid &= (numpy.diff(keys, axis=1) != 0).all(axis=1)
+
+        candidates = candidates[valid]
+        keys = keys[valid]
+        _, first = numpy.unique(keys, axis=0, return_index=True)
+
+        for index in numpy.sort(first):
+            key = keys[index].tobytes()
+            if key in seen:
+                continue
+
+            seen.add(key)
+            lineups.append(candidates[index])
+            num_found += 1
+            if num_found >= num_lineups:
+                break
+
+    if len(lineups) == 0:
+        return numpy.empty((0, len(LINEUP_SLOTS)), dtype=numpy.int64)
+    return numpy.array(lineups)
+
+
+def score_lineups(lineups, outcomes):
+    '''
+    Returns the (lineups x iterations) sim scores of lineups given as player indices into
+    the rows of the player outcomes matrix.
+    '''
+    scores = numpy.zeros((lineups.shape[0], outcomes.shape[1]), dtype=numpy.float64)
+    for slot in range(lineups.shape[1]):
+        scores += outcomes[lineups[:, slot]]
+    return scores
@@ -0,0 +1,73 @@
+import numpy
+
+# Head-to-head win rate needed to beat the rake
+RAKE_FREE_WIN_RATE = 0.55
+
+# Upper bound on the number of score comparisons held in memory at once
+MAX_BLOCK_ELEMENTS = 50000000
+
+
+def win_rate_matrix(candidates, field):
+    '''
+    Returns a (candidates x field) float32 matrix of head-to-head win rates, where entry
+    [i, j] is the share of iterations in which candidate i outscores field lineup j.
+
+    Both inputs are (lineups x iterations) score matrices. Candidates are compared against
+    the whole field in blocks sized to keep memory bounded.
+    '''
+    num_candidates, num_iterations = candidates.shape
+    num_field = field.shape[0]
+    rates = numpy.zeros((num_candidates, num_field), dtype=numpy.float32)
+
+    if num_candidates == 0 or num_field == 0 or num_iterations == 0:
+        return rates
+
+    block_size = max(1, MAX_BLOCK_ELEMENTS // (num_field * num_iterations))
+    for start in range(0, num_candidates, block_size):
+        block = candidates[start:start + block_size]
+        wins = numpy.count_nonzero(block[:, numpy.newaxis, :] > field[numpy.newaxis, :, :], axis=2)
+        rates[start:start + block_size] = wins / num_iterations
+
+    return rates
+
+
+def summarize_h2h(rates, scores):
+    '''
+    Derives the WinningLineup values for each candidate from its row of win rates and its
+    sim scores: median/s75/s90 of the scores, the number of rake-free matchups (win_count),
+    their median win rate (win_rate) and rating = win_rate * 2 * win_count.
+    '''
+    median, s75, s90 = numpy.percentile(scores, [50, 75, 90], axis=1)
+
+    rake_free = rates >= RAKE_FREE_WIN_RATE
+    win_count = numpy.count_nonzero(rake_free, axis=1)
+
+    win_rate = numpy.zeros(rates.shape[0], dtype=numpy.float64)
+    has_wins = win_count > 0
+    if has_wins.any():
+        masked = numpy.where(rake_free[has_wins], rates[has_wins], numpy.nan)
+        win_rate[has_wins] = numpy.nanmedian(masked, axis=1)
+
+    return {
+        'median': median,
+        's75': s75,
+        's90': s90,
+        'win_rate': win_rate,
+        'win_count': win_count,
+        'rating': win_rate * (2 * win_count),
+    }
+
+
+def single_entry_win_counts(candidates, field):
+    '''
+    Returns, for each candidate, the number of iterations in which it finishes at or above
+    the best lineup in the field.
+
+    The field's per-iteration maximum is computed once and every candidate is compared
+    against it in one vectorized pass.
+    '''
+    if field.shape[0] == 0 or candidates.shape[0] == 0:
+        return numpy.zeros(candidates.shape[0], dtype=numpy.int64)
+
+    field_max = numpy.nanmax(field, axis=0)
+    return numpy.count_nonzero(candidates >= field_max, axis=1)
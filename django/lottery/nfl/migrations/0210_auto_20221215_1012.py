@@ -0,0 +1,43 @@
+# Generated by Django 2.2 on 2022-12-15 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nfl', '0209_auto_20221213_1523'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='slatebuildlineup',
+            name='sim_outcomes',
+            field=models.BinaryField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='slatebuildstack',
+            name='sim_outcomes',
+            field=models.BinaryField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='slatefieldlineup',
+            name='sim_outcomes',
+            field=models.BinaryField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='slatelineup',
+            name='sim_outcomes',
+            field=models.BinaryField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='slateplayerprojection',
+            name='sim_outcomes',
+            field=models.BinaryField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='slatesdlineup',
+            name='sim_outcomes',
+            field=models.BinaryField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -2,7 +2,6 @@ import bisect
 import csv
 import datetime
 import decimal
-import difflib
 import math
 from random import choices
 from tabnanny import verbose
@@ -34,8 +33,10 @@ from django.urls import reverse_lazy
 from configuration.models import BackgroundTask
 from fanduel import models as fanduel_models
 
+from . import aliases
 from . import optimize
 from . import new_optimize
+from . import sim_store
 from . import tasks
 
 
@@ -263,155 +264,11 @@ class Alias(models.Model):
 
     @classmethod
     def find_alias(clz, player_name, site):
-        try:
-            if site == 'draftkings':
-                alias = Alias.objects.get(dk_name=player_name)
-            elif site == 'fanduel':
-                alias = Alias.objects.get(fd_name=player_name)
-            elif site.startswith('4for4'):
-                alias = Alias.objects.get(four4four_name=player_name)
-            elif site.startswith('awesemo_own'):
-                alias = Alias.objects.get(awesemo_ownership_name=player_name)
-            elif site.startswith('awesemo'):
-                alias = Alias.objects.get(awesemo_name=player_name)
-            elif site == 'etr_all':
-                alias = Alias.objects.get(etr_all_name=player_name)
-            elif site.startswith('etr'):
-                alias = Alias.objects.get(etr_name=player_name)
-            elif site.startswith('tda'):
-                alias = Alias.objects.get(tda_name=player_name)
-            elif site == 'rg_all':
-                alias = Alias.objects.get(rg_all_name=player_name)
-            elif site.startswith('rg'):
-                alias = Alias.objects.get(rg_name=player_name)
-            elif site.startswith('fc'):
-                alias = Alias.objects.get(fc_name=player_name)
-            elif site.startswith('rts'):
-                alias = Alias.objects.get(rts_name=player_name)
-            elif site.startswith('yahoo'):
-                alias = Alias.objects.get(yahoo_name=player_name)
-            elif site.startswith('rotogrinders'):
-                alias = Alias.objects.get(rg_name=player_name)
-            elif site.startswith('sabersim'):
-                alias = Alias.objects.get(ss_name=player_name)
-            elif site.startswith('dailyroto'):
-                alias = Alias.objects.get(dr_name=player_name)
-            elif site.startswith('linestar'):
-                alias = Alias.objects.get(linestar_name=player_name)
-            else:
-                raise Exception('{} is not a supported site yet.'.format(site))
-        except Alias.MultipleObjectsReturned:
-            if site == 'draftkings':
-                alias = Alias.objects.filter(dk_name=player_name)[0]
-            elif site == 'fanduel':
-                alias = Alias.objects.filter(fd_name=player_name)[0]
-            elif site.startswith('4for4'):
-                alias = Alias.objects.filter(four4four_name=player_name)[0]
-            elif site.startswith('awesemo_own'):
-                alias = Alias.objects.filter(awesemo_ownership_name=player_name)[0]
-            elif site.startswith('awesemo'):
-                alias = Alias.objects.filter(awesemo_name=player_name)[0]
-            elif site == 'etr_all':
-                alias = Alias.objects.filter(etr_all_name=player_name)[0]
-            elif site.startswith('etr'):
-                alias = Alias.objects.filter(etr_name=player_name)[0]
-            elif site.startswith('tda'):
-                alias = Alias.objects.filter(tda_name=player_name)[0]
-            elif site == 'rg_all':
-                alias = Alias.objects.filter(rg_all_name=player_name)[0]
-            elif site.startswith('rg'):
-                alias = Alias.objects.filter(rg_name=player_name)[0]
-            elif site.startswith('fc'):
-                alias = Alias.objects.filter(fc_name=player_name)[0]
-            elif site.startswith('rts'):
-                alias = Alias.objects.filter(rts_name=player_name)[0]
-            elif site.startswith('yahoo'):
-                alias = Alias.objects.filter(yahoo_name=player_name)[0]
-            elif site.startswith('rotogrinders'):
-                alias = Alias.objects.filter(rg_name=player_name)[0]
-            elif site.startswith('sabersim'):
-                alias = Alias.objects.filter(ss_name=player_name)[0]
-            elif site.startswith('dailyroto'):
-                alias = Alias.objects.filter(dr_name=player_name)[0]
-            elif site.startswith('linestar'):
-                alias = Alias.objects.filter(linestar_name=player_name)[0]
-            else:
-                raise Exception('{} is not a supported site yet.'.format(site))
-        except Alias.DoesNotExist:
-            scores = []
-            normal_name = player_name.lower()
-            possible_matches = Alias.objects.all()
-            for possible_match in possible_matches:
-                if site == 'draftkings':
-                    seqmatch = difflib.SequenceMatcher(None, normal_name.lower(), possible_match.dk_name.lower())
-                    score = seqmatch.quick_ratio()
-                elif site == 'fanduel':
-                    seqmatch = difflib.SequenceMatcher(None, normal_name.lower(), possible_match.fd_name.lower())
-                    score = seqmatch.quick_ratio()
-                elif site == 'yahoo':
-                    seqmatch = difflib.SequenceMatcher(None, normal_name.lower(), possible_match.yahoo_name.lower())
-                    score = seqmatch.quick_ratio()
-                elif site.startswith('4for4'):
-                    seqmatch = difflib.SequenceMatcher(None, normal_name.lower(), possible_match.four4four_name.lower())
-                    score = seqmatch.quick_ratio()
-                elif site.startswith('awesemo_own'):
-                    seqmatch = difflib.SequenceMatcher(None, normal_name.lower(), possible_match.awesemo_ownership_name.lower())
-                    score = seqmatch.quick_ratio()
-                elif site.startswith('awesemo'):
-                    seqmatch = difflib.SequenceMatcher(None, normal_name.lower(), possible_match.awesemo_name.lower())
-                    score = seqmatch.quick_ratio()
-                elif site == 'etr_all':
-                    seqmatch = difflib.SequenceMatcher(None, normal_name.lower(), possible_match.etr_all_name.lower())
-                    score = seqmatch.quick_ratio()
-                elif site.startswith('etr'):
-                    seqmatch = difflib.SequenceMatcher(None, normal_name.lower(), possible_match.etr_name.lower())
-                    score = seqmatch.quick_ratio()
-                elif site.startswith('tda'):
-                    seqmatch = difflib.SequenceMatcher(None, normal_name.lower(), possible_match.tda_name.lower())
-                    score = seqmatch.quick_ratio()
-                elif site == 'rg_all':
-                    seqmatch = difflib.SequenceMatcher(None, normal_name.lower(), possible_match.rg_all_name.lower())
-                    score = seqmatch.quick_ratio()
-                elif site.startswith('rg'):
-                    seqmatch = difflib.SequenceMatcher(None, normal_name.lower(), possible_match.rg_name.lower())
-                    score = seqmatch.quick_ratio()
-                elif site.startswith('fc'):
-                    seqmatch = difflib.SequenceMatcher(None, normal_name.lower(), possible_match.fc_name.lower())
-                    score = seqmatch.quick_ratio()
-                elif site.startswith('rts'):
-                    seqmatch = difflib.SequenceMatcher(None, normal_name.lower(), possible_match.rts_name.lower())
-                    score = seqmatch.quick_ratio()
-                elif site.startswith('rotogrinders'):
-                    seqmatch = difflib.SequenceMatcher(None, normal_name.lower(), possible_match.rg_name.lower())
-                    score = seqmatch.quick_ratio()
-                elif site.startswith('sabersim'):
-                    seqmatch = difflib.SequenceMatcher(None, normal_name.lower(), possible_match.ss_name.lower())
-                    score = seqmatch.quick_ratio()
-                elif site.startswith('dailyroto'):
-                    seqmatch = difflib.SequenceMatcher(None, normal_name.lower(), possible_match.dr_name.lower())
-                    score = seqmatch.quick_ratio()
-                elif site.startswith('linestar'):
-                    seqmatch = difflib.SequenceMatcher(None, normal_name.lower(), possible_match.linestar_name.lower())
-                    score = seqmatch.quick_ratio()
-                else:
-                    raise Exception('{} is not a supported site yet.'.format(site))
-
-                scores.append({'alias': possible_match, 'score': score})
-            
-            scores = sorted(scores, key=lambda x: x.get('score'), reverse=True)
-
-            # add top 3 scoring aliases to MissingAlias table
-            MissingAlias.objects.create(
-                player_name=player_name,
-                site=site,
-                alias_1=scores[0].get('alias'),
-                alias_2=scores[1].get('alias'),
-                alias_3=scores[2].get('alias'),
-            )
+        return aliases.find_aliases([player_name], site)[0]
 
-            return None
-
-        return alias
+    @classmethod
+    def find_aliases(clz, player_names, site):
+        return aliases.find_aliases(player_names, site)
 
     def get_alias(self, for_site):
         if for_site == 'fanduel':
@@ -1081,6 +938,7 @@ class SlatePlayerProjection(models.Model):
     rb_group = models.PositiveIntegerField('RBG', null=True, blank=True)
     balanced_projection = models.DecimalField('BP', null=True, blank=True, max_digits=5, decimal_places=2, default=0.0)
     sim_scores = ArrayField(models.DecimalField(max_digits=5, decimal_places=2), null=True, blank=True)
+    sim_outcomes = models.BinaryField(null=True, blank=True, editable=False)
     s20 = models.FloatField(db_index=True, default=0.0)
     median = models.FloatField(db_index=True, default=0.0)
     s75 = models.FloatField(db_index=True, default=0.0)
@@ -1157,11 +1015,11 @@ class SlatePlayerProjection(models.Model):
         else:
             sim_scores = None
         
-        self.sim_scores = sim_scores
+        sim_store.set_sim_outcomes(self, sim_scores)
         self.save()
 
     def get_percentile_sim_score(self, percentile):
-        return numpy.percentile(self.sim_scores, decimal.Decimal(percentile))
+        return numpy.percentile(sim_store.get_sim_outcomes(self), float(percentile))
 
     def get_opponent(self):
         return self.slate_player.get_opponent()
@@ -1534,6 +1392,7 @@ class SlateLineup(models.Model):
     dst = models.ForeignKey(SlatePlayer, db_index=True, related_name='dst', on_delete=models.CASCADE)
     total_salary = models.IntegerField(default=0)
     sim_scores = ArrayField(models.FloatField(), null=True, blank=True)
+    sim_outcomes = models.BinaryField(null=True, blank=True, editable=False)
 
     class Meta:
         verbose_name = 'Slate Lineup'
@@ -1572,6 +1431,7 @@ class SlateSDLineup(models.Model):
     flex5 = models.ForeignKey(SlatePlayer, db_index=True, related_name='flex5', null=True, blank=True, on_delete=models.CASCADE)
     total_salary = models.IntegerField(default=0)
     sim_scores = ArrayField(models.FloatField(), null=True, blank=True)
+    sim_outcomes = models.BinaryField(null=True, blank=True, editable=False)
 
     class Meta:
         verbose_name = 'Slate SD Lineup'
@@ -2957,6 +2817,10 @@ class BuildPlayerProjection(models.Model):
     def sim_scores(self):
         return self.slate_player.projection.sim_scores
 
+    @property
+    def sim_outcomes(self):
+        return self.slate_player.projection.sim_outcomes
+
     def get_qb(self):
         qbs = BuildPlayerProjection.objects.filter(
             build=self.build,
@@ -3037,6 +2901,7 @@ class SlateBuildStack(models.Model):
     optimals_created = models.BooleanField(default=False)
     error_message = models.TextField(blank=True, null=True)
     sim_scores = ArrayField(models.DecimalField(max_digits=5, decimal_places=2), null=True, blank=True)
+    sim_outcomes = models.BinaryField(null=True, blank=True, editable=False)
     actual = models.DecimalField(max_digits=5, decimal_places=2, blank=True, null=True, db_index=True)
 
     class Meta:
@@ -3191,7 +3056,7 @@ class SlateBuildStack(models.Model):
     def calc_sim_scores(self):
         mu = float(sum(p.projection for p in [self.qb, self.player_1, self.player_2, self.opp_player]))
         sim_scores = [min(i * mu, 999.99) for i in scipy.stats.exponweib.rvs(3.2212819188775237, 1.8784436736213124, loc=-0.08318691129888284, scale=0.782305472516587, size=settings.SIMULATION_SIZE)]
-        self.sim_scores = sim_scores
+        sim_store.set_sim_outcomes(self, sim_scores)
         self.save()
 
     def has_possible_optimals(self):
@@ -3333,19 +3198,19 @@ class SlateBuildStack(models.Model):
         return count
 
     def get_median_sim_score(self):
-        if self.sim_scores:
-            return numpy.median(self.sim_scores)
+        outcomes = sim_store.get_sim_outcomes(self)
+        if outcomes is not None and len(outcomes) > 0:
+            return numpy.median(outcomes)
         return 0
 
     def get_percentile_sim_score(self, percentile):
-        if self.sim_scores:
-            return numpy.percentile([float(i) for i in self.sim_scores], percentile)
+        outcomes = sim_store.get_sim_outcomes(self)
+        if outcomes is not None and len(outcomes) > 0:
+            return numpy.percentile(outcomes, percentile)
         return 0
 
     def get_ceiling_sim_score(self):
-        if self.sim_scores:
-            return self.get_percentile_sim_score(90)
-        return 0
+        return self.get_percentile_sim_score(90)
 
 
 class SlateBuildTopStack(models.Model):
@@ -3479,6 +3344,7 @@ class SlateBuildLineup(models.Model):
     sim_rating = models.DecimalField(db_index=True, max_digits=10, decimal_places=2, default=0.0)
     actual = models.DecimalField(max_digits=5, decimal_places=2, blank=True, null=True)
     sim_scores = ArrayField(models.DecimalField(max_digits=5, decimal_places=2), null=True, blank=True)
+    sim_outcomes = models.BinaryField(null=True, blank=True, editable=False)
 
     class Meta:
         verbose_name = 'Lineup'
@@ -3502,22 +3368,22 @@ class SlateBuildLineup(models.Model):
     @property
     def non_stack_sim_scores(self):
         matrix = [
-            self.rb1.sim_scores,
-            self.rb2.sim_scores,
+            sim_store.get_sim_outcomes(self.rb1),
+            sim_store.get_sim_outcomes(self.rb2),
         ]
 
         if not self.stack.contains_slate_player(self.wr1.slate_player):
-            matrix.append(self.wr1.sim_scores)    
+            matrix.append(sim_store.get_sim_outcomes(self.wr1))    
         if not self.stack.contains_slate_player(self.wr2.slate_player):
-            matrix.append(self.wr2.sim_scores)    
+            matrix.append(sim_store.get_sim_outcomes(self.wr2))    
         if not self.stack.contains_slate_player(self.wr3.slate_player):
-            matrix.append(self.wr3.sim_scores)    
+            matrix.append(sim_store.get_sim_outcomes(self.wr3))    
         if not self.stack.contains_slate_player(self.te.slate_player):
-            matrix.append(self.te.sim_scores)    
+            matrix.append(sim_store.get_sim_outcomes(self.te))    
         if not self.stack.contains_slate_player(self.flex.slate_player):
-            matrix.append(self.flex.sim_scores) 
+            matrix.append(sim_store.get_sim_outcomes(self.flex)) 
         
-        matrix.append(self.dst.sim_scores)
+        matrix.append(sim_store.get_sim_outcomes(self.dst))
 
         return matrix  
 
@@ -3611,13 +3477,14 @@ class SlateBuildLineup(models.Model):
         return score        
 
     def get_percentile_sim_score(self, percentile):
-        return numpy.percentile(self.sim_scores, float(percentile))
+        return numpy.percentile(sim_store.get_sim_outcomes(self), float(percentile))
 
     def simulate(self):
-        self.sim_scores = [float(sum([p.sim_scores[i] for p in self.players])) for i in range(0, 10000)]
-        self.median = numpy.median(self.sim_scores)
-        self.s75 = self.get_percentile_sim_score(75)
-        self.s90 = self.get_percentile_sim_score(98)
+        scores = numpy.sum([sim_store.get_sim_outcomes(p)[0:10000] for p in self.players], axis=0, dtype=numpy.float64)
+        sim_store.set_sim_outcomes(self, scores)
+        self.median = numpy.median(scores)
+        self.s75 = numpy.percentile(scores, 75)
+        self.s90 = numpy.percentile(scores, 98)
         self.save()
 
 
@@ -3634,6 +3501,7 @@ class SlateFieldLineup(models.Model):
     flex = models.ForeignKey(SlatePlayerProjection, db_index=True, related_name='flex', on_delete=models.CASCADE)
     dst = models.ForeignKey(SlatePlayerProjection, db_index=True, related_name='dst', on_delete=models.CASCADE)
     sim_scores = ArrayField(models.DecimalField(max_digits=5, decimal_places=2), null=True, blank=True)
+    sim_outcomes = models.BinaryField(null=True, blank=True, editable=False)
 
     @property
     def players(self):
@@ -3650,7 +3518,7 @@ class SlateFieldLineup(models.Model):
         ]
 
     def simulate(self):
-        self.sim_scores = [float(sum([p.sim_scores[i] for p in self.players])) for i in range(0, 10000)]
+        sim_store.set_sim_outcomes(self, numpy.sum([sim_store.get_sim_outcomes(p)[0:10000] for p in self.players], axis=0, dtype=numpy.float64))
         self.save()
 
 
@@ -3768,27 +3636,27 @@ class SlateBuildActualsLineup(models.Model):
     @property
     def non_stack_sim_scores(self):
         matrix = [
-            self.rb1.sim_scores,
-            self.rb2.sim_scores,
+            sim_store.get_sim_outcomes(self.rb1),
+            sim_store.get_sim_outcomes(self.rb2),
         ]
 
         if not self.stack.contains_slate_player(self.wr1.slate_player):
-            matrix.append(self.wr1.sim_scores)    
+            matrix.append(sim_store.get_sim_outcomes(self.wr1))    
         if not self.stack.contains_slate_player(self.wr2.slate_player):
-            matrix.append(self.wr2.sim_scores)    
+            matrix.append(sim_store.get_sim_outcomes(self.wr2))    
         if not self.stack.contains_slate_player(self.wr3.slate_player):
-            matrix.append(self.wr3.sim_scores)    
+            matrix.append(sim_store.get_sim_outcomes(self.wr3))    
         if not self.stack.contains_slate_player(self.te.slate_player):
-            matrix.append(self.te.sim_scores)    
+            matrix.append(sim_store.get_sim_outcomes(self.te))    
         if not self.stack.contains_slate_player(self.flex.slate_player):
-            matrix.append(self.flex.sim_scores) 
+            matrix.append(sim_store.get_sim_outcomes(self.flex)) 
         
-        matrix.append(self.dst.sim_scores)
+        matrix.append(sim_store.get_sim_outcomes(self.dst))
 
         return matrix  
 
     def get_median_sim_score(self):
-        matrix = [self.stack.sim_scores] + self.non_stack_sim_scores
+        matrix = [sim_store.get_sim_outcomes(self.stack)] + self.non_stack_sim_scores
         score_matrix = numpy.array(matrix)
 
         try:
@@ -3799,7 +3667,7 @@ class SlateBuildActualsLineup(models.Model):
         return numpy.median(scores)
 
     def get_ceiling_sim_score(self):
-        matrix = [self.stack.sim_scores] + self.non_stack_sim_scores
+        matrix = [sim_store.get_sim_outcomes(self.stack)] + self.non_stack_sim_scores
         score_matrix = numpy.array(matrix)
 
         try:
@@ -3810,7 +3678,7 @@ class SlateBuildActualsLineup(models.Model):
         return numpy.amax(scores)
 
     def get_percentile_sim_score(self, percentile):
-        matrix = [self.stack.sim_scores] + self.non_stack_sim_scores
+        matrix = [sim_store.get_sim_outcomes(self.stack)] + self.non_stack_sim_scores
         score_matrix = numpy.array(matrix)
 
         try:
@@ -3821,7 +3689,7 @@ class SlateBuildActualsLineup(models.Model):
         return numpy.percentile(scores, decimal.Decimal(percentile))
 
     def simulate(self):
-        self.sim_scores = [float(sum([p.sim_scores[i] for p in self.players])) for i in range(0, 10000)]
+        self.sim_scores = numpy.sum([sim_store.get_sim_outcomes(p)[0:10000] for p in self.players], axis=0, dtype=numpy.float64).tolist()
         self.save()
 
 
@@ -11,6 +11,7 @@ import traceback
 
 from collections import namedtuple
 from django.core.management.base import BaseCommand
+from django.db.models import QuerySet
 from pydfs_lineup_optimizer import Site, Sport, Player, get_optimizer, \
     exceptions, LineupOptimizer
 from pydfs_lineup_optimizer.stacks import PlayersGroup, Stack, GameStack
@@ -20,11 +21,32 @@ from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.feature_extraction.text import CountVectorizer
 
 from . import optimizer_settings
+from . import sim_store
 
 logger = logging.getLogger(__name__)
 
 GameInfo = namedtuple('GameInfo', ['home_team', 'away_team', 'starts_at', 'game_started'])
 
+# Build projection, group and configuration fields a stack optimizer context is built
+# from. A cached context is rebuilt when any of them change.
+CONTEXT_PROJECTION_FIELDS = [
+    'id', 'in_play', 'locked', 'stack_only', 'balanced_projection', 'min_exposure', 'max_exposure',
+    'slate_player__player_id', 'slate_player__name', 'slate_player__team', 'slate_player__site_pos',
+    'slate_player__salary', 'slate_player__fantasy_points', 'slate_player__slate_game_id',
+]
+CONTEXT_GROUP_FIELDS = ['id', 'min_from_group', 'max_from_group', 'players__slate_player__player_id']
+CONTEXT_CONFIG_FIELDS = [
+    'id', 'randomness', 'min_salary', 'uniques', 'num_players_vs_dst', 'allow_dst_rb_stack',
+    'allow_rbs_from_same_game', 'allow_qb_dst_from_same_team', 'allow_rb_qb_from_same_team',
+    'allow_rb_qb_from_opp_team', 'game_stack_size', 'use_mini_stacks', 'flex_positions',
+]
+
+# Optimizer contexts kept by a worker, least recently used dropped first
+MAX_OPTIMIZER_CONTEXTS = 4
+
+# (site, build id, for_optimals) -> optimizer context
+_contexts = {}
+
 
 def optimize(site, projections, num_lineups=1):
     if site == 'fanduel':
@@ -269,7 +291,8 @@ def naked_simulate(site, projections, config, player_sim_index=0, optimals_per_s
         else:
             player_position = [player_projection.position]
 
-        if player_projection.sim_scores is not None and len(player_projection.sim_scores) > 0:
+        outcomes = sim_store.get_sim_outcomes(player_projection)
+        if outcomes is not None and len(outcomes) > 0:
             player = Player(
                 player_projection.slate_player.player_id,
                 first,
@@ -277,7 +300,7 @@ def naked_simulate(site, projections, config, player_sim_index=0, optimals_per_s
                 player_position,
                 player_projection.team,
                 player_projection.salary,
-                float(player_projection.sim_scores[player_sim_index]),
+                float(outcomes[player_sim_index]),
                 game_info=game_info
             )
 
@@ -414,7 +437,8 @@ def simulate(site, projections, qbs, config, player_sim_index=0, optimals_per_si
         else:
             player_position = [player_projection.position]
 
-        if player_projection.sim_scores is not None and len(player_projection.sim_scores) > 0:
+        outcomes = sim_store.get_sim_outcomes(player_projection)
+        if outcomes is not None and len(outcomes) > 0:
             player = Player(
                 player_projection.slate_player.player_id,
                 first,
@@ -422,7 +446,7 @@ def simulate(site, projections, qbs, config, player_sim_index=0, optimals_per_si
                 player_position,
                 player_projection.team,
                 player_projection.salary,
-                float(player_projection.sim_scores[player_sim_index]),
+                float(outcomes[player_sim_index]),
                 game_info=game_info
             )
 
@@ -519,9 +543,13 @@ def simulate(site, projections, qbs, config, player_sim_index=0, optimals_per_si
         return []
 
 
-def optimize_for_stack(site, stack, projections, slate_teams, config, num_lineups, groups=[], for_optimals=False):
+def get_optimizer_settings(site, stack, config):
+    '''
+    Returns the settings a stack's optimizer is created with: a (site, sport) pair for the
+    site's standard settings or a custom settings class.
+    '''
     if site == 'fanduel':
-        optimizer = get_optimizer(Site.FANDUEL, Sport.FOOTBALL)
+        return (Site.FANDUEL, Sport.FOOTBALL)
         # if config.game_stack_size == 3:
         #     if config.use_mini_stacks:
         #         if stack.player_2 is not None:
@@ -536,7 +564,7 @@ def optimize_for_stack(site, stack, projections, slate_teams, config, num_lineup
         #     else:
         #         optimizer = get_optimizer(Site.FANDUEL, Sport.FOOTBALL)
     elif site == 'draftkings':
-        optimizer = get_optimizer(Site.DRAFTKINGS, Sport.FOOTBALL)
+        return (Site.DRAFTKINGS, Sport.FOOTBALL)
         # if config.game_stack_size == 3:
         #     if config.use_mini_stacks:
         #         if stack.player_2 is not None:
@@ -576,130 +604,332 @@ def optimize_for_stack(site, stack, projections, slate_teams, config, num_lineup
         #         else:
         #             optimizer = get_optimizer(Site.DRAFTKINGS, Sport.FOOTBALL)
     elif site == 'yahoo':
-        if config.game_stack_size == 3:
-            if config.use_mini_stacks:
+        if config.use_mini_stacks:
+            if config.game_stack_size == 3:
                 if stack.player_2 is not None:
-                    optimizer = LineupOptimizer(optimizer_settings.YahooNFLSettingsMax3PerTeam)
-                else:
-                    optimizer = LineupOptimizer(optimizer_settings.YahooNFLSettingsMax2PerTeam)
-            else:
-                optimizer = get_optimizer(Site.YAHOO, Sport.FOOTBALL)
-        elif config.game_stack_size == 4:
-            if config.use_mini_stacks:
-                optimizer = LineupOptimizer(optimizer_settings.YahooNFLSettingsMax3PerTeamMax5Games)
-            else:
-                optimizer = get_optimizer(Site.Yahoo, Sport.FOOTBALL)
-    else:
-        raise Exception('{} is not a supported dfs site.'.format(site))
+                    return optimizer_settings.YahooNFLSettingsMax3PerTeam
+                return optimizer_settings.YahooNFLSettingsMax2PerTeam
+            elif config.game_stack_size == 4:
+                return optimizer_settings.YahooNFLSettingsMax3PerTeamMax5Games
+        return (Site.YAHOO, Sport.FOOTBALL)
+    raise Exception('{} is not a supported dfs site.'.format(site))
 
-    players_list = get_player_list_for_game_stack(
-        projections, 
-        stack.qb.slate_player,
-        stack,
-        randomness=config.randomness,
-        use_stack_only=True,
-        allow_qb_dst_stack=config.allow_qb_dst_from_same_team,
-        allow_rb_qb_stack=config.allow_rb_qb_from_same_team,
-        allow_opp_rb_qb_stack=config.allow_rb_qb_from_opp_team,
-        max_dst_exposure=config.max_dst_exposure,
-        for_optimals=for_optimals
-    )
-    optimizer.load_players(players_list)
-    logger.info('  Loaded {} players.'.format(len(players_list)))
 
-    lineups = []
+def create_optimizer(settings):
+    if isinstance(settings, tuple):
+        return get_optimizer(*settings)
+    return LineupOptimizer(settings)
 
-    ### SETTINGS ###
+
+def get_dst_label(site):
     if site == 'fanduel':
-        dst_label = 'D' 
+        return 'D'
     elif site == 'yahoo':
-        dst_label = 'DEF' 
-    else:
-        dst_label = 'DST'
+        return 'DEF'
+    return 'DST'
+
+
+def get_context_signature_row(player_projection):
+    slate_player = player_projection.slate_player
+    return (
+        player_projection.id,
+        player_projection.in_play,
+        player_projection.locked,
+        player_projection.stack_only,
+        player_projection.balanced_projection,
+        player_projection.min_exposure,
+        player_projection.max_exposure,
+        slate_player.player_id,
+        slate_player.name,
+        slate_player.team,
+        slate_player.site_pos,
+        slate_player.salary,
+        slate_player.fantasy_points,
+        slate_player.slate_game_id,
+    )
 
-    # Locked Players
-    locked_players = projections.filter(locked=True)
-    for locked_player in locked_players:
-        player = optimizer.get_player_by_id(locked_player.slate_player.player_id)
 
-        if player is not None:
-            optimizer.add_player_to_lineup(player)
+def get_group_rows(groups):
+    '''
+    Returns (group id, min from group, max from group, player id) for every player of the
+    groups, in group order
+    '''
+    if isinstance(groups, QuerySet):
+        return list(groups.order_by('id', 'players__id').values_list(*CONTEXT_GROUP_FIELDS))
+    return [(group.id, group.min_from_group, group.max_from_group, player.slate_player.player_id) for group in groups for player in group.players.all()]
 
-    # Groups
-    for group in groups:
-        group_player_list = []
-        for player in group.players.all(): 
-            p = optimizer.get_player_by_id(player.slate_player.player_id)
 
-            if p is not None:
-                group_player_list.append(p)
-        
-        if len(group_player_list) > 0:
-            opto_group = PlayersGroup(
-                group_player_list, 
-                min_from_group=group.min_from_group,
-                max_from_group=group.max_from_group
-            )
-            optimizer.add_players_group(opto_group)
+def get_context_signature(projections, groups, config):
+    '''
+    Returns everything an optimizer context is built from, so a cached context can be
+    checked against the build with two queries.
+    '''
+    return (
+        tuple(projections.values_list(*CONTEXT_PROJECTION_FIELDS)),
+        tuple(get_group_rows(groups)),
+        tuple(getattr(config, field) for field in CONTEXT_CONFIG_FIELDS),
+    )
 
-    # Salary
-    if config.min_salary > 0:
-        optimizer.set_min_salary_cap(config.min_salary)
-    
-    # Uniques
-    if not for_optimals:
-        optimizer.set_max_repeating_players(9 - config.uniques) 
 
-    ### LIMIT RULES ###
+class StackOptimizerContext:
+    '''
+    The optimizer state shared by every stack of a build: the optimizer players of all
+    in-play projections, the build's locked players and active groups, and one optimizer
+    per settings with the build-wide rules applied, all loaded once.
 
-    # Limit Flex Position
-    d = {}
-    for p in config.flex_positions:
-        d[p] = 1
-    if len(d) == 1 and get_num_tes_in_list(stack.players) < 2:  # allow TE in flex when game stack has 2 TEs
-        optimizer.set_players_with_same_position(d)
+    Each stack loads its own share of the cached players, locks the build's and its own
+    players, adds its groups and stacks, optimizes and rolls all of it back, so lineups
+    are the same as from an optimizer set up from scratch for the stack.
+    '''
+    def __init__(self, site, projections, config, groups, for_optimals=False):
+        self.site = site
+        self.config = config
+        self.for_optimals = for_optimals
+        self.flex_positions = config.flex_positions
+
+        projections = list(projections.select_related('slate_player', 'slate_player__slate'))
+        group_rows = get_group_rows(groups)
+        self.signature = (
+            tuple(get_context_signature_row(p) for p in projections),
+            tuple(group_rows),
+            tuple(getattr(config, field) for field in CONTEXT_CONFIG_FIELDS),
+        )
 
-    ### STACKING RULES ###
+        self.players = []
+        for player_projection in projections:
+            if player_projection.in_play:
+                try:
+                    self.players.append((player_projection, get_optimizer_player(player_projection, randomness=config.randomness, for_optimals=for_optimals)))
+                except:
+                    traceback.print_exc()
 
-    # Players vs DST
-    optimizer.restrict_positions_for_opposing_team([dst_label], ['QB', 'RB', 'WR', 'TE'], max_allowed=config.num_players_vs_dst)
+        self.locked_player_ids = [p.slate_player.player_id for p in projections if p.locked]
 
-    # RB/DST Stack
-    if not config.allow_dst_rb_stack:
-        optimizer.restrict_positions_for_same_team((dst_label, 'RB'))
+        self.groups = []
+        group_player_ids = {}
+        for group_id, min_from_group, max_from_group, player_id in group_rows:
+            if group_id not in group_player_ids:
+                group_player_ids[group_id] = []
+                self.groups.append((min_from_group, max_from_group, group_player_ids[group_id]))
+            if player_id is not None:
+                group_player_ids[group_id].append(player_id)
 
-    # Game Stack -- Lock players for incoming stack
-    for p in stack.players:  
-        player = optimizer.get_player_by_id(p.slate_player.player_id)
+        self.optimizers = {}
 
-        if player is not None:
+    def get_optimizer(self, settings):
+        optimizer = self.optimizers.get(settings)
+        if optimizer is not None:
+            return optimizer
+
+        optimizer = create_optimizer(settings)
+        optimizer.load_players([player for _, player in self.players])
+        dst_label = get_dst_label(self.site)
+
+        # Salary
+        if self.config.min_salary > 0:
+            optimizer.set_min_salary_cap(self.config.min_salary)
+
+        # Uniques
+        if not self.for_optimals:
+            optimizer.set_max_repeating_players(9 - self.config.uniques)
+
+        # Players vs DST
+        optimizer.restrict_positions_for_opposing_team([dst_label], ['QB', 'RB', 'WR', 'TE'], max_allowed=self.config.num_players_vs_dst)
+
+        # RB/DST Stack
+        if not self.config.allow_dst_rb_stack:
+            optimizer.restrict_positions_for_same_team((dst_label, 'RB'))
+
+        self.optimizers[settings] = optimizer
+        return optimizer
+
+    def get_stack_players(self, stack):
+        game_qb = stack.qb.slate_player
+        stack_slate_player_ids = get_stack_slate_player_ids(stack)
+
+        players = []
+        for player_projection, player in self.players:
             try:
-                optimizer.add_player_to_lineup(player)
-            except exceptions.LineupOptimizerException as e:
-                logger.info(e)
+                if is_player_in_stack_pool(
+                    player_projection,
+                    game_qb,
+                    stack_slate_player_ids,
+                    use_stack_only=True,
+                    allow_qb_dst_stack=self.config.allow_qb_dst_from_same_team,
+                    allow_rb_qb_stack=self.config.allow_rb_qb_from_same_team,
+                    allow_opp_rb_qb_stack=self.config.allow_rb_qb_from_opp_team
+                ):
+                    players.append(player)
+            except:
+                traceback.print_exc()
+        return players
+
+    def optimize(self, stack, num_lineups):
+        optimizer = self.get_optimizer(get_optimizer_settings(self.site, stack, self.config))
+        players_list = self.get_stack_players(stack)
+        optimizer.load_players(players_list)
+        logger.info('  Loaded {} players.'.format(len(players_list)))
+
+        locked = []
+        num_stacks = len(optimizer.stacks)
+        lineups = []
 
-    # RBs from Same Game
-    if not config.allow_rbs_from_same_game:
-        same_game_rb_groups = get_same_game_rb_groups(players_list)
-        optimizer.add_stack(Stack(same_game_rb_groups))
+        try:
+            # Locked Players
+            for player_id in self.locked_player_ids:
+                player = optimizer.get_player_by_id(player_id)
+
+                if player is not None:
+                    optimizer.add_player_to_lineup(player)
+                    locked.append(player)
+
+            # Groups
+            for min_from_group, max_from_group, player_ids in self.groups:
+                group_player_list = []
+                for player_id in player_ids:
+                    p = optimizer.get_player_by_id(player_id)
+
+                    if p is not None:
+                        group_player_list.append(p)
+
+                if len(group_player_list) > 0:
+                    opto_group = PlayersGroup(
+                        group_player_list,
+                        min_from_group=min_from_group,
+                        max_from_group=max_from_group
+                    )
+                    optimizer.add_players_group(opto_group)
+
+            # Limit Flex Position
+            d = {}
+            for p in self.flex_positions:
+                d[p] = 1
+            if len(d) == 1 and get_num_tes_in_list(stack.players) < 2:  # allow TE in flex when game stack has 2 TEs
+                optimizer.set_players_with_same_position(d)
+
+            # Game Stack -- Lock players for incoming stack
+            for p in stack.players:
+                player = optimizer.get_player_by_id(p.slate_player.player_id)
+
+                if player is not None:
+                    try:
+                        optimizer.add_player_to_lineup(player)
+                        locked.append(player)
+                    except exceptions.LineupOptimizerException as e:
+                        logger.info(e)
+
+            # RBs from Same Game
+            if not self.config.allow_rbs_from_same_game:
+                same_game_rb_groups = get_same_game_rb_groups(players_list)
+                optimizer.add_stack(Stack(same_game_rb_groups))
 
-    # optimizer.force_positions_for_opposing_team(('RB', 'WR'), ('RB', 'TE'), ('WR', 'WR'), ('WR', 'TE'))
+            try:
+                for lineup in optimizer.optimize(n=num_lineups, randomness=not self.for_optimals):
+                    lineups.append(lineup)
+            except exceptions.LineupOptimizerException:
+                logger.info('Cannot generate more lineups for: {}'.format(stack.qb.name))
+        finally:
+            for player in reversed(locked):
+                optimizer.remove_player_from_lineup(player)
+            del optimizer.stacks[num_stacks:]
+            optimizer.set_players_with_same_position({})
+
+        logger.info('created {} lineups'.format(len(lineups)))
 
-    try:
-        optimized_lineups = optimizer.optimize(
-            n=num_lineups,
-            randomness=not for_optimals, 
-        )
-        count = 0
-        for lineup in optimized_lineups:
-            lineups.append(lineup)
-            count += 1
-    except exceptions.LineupOptimizerException:
-        logger.info('Cannot generate more lineups for: {}'.format(stack.qb.name))
+        return lineups
 
-    logger.info('created {} lineups'.format(len(lineups)))
 
-    return lineups
+def get_stack_optimizer_context(site, build_id, projections, config, groups, for_optimals=False):
+    '''
+    Returns the build's optimizer context, reusing the one cached by this worker while
+    the build's projections, groups and configuration are unchanged. Only the
+    MAX_OPTIMIZER_CONTEXTS most recently used contexts are kept.
+    '''
+    key = (site, build_id, for_optimals)
+    context = _contexts.pop(key, None)
+    if context is None or context.signature != get_context_signature(projections, groups, config):
+        # a stale context is released before its replacement is built
+        context = None
+        if len(_contexts) >= MAX_OPTIMIZER_CONTEXTS:
+            _contexts.pop(next(iter(_contexts)))
+        context = StackOptimizerContext(site, projections, config, groups, for_optimals)
+
+    _contexts[key] = context
+    return context
+
+
+def optimize_for_stack(site, stack, projections, slate_teams, config, num_lineups, groups=[], for_optimals=False):
+    context = get_stack_optimizer_context(site, stack.build_id, projections, config, groups, for_optimals)
+    return context.optimize(stack, num_lineups)
+
+
+def get_stack_slate_player_ids(stack):
+    return set(p.slate_player_id for p in [stack.qb, stack.player_1, stack.player_2, stack.opp_player] if p is not None)
+
+
+def is_player_in_stack_pool(player_projection, game_qb, stack_slate_player_ids, use_stack_only=True, allow_rb_qb_stack=False, allow_qb_dst_stack=False, allow_opp_rb_qb_stack=False):
+    '''
+    Returns true if an in-play player can be in lineups built around a game stack with
+    game_qb, given the slate player ids of the stack
+    '''
+    in_stack = player_projection.slate_player_id in stack_slate_player_ids
+
+    # If player is stack-only and not in the same game as qb, not a valid player
+    if use_stack_only and player_projection.stack_only and player_projection.slate_player.slate_game_id != game_qb.slate_game_id:
+        return False
+    elif not allow_qb_dst_stack and (player_projection.position == 'DST' or player_projection.position == 'D' or player_projection.position == 'DEF') and player_projection.team == game_qb.team and not in_stack:
+        return False
+    elif not allow_rb_qb_stack and player_projection.position == 'RB' and player_projection.team == game_qb.team and not in_stack:
+        return False
+    elif not allow_opp_rb_qb_stack and player_projection.position == 'RB' and player_projection.team == get_slate_player_opponent(game_qb) and not in_stack:
+        return False
+    elif player_projection.position == 'QB' and player_projection.slate_player != game_qb:
+        return False
+    return True
+
+
+def get_optimizer_player(player_projection, randomness=0.75, for_optimals=False):
+    '''
+    Returns the optimizer Player for a build projection
+    '''
+    if ' ' in player_projection.name:
+        first, last = player_projection.name.split(' ', 1)
+    else:
+        first = player_projection.name
+        last = ''
+
+    slate_game = player_projection.slate_player.get_slate_game().game
+    game_info = GameInfo(
+        home_team=slate_game.home_team, 
+        away_team=slate_game.away_team,
+        starts_at=slate_game.game_date,
+        game_started=False
+    )
+
+    player_position = player_projection.position
+    if player_projection.position == 'DST' and player_projection.slate_player.slate.site == 'fanduel':
+        player_position = ['D']
+    elif player_projection.position == 'DST' and player_projection.slate_player.slate.site == 'yahoo':
+        player_position = ['DEF']
+    elif '/' in player_projection.position:
+        player_position = player_projection.position.split('/')
+    else:
+        player_position = [player_projection.position]
+
+    return Player(
+        player_projection.slate_player.player_id,
+        first,
+        'DST' if player_projection.position == 'DST' else last,
+        player_position,
+        player_projection.team,
+        player_projection.salary,
+        float(player_projection.balanced_projection) if not for_optimals else float(player_projection.slate_player.fantasy_points),
+        game_info=game_info,
+        min_deviation=-float(randomness) if not for_optimals else None,
+        max_deviation=float(randomness) if not for_optimals else None,
+        max_exposure=float(player_projection.max_exposure / 100) if not for_optimals else None,
+        min_exposure=float(player_projection.min_exposure / 100) if not for_optimals else None,
+    )
 
 
 def get_player_list_for_game_stack(projections, game_qb, stack, randomness=0.75, use_stack_only=True, allow_rb_qb_stack=False, allow_qb_dst_stack=False, allow_opp_rb_qb_stack=False, max_dst_exposure=1.0, for_optimals=False):
@@ -707,75 +937,22 @@ def get_player_list_for_game_stack(projections, game_qb, stack, randomness=0.75,
     Returns the player list on which to optimize based on a game stack with game_qb
     '''
     player_list = []
+    stack_slate_player_ids = get_stack_slate_player_ids(stack)
 
     for player_projection in projections:
         # Add players to pool based on config rules
-        valid_player = True
         try:
             # If player is in-play
-            if player_projection.in_play:
-                stack_player_ids = [
-                    stack.qb.slate_player.player_id,
-                    stack.player_1.slate_player.player_id
-                ]
-                if stack.player_2 is not None:
-                    stack_player_ids.append(stack.player_2.slate_player.player_id)
-                if stack.opp_player is not None:
-                    stack_player_ids.append(stack.opp_player.slate_player.player_id)
-                    
-                # If player is stack-only and not in the same game as qb, not a valid player
-                if use_stack_only and player_projection.stack_only and player_projection.slate_player.slate_game != game_qb.slate_game:
-                    valid_player = False
-                elif not allow_qb_dst_stack and (player_projection.position == 'DST' or player_projection.position == 'D' or player_projection.position == 'DEF') and player_projection.team == game_qb.team and not stack.contains_slate_player(player_projection.slate_player):
-                    valid_player = False
-                elif not allow_rb_qb_stack and player_projection.position == 'RB' and player_projection.team == game_qb.team and not stack.contains_slate_player(player_projection.slate_player):
-                    valid_player = False
-                elif not allow_opp_rb_qb_stack and player_projection.position == 'RB' and player_projection.team == get_slate_player_opponent(game_qb) and not stack.contains_slate_player(player_projection.slate_player):
-                    valid_player = False
-                elif player_projection.position == 'QB' and player_projection.slate_player != game_qb:
-                    valid_player = False
-                
-                if valid_player:
-                    if ' ' in player_projection.name:
-                        first, last = player_projection.name.split(' ', 1)
-                    else:
-                        first = player_projection.name
-                        last = ''
-
-                    slate_game = player_projection.slate_player.get_slate_game().game
-                    game_info = GameInfo(
-                        home_team=slate_game.home_team, 
-                        away_team=slate_game.away_team,
-                        starts_at=slate_game.game_date,
-                        game_started=False
-                    )
-
-                    player_position = player_projection.position
-                    if player_projection.position == 'DST' and player_projection.slate_player.slate.site == 'fanduel':
-                        player_position = ['D']
-                    elif player_projection.position == 'DST' and player_projection.slate_player.slate.site == 'yahoo':
-                        player_position = ['DEF']
-                    elif '/' in player_projection.position:
-                        player_position = player_projection.position.split('/')
-                    else:
-                        player_position = [player_projection.position]
-
-                    player = Player(
-                        player_projection.slate_player.player_id,
-                        first,
-                        'DST' if player_projection.position == 'DST' else last,
-                        player_position,
-                        player_projection.team,
-                        player_projection.salary,
-                        float(player_projection.balanced_projection) if not for_optimals else float(player_projection.slate_player.fantasy_points),
-                        game_info=game_info,
-                        min_deviation=-float(randomness) if not for_optimals else None,
-                        max_deviation=float(randomness) if not for_optimals else None,
-                        max_exposure=float(player_projection.max_exposure / 100) if not for_optimals else None,
-                        min_exposure=float(player_projection.min_exposure / 100) if not for_optimals else None,
-                    )
-
-                    player_list.append(player)
+            if player_projection.in_play and is_player_in_stack_pool(
+                player_projection,
+                game_qb,
+                stack_slate_player_ids,
+                use_stack_only=use_stack_only,
+                allow_rb_qb_stack=allow_rb_qb_stack,
+                allow_qb_dst_stack=allow_qb_dst_stack,
+                allow_opp_rb_qb_stack=allow_opp_rb_qb_stack
+            ):
+                player_list.append(get_optimizer_player(player_projection, randomness=randomness, for_optimals=for_optimals))
         except:
             traceback.print_exc()
     return player_list  
@@ -0,0 +1,93 @@
+import math
+
+from django.db import transaction
+
+from . import models
+
+# Roster positions a projection row is matched to on classic slates, and the captain
+# positions that receive a scaled copy of it on showdown slates
+PLAYER_POSITIONS = ['QB', 'RB', 'WR', 'TE', 'DST', 'D', 'DEF', 'FLEX', 'UTIL']
+CAPTAIN_POSITIONS = ['CPT', 'MVP']
+CAPTAIN_MULTIPLIER = 1.5
+
+# Team abbreviations used by projection sources that differ from the sites'
+TEAM_ABBREVIATIONS = {
+    'JAX': 'JAC',
+    'LA': 'LAR',
+}
+
+# Raw projections written per insert statement
+BATCH_SIZE = 500
+
+
+def get_team(team):
+    return TEAM_ABBREVIATIONS.get(team, team.strip())
+
+
+def find_aliases(player_names, site):
+    '''
+    Resolves player names to Alias objects (or None) in one batch, looking each distinct
+    name up once.
+    '''
+    names = list(dict.fromkeys(player_names))
+    aliases = dict(zip(names, models.Alias.find_aliases(names, site)))
+    return [aliases.get(player_name) for player_name in player_names]
+
+
+def get_slate_players(slate, roster_positions=None):
+    '''
+    Returns a map of (name, team) -> list of slate players for a slate, loaded with a
+    single query, optionally limited to some roster positions.
+    '''
+    slate_players = models.SlatePlayer.objects.filter(slate=slate)
+    if roster_positions is not None:
+        slate_players = slate_players.filter(roster_position__in=roster_positions)
+
+    players = {}
+    for slate_player in slate_players:
+        players.setdefault((slate_player.name, slate_player.team), []).append(slate_player)
+    return players
+
+
+def match_slate_player(players, alias, site, team):
+    '''
+    Returns the one slate player of players an alias and team point to, or None. A match
+    that is not unique is logged by the caller's row handling like a failed lookup.
+    '''
+    matches = players.get((alias.get_alias(site), team), [])
+    if len(matches) > 1:
+        raise models.SlatePlayer.MultipleObjectsReturned(f'{len(matches)} slate players named {alias.get_alias(site)} on {team}')
+    return matches[0] if len(matches) == 1 else None
+
+
+def get_invalid_field(projection):
+    '''
+    Returns the name of the first decimal field of a raw projection whose value would not
+    fit its column, so the row can be reported on its own rather than failing the bulk
+    insert.
+    '''
+    for field in models.SlatePlayerRawProjection._meta.concrete_fields:
+        if field.get_internal_type() != 'DecimalField':
+            continue
+
+        value = getattr(projection, field.attname)
+        if value is None:
+            continue
+
+        value = float(value)
+        if math.isnan(value) or abs(round(value, field.decimal_places)) >= 10 ** (field.max_digits - field.decimal_places):
+            return field.name
+    return None
+
+
+def replace_raw_projections(slate, projection_site, raw_projections):
+    '''
+    Replaces a projection source's raw projections for a slate with raw_projections in one
+    transaction: the previous projections are deleted and the new ones bulk inserted.
+    '''
+    with transaction.atomic():
+        models.SlatePlayerRawProjection.objects.filter(
+            projection_site=projection_site,
+            slate_player__slate=slate
+        ).delete()
+        models.SlatePlayerRawProjection.objects.bulk_create(raw_projections, batch_size=BATCH_SIZE)
@@ -0,0 +1,101 @@
+import numpy
+
+# Sim outcomes are stored as little-endian float32 bytes (bytea) in place of the legacy
+# sim_scores ArrayFields, which are only read for rows saved before sim_outcomes existed.
+# Reading them back is a single buffer view instead of parsing thousands of Decimals per row.
+OUTCOME_DTYPE = numpy.dtype('<f4')
+
+
+def encode_outcomes(scores):
+    '''
+    Returns scores packed as float32 bytes, or None if there are no scores.
+    '''
+    if scores is None:
+        return None
+    return numpy.asarray(scores, dtype=OUTCOME_DTYPE).tobytes()
+
+
+def decode_outcomes(data):
+    '''
+    Returns a read-only float32 view over stored outcome bytes without copying them.
+    '''
+    if data is None:
+        return None
+    return numpy.frombuffer(data, dtype=OUTCOME_DTYPE)
+
+
+def set_sim_outcomes(obj, scores):
+    '''
+    Sets the packed sim_outcomes on a model instance and clears its legacy sim_scores.
+    Does not save.
+    '''
+    obj.sim_scores = None
+    obj.sim_outcomes = encode_outcomes(scores)
+
+
+def get_sim_outcomes(obj):
+    '''
+    Returns the sim outcomes of a model instance as a float32 array, falling back to
+    sim_scores for rows saved before sim_outcomes existed.
+    '''
+    if obj.sim_outcomes is not None:
+        return decode_outcomes(obj.sim_outcomes)
+    if obj.sim_scores is not None:
+        return numpy.array(obj.sim_scores, dtype=OUTCOME_DTYPE)
+    return None
+
+
+def load_outcome_matrix(queryset, prefix='', id_field='id'):
+    '''
+    Loads the sim outcomes of every row in queryset with one query.
+
+    prefix is the lookup path to the model that holds the outcomes, e.g. 'slate_lineup__'
+    to read a lineup's outcomes through FieldLineupToBeat. Returns a tuple of (ids, matrix)
+    where matrix is a (rows x iterations) float32 array in the same order as ids. Rows without
+    outcomes are skipped; rows saved before sim_outcomes existed are read from sim_scores.
+    '''
+    rows = list(queryset.values_list(id_field, f'{prefix}sim_outcomes'))
+
+    missing = [row_id for row_id, data in rows if data is None]
+    legacy = {}
+    if len(missing) > 0:
+        legacy = dict(
+            queryset.filter(
+                **{f'{id_field}__in': missing}
+            ).exclude(
+                **{f'{prefix}sim_scores': None}
+            ).values_list(id_field, f'{prefix}sim_scores')
+        )
+
+    ids = []
+    vectors = []
+    for row_id, data in rows:
+        if data is not None:
+            vectors.append(decode_outcomes(data))
+        elif row_id in legacy:
+            vectors.append(numpy.array(legacy[row_id], dtype=OUTCOME_DTYPE))
+        else:
+            continue
+        ids.append(row_id)
+
+    if len(vectors) == 0:
+        return ids, numpy.empty((0, 0), dtype=OUTCOME_DTYPE)
+
+    width = max(len(v) for v in vectors)
+    if all(len(v) == width for v in vectors):
+        matrix = numpy.stack(vectors)
+    else:
+        # legacy rows may have been simulated with a different iteration count
+        matrix = numpy.full((len(vectors), width), numpy.nan, dtype=OUTCOME_DTYPE)
+        for index, v in enumerate(vectors):
+            matrix[index, :len(v)] = v
+
+    return ids, matrix
+
+
+def load_outcome_dict(queryset, key_field='id', prefix=''):
+    '''
+    Returns {key: float32 outcome vector} for every row in queryset with outcomes.
+    '''
+    keys, matrix = load_outcome_matrix(queryset, prefix=prefix, id_field=key_field)
+    return dict(zip(keys, matrix))
@@ -0,0 +1,255 @@
+import hashlib
+import logging
+import numpy
+import pandas
+import scipy.stats
+
+from . import models, sim_store, utils
+
+logger = logging.getLogger(__name__)
+
+# Roster slots simulated for each team in a game, in the same order as the
+# columns of the correlation matrices (qb, rb1..rb3, wr1..wr5, te1, te2, k, dst).
+# Each entry is (position, number of slots, number of slots that must be filled).
+GAME_SIM_SLOTS = (
+    ('QB', 1, 1),
+    ('RB', 3, 1),
+    ('WR', 5, 2),
+    ('TE', 2, 1),
+    ('K', 1, 0),
+    ('DST', 1, 1),
+)
+
+SIM_PERCENTILES = [50, 20, 75, 90]
+CAPTAIN_MULTIPLIER = 1.5
+
+# Eigenvalues below -CORR_EIGEN_TOLERANCE mean a correlation matrix needs repairing
+CORR_EIGEN_TOLERANCE = 1e-10
+
+# Games whose copula samples are drawn together, to bound memory
+COPULA_BATCH_GAMES = 8
+
+# Copula factors kept per worker; the static matrices always fit
+MAX_COPULA_FACTORS = 64
+
+# path -> static correlation matrix and matrix digest -> copula factor, kept for the life of the worker
+_static_corr_matrices = {}
+_copula_factors = {}
+
+
+def get_dst_label(site):
+    if site == 'fanduel':
+        return 'D'
+    elif site == 'yahoo':
+        return 'DEF'
+    return 'DST'
+
+
+def get_game_sim_slots(game, captains=False):
+    '''
+    Returns the projections used to simulate a game as a list of slots, home team first,
+    ordered like the correlation matrix. Slots without a qualifying player are None.
+
+    Players are loaded with a single query and grouped by team and position in memory.
+    '''
+    dst_label = get_dst_label(game.slate.site)
+    cpt_positions = ['CPT', 'MVP']
+
+    projections = models.SlatePlayerProjection.objects.filter(
+        slate_player__slate=game.slate,
+        slate_player__team__in=[game.game.home_team, game.game.away_team]
+    ).exclude(
+        projection__lte=0.0
+    ).exclude(
+        stdev__lte=0.0
+    ).select_related(
+        'slate_player'
+    ).order_by('-projection', '-slate_player__salary')
+
+    if captains:
+        projections = projections.filter(slate_player__roster_position__in=cpt_positions)
+    else:
+        projections = projections.exclude(slate_player__roster_position__in=cpt_positions)
+
+    by_team_and_position = {}
+    for projection in projections:
+        key = (projection.slate_player.team, projection.slate_player.site_pos)
+        by_team_and_position.setdefault(key, []).append(projection)
+
+    slots = []
+    for team in [game.game.home_team, game.game.away_team]:
+        for position, num_slots, num_required in GAME_SIM_SLOTS:
+            site_pos = dst_label if position == 'DST' else position
+            players = by_team_and_position.get((team, site_pos), [])
+
+            if not captains and len(players) < num_required:
+                raise Exception(f'{team} needs at least {num_required} {site_pos} with a projection to simulate {game}')
+
+            for index in range(num_slots):
+                slots.append(players[index] if index < len(players) else None)
+
+    return slots
+
+
+def simulate_marginals(projections, rand_U):
+    '''
+    Maps copula samples through each player's gamma marginal in one matrix operation.
+
+    rand_U is an (iterations x n) matrix of uniforms whose first len(projections) columns
+    are used in order. Returns a (players x iterations) matrix of scores rounded to 2 places.
+    '''
+    mean = numpy.array([float(p.projection) for p in projections])
+    stdev = numpy.array([float(p.stdev) for p in projections])
+
+    scores = scipy.stats.gamma.ppf(
+        rand_U[:, :len(projections)],
+        (mean / stdev) ** 2,
+        scale=(stdev ** 2) / mean
+    )
+
+    return numpy.round(scores.T, 2)
+
+
+def assign_sim_scores(projections, scores):
+    '''
+    Sets sim_scores, median, s20, s75 and s90 on each projection from the matching row of
+    scores, computing all percentiles with one axis-wise call, then saves them in one bulk update.
+    '''
+    if len(projections) == 0:
+        return
+
+    median, s20, s75, s90 = numpy.percentile(scores, SIM_PERCENTILES, axis=1)
+
+    for index, projection in enumerate(projections):
+        sim_store.set_sim_outcomes(projection, scores[index])
+        projection.median = median[index]
+        projection.s20 = s20[index]
+        projection.s75 = s75[index]
+        projection.s90 = s90[index]
+
+    models.SlatePlayerProjection.objects.bulk_update(
+        projections,
+        ['sim_scores', 'sim_outcomes', 'median', 's20', 's75', 's90']
+    )
+
+
+def simulate_game_outcomes(game, rand_U):
+    '''
+    Simulates every player in a game from a matrix of correlated uniforms and saves the
+    outcomes. Captains (CPT/MVP) receive their FLEX twin's outcomes times the captain multiplier.
+
+    Returns the (players x iterations) score matrix for the FLEX players.
+    '''
+    slots = get_game_sim_slots(game)
+    filled = [index for index, projection in enumerate(slots) if projection is not None]
+    projections = [slots[index] for index in filled]
+
+    scores = simulate_marginals(projections, rand_U)
+    assign_sim_scores(projections, scores)
+
+    row_for_slot = {slot: row for row, slot in enumerate(filled)}
+    captains = []
+    captain_rows = []
+    for index, captain in enumerate(get_game_sim_slots(game, captains=True)):
+        if captain is not None and index in row_for_slot:
+            captains.append(captain)
+            captain_rows.append(row_for_slot[index])
+
+    assign_sim_scores(captains, scores[captain_rows] * CAPTAIN_MULTIPLIER)
+
+    return scores
+
+
+def get_static_corr_file(site, is_sd=False):
+    if site == 'draftkings':
+        return 'data/dk_r_sd.csv' if is_sd else 'data/dk_r.csv'
+    return 'data/r.csv'
+
+
+def repair_corr_matrix(A):
+    '''
+    Returns A as a valid correlation matrix: symmetric with a unit diagonal, replaced by its
+    nearest correlation matrix when it is not positive semi-definite.
+    '''
+    A = numpy.array(A, dtype=numpy.float64)
+    A = (A + A.T) / 2
+    numpy.fill_diagonal(A, 1.0)
+
+    if numpy.linalg.eigvalsh(A).min() < -CORR_EIGEN_TOLERANCE:
+        logger.warning('Correlation matrix is not positive semi-definite. Using the nearest correlation matrix.')
+        A = utils.nearcorr(A)
+    return A
+
+
+def get_static_corr_matrix(site, is_sd=False):
+    '''
+    Returns the static correlation matrix of a site as a DataFrame, read from disk and
+    repaired once per worker.
+    '''
+    path = get_static_corr_file(site, is_sd)
+    df = _static_corr_matrices.get(path)
+
+    if df is None:
+        df = pandas.read_csv(path, index_col=0)
+        df = pandas.DataFrame(repair_corr_matrix(df.to_numpy()), index=df.index, columns=df.columns)
+        _static_corr_matrices[path] = df
+
+    return df.copy()
+
+
+def get_copula_factor(corr):
+    '''
+    Returns a factor L with L @ L.T == corr: the Cholesky factor, or the eigen factor when
+    corr is only semi-definite. Factors are cached by the matrix contents.
+    '''
+    corr = numpy.ascontiguousarray(corr, dtype=numpy.float64)
+    key = (corr.shape, hashlib.sha1(corr.tobytes()).hexdigest())
+
+    factor = _copula_factors.get(key)
+    if factor is None:
+        try:
+            factor = numpy.linalg.cholesky(corr)
+        except numpy.linalg.LinAlgError:
+            eigenvalues, eigenvectors = numpy.linalg.eigh(corr)
+            factor = eigenvectors * numpy.sqrt(numpy.clip(eigenvalues, 0, None))
+
+        if len(_copula_factors) >= MAX_COPULA_FACTORS:
+            _copula_factors.pop(next(iter(_copula_factors)))
+        _copula_factors[key] = factor
+
+    return factor
+
+
+def get_game_rng(game_id, seed=None):
+    '''
+    Returns the random generator of a game. With a seed, every game has its own reproducible
+    stream no matter which games it is sampled with.
+    '''
+    if seed is None:
+        return numpy.random.default_rng()
+    return numpy.random.default_rng([seed, game_id])
+
+
+def sample_game_copulas(game_ids, corrs, num_iterations, seed=None):
+    '''
+    Draws Gaussian copula samples for many games. Games sharing a correlation matrix share
+    its cached factor and are transformed in batches of COPULA_BATCH_GAMES.
+
+    Yields (position, rand_U) with an (iterations x n) matrix of correlated uniforms for
+    each game, in batch order.
+    '''
+    groups = {}
+    for position, corr in enumerate(corrs):
+        factor = get_copula_factor(corr)
+        groups.setdefault(id(factor), (factor, []))[1].append(position)
+
+    for factor, positions in groups.values():
+        for start in range(0, len(positions), COPULA_BATCH_GAMES):
+            batch = positions[start:start + COPULA_BATCH_GAMES]
+            rand_N = numpy.stack([
+                get_game_rng(game_ids[position], seed).standard_normal((num_iterations, factor.shape[0])) for position in batch
+            ])
+            rand_U = scipy.stats.norm.cdf(rand_N @ factor.T)
+
+            for offset, position in enumerate(batch):
+                yield position, rand_U[offset]
@@ -0,0 +1,217 @@
+import numpy
+
+from . import models, stack_rules
+
+# Positions of the players paired into mini stacks from the other games of the slate
+MINI_STACK_POSITIONS = ['RB', 'WR', 'TE']
+
+# Stacks written per insert statement
+BATCH_SIZE = 1000
+
+
+def sort_rows(features, rows, by_position=False):
+    '''
+    Orders player rows best projection first (then by position), ties in id order.
+    '''
+    keys = [features.ids[rows], -features.projection[rows]]
+    if by_position:
+        keys.insert(1, features.position[rows].astype(str))
+    return rows[numpy.lexsort(keys)]
+
+
+def get_stack_players(features, qb_row, configuration):
+    '''
+    Returns the rows of the QB's teammates and of the opposing players that can be stacked
+    with the QB, each best projection first.
+    '''
+    team = features.team[qb_row]
+    opponent = features.opponents.get(team)
+
+    team_rows = numpy.flatnonzero(
+        features.qb_stack_only &
+        (features.team == team) &
+        numpy.isin(features.position, configuration.qb_stack_positions)
+    )
+    opp_rows = numpy.flatnonzero(
+        features.opp_qb_stack_only &
+        (features.team == opponent) &
+        (features.team != team) &
+        (features.slate_game_id == features.slate_game_id[qb_row]) &
+        numpy.isin(features.position, configuration.opp_qb_stack_positions)
+    )
+
+    return sort_rows(features, team_rows), sort_rows(features, opp_rows)
+
+
+def get_mini_stacks(features, qb_game_id):
+    '''
+    Returns the mini stacks of every other game of the slate as arrays of player rows and
+    slate game ids: ordered pairs of home players, ordered pairs of away players, then
+    every home and away player pair.
+    '''
+    mini_rows = numpy.flatnonzero(features.in_play & numpy.isin(features.position, MINI_STACK_POSITIONS))
+
+    player_1 = []
+    player_2 = []
+    game_ids = []
+    for slate_game_id, home_team, away_team in features.games:
+        if slate_game_id == qb_game_id:
+            continue
+
+        home = sort_rows(features, mini_rows[features.team[mini_rows] == home_team], by_position=True)
+        away = sort_rows(features, mini_rows[features.team[mini_rows] == away_team], by_position=True)
+
+        for first, second in [(home, home), (away, away), (home, away)]:
+            first_index, second_index = numpy.meshgrid(numpy.arange(len(first)), numpy.arange(len(second)), indexing='ij')
+            pairs = numpy.stack([first[first_index.ravel()], second[second_index.ravel()]])
+            if first is second:
+                pairs = pairs[:, pairs[0] != pairs[1]]
+
+            player_1.append(pairs[0])
+            player_2.append(pairs[1])
+            game_ids.append(numpy.full(pairs.shape[1], slate_game_id, dtype=numpy.int64))
+
+    if len(player_1) == 0:
+        empty = numpy.zeros(0, dtype=numpy.int64)
+        return empty, empty, empty
+    return numpy.concatenate(player_1), numpy.concatenate(player_2), numpy.concatenate(game_ids)
+
+
+def get_candidate_stacks(features, qb_row, configuration):
+    '''
+    Enumerates every stack of a QB as arrays of player rows (-1 for empty slots), with the
+    build order of each, in the order they have always been numbered.
+
+    Three man stacks pair each teammate with each opposing player, then with each
+    teammate projected below them, optionally crossed with every mini stack. Four man
+    stacks pair two teammates with an opposing player, never with three TEs, and only
+    pivot on stack-only players when every teammate is stack-only.
+    '''
+    team_rows, opp_rows = get_stack_players(features, qb_row, configuration)
+    empty = numpy.zeros(0, dtype=numpy.int64)
+
+    if configuration.game_stack_size == 3 or len(opp_rows) == 0:
+        player_1 = []
+        player_2 = []
+        opp_player = []
+        for index, row in enumerate(team_rows):
+            teammates = team_rows[index + 1:]
+            player_1.append(numpy.full(len(opp_rows) + len(teammates), row, dtype=numpy.int64))
+            player_2.append(numpy.concatenate([numpy.full(len(opp_rows), -1, dtype=numpy.int64), teammates]))
+            opp_player.append(numpy.concatenate([opp_rows, numpy.full(len(teammates), -1, dtype=numpy.int64)]))
+
+        player_1 = numpy.concatenate(player_1) if len(player_1) > 0 else empty
+        player_2 = numpy.concatenate(player_2) if len(player_2) > 0 else empty
+        opp_player = numpy.concatenate(opp_player) if len(opp_player) > 0 else empty
+        build_order = numpy.arange(1, len(player_1) + 1)
+
+        mini_player_1 = numpy.full(len(player_1), -1, dtype=numpy.int64)
+        mini_player_2 = numpy.full(len(player_1), -1, dtype=numpy.int64)
+        mini_game = numpy.full(len(player_1), -1, dtype=numpy.int64)
+
+        if configuration.use_super_stacks:
+            minis = get_mini_stacks(features, features.slate_game_id[qb_row])
+            num_minis = len(minis[0])
+
+            player_1, player_2, opp_player, build_order = [numpy.repeat(a, num_minis) for a in [player_1, player_2, opp_player, build_order]]
+            mini_player_1, mini_player_2, mini_game = [numpy.tile(a, len(build_order) // max(num_minis, 1)) for a in minis]
+    elif configuration.game_stack_size == 4:
+        first_index, second_index = numpy.triu_indices(len(team_rows), 1)
+        is_pivot = numpy.full(len(team_rows), features.stack_only[team_rows].all()) | ~features.stack_only[team_rows]
+        keep = is_pivot[first_index]
+        first_index = first_index[keep]
+        second_index = second_index[keep]
+
+        player_1 = numpy.repeat(team_rows[first_index], len(opp_rows))
+        player_2 = numpy.repeat(team_rows[second_index], len(opp_rows))
+        opp_player = numpy.tile(opp_rows, len(first_index))
+
+        # You can't have stacks with 3 TEs
+        is_te = features.position == 'TE'
+        keep = ~(is_te[player_1] & is_te[player_2] & is_te[opp_player]) if len(opp_player) > 0 else numpy.zeros(0, dtype=bool)
+        player_1 = player_1[keep]
+        player_2 = player_2[keep]
+        opp_player = opp_player[keep]
+        build_order = numpy.arange(1, len(player_1) + 1)
+
+        mini_player_1 = numpy.full(len(player_1), -1, dtype=numpy.int64)
+        mini_player_2 = numpy.full(len(player_1), -1, dtype=numpy.int64)
+        mini_game = numpy.full(len(player_1), -1, dtype=numpy.int64)
+    else:
+        player_1 = player_2 = opp_player = mini_player_1 = mini_player_2 = mini_game = build_order = empty
+
+    return {
+        'qb': numpy.full(len(player_1), qb_row, dtype=numpy.int64),
+        'player_1': player_1,
+        'player_2': player_2,
+        'opp_player': opp_player,
+        'mini_player_1': mini_player_1,
+        'mini_player_2': mini_player_2,
+        'mini_game': mini_game,
+        'build_order': build_order,
+    }
+
+
+def get_stack_counts(projection, num_lineups):
+    '''
+    Allocates a QB's lineups to its stacks in proportion to their projections, at least
+    one lineup each.
+    '''
+    total = projection.sum()
+    if len(projection) == 0 or total <= 0:
+        return numpy.ones(len(projection), dtype=numpy.int64)
+    return numpy.round(numpy.maximum(projection / total * num_lineups, 1)).astype(numpy.int64)
+
+
+def create_stacks_for_qb(build, qb, num_lineups, features=None):
+    '''
+    Creates every stack of a QB that passes the build's stack construction rule with a
+    single bulk insert. Candidates are enumerated and scored from a snapshot of the
+    build's players, the rule is applied to all of them at once and the QB's lineups are
+    allocated to the survivors before they are written.
+    '''
+    if features is None:
+        features = stack_rules.PlayerFeatures(build)
+
+    qb_row = features.rows[qb.id]
+    stacks = get_candidate_stacks(features, qb_row, build.configuration)
+    slots = ['qb', 'player_1', 'player_2', 'opp_player', 'mini_player_1', 'mini_player_2']
+
+    salary = sum(features.get('salary', stacks[slot], 0) for slot in slots)
+    projection = numpy.round(sum(features.get('projection', stacks[slot]) for slot in slots), 2)
+    contains_top_pc = numpy.zeros(len(projection), dtype=bool)
+
+    if build.stack_construction is not None and len(projection) > 0:
+        rule = stack_rules.compile_rule(build.stack_construction)
+        passes = rule.evaluate(features, *[stacks[slot] for slot in slots], stack_projection=projection)
+        contains_top_pc = rule.contains_top_pass_catcher(features, stacks['player_1'], stacks['player_2'])
+
+        stacks = {key: value[passes] for key, value in stacks.items()}
+        salary = salary[passes]
+        projection = projection[passes]
+        contains_top_pc = contains_top_pc[passes]
+
+    counts = get_stack_counts(projection, num_lineups)
+
+    def get_id(slot, index):
+        row = stacks[slot][index]
+        return int(features.ids[row]) if row >= 0 else None
+
+    return models.SlateBuildStack.objects.bulk_create([
+        models.SlateBuildStack(
+            build=build,
+            game_id=int(features.slate_game_id[qb_row]) if features.slate_game_id[qb_row] >= 0 else None,
+            mini_game_id=int(stacks['mini_game'][index]) if stacks['mini_game'][index] >= 0 else None,
+            build_order=int(stacks['build_order'][index]),
+            qb=qb,
+            player_1_id=get_id('player_1', index),
+            player_2_id=get_id('player_2', index),
+            opp_player_id=get_id('opp_player', index),
+            mini_player_1_id=get_id('mini_player_1', index),
+            mini_player_2_id=get_id('mini_player_2', index),
+            contains_top_pc=bool(contains_top_pc[index]),
+            salary=int(salary[index]),
+            projection=float(projection[index]),
+            count=int(counts[index])
+        ) for index in range(len(projection))
+    ], batch_size=BATCH_SIZE)
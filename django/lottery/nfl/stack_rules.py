@@ -0,0 +1,246 @@
+import ast
+import numpy
+
+# Variables a stack construction rule's criteria can use
+RULE_VARIABLES = [
+    'stack_projection',
+    'stack_min_player_projection',
+    'stack_min_player_ownership',
+    'qb_team_total',
+    'qb_game_total',
+    'qb_game_zscore',
+    'qb_spread',
+    'mini_stack_game_total',
+    'mini_stack_game_zscore',
+    'qb_ownership',
+    'opposing_player_qb_ownership',
+    'mini_stack_min_player_projection',
+    'mini_stack_min_player_zscore',
+    'mini_stack_min_player_ownership',
+    'mini_stack_ownership',
+    'contains_top_pass_catcher',
+]
+
+PASS_CATCHER_POSITIONS = ['WR', 'TE']
+
+# Syntax allowed in criteria: arithmetic, comparisons, boolean logic and conditionals
+# over the rule variables and literals
+ALLOWED_NODES = tuple(getattr(ast, name) for name in [
+    'Expression', 'BoolOp', 'And', 'Or', 'UnaryOp', 'Not', 'USub', 'UAdd', 'BinOp',
+    'Add', 'Sub', 'Mult', 'Div', 'FloorDiv', 'Mod', 'Pow', 'Compare', 'Eq', 'NotEq',
+    'Lt', 'LtE', 'Gt', 'GtE', 'IfExp', 'Name', 'Load', 'Constant', 'Num', 'NameConstant',
+] if hasattr(ast, name))
+
+# (criteria, top pc margin) -> compiled rule, kept for the life of the worker
+_compiled_rules = {}
+
+
+class PlayerFeatures:
+    '''
+    A snapshot of every player of a build with the features rules are evaluated on, and
+    the slate's games, loaded with two queries. Players are addressed by row, and row -1
+    stands for an empty stack slot.
+    '''
+    def __init__(self, build):
+        rows = list(build.projections.all().order_by('id').values_list(
+            'id',
+            'projection',
+            'ownership_projection',
+            'slate_player__projection__zscore',
+            'slate_player__salary',
+            'slate_player__team',
+            'slate_player__site_pos',
+            'slate_player__slate_game_id',
+            'in_play',
+            'stack_only',
+            'qb_stack_only',
+            'opp_qb_stack_only',
+        ))
+
+        self.rows = {row[0]: index for index, row in enumerate(rows)}
+        self.ids = numpy.array([row[0] for row in rows], dtype=numpy.int64)
+        self.projection = numpy.array([float(row[1]) for row in rows])
+        self.ownership = numpy.array([float(row[2]) for row in rows])
+        self.zscore = numpy.array([float(row[3]) if row[3] is not None else numpy.nan for row in rows])
+        self.salary = numpy.array([row[4] for row in rows], dtype=numpy.int64)
+        self.team = numpy.array([row[5] for row in rows], dtype=object)
+        self.position = numpy.array([row[6] for row in rows], dtype=object)
+        self.slate_game_id = numpy.array([row[7] if row[7] is not None else -1 for row in rows], dtype=numpy.int64)
+        self.in_play = numpy.array([row[8] for row in rows], dtype=bool)
+        self.stack_only = numpy.array([row[9] for row in rows], dtype=bool)
+        self.qb_stack_only = numpy.array([row[10] for row in rows], dtype=bool)
+        self.opp_qb_stack_only = numpy.array([row[11] for row in rows], dtype=bool)
+
+        # game lines, by the slate game each player is linked to and by the game of each team
+        games = {}
+        team_games = {}
+        self.games = []
+        self.opponents = {}
+        for slate_game_id, zscore, home_team, away_team, game_total, home_spread, away_spread, home_implied, away_implied in build.slate.games.all().order_by('id').values_list(
+            'id', 'zscore', 'game__home_team', 'game__away_team', 'game__game_total', 'game__home_spread', 'game__away_spread', 'game__home_implied', 'game__away_implied'
+        ):
+            games[slate_game_id] = (float(game_total), float(zscore))
+            team_games.setdefault(home_team, (float(home_implied), float(home_spread)))
+            team_games.setdefault(away_team, (float(away_implied), float(away_spread)))
+            self.games.append((slate_game_id, home_team, away_team))
+            self.opponents.setdefault(home_team, away_team)
+            self.opponents.setdefault(away_team, home_team)
+
+        self.game_total = numpy.array([games.get(row[7], (0.0, 0.0))[0] for row in rows])
+        self.game_zscore = numpy.array([games.get(row[7], (0.0, 0.0))[1] for row in rows])
+        self.team_total = numpy.array([team_games.get(row[5], (0.0, 0.0))[0] for row in rows])
+        self.spread = numpy.array([team_games.get(row[5], (0.0, 0.0))[1] for row in rows])
+
+        # ownership of the top projected QB on each player's team
+        team_qb_ownership = {}
+        for index in numpy.argsort(-self.projection, kind='stable'):
+            if self.position[index] == 'QB':
+                team_qb_ownership.setdefault(self.team[index], self.ownership[index])
+        self.team_qb_ownership = numpy.array([team_qb_ownership.get(team, 0.0) for team in self.team])
+
+        # projection gap (in hundredths) to the top projected pass catcher of each player's team
+        cents = numpy.round(self.projection * 100).astype(numpy.int64)
+        is_pass_catcher = numpy.isin(self.position, PASS_CATCHER_POSITIONS)
+        top_pass_catcher = {}
+        for index in numpy.flatnonzero(is_pass_catcher):
+            top_pass_catcher[self.team[index]] = max(top_pass_catcher.get(self.team[index], cents[index]), cents[index])
+        self.pass_catcher_gap = numpy.array([
+            top_pass_catcher[self.team[index]] - cents[index] if is_pass_catcher[index] else numpy.iinfo(numpy.int64).max
+            for index in range(len(rows))
+        ], dtype=numpy.int64)
+
+    def get_rows(self, projection_ids):
+        return numpy.array([self.rows[projection_id] if projection_id is not None else -1 for projection_id in projection_ids], dtype=numpy.int64)
+
+    def get(self, feature, rows, empty=0.0):
+        values = getattr(self, feature)
+        if len(values) == 0:
+            return numpy.full(len(rows), empty, dtype=values.dtype)
+        return numpy.where(rows >= 0, values[rows], empty)
+
+
+class VectorizeCriteria(ast.NodeTransformer):
+    '''
+    Rewrites a criteria expression to operate on arrays: and, or, not and chained
+    comparisons become element-wise operations and conditionals become numpy.where.
+    '''
+    def truth(self, node):
+        return ast.Call(func=ast.Name(id='_truth', ctx=ast.Load()), args=[node], keywords=[])
+
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        op = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+        result = self.truth(node.values[0])
+        for value in node.values[1:]:
+            result = ast.BinOp(left=result, op=op, right=self.truth(value))
+        return result
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return ast.UnaryOp(op=ast.Invert(), operand=self.truth(node.operand))
+        return node
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        left = node.left
+        result = None
+        for op, right in zip(node.ops, node.comparators):
+            comparison = self.truth(ast.Compare(left=left, ops=[op], comparators=[right]))
+            result = comparison if result is None else ast.BinOp(left=result, op=ast.BitAnd(), right=comparison)
+            left = right
+        return result
+
+    def visit_IfExp(self, node):
+        self.generic_visit(node)
+        return ast.Call(func=ast.Name(id='_where', ctx=ast.Load()), args=[self.truth(node.test), node.body, node.orelse], keywords=[])
+
+
+class CompiledRule:
+    '''
+    A stack construction rule's criteria parsed and compiled once into a predicate over
+    arrays of candidate stacks.
+    '''
+    def __init__(self, criteria, top_pc_margin):
+        tree = ast.parse(criteria.strip(), mode='eval')
+
+        for node in ast.walk(tree):
+            if not isinstance(node, ALLOWED_NODES):
+                raise ValueError(f'{type(node).__name__} is not allowed in stack construction criteria')
+            if isinstance(node, ast.Name) and node.id not in RULE_VARIABLES and node.id not in ['True', 'False']:
+                raise ValueError(f'{node.id} is not a stack construction variable')
+
+        tree = ast.fix_missing_locations(VectorizeCriteria().visit(tree))
+        self.code = compile(tree, '<stack construction criteria>', 'eval')
+        self.top_pc_margin_cents = int(round(float(top_pc_margin) * 100))
+
+    def contains_top_pass_catcher(self, features, player_1, player_2):
+        '''
+        True for stacks whose player_1 or player_2 is within the margin of their team's top
+        projected pass catcher.
+        '''
+        gap = numpy.iinfo(numpy.int64).max
+        return (features.get('pass_catcher_gap', player_1, gap) <= self.top_pc_margin_cents) | (features.get('pass_catcher_gap', player_2, gap) <= self.top_pc_margin_cents)
+
+    def get_variables(self, features, qb, player_1, player_2, opp_player, mini_player_1, mini_player_2, stack_projection=None):
+        stack_rows = numpy.stack([qb, player_1, player_2, opp_player])
+        mini_rows = numpy.stack([mini_player_1, mini_player_2])
+        has_mini = (mini_player_1 >= 0) & (mini_player_2 >= 0)
+
+        stack_projections = numpy.stack([features.get('projection', rows, numpy.inf) for rows in stack_rows])
+        stack_ownerships = numpy.stack([features.get('ownership', rows, numpy.inf) for rows in stack_rows])
+        mini_projections = numpy.stack([features.get('projection', rows) for rows in mini_rows])
+        mini_ownerships = numpy.stack([features.get('ownership', rows) for rows in mini_rows])
+
+        if stack_projection is None:
+            stack_projection = numpy.where(numpy.isinf(stack_projections), 0.0, stack_projections).sum(axis=0) + mini_projections.sum(axis=0)
+
+        mini_stack_min_player_projection = numpy.where(has_mini, mini_projections.min(axis=0), 0.0)
+
+        return {
+            'stack_projection': numpy.asarray(stack_projection, dtype=numpy.float64),
+            'stack_min_player_projection': stack_projections.min(axis=0),
+            'stack_min_player_ownership': stack_ownerships.min(axis=0),
+            'qb_team_total': features.get('team_total', qb),
+            'qb_game_total': features.get('game_total', qb),
+            'qb_game_zscore': features.get('game_zscore', qb),
+            'qb_spread': features.get('spread', qb),
+            'mini_stack_game_total': features.get('game_total', mini_player_1),
+            'mini_stack_game_zscore': features.get('game_zscore', mini_player_1),
+            'qb_ownership': features.get('ownership', qb),
+            'opposing_player_qb_ownership': features.get('team_qb_ownership', opp_player),
+            'mini_stack_min_player_projection': mini_stack_min_player_projection,
+            # as in passes_rule, this has always been the mini stack's min projection
+            'mini_stack_min_player_zscore': mini_stack_min_player_projection,
+            'mini_stack_min_player_ownership': numpy.where(has_mini, mini_ownerships.min(axis=0), 0.0),
+            'mini_stack_ownership': numpy.where(has_mini, mini_ownerships.sum(axis=0), 0.0),
+            'contains_top_pass_catcher': self.contains_top_pass_catcher(features, player_1, player_2),
+        }
+
+    def evaluate(self, features, qb, player_1, player_2, opp_player, mini_player_1, mini_player_2, stack_projection=None):
+        '''
+        Returns whether each candidate stack passes the rule. Stacks are given as arrays of
+        feature rows, one per slot, with -1 for empty slots.
+        '''
+        variables = self.get_variables(features, qb, player_1, player_2, opp_player, mini_player_1, mini_player_2, stack_projection)
+        variables.update({
+            '_truth': lambda value: numpy.asarray(value) != 0,
+            '_where': numpy.where,
+            'True': True,
+            'False': False,
+        })
+
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            result = eval(self.code, {'__builtins__': {}}, variables)
+
+        return numpy.broadcast_to(numpy.asarray(result) != 0, (len(qb),))
+
+
+def compile_rule(rule):
+    key = (rule.criteria, float(rule.top_pc_margin))
+    compiled = _compiled_rules.get(key)
+    if compiled is None:
+        compiled = CompiledRule(rule.criteria, rule.top_pc_margin)
+        _compiled_rules[key] = compiled
+    return compiled
+
@@ -1,15 +1,12 @@
 import csv
 import datetime
 import decimal
-import itertools
 import json
 import logging
 import math
 import numpy
 import os
 import pandas
-import random
-import re
 import requests
 import scipy
 import sqlalchemy
@@ -24,7 +21,6 @@ from contextlib import contextmanager
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.messages.api import success
-from django.db import connection
 from django.db.models.aggregates import Count, Sum
 from django.db.models import Q, F
 from django.db import transaction
@@ -36,7 +32,7 @@ from configuration.models import BackgroundTask
 from fanduel import models as fanduel_models
 from yahoo import models as yahoo_models
 
-from . import models, optimize, utils
+from . import correlation, field_import, lineup_sampler, matchups, models, optimize, sheets, sim_store, simulation, stack_builder, utils
 # from . import optimize
 
 from lottery.celery import app
@@ -1223,50 +1219,9 @@ We calculate the corresponding correlation of actual scores on this subset of pl
 as the parameter estimate. We do the same for players on opposing teams
 '''
 def find_knn_corr(p1, p2, site):
-    with connection.cursor() as cursor:
-        sql = '''
-            SELECT  p1.name,
-                    p1_proj.projection       as p1_proj,
-                    p1.fantasy_points        as p1_actual,
-                    p2.name,
-                    p2_proj.projection       as p2_proj,
-                    p2.fantasy_points        as p2_actual
-            FROM nfl_slateplayer p1
-            INNER JOIN nfl_slateplayer p2 on p1.team = p2.team AND p1.slate_id = p2.slate_id
-            LEFT JOIN nfl_slate slate ON slate.id = p1.slate_id
-            LEFT JOIN nfl_slateplayerprojection p1_proj ON p1_proj.slate_player_id = p1.id
-            LEFT JOIN nfl_slateplayerprojection p2_proj ON p2_proj.slate_player_id = p2.id
-            WHERE slate.is_main_slate = true
-                AND slate.site = %s
-                AND p1.site_pos = %s
-                AND p2.site_pos = %s
-                AND slate.datetime < '2022-02-28'
-                AND p1.fantasy_points >= 1.0
-                AND p2.fantasy_points >= 1.0
-        '''
-
-        cursor.execute(sql, [site, p1.slate_player.site_pos, p2.slate_player.site_pos])
-        rows = cursor.fetchall()
-
-    df = pandas.DataFrame.from_records(
-        rows,
-        columns=['p1_name', 'p1_proj', 'p1_actual', 'p2_name', 'p2_proj', 'p2_actual'],
-        coerce_float=True
-    )
-
-    X = df.drop(['p1_name', 'p1_actual', 'p2_name', 'p2_actual'], axis=1)
-
-    new_dp = numpy.array([
-        float(p1.projection),
-        float(p2.projection),
-    ])
-    distances = numpy.linalg.norm(X - new_dp, axis=1)
-    k = 50
-    nearest_neighbor_ids = distances.argsort()[:k]
-
-    comps = df.iloc[nearest_neighbor_ids]
-    # logger.info(comps)
-    return round(comps['p1_actual'].corr(comps['p2_actual']), 4)
+    return correlation.find_knn_corrs(site, [
+        (p1.slate_player.site_pos, p2.slate_player.site_pos, True, p1.projection, p2.projection)
+    ])[0]
 
 
 
@@ -1286,1341 +1241,27 @@ We calculate the corresponding correlation of actual scores on this subset of pl
 as the parameter estimate. We do the same for players on opposing teams
 '''
 def find_opp_knn_corr(p1, p2, site):
-    with connection.cursor() as cursor:
-        sql = '''
-            SELECT  p1.name,
-                    p1_proj.projection       as p1_proj,
-                    p1.fantasy_points        as p1_actual,
-                    p2.name,
-                    p2_proj.projection       as p2_proj,
-                    p2.fantasy_points        as p2_actual
-            FROM nfl_slateplayer p1
-            INNER JOIN nfl_slateplayer p2 on p1.team <> p2.team AND p1.slate_game_id = p2.slate_game_id
-            LEFT JOIN nfl_slate slate ON slate.id = p1.slate_id
-            LEFT JOIN nfl_slateplayerprojection p1_proj ON p1_proj.slate_player_id = p1.id
-            LEFT JOIN nfl_slateplayerprojection p2_proj ON p2_proj.slate_player_id = p2.id
-            WHERE slate.is_main_slate = true
-                AND slate.site = %s
-                AND p1.site_pos = %s
-                AND p2.site_pos = %s
-                AND slate.datetime < '2022-02-28'
-                AND p1.fantasy_points >= 1.0
-                AND p2.fantasy_points >= 1.0
-        '''
-
-        cursor.execute(sql, [site, p1.slate_player.site_pos, p2.slate_player.site_pos])
-        rows = cursor.fetchall()
-
-    df = pandas.DataFrame.from_records(
-        rows,
-        columns=['p1_name', 'p1_proj', 'p1_actual', 'p2_name', 'p2_proj', 'p2_actual'],
-        coerce_float=True
-    )
-
-    X = df.drop(['p1_name', 'p1_actual', 'p2_name', 'p2_actual'], axis=1)
-
-    new_dp = numpy.array([
-        float(p1.projection),
-        float(p2.projection),
-    ])
-    distances = numpy.linalg.norm(X - new_dp, axis=1)
-    k = 50
-    nearest_neighbor_ids = distances.argsort()[:k]
-
-    comps = df.iloc[nearest_neighbor_ids]
-    # logger.info(comps)
-    return round(comps['p1_actual'].corr(comps['p2_actual']), 4)
+    return correlation.find_knn_corrs(site, [
+        (p1.slate_player.site_pos, p2.slate_player.site_pos, False, p1.projection, p2.projection)
+    ])[0]
 
 
 def get_static_corr_matrix(game, is_sd=False):
-    if game.slate.site == 'fanduel' or game.slate.site == 'yahoo':
-        df = pandas.read_csv('data/r.csv', index_col=0)
-    elif game.slate.site == 'draftkings':
-        if is_sd:
-            df = pandas.read_csv('data/dk_r_sd.csv', index_col=0)
-        else:
-            df = pandas.read_csv('data/dk_r.csv', index_col=0)
-    return df
+    return simulation.get_static_corr_matrix(game.slate.site, is_sd)
 
 
 def get_corr_matrix(game, is_sd=False):
-    if game.slate.site == 'fanduel':
-        dst_label = 'D' 
-    elif game.slate.site == 'yahoo':
-        dst_label = 'DEF' 
-    else:
-        dst_label = 'DST' 
-    
     if not is_sd:
         return get_static_corr_matrix(game, False)
 
-    # initialize variables
-    slate = game.slate
-    home_qb = None
-    home_rb1 = None
-    home_rb2 = None
-    home_rb3 = None
-    home_wr1 = None
-    home_wr2 = None
-    home_wr3 = None
-    home_wr4 = None
-    home_wr5 = None
-    home_te1 = None
-    home_te2 = None
-    home_k = None
-    home_dst = None
-    away_qb = None
-    away_rb1 = None
-    away_rb2 = None
-    away_rb3 = None
-    away_wr1 = None
-    away_wr2 = None
-    away_wr3 = None
-    away_wr4 = None
-    away_wr5 = None
-    away_te1 = None
-    away_te2 = None
-    away_k = None
-    away_dst = None
-
-    # Set up game players
-    home_players = models.SlatePlayerProjection.objects.filter(slate_player__id__in=game.get_home_players().values_list('id', flat=True)).exclude(slate_player__roster_position__in=['CPT', 'MVP'])
-    away_players = models.SlatePlayerProjection.objects.filter(slate_player__id__in=game.get_away_players().values_list('id', flat=True)).exclude(slate_player__roster_position__in=['CPT', 'MVP'])
-
-    home_qbs = home_players.filter(slate_player__site_pos='QB').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-    home_rbs = home_players.filter(slate_player__site_pos='RB').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-    home_wrs = home_players.filter(slate_player__site_pos='WR').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-    home_tes = home_players.filter(slate_player__site_pos='TE').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-    home_ks = home_players.filter(slate_player__site_pos='K').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-    home_dsts = home_players.filter(slate_player__site_pos=dst_label).exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-
-    home_qb = home_qbs[0]
-    home_rb1 = home_rbs[0]
-    if home_rbs.count() > 1:
-        home_rb2 = home_rbs[1]
-    if home_rbs.count() > 2:
-        home_rb3 = home_rbs[2]
-    home_wr1 = home_wrs[0]
-    home_wr2 = home_wrs[1]
-    if home_wrs.count() > 2:
-        home_wr3 = home_wrs[2]
-    if home_wrs.count() > 3:
-        home_wr4 = home_wrs[3]
-    if home_wrs.count() > 4:
-        home_wr5 = home_wrs[4]
-    home_te1 = home_tes[0]
-    if home_tes.count() > 1:
-        home_te2 = home_tes[1]
-    if home_ks.count() > 0:
-        home_k = home_ks[0]
-    home_dst = home_dsts[0]
-
-    away_qbs = away_players.filter(slate_player__site_pos='QB').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-    away_rbs = away_players.filter(slate_player__site_pos='RB').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-    away_wrs = away_players.filter(slate_player__site_pos='WR').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-    away_tes = away_players.filter(slate_player__site_pos='TE').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-    away_ks = away_players.filter(slate_player__site_pos='K').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-    away_dsts = away_players.filter(slate_player__site_pos=dst_label).exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-
-    away_qb = away_qbs[0]
-    away_rb1 = away_rbs[0]
-    if away_rbs.count() > 1:
-        away_rb2 = away_rbs[1]
-    if away_rbs.count() > 2:
-        away_rb3 = away_rbs[2]
-    away_wr1 = away_wrs[0]
-    away_wr2 = away_wrs[1]
-    if away_wrs.count() > 2:
-        away_wr3 = away_wrs[2]
-    if away_wrs.count() > 3:
-        away_wr4 = away_wrs[3]
-    if away_wrs.count() > 4:
-        away_wr5 = away_wrs[4]
-    away_te1 = away_tes[0]
-    if away_tes.count() > 1:
-        away_te2 = away_tes[1]
-    if away_ks.count() > 0:
-        away_k = away_ks[0]
-    away_dst = away_dsts[0]
-
-    # set up correlation combinations
-    correlations = []
-
-    # QB
-    logger.info('QB')
-    qb_corr = []
-    qb_corr.append(1.0)  # self
-    qb_corr.append(find_knn_corr(home_qb, home_rb1, slate.site))
-    if home_rb2:
-        qb_corr.append(find_knn_corr(home_qb, home_rb2, slate.site))
-    if home_rb3:
-        qb_corr.append(find_knn_corr(home_qb, home_rb3, slate.site))
-    qb_corr.append(find_knn_corr(home_qb, home_wr1, slate.site))
-    qb_corr.append(find_knn_corr(home_qb, home_wr2, slate.site))
-    if home_wr3:
-        qb_corr.append(find_knn_corr(home_qb, home_wr3, slate.site))
-    if home_wr4:
-        qb_corr.append(find_knn_corr(home_qb, home_wr4, slate.site))
-    if home_wr5:
-        qb_corr.append(find_knn_corr(home_qb, home_wr5, slate.site))
-    qb_corr.append(find_knn_corr(home_qb, home_te1, slate.site))
-    if home_te2:
-        qb_corr.append(find_knn_corr(home_qb, home_te2, slate.site))
-    qb_corr.append(0.1)
-    qb_corr.append(find_knn_corr(home_qb, home_dst, slate.site))
-    qb_corr.append(find_opp_knn_corr(home_qb, away_qb, slate.site))
-    qb_corr.append(find_opp_knn_corr(home_qb, away_rb1, slate.site))
-    if away_rb2:
-        qb_corr.append(find_opp_knn_corr(home_qb, away_rb2, slate.site))
-    if away_rb3:
-        qb_corr.append(find_opp_knn_corr(home_qb, away_rb3, slate.site))
-    qb_corr.append(find_opp_knn_corr(home_qb, away_wr1, slate.site))
-    qb_corr.append(find_opp_knn_corr(home_qb, away_wr2, slate.site))
-    if away_wr3:
-        qb_corr.append(find_opp_knn_corr(home_qb, away_wr3, slate.site))
-    if away_wr4:
-        qb_corr.append(find_opp_knn_corr(home_qb, away_wr4, slate.site))
-    if away_wr5:
-        qb_corr.append(find_opp_knn_corr(home_qb, away_wr5, slate.site))
-    qb_corr.append(find_opp_knn_corr(home_qb, away_te1, slate.site))
-    if away_te2:
-        qb_corr.append(find_opp_knn_corr(home_qb, away_te2, slate.site))
-    qb_corr.append(-0.03)
-    qb_corr.append(find_opp_knn_corr(home_qb, away_dst, slate.site))
-    correlations.append(qb_corr)
-    
-    # RB1
-    logger.info('RB1')
-    rb1_corr = []
-    rb1_corr.append(find_knn_corr(home_qb, home_rb1, slate.site))
-    rb1_corr.append(1.0)  # self
-    if home_rb2:
-        rb1_corr.append(find_knn_corr(home_rb1, home_rb2, slate.site))
-    if home_rb3:
-        rb1_corr.append(find_knn_corr(home_rb1, home_rb3, slate.site))
-    rb1_corr.append(find_knn_corr(home_rb1, home_wr1, slate.site))
-    rb1_corr.append(find_knn_corr(home_rb1, home_wr2, slate.site))
-    if home_wr3:
-        rb1_corr.append(find_knn_corr(home_rb1, home_wr3, slate.site))
-    if home_wr4:
-        rb1_corr.append(find_knn_corr(home_rb1, home_wr4, slate.site))
-    if home_wr5:
-        rb1_corr.append(find_knn_corr(home_rb1, home_wr5, slate.site))
-    rb1_corr.append(find_knn_corr(home_rb1, home_te1, slate.site))
-    if home_te2:
-        rb1_corr.append(find_knn_corr(home_rb1, home_te2, slate.site))
-    rb1_corr.append(0.06)
-    rb1_corr.append(find_knn_corr(home_rb1, home_dst, slate.site))
-    rb1_corr.append(find_opp_knn_corr(home_rb1, away_qb, slate.site))
-    rb1_corr.append(find_opp_knn_corr(home_rb1, away_rb1, slate.site))
-    if away_rb2:
-        rb1_corr.append(find_opp_knn_corr(home_rb1, away_rb2, slate.site))
-    if away_rb3:
-        rb1_corr.append(find_opp_knn_corr(home_rb1, away_rb3, slate.site))
-    rb1_corr.append(find_opp_knn_corr(home_rb1, away_wr1, slate.site))
-    rb1_corr.append(find_opp_knn_corr(home_rb1, away_wr2, slate.site))
-    if away_wr3:
-        rb1_corr.append(find_opp_knn_corr(home_rb1, away_wr3, slate.site))
-    if away_wr4:
-        rb1_corr.append(find_opp_knn_corr(home_rb1, away_wr4, slate.site))
-    if away_wr5:
-        rb1_corr.append(find_opp_knn_corr(home_rb1, away_wr5, slate.site))
-    rb1_corr.append(find_opp_knn_corr(home_rb1, away_te1, slate.site))
-    if away_te2:
-        rb1_corr.append(find_opp_knn_corr(home_rb1, away_te2, slate.site))
-    rb1_corr.append(-0.07)
-    rb1_corr.append(find_opp_knn_corr(home_rb1, away_dst, slate.site))
-    correlations.append(rb1_corr)
-    
-    # RB2
-    logger.info('RB2')
-    if home_rb2:
-        rb2_corr = []
-        rb2_corr.append(find_knn_corr(home_qb, home_rb2, slate.site))
-        rb2_corr.append(find_knn_corr(home_rb1, home_rb2, slate.site))
-        rb2_corr.append(1.0)  # self
-        if home_rb3:
-            rb2_corr.append(find_knn_corr(home_rb2, home_rb3, slate.site))
-        rb2_corr.append(find_knn_corr(home_rb2, home_wr1, slate.site))
-        rb2_corr.append(find_knn_corr(home_rb2, home_wr2, slate.site))
-        if home_wr3:
-            rb2_corr.append(find_knn_corr(home_rb2, home_wr3, slate.site))
-        if home_wr4:
-            rb2_corr.append(find_knn_corr(home_rb2, home_wr4, slate.site))
-        if home_wr5:
-            rb2_corr.append(find_knn_corr(home_rb2, home_wr5, slate.site))
-        rb2_corr.append(find_knn_corr(home_rb2, home_te1, slate.site))
-        if home_te2:
-            rb2_corr.append(find_knn_corr(home_rb2, home_te2, slate.site))
-        rb2_corr.append(0.06)
-        rb2_corr.append(find_knn_corr(home_rb2, home_dst, slate.site))
-        rb2_corr.append(find_opp_knn_corr(home_rb2, away_qb, slate.site))
-        rb2_corr.append(find_opp_knn_corr(home_rb2, away_rb1, slate.site))
-        if away_rb2:
-            rb2_corr.append(find_opp_knn_corr(home_rb2, away_rb2, slate.site))
-        if away_rb3:
-            rb2_corr.append(find_opp_knn_corr(home_rb2, away_rb3, slate.site))
-        rb2_corr.append(find_opp_knn_corr(home_rb2, away_wr1, slate.site))
-        rb2_corr.append(find_opp_knn_corr(home_rb2, away_wr2, slate.site))
-        if away_wr3:
-            rb2_corr.append(find_opp_knn_corr(home_rb2, away_wr3, slate.site))
-        if away_wr4:
-            rb2_corr.append(find_opp_knn_corr(home_rb2, away_wr4, slate.site))
-        if away_wr5:
-            rb2_corr.append(find_opp_knn_corr(home_rb2, away_wr5, slate.site))
-        rb2_corr.append(find_opp_knn_corr(home_rb2, away_te1, slate.site))
-        if away_te2:
-            rb2_corr.append(find_opp_knn_corr(home_rb2, away_te2, slate.site))
-        rb2_corr.append(-0.08)
-        rb2_corr.append(find_opp_knn_corr(home_rb2, away_dst, slate.site))
-        correlations.append(rb2_corr)
-    
-    # RB3
-    logger.info('RB3')
-    if home_rb3:
-        rb3_corr = []
-        rb3_corr.append(find_knn_corr(home_qb, home_rb3, slate.site))
-        rb3_corr.append(find_knn_corr(home_rb1, home_rb3, slate.site))
-        rb3_corr.append(find_knn_corr(home_rb2, home_rb3, slate.site))
-        rb3_corr.append(1.0)  # self
-        rb3_corr.append(find_knn_corr(home_rb3, home_wr1, slate.site))
-        rb3_corr.append(find_knn_corr(home_rb3, home_wr2, slate.site))
-        if home_wr3:
-            rb3_corr.append(find_knn_corr(home_rb3, home_wr3, slate.site))
-        if home_wr4:
-            rb3_corr.append(find_knn_corr(home_rb3, home_wr4, slate.site))
-        if home_wr5:
-            rb3_corr.append(find_knn_corr(home_rb3, home_wr5, slate.site))
-        rb3_corr.append(find_knn_corr(home_rb3, home_te1, slate.site))
-        if home_te2:
-            rb3_corr.append(find_knn_corr(home_rb3, home_te2, slate.site))
-        rb3_corr.append(0.06)
-        rb3_corr.append(find_knn_corr(home_rb3, home_dst, slate.site))
-        rb3_corr.append(find_opp_knn_corr(home_rb3, away_qb, slate.site))
-        rb3_corr.append(find_opp_knn_corr(home_rb3, away_rb1, slate.site))
-        if away_rb2:
-            rb3_corr.append(find_opp_knn_corr(home_rb3, away_rb2, slate.site))
-        if away_rb3:
-            rb3_corr.append(find_opp_knn_corr(home_rb3, away_rb3, slate.site))
-        rb3_corr.append(find_opp_knn_corr(home_rb3, away_wr1, slate.site))
-        rb3_corr.append(find_opp_knn_corr(home_rb3, away_wr2, slate.site))
-        if away_wr3:
-            rb3_corr.append(find_opp_knn_corr(home_rb3, away_wr3, slate.site))
-        if away_wr4:
-            rb3_corr.append(find_opp_knn_corr(home_rb3, away_wr4, slate.site))
-        if away_wr5:
-            rb3_corr.append(find_opp_knn_corr(home_rb3, away_wr5, slate.site))
-        rb3_corr.append(find_opp_knn_corr(home_rb3, away_te1, slate.site))
-        if away_te2:
-            rb3_corr.append(find_opp_knn_corr(home_rb3, away_te2, slate.site))
-        rb3_corr.append(-0.09)
-        rb3_corr.append(find_opp_knn_corr(home_rb3, away_dst, slate.site))
-        correlations.append(rb3_corr)
-
-    # WR1
-    logger.info('WR1')
-    wr1_corr = []
-    wr1_corr.append(find_knn_corr(home_qb, home_wr1, slate.site))
-    wr1_corr.append(find_knn_corr(home_rb1, home_wr1, slate.site))
-    if home_rb2:
-        wr1_corr.append(find_knn_corr(home_rb2, home_wr1, slate.site))
-    if home_rb3:
-        wr1_corr.append(find_knn_corr(home_rb3, home_wr1, slate.site))
-    wr1_corr.append(1.0)  # self
-    wr1_corr.append(find_knn_corr(home_wr1, home_wr2, slate.site))
-    if home_wr3:
-        wr1_corr.append(find_knn_corr(home_wr1, home_wr3, slate.site))
-    if home_wr4:
-        wr1_corr.append(find_knn_corr(home_wr1, home_wr4, slate.site))
-    if home_wr5:
-        wr1_corr.append(find_knn_corr(home_wr1, home_wr5, slate.site))
-    wr1_corr.append(find_knn_corr(home_wr1, home_te1, slate.site))
-    if home_te2:
-        wr1_corr.append(find_knn_corr(home_wr1, home_te2, slate.site))
-    wr1_corr.append(0.05)
-    wr1_corr.append(find_knn_corr(home_wr1, home_dst, slate.site))
-    wr1_corr.append(find_opp_knn_corr(home_wr1, away_qb, slate.site))
-    wr1_corr.append(find_opp_knn_corr(home_wr1, away_rb1, slate.site))
-    if away_rb2:
-        wr1_corr.append(find_opp_knn_corr(home_wr1, away_rb2, slate.site))
-    if away_rb3:
-        wr1_corr.append(find_opp_knn_corr(home_wr1, away_rb3, slate.site))
-    wr1_corr.append(find_opp_knn_corr(home_wr1, away_wr1, slate.site))
-    wr1_corr.append(find_opp_knn_corr(home_wr1, away_wr2, slate.site))
-    if away_wr3:
-        wr1_corr.append(find_opp_knn_corr(home_wr1, away_wr3, slate.site))
-    if away_wr4:
-        wr1_corr.append(find_opp_knn_corr(home_wr1, away_wr4, slate.site))
-    if away_wr5:
-        wr1_corr.append(find_opp_knn_corr(home_wr1, away_wr5, slate.site))
-    wr1_corr.append(find_opp_knn_corr(home_wr1, away_te1, slate.site))
-    if away_te2:
-        wr1_corr.append(find_opp_knn_corr(home_wr1, away_te2, slate.site))
-    wr1_corr.append(0.01)
-    wr1_corr.append(find_opp_knn_corr(home_wr1, away_dst, slate.site))
-    correlations.append(wr1_corr)
-
-    # WR2
-    logger.info('WR2')
-    wr2_corr = []
-    wr2_corr.append(find_knn_corr(home_qb, home_wr2, slate.site))
-    wr2_corr.append(find_knn_corr(home_rb1, home_wr2, slate.site))
-    if home_rb2:
-        wr2_corr.append(find_knn_corr(home_rb2, home_wr2, slate.site))
-    if home_rb3:
-        wr2_corr.append(find_knn_corr(home_rb3, home_wr2, slate.site))
-    wr2_corr.append(find_knn_corr(home_wr1, home_wr2, slate.site))
-    wr2_corr.append(1.0)  # self
-    if home_wr3:
-        wr2_corr.append(find_knn_corr(home_wr2, home_wr3, slate.site))
-    if home_wr4:
-        wr2_corr.append(find_knn_corr(home_wr2, home_wr4, slate.site))
-    if home_wr5:
-        wr2_corr.append(find_knn_corr(home_wr2, home_wr5, slate.site))
-    wr2_corr.append(find_knn_corr(home_wr2, home_te1, slate.site))
-    if home_te2:
-        wr2_corr.append(find_knn_corr(home_wr2, home_te2, slate.site))
-    wr2_corr.append(0.00)
-    wr2_corr.append(find_knn_corr(home_wr2, home_dst, slate.site))
-    wr2_corr.append(find_opp_knn_corr(home_wr2, away_qb, slate.site))
-    wr2_corr.append(find_opp_knn_corr(home_wr2, away_rb1, slate.site))
-    if away_rb2:
-        wr2_corr.append(find_opp_knn_corr(home_wr2, away_rb2, slate.site))
-    if away_rb3:
-        wr2_corr.append(find_opp_knn_corr(home_wr2, away_rb3, slate.site))
-    wr2_corr.append(find_opp_knn_corr(home_wr2, away_wr1, slate.site))
-    wr2_corr.append(find_opp_knn_corr(home_wr2, away_wr2, slate.site))
-    if away_wr3:
-        wr2_corr.append(find_opp_knn_corr(home_wr2, away_wr3, slate.site))
-    if away_wr4:
-        wr2_corr.append(find_opp_knn_corr(home_wr2, away_wr4, slate.site))
-    if away_wr5:
-        wr2_corr.append(find_opp_knn_corr(home_wr2, away_wr5, slate.site))
-    wr2_corr.append(find_opp_knn_corr(home_wr2, away_te1, slate.site))
-    if away_te2:
-        wr2_corr.append(find_opp_knn_corr(home_wr2, away_te2, slate.site))
-    wr2_corr.append(0.07)
-    wr2_corr.append(find_opp_knn_corr(home_wr2, away_dst, slate.site))
-    correlations.append(wr2_corr)
-    
-    # WR3
-    logger.info('WR3')
-    if home_wr3:
-        wr3_corr = []
-        wr3_corr.append(find_knn_corr(home_qb, home_wr3, slate.site))
-        wr3_corr.append(find_knn_corr(home_rb1, home_wr3, slate.site))
-        if home_rb2:
-            wr3_corr.append(find_knn_corr(home_rb2, home_wr3, slate.site))
-        if home_rb3:
-            wr3_corr.append(find_knn_corr(home_rb3, home_wr3, slate.site))
-        wr3_corr.append(find_knn_corr(home_wr1, home_wr3, slate.site))
-        wr3_corr.append(find_knn_corr(home_wr2, home_wr3, slate.site))
-        wr3_corr.append(1.0)  # self
-        if home_wr4:
-            wr3_corr.append(find_knn_corr(home_wr3, home_wr4, slate.site))
-        if home_wr5:
-            wr3_corr.append(find_knn_corr(home_wr3, home_wr5, slate.site))
-        wr3_corr.append(find_knn_corr(home_wr3, home_te1, slate.site))
-        if home_te2:
-            wr3_corr.append(find_knn_corr(home_wr3, home_te2, slate.site))
-        wr3_corr.append(0.01)
-        wr3_corr.append(find_knn_corr(home_wr3, home_dst, slate.site))
-        wr3_corr.append(find_opp_knn_corr(home_wr3, away_qb, slate.site))
-        wr3_corr.append(find_opp_knn_corr(home_wr3, away_rb1, slate.site))
-        if away_rb2:
-            wr3_corr.append(find_opp_knn_corr(home_wr3, away_rb2, slate.site))
-        if away_rb3:
-            wr3_corr.append(find_opp_knn_corr(home_wr3, away_rb3, slate.site))
-        wr3_corr.append(find_opp_knn_corr(home_wr3, away_wr1, slate.site))
-        wr3_corr.append(find_opp_knn_corr(home_wr3, away_wr2, slate.site))
-        if away_wr3:
-            wr3_corr.append(find_opp_knn_corr(home_wr3, away_wr3, slate.site))
-        if away_wr4:
-            wr3_corr.append(find_opp_knn_corr(home_wr3, away_wr4, slate.site))
-        if away_wr5:
-            wr3_corr.append(find_opp_knn_corr(home_wr3, away_wr5, slate.site))
-        wr3_corr.append(find_opp_knn_corr(home_wr3, away_te1, slate.site))
-        if away_te2:
-            wr3_corr.append(find_opp_knn_corr(home_wr3, away_te2, slate.site))
-        wr3_corr.append(-0.01)
-        wr3_corr.append(find_opp_knn_corr(home_wr3, away_dst, slate.site))
-        correlations.append(wr3_corr)
-    
-    # WR4
-    logger.info('WR4')
-    if home_wr4:
-        wr4_corr = []
-        wr4_corr.append(find_knn_corr(home_qb, home_wr4, slate.site))
-        wr4_corr.append(find_knn_corr(home_rb1, home_wr4, slate.site))
-        if home_rb2:
-            wr4_corr.append(find_knn_corr(home_rb2, home_wr4, slate.site))
-        if home_rb3:
-            wr4_corr.append(find_knn_corr(home_rb3, home_wr4, slate.site))
-        wr4_corr.append(find_knn_corr(home_wr1, home_wr4, slate.site))
-        wr4_corr.append(find_knn_corr(home_wr2, home_wr4, slate.site))
-        if home_wr3:
-            wr4_corr.append(find_knn_corr(home_wr3, home_wr4, slate.site))
-        wr4_corr.append(1.0)  # self
-        if home_wr5:
-            wr4_corr.append(find_knn_corr(home_wr4, home_wr5, slate.site))
-        wr4_corr.append(find_knn_corr(home_wr4, home_te1, slate.site))
-        if home_te2:
-            wr4_corr.append(find_knn_corr(home_wr4, home_te2, slate.site))
-        wr4_corr.append(0.00)
-        wr4_corr.append(find_knn_corr(home_wr4, home_dst, slate.site))
-        wr4_corr.append(find_opp_knn_corr(home_wr4, away_qb, slate.site))
-        wr4_corr.append(find_opp_knn_corr(home_wr4, away_rb1, slate.site))
-        if away_rb2:
-            wr4_corr.append(find_opp_knn_corr(home_wr4, away_rb2, slate.site))
-        if away_rb3:
-            wr4_corr.append(find_opp_knn_corr(home_wr4, away_rb3, slate.site))
-        wr4_corr.append(find_opp_knn_corr(home_wr4, away_wr1, slate.site))
-        wr4_corr.append(find_opp_knn_corr(home_wr4, away_wr2, slate.site))
-        if away_wr3:
-            wr4_corr.append(find_opp_knn_corr(home_wr4, away_wr3, slate.site))
-        if away_wr4:
-            wr4_corr.append(find_opp_knn_corr(home_wr4, away_wr4, slate.site))
-        if away_wr5:
-            wr4_corr.append(find_opp_knn_corr(home_wr4, away_wr5, slate.site))
-        wr4_corr.append(find_opp_knn_corr(home_wr4, away_te1, slate.site))
-        if away_te2:
-            wr4_corr.append(find_opp_knn_corr(home_wr4, away_te2, slate.site))
-        wr4_corr.append(-0.01)
-        wr4_corr.append(find_opp_knn_corr(home_wr4, away_dst, slate.site))
-        correlations.append(wr4_corr)
-    
-    # WR5
-    logger.info('WR5')
-    if home_wr5:
-        wr5_corr = []
-        wr5_corr.append(find_knn_corr(home_qb, home_wr5, slate.site))
-        wr5_corr.append(find_knn_corr(home_rb1, home_wr5, slate.site))
-        if home_rb2:
-            wr5_corr.append(find_knn_corr(home_rb2, home_wr5, slate.site))
-        if home_rb3:
-            wr5_corr.append(find_knn_corr(home_rb3, home_wr5, slate.site))
-        wr5_corr.append(find_knn_corr(home_wr1, home_wr5, slate.site))
-        wr5_corr.append(find_knn_corr(home_wr2, home_wr5, slate.site))
-        if home_wr3:
-            wr5_corr.append(find_knn_corr(home_wr3, home_wr5, slate.site))
-        if home_wr4:
-            wr5_corr.append(find_knn_corr(home_wr4, home_wr5, slate.site))
-        wr5_corr.append(1.0)  # self
-        wr5_corr.append(find_knn_corr(home_wr5, home_te1, slate.site))
-        if home_te2:
-            wr5_corr.append(find_knn_corr(home_wr5, home_te2, slate.site))
-        wr5_corr.append(0.00)
-        wr5_corr.append(find_knn_corr(home_wr5, home_dst, slate.site))
-        wr5_corr.append(find_opp_knn_corr(home_wr5, away_qb, slate.site))
-        wr5_corr.append(find_opp_knn_corr(home_wr5, away_rb1, slate.site))
-        if away_rb2:
-            wr5_corr.append(find_opp_knn_corr(home_wr5, away_rb2, slate.site))
-        if away_rb3:
-            wr5_corr.append(find_opp_knn_corr(home_wr5, away_rb3, slate.site))
-        wr5_corr.append(find_opp_knn_corr(home_wr5, away_wr1, slate.site))
-        wr5_corr.append(find_opp_knn_corr(home_wr5, away_wr2, slate.site))
-        if away_wr3:
-            wr5_corr.append(find_opp_knn_corr(home_wr5, away_wr3, slate.site))
-        if away_wr4:
-            wr5_corr.append(find_opp_knn_corr(home_wr5, away_wr4, slate.site))
-        if away_wr5:
-            wr5_corr.append(find_opp_knn_corr(home_wr5, away_wr5, slate.site))
-        wr5_corr.append(find_opp_knn_corr(home_wr5, away_te1, slate.site))
-        if away_te2:
-            wr5_corr.append(find_opp_knn_corr(home_wr5, away_te2, slate.site))
-        wr5_corr.append(-0.01)
-        wr5_corr.append(find_opp_knn_corr(home_wr5, away_dst, slate.site))
-        correlations.append(wr5_corr)
-
-    # TE1
-    logger.info('TE1')
-    te1_corr = []
-    te1_corr.append(find_knn_corr(home_qb, home_te1, slate.site))
-    te1_corr.append(find_knn_corr(home_rb1, home_te1, slate.site))
-    if home_rb2:
-        te1_corr.append(find_knn_corr(home_rb2, home_te1, slate.site))
-    if home_rb3:
-        te1_corr.append(find_knn_corr(home_rb3, home_te1, slate.site))
-    te1_corr.append(find_knn_corr(home_wr1, home_te1, slate.site))
-    te1_corr.append(find_knn_corr(home_wr2, home_te1, slate.site))
-    if home_wr3:
-        te1_corr.append(find_knn_corr(home_wr3, home_te1, slate.site))
-    if home_wr4:
-        te1_corr.append(find_knn_corr(home_wr4, home_te1, slate.site))
-    if home_wr5:
-        te1_corr.append(find_knn_corr(home_wr5, home_te1, slate.site))
-    te1_corr.append(1.0)  # self
-    if home_te2:
-        te1_corr.append(find_knn_corr(home_te1, home_te2, slate.site))
-    te1_corr.append(0.05)
-    te1_corr.append(find_knn_corr(home_te1, home_dst, slate.site))
-    te1_corr.append(find_opp_knn_corr(home_te1, away_qb, slate.site))
-    te1_corr.append(find_opp_knn_corr(home_te1, away_rb1, slate.site))
-    if away_rb2:
-        te1_corr.append(find_opp_knn_corr(home_te1, away_rb2, slate.site))
-    if away_rb3:
-        te1_corr.append(find_opp_knn_corr(home_te1, away_rb3, slate.site))
-    te1_corr.append(find_opp_knn_corr(home_te1, away_wr1, slate.site))
-    te1_corr.append(find_opp_knn_corr(home_te1, away_wr2, slate.site))
-    if away_wr3:
-        te1_corr.append(find_opp_knn_corr(home_te1, away_wr3, slate.site))
-    if away_wr4:
-        te1_corr.append(find_opp_knn_corr(home_te1, away_wr4, slate.site))
-    if away_wr5:
-        te1_corr.append(find_opp_knn_corr(home_te1, away_wr5, slate.site))
-    te1_corr.append(find_opp_knn_corr(home_te1, away_te1, slate.site))
-    if away_te2:
-        te1_corr.append(find_opp_knn_corr(home_te1, away_te2, slate.site))
-    te1_corr.append(0.00)
-    te1_corr.append(find_opp_knn_corr(home_te1, away_dst, slate.site))
-    correlations.append(te1_corr)
-
-    # TE2
-    logger.info('TE2')
-    if home_te2:
-        te2_corr = []
-        te2_corr.append(find_knn_corr(home_qb, home_te2, slate.site))
-        te2_corr.append(find_knn_corr(home_rb1, home_te2, slate.site))
-        if home_rb2:
-            te2_corr.append(find_knn_corr(home_rb2, home_te2, slate.site))
-        if home_rb3:
-            te2_corr.append(find_knn_corr(home_rb3, home_te2, slate.site))
-        te2_corr.append(find_knn_corr(home_wr1, home_te2, slate.site))
-        te2_corr.append(find_knn_corr(home_wr2, home_te2, slate.site))
-        if home_wr3:
-            te2_corr.append(find_knn_corr(home_wr3, home_te2, slate.site))
-        if home_wr4:
-            te2_corr.append(find_knn_corr(home_wr4, home_te2, slate.site))
-        if home_wr5:
-            te2_corr.append(find_knn_corr(home_wr5, home_te2, slate.site))
-        te2_corr.append(find_knn_corr(home_te1, home_te2, slate.site))
-        te2_corr.append(1.0)  # self
-        te2_corr.append(0.04)
-        te2_corr.append(find_knn_corr(home_te2, home_dst, slate.site))
-        te2_corr.append(find_opp_knn_corr(home_te2, away_qb, slate.site))
-        te2_corr.append(find_opp_knn_corr(home_te2, away_rb1, slate.site))
-        if away_rb2:
-            te2_corr.append(find_opp_knn_corr(home_te2, away_rb2, slate.site))
-        if away_rb3:
-            te2_corr.append(find_opp_knn_corr(home_te2, away_rb3, slate.site))
-        te2_corr.append(find_opp_knn_corr(home_te2, away_wr1, slate.site))
-        te2_corr.append(find_opp_knn_corr(home_te2, away_wr2, slate.site))
-        if away_wr3:
-            te2_corr.append(find_opp_knn_corr(home_te2, away_wr3, slate.site))
-        if away_wr4:
-            te2_corr.append(find_opp_knn_corr(home_te2, away_wr4, slate.site))
-        if away_wr5:
-            te2_corr.append(find_opp_knn_corr(home_te2, away_wr5, slate.site))
-        te2_corr.append(find_opp_knn_corr(home_te2, away_te1, slate.site))
-        if away_te2:
-            te2_corr.append(find_opp_knn_corr(home_te2, away_te2, slate.site))
-        te2_corr.append(0.00)
-        te2_corr.append(find_opp_knn_corr(home_te2, away_dst, slate.site))
-        correlations.append(te2_corr)
-
-    # K
-    logger.info('K')
-    k_corr = []
-    k_corr.append(0.1)
-    k_corr.append(0.06)
-    if home_rb2:
-        k_corr.append(0.06)
-    if home_rb3:
-        k_corr.append(0.06)
-    k_corr.append(0.05)
-    k_corr.append(0)
-    if home_wr3:
-        k_corr.append(0.01)
-    if home_wr4:
-        k_corr.append(0)
-    if home_wr5:
-        k_corr.append(0)
-    k_corr.append(0.05)
-    if home_te2:
-        k_corr.append(0.04)
-    k_corr.append(1.0)
-    k_corr.append(0.13)
-    k_corr.append(-0.03)
-    k_corr.append(-0.07)
-    if away_rb2:
-        k_corr.append(-0.08)
-    if away_rb3:
-        k_corr.append(-0.09)
-    k_corr.append(0.01)
-    k_corr.append(0.07)
-    if away_wr3:
-        k_corr.append(-0.01)
-    if away_wr4:
-        k_corr.append(-0.01)
-    if away_wr5:
-        k_corr.append(-0.01)
-    k_corr.append(0.0)
-    if away_te2:
-        k_corr.append(0.0)
-    k_corr.append(-0.05)
-    k_corr.append(-0.33)
-    correlations.append(k_corr)
-
-    # DST
-    logger.info('DST')
-    dst_corr = []
-    dst_corr.append(find_knn_corr(home_qb, home_dst, slate.site))
-    dst_corr.append(find_knn_corr(home_rb1, home_dst, slate.site))
-    if home_rb2:
-        dst_corr.append(find_knn_corr(home_rb2, home_dst, slate.site))
-    if home_rb3:
-        dst_corr.append(find_knn_corr(home_rb3, home_dst, slate.site))
-    dst_corr.append(find_knn_corr(home_wr1, home_dst, slate.site))
-    dst_corr.append(find_knn_corr(home_wr2, home_dst, slate.site))
-    if home_wr3:
-        dst_corr.append(find_knn_corr(home_wr3, home_dst, slate.site))
-    if home_wr4:
-        dst_corr.append(find_knn_corr(home_wr4, home_dst, slate.site))
-    if home_wr5:
-        dst_corr.append(find_knn_corr(home_wr5, home_dst, slate.site))
-    dst_corr.append(find_knn_corr(home_te1, home_dst, slate.site))
-    if home_te2:
-        dst_corr.append(find_knn_corr(home_te2, home_dst, slate.site))
-    dst_corr.append(0.13)
-    dst_corr.append(1.0)  # self
-    dst_corr.append(find_opp_knn_corr(home_dst, away_qb, slate.site))
-    dst_corr.append(find_opp_knn_corr(home_dst, away_rb1, slate.site))
-    if away_rb2:
-        dst_corr.append(find_opp_knn_corr(home_dst, away_rb2, slate.site))
-    if away_rb3:
-        dst_corr.append(find_opp_knn_corr(home_dst, away_rb3, slate.site))
-    dst_corr.append(find_opp_knn_corr(home_dst, away_wr1, slate.site))
-    dst_corr.append(find_opp_knn_corr(home_dst, away_wr2, slate.site))
-    if away_wr3:
-        dst_corr.append(find_opp_knn_corr(home_dst, away_wr3, slate.site))
-    if away_wr4:
-        dst_corr.append(find_opp_knn_corr(home_dst, away_wr4, slate.site))
-    if away_wr5:
-        dst_corr.append(find_opp_knn_corr(home_dst, away_wr5, slate.site))
-    dst_corr.append(find_opp_knn_corr(home_dst, away_te1, slate.site))
-    if away_te2:
-        dst_corr.append(find_opp_knn_corr(home_dst, away_te2, slate.site))
-    dst_corr.append(-.33)
-    dst_corr.append(find_opp_knn_corr(home_dst, away_dst, slate.site))
-    correlations.append(dst_corr)
-
-    # OPP QB
-    logger.info('OPP QB')
-    qb_opp_corr = []
-    qb_opp_corr.append(find_opp_knn_corr(home_qb, away_qb, slate.site))
-    qb_opp_corr.append(find_opp_knn_corr(home_rb1, away_qb, slate.site))
-    if home_rb2:
-        qb_opp_corr.append(find_opp_knn_corr(home_rb2, away_qb, slate.site))
-    if home_rb3:
-        qb_opp_corr.append(find_opp_knn_corr(home_rb3, away_qb, slate.site))
-    qb_opp_corr.append(find_opp_knn_corr(home_wr1, away_qb, slate.site))
-    qb_opp_corr.append(find_opp_knn_corr(home_wr2, away_qb, slate.site))
-    if home_wr3:
-        qb_opp_corr.append(find_opp_knn_corr(home_wr3, away_qb, slate.site))
-    if home_wr4:
-        qb_opp_corr.append(find_opp_knn_corr(home_wr4, away_qb, slate.site))
-    if home_wr5:
-        qb_opp_corr.append(find_opp_knn_corr(home_wr5, away_qb, slate.site))
-    qb_opp_corr.append(find_opp_knn_corr(home_te1, away_qb, slate.site))
-    if home_te2:
-        qb_opp_corr.append(find_opp_knn_corr(home_te2, away_qb, slate.site))
-    qb_opp_corr.append(-0.03)
-    qb_opp_corr.append(find_opp_knn_corr(home_dst, away_qb, slate.site))
-    qb_opp_corr.append(1.0)  # self
-    qb_opp_corr.append(find_knn_corr(away_qb, away_rb1, slate.site))
-    if away_rb2:
-        qb_opp_corr.append(find_knn_corr(away_qb, away_rb2, slate.site))
-    if away_rb3:
-        qb_opp_corr.append(find_knn_corr(away_qb, away_rb3, slate.site))
-    qb_opp_corr.append(find_knn_corr(away_qb, away_wr1, slate.site))
-    qb_opp_corr.append(find_knn_corr(away_qb, away_wr2, slate.site))
-    if away_wr3:
-        qb_opp_corr.append(find_knn_corr(away_qb, away_wr3, slate.site))
-    if away_wr4:
-        qb_opp_corr.append(find_knn_corr(away_qb, away_wr4, slate.site))
-    if away_wr5:
-        qb_opp_corr.append(find_knn_corr(away_qb, away_wr5, slate.site))
-    qb_opp_corr.append(find_knn_corr(away_qb, away_te1, slate.site))
-    if away_te2:
-        qb_opp_corr.append(find_knn_corr(away_qb, away_te2, slate.site))
-    qb_opp_corr.append(0.1)
-    qb_opp_corr.append(find_knn_corr(away_qb, away_dst, slate.site))
-    correlations.append(qb_opp_corr)
-    
-    # OPP RB1
-    logger.info('OPP RB1')
-    rb1_opp_corr = []
-    rb1_opp_corr.append(find_opp_knn_corr(home_qb, away_rb1, slate.site))
-    rb1_opp_corr.append(find_opp_knn_corr(home_rb1, away_rb1, slate.site))
-    if home_rb2:
-        rb1_opp_corr.append(find_opp_knn_corr(home_rb2, away_rb1, slate.site))
-    if home_rb3:
-        rb1_opp_corr.append(find_opp_knn_corr(home_rb3, away_rb1, slate.site))
-    rb1_opp_corr.append(find_opp_knn_corr(home_wr1, away_rb1, slate.site))
-    rb1_opp_corr.append(find_opp_knn_corr(home_wr2, away_rb1, slate.site))
-    if home_wr3:
-        rb1_opp_corr.append(find_opp_knn_corr(home_wr3, away_rb1, slate.site))
-    if home_wr4:
-        rb1_opp_corr.append(find_opp_knn_corr(home_wr4, away_rb1, slate.site))
-    if home_wr5:
-        rb1_opp_corr.append(find_opp_knn_corr(home_wr5, away_rb1, slate.site))
-    rb1_opp_corr.append(find_opp_knn_corr(home_te1, away_rb1, slate.site))
-    if home_te2:
-        rb1_opp_corr.append(find_opp_knn_corr(home_te2, away_rb1, slate.site))
-    rb1_opp_corr.append(-0.07)
-    rb1_opp_corr.append(find_opp_knn_corr(home_dst, away_rb1, slate.site))
-    rb1_opp_corr.append(find_knn_corr(away_qb, away_rb1, slate.site))
-    rb1_opp_corr.append(1.0)  # self
-    if away_rb2:
-        rb1_opp_corr.append(find_knn_corr(away_rb1, away_rb2, slate.site))
-    if away_rb3:
-        rb1_opp_corr.append(find_knn_corr(away_rb1, away_rb3, slate.site))
-    rb1_opp_corr.append(find_knn_corr(away_rb1, away_wr1, slate.site))
-    rb1_opp_corr.append(find_knn_corr(away_rb1, away_wr2, slate.site))
-    if away_wr3:
-        rb1_opp_corr.append(find_knn_corr(away_rb1, away_wr3, slate.site))
-    if away_wr4:
-        rb1_opp_corr.append(find_knn_corr(away_rb1, away_wr4, slate.site))
-    if away_wr5:
-        rb1_opp_corr.append(find_knn_corr(away_rb1, away_wr5, slate.site))
-    rb1_opp_corr.append(find_knn_corr(away_rb1, away_te1, slate.site))
-    if away_te2:
-        rb1_opp_corr.append(find_knn_corr(away_rb1, away_te2, slate.site))
-    rb1_opp_corr.append(0.06)
-    rb1_opp_corr.append(find_knn_corr(away_rb1, away_dst, slate.site))
-    correlations.append(rb1_opp_corr)
-    
-    # OPP RB2
-    logger.info('OPP RB2')
-    if away_rb2:
-        rb2_opp_corr = []
-        rb2_opp_corr.append(find_opp_knn_corr(home_qb, away_rb2, slate.site))
-        rb2_opp_corr.append(find_opp_knn_corr(home_rb1, away_rb2, slate.site))
-        if home_rb2:
-            rb2_opp_corr.append(find_opp_knn_corr(home_rb2, away_rb2, slate.site))
-        if home_rb3:
-            rb2_opp_corr.append(find_opp_knn_corr(home_rb3, away_rb2, slate.site))
-        rb2_opp_corr.append(find_opp_knn_corr(home_wr1, away_rb2, slate.site))
-        rb2_opp_corr.append(find_opp_knn_corr(home_wr2, away_rb2, slate.site))
-        if home_wr3:
-            rb2_opp_corr.append(find_opp_knn_corr(home_wr3, away_rb2, slate.site))
-        if home_wr4:
-            rb2_opp_corr.append(find_opp_knn_corr(home_wr4, away_rb2, slate.site))
-        if home_wr5:
-            rb2_opp_corr.append(find_opp_knn_corr(home_wr5, away_rb2, slate.site))
-        rb2_opp_corr.append(find_opp_knn_corr(home_te1, away_rb2, slate.site))
-        if home_te2:
-            rb2_opp_corr.append(find_opp_knn_corr(home_te2, away_rb2, slate.site))
-        rb2_opp_corr.append(-0.08)
-        rb2_opp_corr.append(find_opp_knn_corr(home_dst, away_rb2, slate.site))
-        rb2_opp_corr.append(find_knn_corr(away_qb, away_rb2, slate.site))
-        rb2_opp_corr.append(find_knn_corr(away_rb1, away_rb2, slate.site))
-        rb2_opp_corr.append(1.0)  # self
-        if away_rb3:
-            rb2_opp_corr.append(find_knn_corr(away_rb2, away_rb3, slate.site))
-        rb2_opp_corr.append(find_knn_corr(away_rb2, away_wr1, slate.site))
-        rb2_opp_corr.append(find_knn_corr(away_rb2, away_wr2, slate.site))
-        if away_wr3:
-            rb2_opp_corr.append(find_knn_corr(away_rb2, away_wr3, slate.site))
-        if away_wr4:
-            rb2_opp_corr.append(find_knn_corr(away_rb2, away_wr4, slate.site))
-        if away_wr5:
-            rb2_opp_corr.append(find_knn_corr(away_rb2, away_wr5, slate.site))
-        rb2_opp_corr.append(find_knn_corr(away_rb2, away_te1, slate.site))
-        if away_te2:
-            rb2_opp_corr.append(find_knn_corr(away_rb2, away_te2, slate.site))
-        rb2_opp_corr.append(0.06)
-        rb2_opp_corr.append(find_knn_corr(away_rb2, away_dst, slate.site))
-        correlations.append(rb2_opp_corr)
-    
-    # OPP RB3
-    logger.info('OPP RB3')
-    if away_rb3:
-        rb3_opp_corr = []
-        rb3_opp_corr.append(find_opp_knn_corr(home_qb, away_rb3, slate.site))
-        rb3_opp_corr.append(find_opp_knn_corr(home_rb1, away_rb3, slate.site))
-        rb3_opp_corr.append(find_opp_knn_corr(home_rb2, away_rb3, slate.site))
-        if home_rb3:
-            rb3_opp_corr.append(find_opp_knn_corr(home_rb3, away_rb3, slate.site))
-        rb3_opp_corr.append(find_opp_knn_corr(home_wr1, away_rb3, slate.site))
-        rb3_opp_corr.append(find_opp_knn_corr(home_wr2, away_rb3, slate.site))
-        if home_wr3:
-            rb3_opp_corr.append(find_opp_knn_corr(home_wr3, away_rb3, slate.site))
-        if home_wr4:
-            rb3_opp_corr.append(find_opp_knn_corr(home_wr4, away_rb3, slate.site))
-        if home_wr5:
-            rb3_opp_corr.append(find_opp_knn_corr(home_wr5, away_rb3, slate.site))
-        rb3_opp_corr.append(find_opp_knn_corr(home_te1, away_rb3, slate.site))
-        if home_te2:
-            rb3_opp_corr.append(find_opp_knn_corr(home_te2, away_rb3, slate.site))
-        rb3_opp_corr.append(-0.09)
-        rb3_opp_corr.append(find_opp_knn_corr(home_dst, away_rb3, slate.site))
-        rb3_opp_corr.append(find_knn_corr(away_qb, away_rb3, slate.site))
-        rb3_opp_corr.append(find_knn_corr(away_rb1, away_rb3, slate.site))
-        if away_rb2:
-            rb3_opp_corr.append(find_knn_corr(away_rb2, away_rb3, slate.site))
-        rb3_opp_corr.append(1.0)  # self
-        rb3_opp_corr.append(find_knn_corr(away_rb3, away_wr1, slate.site))
-        rb3_opp_corr.append(find_knn_corr(away_rb3, away_wr2, slate.site))
-        if away_wr3:
-            rb3_opp_corr.append(find_knn_corr(away_rb3, away_wr3, slate.site))
-        if away_wr4:
-            rb3_opp_corr.append(find_knn_corr(away_rb3, away_wr4, slate.site))
-        if away_wr5:
-            rb3_opp_corr.append(find_knn_corr(away_rb3, away_wr5, slate.site))
-        rb3_opp_corr.append(find_knn_corr(away_rb3, away_te1, slate.site))
-        if away_te2:
-            rb3_opp_corr.append(find_knn_corr(away_rb3, away_te2, slate.site))
-        rb3_opp_corr.append(0.06)
-        rb3_opp_corr.append(find_knn_corr(away_rb3, away_dst, slate.site))
-        correlations.append(rb3_opp_corr)
-
-    # OPP WR1
-    logger.info('OPP WR1')
-    wr1_opp_corr = []
-    wr1_opp_corr.append(find_opp_knn_corr(home_qb, away_wr1, slate.site))
-    wr1_opp_corr.append(find_opp_knn_corr(home_rb1, away_wr1, slate.site))
-    if home_rb2:
-        wr1_opp_corr.append(find_opp_knn_corr(home_rb2, away_wr1, slate.site))
-    if home_rb3:
-        wr1_opp_corr.append(find_opp_knn_corr(home_rb3, away_wr1, slate.site))
-    wr1_opp_corr.append(find_opp_knn_corr(home_wr1, away_wr1, slate.site))
-    wr1_opp_corr.append(find_opp_knn_corr(home_wr2, away_wr1, slate.site))
-    if home_wr3:
-        wr1_opp_corr.append(find_opp_knn_corr(home_wr3, away_wr1, slate.site))
-    if home_wr4:
-        wr1_opp_corr.append(find_opp_knn_corr(home_wr4, away_wr1, slate.site))
-    if home_wr5:
-        wr1_opp_corr.append(find_opp_knn_corr(home_wr5, away_wr1, slate.site))
-    wr1_opp_corr.append(find_opp_knn_corr(home_te1, away_wr1, slate.site))
-    if home_te2:
-        wr1_opp_corr.append(find_opp_knn_corr(home_te2, away_wr1, slate.site))
-    wr1_opp_corr.append(0.01)
-    wr1_opp_corr.append(find_opp_knn_corr(home_dst, away_wr1, slate.site))
-    wr1_opp_corr.append(find_knn_corr(away_qb, away_wr1, slate.site))
-    wr1_opp_corr.append(find_knn_corr(away_rb1, away_wr1, slate.site))
-    if away_rb2:
-        wr1_opp_corr.append(find_knn_corr(away_rb2, away_wr1, slate.site))
-    if away_rb3:
-        wr1_opp_corr.append(find_knn_corr(away_rb3, away_wr1, slate.site))
-    wr1_opp_corr.append(1.0)  # self
-    wr1_opp_corr.append(find_knn_corr(away_wr1, away_wr2, slate.site))
-    if away_wr3:
-        wr1_opp_corr.append(find_knn_corr(away_wr1, away_wr3, slate.site))
-    if away_wr4:
-        wr1_opp_corr.append(find_knn_corr(away_wr1, away_wr4, slate.site))
-    if away_wr5:
-        wr1_opp_corr.append(find_knn_corr(away_wr1, away_wr5, slate.site))
-    wr1_opp_corr.append(find_knn_corr(away_wr1, away_te1, slate.site))
-    if away_te2:
-        wr1_opp_corr.append(find_knn_corr(away_wr1, away_te2, slate.site))
-    wr1_opp_corr.append(0.05)
-    wr1_opp_corr.append(find_knn_corr(away_wr1, away_dst, slate.site))
-    correlations.append(wr1_opp_corr)
-
-    # OPP WR2
-    logger.info('OPP WR2')
-    wr2_opp_corr = []
-    wr2_opp_corr.append(find_opp_knn_corr(home_qb, away_wr2, slate.site))
-    wr2_opp_corr.append(find_opp_knn_corr(home_rb1, away_wr2, slate.site))
-    if home_rb2:
-        wr2_opp_corr.append(find_opp_knn_corr(home_rb2, away_wr2, slate.site))
-    if home_rb3:
-        wr2_opp_corr.append(find_opp_knn_corr(home_rb3, away_wr2, slate.site))
-    wr2_opp_corr.append(find_opp_knn_corr(home_wr1, away_wr2, slate.site))
-    wr2_opp_corr.append(find_opp_knn_corr(home_wr2, away_wr2, slate.site))
-    if home_wr3:
-        wr2_opp_corr.append(find_opp_knn_corr(home_wr3, away_wr2, slate.site))
-    if home_wr4:
-        wr2_opp_corr.append(find_opp_knn_corr(home_wr4, away_wr2, slate.site))
-    if home_wr5:
-        wr2_opp_corr.append(find_opp_knn_corr(home_wr5, away_wr2, slate.site))
-    wr2_opp_corr.append(find_opp_knn_corr(home_te1, away_wr2, slate.site))
-    if home_te2:
-        wr2_opp_corr.append(find_opp_knn_corr(home_te2, away_wr2, slate.site))
-    wr2_opp_corr.append(0.07)
-    wr2_opp_corr.append(find_opp_knn_corr(home_dst, away_wr2, slate.site))
-    wr2_opp_corr.append(find_knn_corr(away_qb, away_wr2, slate.site))
-    wr2_opp_corr.append(find_knn_corr(away_rb1, away_wr2, slate.site))
-    if away_rb2:
-        wr2_opp_corr.append(find_knn_corr(away_rb2, away_wr2, slate.site))
-    if away_rb3:
-        wr2_opp_corr.append(find_knn_corr(away_rb3, away_wr2, slate.site))
-    wr2_opp_corr.append(find_knn_corr(away_wr1, away_wr2, slate.site))
-    wr2_opp_corr.append(1.0)  # self
-    if away_wr3:
-        wr2_opp_corr.append(find_knn_corr(away_wr2, away_wr3, slate.site))
-    if away_wr4:
-        wr2_opp_corr.append(find_knn_corr(away_wr2, away_wr4, slate.site))
-    if away_wr5:
-        wr2_opp_corr.append(find_knn_corr(away_wr2, away_wr5, slate.site))
-    wr2_opp_corr.append(find_knn_corr(away_wr2, away_te1, slate.site))
-    if away_te2:
-        wr2_opp_corr.append(find_knn_corr(away_wr2, away_te2, slate.site))
-    wr2_opp_corr.append(0.00)
-    wr2_opp_corr.append(find_knn_corr(away_wr2, away_dst, slate.site))
-    correlations.append(wr2_opp_corr)
-    
-    # OPP WR3
-    logger.info('OPP WR3')
-    if away_wr3:
-        wr3_opp_corr = []
-        wr3_opp_corr.append(find_opp_knn_corr(home_qb, away_wr3, slate.site))
-        wr3_opp_corr.append(find_opp_knn_corr(home_rb1, away_wr3, slate.site))
-        if home_rb2:
-            wr3_opp_corr.append(find_opp_knn_corr(home_rb2, away_wr3, slate.site))
-        if home_rb3:
-            wr3_opp_corr.append(find_opp_knn_corr(home_rb3, away_wr3, slate.site))
-        wr3_opp_corr.append(find_opp_knn_corr(home_wr1, away_wr3, slate.site))
-        wr3_opp_corr.append(find_opp_knn_corr(home_wr2, away_wr3, slate.site))
-        if home_wr3:
-            wr3_opp_corr.append(find_opp_knn_corr(home_wr3, away_wr3, slate.site))
-        if home_wr4:
-            wr3_opp_corr.append(find_opp_knn_corr(home_wr4, away_wr3, slate.site))
-        if home_wr5:
-            wr3_opp_corr.append(find_opp_knn_corr(home_wr5, away_wr3, slate.site))
-        wr3_opp_corr.append(find_opp_knn_corr(home_te1, away_wr3, slate.site))
-        if home_te2:
-            wr3_opp_corr.append(find_opp_knn_corr(home_te2, away_wr3, slate.site))
-        wr3_opp_corr.append(-0.01)
-        wr3_opp_corr.append(find_opp_knn_corr(home_dst, away_wr3, slate.site))
-        wr3_opp_corr.append(find_knn_corr(away_qb, away_wr3, slate.site))
-        wr3_opp_corr.append(find_knn_corr(away_rb1, away_wr3, slate.site))
-        if away_rb2:
-            wr3_opp_corr.append(find_knn_corr(away_rb2, away_wr3, slate.site))
-        if away_rb3:
-            wr3_opp_corr.append(find_knn_corr(away_rb3, away_wr3, slate.site))
-        wr3_opp_corr.append(find_knn_corr(away_wr1, away_wr3, slate.site))
-        wr3_opp_corr.append(find_knn_corr(away_wr2, away_wr3, slate.site))
-        wr3_opp_corr.append(1.0)  # self
-        if away_wr4:
-            wr3_opp_corr.append(find_knn_corr(away_wr3, away_wr4, slate.site))
-        if away_wr5:
-            wr3_opp_corr.append(find_knn_corr(away_wr3, away_wr5, slate.site))
-        wr3_opp_corr.append(find_knn_corr(away_wr3, away_te1, slate.site))
-        if away_te2:
-            wr3_opp_corr.append(find_knn_corr(away_wr3, away_te2, slate.site))
-        wr3_opp_corr.append(0.00)
-        wr3_opp_corr.append(find_knn_corr(away_wr3, away_dst, slate.site))
-        correlations.append(wr3_opp_corr)
-    
-    # OPP WR4
-    logger.info('OPP WR4')
-    if away_wr4:
-        wr4_opp_corr = []
-        wr4_opp_corr.append(find_opp_knn_corr(home_qb, away_wr4, slate.site))
-        wr4_opp_corr.append(find_opp_knn_corr(home_rb1, away_wr4, slate.site))
-        if home_rb2:
-            wr4_opp_corr.append(find_opp_knn_corr(home_rb2, away_wr4, slate.site))
-        if home_rb3:
-            wr4_opp_corr.append(find_opp_knn_corr(home_rb3, away_wr4, slate.site))
-        wr4_opp_corr.append(find_opp_knn_corr(home_wr1, away_wr4, slate.site))
-        wr4_opp_corr.append(find_opp_knn_corr(home_wr2, away_wr4, slate.site))
-        if home_wr3:
-            wr4_opp_corr.append(find_opp_knn_corr(home_wr3, away_wr4, slate.site))
-        if home_wr4:
-            wr4_opp_corr.append(find_opp_knn_corr(home_wr4, away_wr4, slate.site))
-        if home_wr5:
-            wr4_opp_corr.append(find_opp_knn_corr(home_wr5, away_wr4, slate.site))
-        wr4_opp_corr.append(find_opp_knn_corr(home_te1, away_wr4, slate.site))
-        if home_te2:
-            wr4_opp_corr.append(find_opp_knn_corr(home_te2, away_wr4, slate.site))
-        wr4_opp_corr.append(-0.01)
-        wr4_opp_corr.append(find_opp_knn_corr(home_dst, away_wr4, slate.site))
-        wr4_opp_corr.append(find_knn_corr(away_qb, away_wr4, slate.site))
-        wr4_opp_corr.append(find_knn_corr(away_rb1, away_wr4, slate.site))
-        if away_rb2:
-            wr4_opp_corr.append(find_knn_corr(away_rb2, away_wr4, slate.site))
-        if away_rb3:
-            wr4_opp_corr.append(find_knn_corr(away_rb3, away_wr4, slate.site))
-        wr4_opp_corr.append(find_knn_corr(away_wr1, away_wr4, slate.site))
-        wr4_opp_corr.append(find_knn_corr(away_wr2, away_wr4, slate.site))
-        if away_wr3:
-            wr4_opp_corr.append(find_knn_corr(away_wr3, away_wr4, slate.site))
-        wr4_opp_corr.append(1.0)  # self
-        if away_wr5:
-            wr4_opp_corr.append(find_knn_corr(away_wr4, away_wr5, slate.site))
-        wr4_opp_corr.append(find_knn_corr(away_wr4, away_te1, slate.site))
-        if away_te2:
-            wr4_opp_corr.append(find_knn_corr(away_wr4, away_te2, slate.site))
-        wr4_opp_corr.append(0.01)
-        wr4_opp_corr.append(find_knn_corr(away_wr4, away_dst, slate.site))
-        correlations.append(wr4_opp_corr)
-    
-    # OPP WR5
-    logger.info('OPP WR5')
-    if away_wr5:
-        wr5_opp_corr = []
-        wr5_opp_corr.append(find_opp_knn_corr(home_qb, away_wr5, slate.site))
-        wr5_opp_corr.append(find_opp_knn_corr(home_rb1, away_wr5, slate.site))
-        if home_rb2:
-            wr5_opp_corr.append(find_opp_knn_corr(home_rb2, away_wr5, slate.site))
-        if home_rb3:
-            wr5_opp_corr.append(find_opp_knn_corr(home_rb3, away_wr5, slate.site))
-        wr5_opp_corr.append(find_opp_knn_corr(home_wr1, away_wr5, slate.site))
-        wr5_opp_corr.append(find_opp_knn_corr(home_wr2, away_wr5, slate.site))
-        if home_wr3:
-            wr5_opp_corr.append(find_opp_knn_corr(home_wr3, away_wr5, slate.site))
-        if home_wr4:
-            wr5_opp_corr.append(find_opp_knn_corr(home_wr4, away_wr5, slate.site))
-        if home_wr5:
-            wr5_opp_corr.append(find_opp_knn_corr(home_wr5, away_wr5, slate.site))
-        wr5_opp_corr.append(find_opp_knn_corr(home_te1, away_wr5, slate.site))
-        if home_te2:
-            wr5_opp_corr.append(find_opp_knn_corr(home_te2, away_wr5, slate.site))
-        wr5_opp_corr.append(-0.01)
-        wr5_opp_corr.append(find_opp_knn_corr(home_dst, away_wr5, slate.site))
-        wr5_opp_corr.append(find_knn_corr(away_qb, away_wr5, slate.site))
-        wr5_opp_corr.append(find_knn_corr(away_rb1, away_wr5, slate.site))
-        if away_rb2:
-            wr5_opp_corr.append(find_knn_corr(away_rb2, away_wr5, slate.site))
-        if away_rb3:
-            wr5_opp_corr.append(find_knn_corr(away_rb3, away_wr5, slate.site))
-        wr5_opp_corr.append(find_knn_corr(away_wr1, away_wr5, slate.site))
-        wr5_opp_corr.append(find_knn_corr(away_wr2, away_wr5, slate.site))
-        if away_wr3:
-            wr5_opp_corr.append(find_knn_corr(away_wr3, away_wr5, slate.site))
-        if away_wr4:
-            wr5_opp_corr.append(find_knn_corr(away_wr4, away_wr5, slate.site))
-        wr5_opp_corr.append(1.0)  # self
-        wr5_opp_corr.append(find_knn_corr(away_wr5, away_te1, slate.site))
-        if away_te2:
-            wr5_opp_corr.append(find_knn_corr(away_wr5, away_te2, slate.site))
-        wr5_opp_corr.append(0.00)
-        wr5_opp_corr.append(find_knn_corr(away_wr5, away_dst, slate.site))
-        correlations.append(wr5_opp_corr)
-
-    # OPP TE1
-    logger.info('OPP TE1')
-    te1_opp_corr = []
-    te1_opp_corr.append(find_opp_knn_corr(home_qb, away_te1, slate.site))
-    te1_opp_corr.append(find_opp_knn_corr(home_rb1, away_te1, slate.site))
-    if home_rb2:
-        te1_opp_corr.append(find_opp_knn_corr(home_rb2, away_te1, slate.site))
-    if home_rb3:
-        te1_opp_corr.append(find_opp_knn_corr(home_rb3, away_te1, slate.site))
-    te1_opp_corr.append(find_opp_knn_corr(home_wr1, away_te1, slate.site))
-    te1_opp_corr.append(find_opp_knn_corr(home_wr2, away_te1, slate.site))
-    if home_wr3:
-        te1_opp_corr.append(find_opp_knn_corr(home_wr3, away_te1, slate.site))
-    if home_wr4:
-        te1_opp_corr.append(find_opp_knn_corr(home_wr4, away_te1, slate.site))
-    if home_wr5:
-        te1_opp_corr.append(find_opp_knn_corr(home_wr5, away_te1, slate.site))
-    te1_opp_corr.append(find_opp_knn_corr(home_te1, away_te1, slate.site))
-    if home_te2:
-        te1_opp_corr.append(find_opp_knn_corr(home_te2, away_te1, slate.site))
-    te1_opp_corr.append(0.00)
-    te1_opp_corr.append(find_opp_knn_corr(home_dst, away_te1, slate.site))
-    te1_opp_corr.append(find_knn_corr(away_qb, away_te1, slate.site))
-    te1_opp_corr.append(find_knn_corr(away_rb1, away_te1, slate.site))
-    if away_rb2:
-        te1_opp_corr.append(find_knn_corr(away_rb2, away_te1, slate.site))
-    if away_rb3:
-        te1_opp_corr.append(find_knn_corr(away_rb3, away_te1, slate.site))
-    te1_opp_corr.append(find_knn_corr(away_wr1, away_te1, slate.site))
-    te1_opp_corr.append(find_knn_corr(away_wr2, away_te1, slate.site))
-    if away_wr3:
-        te1_opp_corr.append(find_knn_corr(away_wr3, away_te1, slate.site))
-    if away_wr4:
-        te1_opp_corr.append(find_knn_corr(away_wr4, away_te1, slate.site))
-    if away_wr5:
-        te1_opp_corr.append(find_knn_corr(away_wr5, away_te1, slate.site))
-    te1_opp_corr.append(1.0)  # self
-    if away_te2:
-        te1_opp_corr.append(find_knn_corr(away_te1, away_te2, slate.site))
-    te1_opp_corr.append(0.05)
-    te1_opp_corr.append(find_knn_corr(away_te1, away_dst, slate.site))
-    correlations.append(te1_opp_corr)
-
-    # OPP TE2
-    logger.info('OPP TE2')
-    if away_te2:
-        te2_opp_corr = []
-        te2_opp_corr.append(find_opp_knn_corr(home_qb, away_te2, slate.site))
-        te2_opp_corr.append(find_opp_knn_corr(home_rb1, away_te2, slate.site))
-        if home_rb2:
-            te2_opp_corr.append(find_opp_knn_corr(home_rb2, away_te2, slate.site))
-        if home_rb3:
-            te2_opp_corr.append(find_opp_knn_corr(home_rb3, away_te2, slate.site))
-        te2_opp_corr.append(find_opp_knn_corr(home_wr1, away_te2, slate.site))
-        te2_opp_corr.append(find_opp_knn_corr(home_wr2, away_te2, slate.site))
-        if home_wr3:
-            te2_opp_corr.append(find_opp_knn_corr(home_wr3, away_te2, slate.site))
-        if home_wr4:
-            te2_opp_corr.append(find_opp_knn_corr(home_wr4, away_te2, slate.site))
-        if home_wr5:
-            te2_opp_corr.append(find_opp_knn_corr(home_wr5, away_te2, slate.site))
-        te2_opp_corr.append(find_opp_knn_corr(home_te1, away_te2, slate.site))
-        if home_te2:
-            te2_opp_corr.append(find_opp_knn_corr(home_te2, away_te2, slate.site))
-        te2_opp_corr.append(0.00)
-        te2_opp_corr.append(find_opp_knn_corr(home_dst, away_te2, slate.site))
-        te2_opp_corr.append(find_knn_corr(away_qb, away_te2, slate.site))
-        te2_opp_corr.append(find_knn_corr(away_rb1, away_te2, slate.site))
-        if away_rb2:
-            te2_opp_corr.append(find_knn_corr(away_rb2, away_te2, slate.site))
-        if away_rb3:
-            te2_opp_corr.append(find_knn_corr(away_rb3, away_te2, slate.site))
-        te2_opp_corr.append(find_knn_corr(away_wr1, away_te2, slate.site))
-        te2_opp_corr.append(find_knn_corr(away_wr2, away_te2, slate.site))
-        if away_wr3:
-            te2_opp_corr.append(find_knn_corr(away_wr3, away_te2, slate.site))
-        if away_wr4:
-            te2_opp_corr.append(find_knn_corr(away_wr4, away_te2, slate.site))
-        if away_wr5:
-            te2_opp_corr.append(find_knn_corr(away_wr5, away_te2, slate.site))
-        te2_opp_corr.append(find_knn_corr(away_te1, away_te2, slate.site))
-        te2_opp_corr.append(1.0)  # self
-        te2_opp_corr.append(0.04)
-        te2_opp_corr.append(find_knn_corr(away_te2, away_dst, slate.site))
-        correlations.append(te2_opp_corr)
-
-    # OPP K
-    logger.info('OPP K')
-    k_opp_corr = []
-    k_opp_corr.append(-0.03)
-    k_opp_corr.append(-0.07)
-    if away_rb2:
-        k_opp_corr.append(-0.08)
-    if away_rb3:
-        k_opp_corr.append(-0.09)
-    k_opp_corr.append(0.01)
-    k_opp_corr.append(0.07)
-    if away_wr3:
-        k_opp_corr.append(-0.01)
-    if away_wr4:
-        k_opp_corr.append(-0.01)
-    if away_wr5:
-        k_opp_corr.append(-0.01)
-    k_opp_corr.append(0.0)
-    if away_te2:
-        k_opp_corr.append(0.0)
-    k_opp_corr.append(-0.05)
-    k_opp_corr.append(-0.33)
-    k_opp_corr.append(0.1)
-    k_opp_corr.append(0.06)
-    if home_rb2:
-        k_opp_corr.append(0.06)
-    if home_rb3:
-        k_opp_corr.append(0.06)
-    k_opp_corr.append(0.05)
-    k_opp_corr.append(0)
-    if home_wr3:
-        k_opp_corr.append(0.0)
-    if home_wr4:
-        k_opp_corr.append(0.01)
-    if home_wr5:
-        k_opp_corr.append(0)
-    k_opp_corr.append(0.05)
-    if home_te2:
-        k_opp_corr.append(0.04)
-    k_opp_corr.append(1.0)
-    k_opp_corr.append(0.13)
-    correlations.append(k_opp_corr)
-
-    # OPP DST
-    logger.info('OPP DST')
-    dst_opp_corr = []
-    dst_opp_corr.append(find_opp_knn_corr(home_qb, away_dst, slate.site))
-    dst_opp_corr.append(find_opp_knn_corr(home_rb1, away_dst, slate.site))
-    if home_rb2:
-        dst_opp_corr.append(find_opp_knn_corr(home_rb2, away_dst, slate.site))
-    if home_rb3:
-        dst_opp_corr.append(find_opp_knn_corr(home_rb3, away_dst, slate.site))
-    dst_opp_corr.append(find_opp_knn_corr(home_wr1, away_dst, slate.site))
-    dst_opp_corr.append(find_opp_knn_corr(home_wr2, away_dst, slate.site))
-    if home_wr3:
-        dst_opp_corr.append(find_opp_knn_corr(home_wr3, away_dst, slate.site))
-    if home_wr4:
-        dst_opp_corr.append(find_opp_knn_corr(home_wr4, away_dst, slate.site))
-    if home_wr5:
-        dst_opp_corr.append(find_opp_knn_corr(home_wr5, away_dst, slate.site))
-    dst_opp_corr.append(find_opp_knn_corr(home_te1, away_dst, slate.site))
-    if home_te2:
-        dst_opp_corr.append(find_opp_knn_corr(home_te2, away_dst, slate.site))
-    dst_opp_corr.append(-0.33)
-    dst_opp_corr.append(find_opp_knn_corr(home_dst, away_dst, slate.site))
-    dst_opp_corr.append(find_knn_corr(away_qb, away_dst, slate.site))
-    dst_opp_corr.append(find_knn_corr(away_rb1, away_dst, slate.site))
-    if away_rb2:
-        dst_opp_corr.append(find_knn_corr(away_rb2, away_dst, slate.site))
-    if away_rb3:
-        dst_opp_corr.append(find_knn_corr(away_rb3, away_dst, slate.site))
-    dst_opp_corr.append(find_knn_corr(away_wr1, away_dst, slate.site))
-    dst_opp_corr.append(find_knn_corr(away_wr2, away_dst, slate.site))
-    if away_wr3:
-        dst_opp_corr.append(find_knn_corr(away_wr3, away_dst, slate.site))
-    if away_wr4:
-        dst_opp_corr.append(find_knn_corr(away_wr4, away_dst, slate.site))
-    if away_wr5:
-        dst_opp_corr.append(find_knn_corr(away_wr5, away_dst, slate.site))
-    dst_opp_corr.append(find_knn_corr(away_te1, away_dst, slate.site))
-    if away_te2:
-        dst_opp_corr.append(find_knn_corr(away_te2, away_dst, slate.site))
-    dst_opp_corr.append(0.13)
-    dst_opp_corr.append(1.0)  # self
-    correlations.append(dst_opp_corr)
-
-    A = pandas.DataFrame(correlations)
-    # utils.find_symmetric(A)
+    # all player pairs of the game are estimated in one batch
+    A = correlation.get_knn_corr_matrix(game)
 
     try:
-        df = pandas.DataFrame(utils.nearcorr(A), columns=[
-            'qb',
-            'rb1',
-            'rb2',
-            'rb3',
-            'wr1',
-            'wr2',
-            'wr3',
-            'wr4',
-            'wr5',
-            'te1',
-            'te2',
-            'k',
-            'dst',
-            'opp qb',
-            'opp rb1',
-            'opp rb2',
-            'opp rb3',
-            'opp wr1',
-            'opp wr2',
-            'opp wr3',
-            'opp wr4',
-            'opp wr5',
-            'opp te1',
-            'opp te2',
-            'opp k',
-            'opp dst',
-        ], index=[
-            'qb',
-            'rb1',
-            'rb2',
-            'rb3',
-            'wr1',
-            'wr2',
-            'wr3',
-            'wr4',
-            'wr5',
-            'te1',
-            'te2',
-            'k',
-            'dst',
-            'opp qb',
-            'opp rb1',
-            'opp rb2',
-            'opp rb3',
-            'opp wr1',
-            'opp wr2',
-            'opp wr3',
-            'opp wr4',
-            'opp wr5',
-            'opp te1',
-            'opp te2',
-            'opp k',
-            'opp dst',
-        ])
+        if A is None:
+            raise Exception(f'{game} does not fill every correlation slot.')
+
+        df = pandas.DataFrame(utils.nearcorr(A), columns=correlation.CORR_LABELS, index=correlation.CORR_LABELS)
     except:
         logger.error(f'Error creating corrlations for {game}. Using default correlation matrix.')
         df = get_static_corr_matrix(game, True)
@@ -2628,8 +1269,16 @@ def get_corr_matrix(game, is_sd=False):
     return df
 
 
+def simulate_game_with_copula(game, rand_U):
+    # simulate all players as one matrix and save outcomes in bulk
+    df_scores = pandas.DataFrame(simulation.simulate_game_outcomes(game, rand_U))
+
+    game.game_sim = json.dumps(df_scores.to_json())
+    game.save()
+
+
 @shared_task
-def simulate_game(game_id, task_id):
+def simulate_game(game_id, task_id, seed=None):
     task = None
 
     try:
@@ -2642,765 +1291,10 @@ def simulate_game(game_id, task_id):
         game = models.SlateGame.objects.get(id=game_id)
         logger.info(game)
 
-        N = models.SIM_ITERATIONS
-        if game.slate.site == 'fanduel':
-            dst_label = 'D' 
-        elif game.slate.site == 'yahoo':
-            dst_label = 'DEF' 
-        else:
-            dst_label = 'DST' 
-
         # set up correlation
         r_df = get_corr_matrix(game, game.slate.is_showdown)
-        c_target = r_df.to_numpy()
-        r0 = [0] * c_target.shape[0]
-        mv_norm = scipy.stats.multivariate_normal(mean=r0, cov=c_target, allow_singular=True)
-        rand_Nmv = mv_norm.rvs(N) 
-        rand_U = scipy.stats.norm.cdf(rand_Nmv)
-
-        # initialize variables
-        home_qb = None
-        home_rb1 = None
-        home_rb2 = None
-        home_rb3 = None
-        home_wr1 = None
-        home_wr2 = None
-        home_wr3 = None
-        home_wr4 = None
-        home_wr5 = None
-        home_te1 = None
-        home_te2 = None
-        home_k = None
-        home_dst = None
-        away_qb = None
-        away_rb1 = None
-        away_rb2 = None
-        away_rb3 = None
-        away_wr1 = None
-        away_wr2 = None
-        away_wr3 = None
-        away_wr4 = None
-        away_wr5 = None
-        away_te1 = None
-        away_te2 = None
-        away_k = None
-        away_dst = None
-
-        home_qb_rv = None 
-        home_rb1_rv = None 
-        home_rb2_rv = None 
-        home_rb3_rv = None 
-        home_wr1_rv = None 
-        home_wr2_rv = None 
-        home_wr3_rv = None 
-        home_wr4_rv = None 
-        home_wr5_rv = None 
-        home_te1_rv = None 
-        home_te2_rv = None 
-        home_k_rv = None 
-        home_dst_rv = None 
-        away_qb_rv = None 
-        away_rb1_rv = None 
-        away_rb2_rv = None 
-        away_rb3_rv = None 
-        away_wr1_rv = None 
-        away_wr2_rv = None 
-        away_wr3_rv = None 
-        away_wr4_rv = None 
-        away_wr5_rv = None 
-        away_te1_rv = None 
-        away_te2_rv = None 
-        away_k_rv = None 
-        away_dst_rv = None 
-
-        cpt_home_qb = None
-        cpt_home_rb1 = None
-        cpt_home_rb2 = None
-        cpt_home_rb3 = None
-        cpt_home_wr1 = None
-        cpt_home_wr2 = None
-        cpt_home_wr3 = None
-        cpt_home_wr4 = None
-        cpt_home_wr5 = None
-        cpt_home_te1 = None
-        cpt_home_te2 = None
-        cpt_home_k = None
-        cpt_home_dst = None
-        cpt_away_qb = None
-        cpt_away_rb1 = None
-        cpt_away_rb2 = None
-        cpt_away_rb3 = None
-        cpt_away_wr1 = None
-        cpt_away_wr2 = None
-        cpt_away_wr3 = None
-        cpt_away_wr4 = None
-        cpt_away_wr5 = None
-        cpt_away_te1 = None
-        cpt_away_te2 = None
-        cpt_away_k = None
-        cpt_away_dst = None
-
-        # Set up game players
-        home_players = models.SlatePlayerProjection.objects.filter(slate_player__id__in=game.get_home_players().values_list('id', flat=True)).exclude(slate_player__roster_position__in=['CPT', 'MVP'])
-        away_players = models.SlatePlayerProjection.objects.filter(slate_player__id__in=game.get_away_players().values_list('id', flat=True)).exclude(slate_player__roster_position__in=['CPT', 'MVP'])
-
-        home_qbs = home_players.filter(slate_player__site_pos='QB').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-        home_rbs = home_players.filter(slate_player__site_pos='RB').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-        home_wrs = home_players.filter(slate_player__site_pos='WR').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-        home_tes = home_players.filter(slate_player__site_pos='TE').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-        home_ks = home_players.filter(slate_player__site_pos='K').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-        home_dsts = home_players.filter(slate_player__site_pos=dst_label).exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-
-        home_qb = home_qbs[0]
-        home_rb1 = home_rbs[0]
-        if home_rbs.count() > 1:
-            home_rb2 = home_rbs[1]
-        if home_rbs.count() > 2:
-            home_rb3 = home_rbs[2]
-        home_wr1 = home_wrs[0]
-        home_wr2 = home_wrs[1]
-        if home_wrs.count() > 2:
-            home_wr3 = home_wrs[2]
-        if home_wrs.count() > 3:
-            home_wr4 = home_wrs[3]
-        if home_wrs.count() > 4:
-            home_wr5 = home_wrs[4]
-        home_te1 = home_tes[0]
-        if home_tes.count() > 1:
-            home_te2 = home_tes[1]
-        if home_ks.count() > 0:
-            home_k = home_ks[0]
-        home_dst = home_dsts[0]
-
-        away_qbs = away_players.filter(slate_player__site_pos='QB').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-        away_rbs = away_players.filter(slate_player__site_pos='RB').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-        away_wrs = away_players.filter(slate_player__site_pos='WR').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-        away_tes = away_players.filter(slate_player__site_pos='TE').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-        away_ks = away_players.filter(slate_player__site_pos='K').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-        away_dsts = away_players.filter(slate_player__site_pos=dst_label).exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-
-        away_qb = away_qbs[0]
-        away_rb1 = away_rbs[0]
-        if away_rbs.count() > 1:
-            away_rb2 = away_rbs[1]
-        if away_rbs.count() > 2:
-            away_rb3 = away_rbs[2]
-        away_wr1 = away_wrs[0]
-        away_wr2 = away_wrs[1]
-        if away_wrs.count() > 2:
-            away_wr3 = away_wrs[2]
-        if away_wrs.count() > 3:
-            away_wr4 = away_wrs[3]
-        if away_wrs.count() > 4:
-            away_wr5 = away_wrs[4]
-        away_te1 = away_tes[0]
-        if away_tes.count() > 1:
-            away_te2 = away_tes[1]
-        if away_ks.count() > 0:
-            away_k = away_ks[0]
-        away_dst = away_dsts[0]
-
-        # Simulate
-
-        home_qb_rv = scipy.stats.gamma((float(home_qb.projection)/float(home_qb.stdev))**2, scale=(float(home_qb.stdev)**2)/float(home_qb.projection))
-        home_rb1_rv = scipy.stats.gamma((float(home_rb1.projection)/float(home_rb1.stdev))**2, scale=(float(home_rb1.stdev)**2)/float(home_rb1.projection))
-        if home_rb2:
-            home_rb2_rv = scipy.stats.gamma((float(home_rb2.projection)/float(home_rb2.stdev))**2, scale=(float(home_rb2.stdev)**2)/float(home_rb2.projection))
-        if home_rb3:
-            home_rb3_rv = scipy.stats.gamma((float(home_rb3.projection)/float(home_rb3.stdev))**2, scale=(float(home_rb3.stdev)**2)/float(home_rb3.projection))
-        home_wr1_rv = scipy.stats.gamma((float(home_wr1.projection)/float(home_wr1.stdev))**2, scale=(float(home_wr1.stdev)**2)/float(home_wr1.projection))
-        home_wr2_rv = scipy.stats.gamma((float(home_wr2.projection)/float(home_wr2.stdev))**2, scale=(float(home_wr2.stdev)**2)/float(home_wr2.projection))
-        if home_wr3:
-            home_wr3_rv = scipy.stats.gamma((float(home_wr3.projection)/float(home_wr3.stdev))**2, scale=(float(home_wr3.stdev)**2)/float(home_wr3.projection))
-        if home_wr4:
-            home_wr4_rv = scipy.stats.gamma((float(home_wr4.projection)/float(home_wr4.stdev))**2, scale=(float(home_wr4.stdev)**2)/float(home_wr4.projection))
-        if home_wr5:
-            home_wr5_rv = scipy.stats.gamma((float(home_wr5.projection)/float(home_wr5.stdev))**2, scale=(float(home_wr5.stdev)**2)/float(home_wr5.projection))
-        home_te1_rv = scipy.stats.gamma((float(home_te1.projection)/float(home_te1.stdev))**2, scale=(float(home_te1.stdev)**2)/float(home_te1.projection))
-        if home_te2:
-            home_te2_rv = scipy.stats.gamma((float(home_te2.projection)/float(home_te2.stdev))**2, scale=(float(home_te2.stdev)**2)/float(home_te2.projection))
-        if home_k:
-            home_k_rv = scipy.stats.gamma((float(home_k.projection)/float(home_k.stdev))**2, scale=(float(home_k.stdev)**2)/float(home_k.projection))
-        home_dst_rv = scipy.stats.gamma((float(home_dst.projection)/float(home_dst.stdev))**2, scale=(float(home_dst.stdev)**2)/float(home_dst.projection))
-        
-        away_qb_rv = scipy.stats.gamma((float(away_qb.projection)/float(away_qb.stdev))**2, scale=(float(away_qb.stdev)**2)/float(away_qb.projection))
-        away_rb1_rv = scipy.stats.gamma((float(away_rb1.projection)/float(away_rb1.stdev))**2, scale=(float(away_rb1.stdev)**2)/float(away_rb1.projection))
-        if away_rb2:
-            away_rb2_rv = scipy.stats.gamma((float(away_rb2.projection)/float(away_rb2.stdev))**2, scale=(float(away_rb2.stdev)**2)/float(away_rb2.projection))
-        if away_rb3:
-            away_rb3_rv = scipy.stats.gamma((float(away_rb3.projection)/float(away_rb3.stdev))**2, scale=(float(away_rb3.stdev)**2)/float(away_rb3.projection))
-        away_wr1_rv = scipy.stats.gamma((float(away_wr1.projection)/float(away_wr1.stdev))**2, scale=(float(away_wr1.stdev)**2)/float(away_wr1.projection))
-        away_wr2_rv = scipy.stats.gamma((float(away_wr2.projection)/float(away_wr2.stdev))**2, scale=(float(away_wr2.stdev)**2)/float(away_wr2.projection))
-        if away_wr3:
-            away_wr3_rv = scipy.stats.gamma((float(away_wr3.projection)/float(away_wr3.stdev))**2, scale=(float(away_wr3.stdev)**2)/float(away_wr3.projection))
-        if away_wr4:
-            away_wr4_rv = scipy.stats.gamma((float(away_wr4.projection)/float(away_wr4.stdev))**2, scale=(float(away_wr4.stdev)**2)/float(away_wr4.projection))
-        if away_wr5:
-            away_wr5_rv = scipy.stats.gamma((float(away_wr5.projection)/float(away_wr5.stdev))**2, scale=(float(away_wr5.stdev)**2)/float(away_wr5.projection))
-        away_te1_rv = scipy.stats.gamma((float(away_te1.projection)/float(away_te1.stdev))**2, scale=(float(away_te1.stdev)**2)/float(away_te1.projection))
-        if away_te2:
-            away_te2_rv = scipy.stats.gamma((float(away_te2.projection)/float(away_te2.stdev))**2, scale=(float(away_te2.stdev)**2)/float(away_te2.projection))
-        if away_k:
-            away_k_rv = scipy.stats.gamma((float(away_k.projection)/float(away_k.stdev))**2, scale=(float(away_k.stdev)**2)/float(away_k.projection))
-        away_dst_rv = scipy.stats.gamma((float(away_dst.projection)/float(away_dst.stdev))**2, scale=(float(away_dst.stdev)**2)/float(away_dst.projection))
-
-        arr = []
-
-        i = 0
-        rand_home_qb = home_qb_rv.ppf(rand_U[:,i])
-        arr.append(rand_home_qb)
-
-        i += 1
-        rand_home_rb1 = home_rb1_rv.ppf(rand_U[:,i])
-        arr.append(rand_home_rb1)
-
-        if home_rb2_rv:
-            i += 1
-            rand_home_rb2 = home_rb2_rv.ppf(rand_U[:,i])
-            arr.append(rand_home_rb2)
-
-        if home_rb3_rv:
-            i += 1
-            rand_home_rb3 = home_rb3_rv.ppf(rand_U[:,i])
-            arr.append(rand_home_rb3)
-
-        i += 1
-        rand_home_wr1 = home_wr1_rv.ppf(rand_U[:,i])
-        arr.append(rand_home_wr1)
-
-        i += 1
-        rand_home_wr2 = home_wr2_rv.ppf(rand_U[:,i])
-        arr.append(rand_home_wr2)
-
-        if home_wr3_rv:
-            i += 1
-            rand_home_wr3 = home_wr3_rv.ppf(rand_U[:,i])
-            arr.append(rand_home_wr3)
-
-        if home_wr4_rv:
-            i += 1
-            rand_home_wr4 = home_wr4_rv.ppf(rand_U[:,i])
-            arr.append(rand_home_wr4)
-
-        if home_wr5_rv:
-            i += 1
-            rand_home_wr5 = home_wr5_rv.ppf(rand_U[:,i])
-            arr.append(rand_home_wr5)
-
-        i += 1
-        rand_home_te1 = home_te1_rv.ppf(rand_U[:,i])
-        arr.append(rand_home_te1)
-
-        if home_te2_rv:
-            i += 1
-            rand_home_te2 = home_te2_rv.ppf(rand_U[:, i])
-            arr.append(rand_home_te2)
-
-        if home_k_rv:
-            i += 1
-            rand_home_k = home_k_rv.ppf(rand_U[:, i])
-            arr.append(rand_home_k)
-
-        i += 1
-        rand_home_dst = home_dst_rv.ppf(rand_U[:, i])
-        arr.append(rand_home_dst)
-
-        i += 1
-        rand_away_qb = away_qb_rv.ppf(rand_U[:,i])
-        arr.append(rand_away_qb)
-
-        i += 1
-        rand_away_rb1 = away_rb1_rv.ppf(rand_U[:,i])
-        arr.append(rand_away_rb1)
-
-        if away_rb2_rv:
-            i += 1
-            rand_away_rb2 = away_rb2_rv.ppf(rand_U[:,i])
-            arr.append(rand_away_rb2)
-
-        if away_rb3_rv:
-            i += 1
-            rand_away_rb3 = away_rb3_rv.ppf(rand_U[:,i])
-            arr.append(rand_away_rb3)
-
-        i += 1
-        rand_away_wr1 = away_wr1_rv.ppf(rand_U[:,i])
-        arr.append(rand_away_wr1)
-
-        i += 1
-        rand_away_wr2 = away_wr2_rv.ppf(rand_U[:,i])
-        arr.append(rand_away_wr2)
-
-        if away_wr3_rv:
-            i += 1
-            rand_away_wr3 = away_wr3_rv.ppf(rand_U[:,i])
-            arr.append(rand_away_wr3)
-
-        if away_wr4_rv:
-            i += 1
-            rand_away_wr4 = away_wr4_rv.ppf(rand_U[:,i])
-            arr.append(rand_away_wr4)
-
-        if away_wr5_rv:
-            i += 1
-            rand_away_wr5 = away_wr5_rv.ppf(rand_U[:,i])
-            arr.append(rand_away_wr5)
-
-        i += 1
-        rand_away_te1 = away_te1_rv.ppf(rand_U[:,i])
-        arr.append(rand_away_te1)
-
-        if away_te2_rv:
-            i += 1
-            rand_away_te2 = away_te2_rv.ppf(rand_U[:, i])
-            arr.append(rand_away_te2)
-
-        if away_k_rv:
-            i += 1
-            rand_away_k = away_k_rv.ppf(rand_U[:, i])
-            arr.append(rand_away_k)
-
-        i += 1
-        rand_away_dst = away_dst_rv.ppf(rand_U[:, i])
-        arr.append(rand_away_dst)
-
-        df_scores = pandas.DataFrame(arr)
-        # logger.info(df_scores)
-
-        game.game_sim = json.dumps(df_scores.to_json())
-        game.save()
-        
-        # assign outcomes to players
-        home_qb.sim_scores = numpy.round(rand_home_qb, 2).tolist()
-        home_qb.median = numpy.median(home_qb.sim_scores)
-        home_qb.s20 = numpy.percentile(home_qb.sim_scores, 20)
-        home_qb.s75 = numpy.percentile(home_qb.sim_scores, 75)
-        home_qb.s90 = numpy.percentile(home_qb.sim_scores, 90)
-        home_qb.save()
-        home_rb1.sim_scores = numpy.round(rand_home_rb1, 2).tolist()
-        home_rb1.median = numpy.median(home_rb1.sim_scores)
-        home_rb1.s20 = numpy.percentile(home_rb1.sim_scores, 20)
-        home_rb1.s75 = numpy.percentile(home_rb1.sim_scores, 75)
-        home_rb1.s90 = numpy.percentile(home_rb1.sim_scores, 90)
-        home_rb1.save()
-        if home_rb2:
-            home_rb2.sim_scores = numpy.round(rand_home_rb2, 2).tolist()
-            home_rb2.median = numpy.median(home_rb2.sim_scores)
-            home_rb2.s20 = numpy.percentile(home_rb2.sim_scores, 20)
-            home_rb2.s75 = numpy.percentile(home_rb2.sim_scores, 75)
-            home_rb2.s90 = numpy.percentile(home_rb2.sim_scores, 90)
-            home_rb2.save()
-        if home_rb3:
-            home_rb3.sim_scores = numpy.round(rand_home_rb3, 2).tolist()
-            home_rb3.median = numpy.median(home_rb3.sim_scores)
-            home_rb3.s20 = numpy.percentile(home_rb3.sim_scores, 20)
-            home_rb3.s75 = numpy.percentile(home_rb3.sim_scores, 75)
-            home_rb3.s90 = numpy.percentile(home_rb3.sim_scores, 90)
-            home_rb3.save()
-        home_wr1.sim_scores = numpy.round(rand_home_wr1, 2).tolist()
-        home_wr1.median = numpy.median(home_wr1.sim_scores)
-        home_wr1.s20 = numpy.percentile(home_wr1.sim_scores, 20)
-        home_wr1.s75 = numpy.percentile(home_wr1.sim_scores, 75)
-        home_wr1.s90 = numpy.percentile(home_wr1.sim_scores, 90)
-        home_wr1.save()
-        home_wr2.sim_scores = numpy.round(rand_home_wr2, 2).tolist()
-        home_wr2.median = numpy.median(home_wr2.sim_scores)
-        home_wr2.s20 = numpy.percentile(home_wr2.sim_scores, 20)
-        home_wr2.s75 = numpy.percentile(home_wr2.sim_scores, 75)
-        home_wr2.s90 = numpy.percentile(home_wr2.sim_scores, 90)
-        home_wr2.save()
-        if home_wr3:
-            home_wr3.sim_scores = numpy.round(rand_home_wr3, 2).tolist()
-            home_wr3.median = numpy.median(home_wr3.sim_scores)
-            home_wr3.s20 = numpy.percentile(home_wr3.sim_scores, 20)
-            home_wr3.s75 = numpy.percentile(home_wr3.sim_scores, 75)
-            home_wr3.s90 = numpy.percentile(home_wr3.sim_scores, 90)
-            home_wr3.save()
-        if home_wr4:
-            home_wr4.sim_scores = numpy.round(rand_home_wr4, 2).tolist()
-            home_wr4.median = numpy.median(home_wr4.sim_scores)
-            home_wr4.s20 = numpy.percentile(home_wr4.sim_scores, 20)
-            home_wr4.s75 = numpy.percentile(home_wr4.sim_scores, 75)
-            home_wr4.s90 = numpy.percentile(home_wr4.sim_scores, 90)
-            home_wr4.save()
-        if home_wr5:
-            home_wr5.sim_scores = numpy.round(rand_home_wr5, 2).tolist()
-            home_wr5.median = numpy.median(home_wr5.sim_scores)
-            home_wr5.s20 = numpy.percentile(home_wr5.sim_scores, 20)
-            home_wr5.s75 = numpy.percentile(home_wr5.sim_scores, 75)
-            home_wr5.s90 = numpy.percentile(home_wr5.sim_scores, 90)
-            home_wr5.save()
-        home_te1.sim_scores = numpy.round(rand_home_te1, 2).tolist()
-        home_te1.median = numpy.median(home_te1.sim_scores)
-        home_te1.s20 = numpy.percentile(home_te1.sim_scores, 20)
-        home_te1.s75 = numpy.percentile(home_te1.sim_scores, 75)
-        home_te1.s90 = numpy.percentile(home_te1.sim_scores, 90)
-        home_te1.save()
-        if home_te2:
-            home_te2.sim_scores = numpy.round(rand_home_te2, 2).tolist()
-            home_te2.median = numpy.median(home_te2.sim_scores)
-            home_te2.s20 = numpy.percentile(home_te2.sim_scores, 20)
-            home_te2.s75 = numpy.percentile(home_te2.sim_scores, 75)
-            home_te2.s90 = numpy.percentile(home_te2.sim_scores, 90)
-            home_te2.save()
-        if home_k:
-            home_k.sim_scores = numpy.round(rand_home_k, 2).tolist()
-            home_k.median = numpy.median(home_k.sim_scores)
-            home_k.s20 = numpy.percentile(home_k.sim_scores, 20)
-            home_k.s75 = numpy.percentile(home_k.sim_scores, 75)
-            home_k.s90 = numpy.percentile(home_k.sim_scores, 90)
-            home_k.save()
-        home_dst.sim_scores = numpy.round(rand_home_dst, 2).tolist()
-        home_dst.median = numpy.median(home_dst.sim_scores)
-        home_dst.s20 = numpy.percentile(home_dst.sim_scores, 20)
-        home_dst.s75 = numpy.percentile(home_dst.sim_scores, 75)
-        home_dst.s90 = numpy.percentile(home_dst.sim_scores, 90)
-        home_dst.save()
-        away_qb.sim_scores = numpy.round(rand_away_qb, 2).tolist()
-        away_qb.median = numpy.median(away_qb.sim_scores)
-        away_qb.s20 = numpy.percentile(away_qb.sim_scores, 20)
-        away_qb.s75 = numpy.percentile(away_qb.sim_scores, 75)
-        away_qb.s90 = numpy.percentile(away_qb.sim_scores, 90)
-        away_qb.save()
-        away_rb1.sim_scores = numpy.round(rand_away_rb1, 2).tolist()
-        away_rb1.median = numpy.median(away_rb1.sim_scores)
-        away_rb1.s20 = numpy.percentile(away_rb1.sim_scores, 20)
-        away_rb1.s75 = numpy.percentile(away_rb1.sim_scores, 75)
-        away_rb1.s90 = numpy.percentile(away_rb1.sim_scores, 90)
-        away_rb1.save()
-        if away_rb2:
-            away_rb2.sim_scores = numpy.round(rand_away_rb2, 2).tolist()
-            away_rb2.median = numpy.median(away_rb2.sim_scores)
-            away_rb2.s20 = numpy.percentile(away_rb2.sim_scores, 20)
-            away_rb2.s75 = numpy.percentile(away_rb2.sim_scores, 75)
-            away_rb2.s90 = numpy.percentile(away_rb2.sim_scores, 90)
-            away_rb2.save()
-        if away_rb3:
-            away_rb3.sim_scores = numpy.round(rand_away_rb3, 2).tolist()
-            away_rb3.median = numpy.median(away_rb3.sim_scores)
-            away_rb3.s20 = numpy.percentile(away_rb3.sim_scores, 20)
-            away_rb3.s75 = numpy.percentile(away_rb3.sim_scores, 75)
-            away_rb3.s90 = numpy.percentile(away_rb3.sim_scores, 90)
-            away_rb3.save()
-        away_wr1.sim_scores = numpy.round(rand_away_wr1, 2).tolist()
-        away_wr1.median = numpy.median(away_wr1.sim_scores)
-        away_wr1.s20 = numpy.percentile(away_wr1.sim_scores, 20)
-        away_wr1.s75 = numpy.percentile(away_wr1.sim_scores, 75)
-        away_wr1.s90 = numpy.percentile(away_wr1.sim_scores, 90)
-        away_wr1.save()
-        away_wr2.sim_scores = numpy.round(rand_away_wr2, 2).tolist()
-        away_wr2.median = numpy.median(away_wr2.sim_scores)
-        away_wr2.s20 = numpy.percentile(away_wr2.sim_scores, 20)
-        away_wr2.s75 = numpy.percentile(away_wr2.sim_scores, 75)
-        away_wr2.s90 = numpy.percentile(away_wr2.sim_scores, 90)
-        away_wr2.save()
-        if away_wr3:
-            away_wr3.sim_scores = numpy.round(rand_away_wr3, 2).tolist()
-            away_wr3.median = numpy.median(away_wr3.sim_scores)
-            away_wr3.s20 = numpy.percentile(away_wr3.sim_scores, 20)
-            away_wr3.s75 = numpy.percentile(away_wr3.sim_scores, 75)
-            away_wr3.s90 = numpy.percentile(away_wr3.sim_scores, 90)
-            away_wr3.save()
-        if away_wr4:
-            away_wr4.sim_scores = numpy.round(rand_away_wr4, 2).tolist()
-            away_wr4.median = numpy.median(away_wr4.sim_scores)
-            away_wr4.s20 = numpy.percentile(away_wr4.sim_scores, 20)
-            away_wr4.s75 = numpy.percentile(away_wr4.sim_scores, 75)
-            away_wr4.s90 = numpy.percentile(away_wr4.sim_scores, 90)
-            away_wr4.save()
-        if away_wr5:
-            away_wr5.sim_scores = numpy.round(rand_away_wr5, 2).tolist()
-            away_wr5.median = numpy.median(away_wr5.sim_scores)
-            away_wr5.s20 = numpy.percentile(away_wr5.sim_scores, 20)
-            away_wr5.s75 = numpy.percentile(away_wr5.sim_scores, 75)
-            away_wr5.s90 = numpy.percentile(away_wr5.sim_scores, 90)
-            away_wr5.save()
-        away_te1.sim_scores = numpy.round(rand_away_te1, 2).tolist()
-        away_te1.median = numpy.median(away_te1.sim_scores)
-        away_te1.s20 = numpy.percentile(away_te1.sim_scores, 20)
-        away_te1.s75 = numpy.percentile(away_te1.sim_scores, 75)
-        away_te1.s90 = numpy.percentile(away_te1.sim_scores, 90)
-        away_te1.save()
-        if away_te2:
-            away_te2.sim_scores = numpy.round(rand_away_te2, 2).tolist()
-            away_te2.median = numpy.median(away_te2.sim_scores)
-            away_te2.s20 = numpy.percentile(away_te2.sim_scores, 20)
-            away_te2.s75 = numpy.percentile(away_te2.sim_scores, 75)
-            away_te2.s90 = numpy.percentile(away_te2.sim_scores, 90)
-            away_te2.save()
-        if away_k:
-            away_k.sim_scores = numpy.round(rand_away_k, 2).tolist()
-            away_k.median = numpy.median(away_k.sim_scores)
-            away_k.s20 = numpy.percentile(away_k.sim_scores, 20)
-            away_k.s75 = numpy.percentile(away_k.sim_scores, 75)
-            away_k.s90 = numpy.percentile(away_k.sim_scores, 90)
-            away_k.save()
-        away_dst.sim_scores = numpy.round(rand_away_dst, 2).tolist()
-        away_dst.median = numpy.median(away_dst.sim_scores)
-        away_dst.s20 = numpy.percentile(away_dst.sim_scores, 20)
-        away_dst.s75 = numpy.percentile(away_dst.sim_scores, 75)
-        away_dst.s90 = numpy.percentile(away_dst.sim_scores, 90)
-        away_dst.save()
-        
-        # assign outcomes to captains if necessary
-        cpt_home_players = models.SlatePlayerProjection.objects.filter(slate_player__id__in=game.get_home_players().values_list('id', flat=True)).filter(slate_player__roster_position__in=['CPT', 'MVP'])
-        cpt_away_players = models.SlatePlayerProjection.objects.filter(slate_player__id__in=game.get_away_players().values_list('id', flat=True)).filter(slate_player__roster_position__in=['CPT', 'MVP'])
-
-        cpt_home_qbs = cpt_home_players.filter(slate_player__site_pos='QB').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-        cpt_home_rbs = cpt_home_players.filter(slate_player__site_pos='RB').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-        cpt_home_wrs = cpt_home_players.filter(slate_player__site_pos='WR').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-        cpt_home_tes = cpt_home_players.filter(slate_player__site_pos='TE').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-        cpt_home_ks = cpt_home_players.filter(slate_player__site_pos='K').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-        cpt_home_dsts = cpt_home_players.filter(slate_player__site_pos=dst_label).exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-
-        if cpt_home_qbs.count() > 0:
-            cpt_home_qb = cpt_home_qbs[0]
-        if cpt_home_rbs.count() > 0:
-            cpt_home_rb1 = cpt_home_rbs[0]
-        if cpt_home_rbs.count() > 1:
-            cpt_home_rb2 = cpt_home_rbs[1]
-        if cpt_home_rbs.count() > 2:
-            cpt_home_rb3 = cpt_home_rbs[2]
-        if cpt_home_wrs.count() > 0:
-            cpt_home_wr1 = cpt_home_wrs[0]
-        if cpt_home_wrs.count() > 1:
-            cpt_home_wr2 = cpt_home_wrs[1]
-        if cpt_home_wrs.count() > 2:
-            cpt_home_wr3 = cpt_home_wrs[2]
-        if cpt_home_wrs.count() > 3:
-            cpt_home_wr4 = cpt_home_wrs[3]
-        if cpt_home_wrs.count() > 4:
-            cpt_home_wr5 = cpt_home_wrs[4]
-        if cpt_home_tes.count() > 0:
-            cpt_home_te1 = cpt_home_tes[0]
-        if cpt_home_tes.count() > 1:
-            cpt_home_te2 = cpt_home_tes[1]
-        if cpt_home_ks.count() > 0:
-            cpt_home_k = cpt_home_ks[0]
-        if cpt_home_dsts.count() > 0:
-            cpt_home_dst = cpt_home_dsts[0]
-
-        cpt_away_qbs = cpt_away_players.filter(slate_player__site_pos='QB').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-        cpt_away_rbs = cpt_away_players.filter(slate_player__site_pos='RB').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-        cpt_away_wrs = cpt_away_players.filter(slate_player__site_pos='WR').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-        cpt_away_tes = cpt_away_players.filter(slate_player__site_pos='TE').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-        cpt_away_ks = cpt_away_players.filter(slate_player__site_pos='K').exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-        cpt_away_dsts = cpt_away_players.filter(slate_player__site_pos=dst_label).exclude(projection__lte=0.0).exclude(stdev__lte=0.0).order_by('-projection', '-slate_player__salary')
-
-        if cpt_away_qbs.count() > 0:
-            cpt_away_qb = cpt_away_qbs[0]
-        if cpt_away_rbs.count() > 0:
-            cpt_away_rb1 = cpt_away_rbs[0]
-        if cpt_away_rbs.count() > 1:
-            cpt_away_rb2 = cpt_away_rbs[1]
-        if cpt_away_rbs.count() > 2:
-            cpt_away_rb3 = cpt_away_rbs[2]
-        if cpt_away_wrs.count() > 0:
-            cpt_away_wr1 = cpt_away_wrs[0]
-        if cpt_away_wrs.count() > 1:
-            cpt_away_wr2 = cpt_away_wrs[1]
-        if cpt_away_wrs.count() > 2:
-            cpt_away_wr3 = cpt_away_wrs[2]
-        if cpt_away_wrs.count() > 3:
-            cpt_away_wr4 = cpt_away_wrs[3]
-        if cpt_away_wrs.count() > 4:
-            cpt_away_wr5 = cpt_away_wrs[4]
-        if cpt_away_tes.count() > 0:
-            cpt_away_te1 = cpt_away_tes[0]
-        if cpt_away_tes.count() > 1:
-            cpt_away_te2 = cpt_away_tes[1]
-        if cpt_away_ks.count() > 0:
-            cpt_away_k = cpt_away_ks[0]
-        if cpt_away_dsts.count() > 0:
-            cpt_away_dst = cpt_away_dsts[0]
-
-        if cpt_home_qb:
-            cpt_home_qb.sim_scores = (numpy.round(rand_home_qb, 2) * 1.5).tolist()
-            cpt_home_qb.median = numpy.median(cpt_home_qb.sim_scores)
-            cpt_home_qb.s20 = numpy.percentile(cpt_home_qb.sim_scores, 20)
-            cpt_home_qb.s75 = numpy.percentile(cpt_home_qb.sim_scores, 75)
-            cpt_home_qb.s90 = numpy.percentile(cpt_home_qb.sim_scores, 90)
-            cpt_home_qb.save()
-        if cpt_home_rb1:
-            cpt_home_rb1.sim_scores = (numpy.round(rand_home_rb1, 2) * 1.5).tolist()
-            cpt_home_rb1.median = numpy.median(cpt_home_rb1.sim_scores)
-            cpt_home_rb1.s20 = numpy.percentile(cpt_home_rb1.sim_scores, 20)
-            cpt_home_rb1.s75 = numpy.percentile(cpt_home_rb1.sim_scores, 75)
-            cpt_home_rb1.s90 = numpy.percentile(cpt_home_rb1.sim_scores, 90)
-            cpt_home_rb1.save()
-        if cpt_home_rb2:
-            cpt_home_rb2.sim_scores = (numpy.round(rand_home_rb2, 2) * 1.5).tolist()
-            cpt_home_rb2.median = numpy.median(cpt_home_rb2.sim_scores)
-            cpt_home_rb2.s20 = numpy.percentile(cpt_home_rb2.sim_scores, 20)
-            cpt_home_rb2.s75 = numpy.percentile(cpt_home_rb2.sim_scores, 75)
-            cpt_home_rb2.s90 = numpy.percentile(cpt_home_rb2.sim_scores, 90)
-            cpt_home_rb2.save()
-        if cpt_home_rb3:
-            cpt_home_rb3.sim_scores = (numpy.round(rand_home_rb3, 2) * 1.5).tolist()
-            cpt_home_rb3.median = numpy.median(cpt_home_rb3.sim_scores)
-            cpt_home_rb3.s20 = numpy.percentile(cpt_home_rb3.sim_scores, 20)
-            cpt_home_rb3.s75 = numpy.percentile(cpt_home_rb3.sim_scores, 75)
-            cpt_home_rb3.s90 = numpy.percentile(cpt_home_rb3.sim_scores, 90)
-            cpt_home_rb3.save()
-        if cpt_home_wr1:
-            cpt_home_wr1.sim_scores = (numpy.round(rand_home_wr1, 2) * 1.5).tolist()
-            cpt_home_wr1.median = numpy.median(cpt_home_wr1.sim_scores)
-            cpt_home_wr1.s20 = numpy.percentile(cpt_home_wr1.sim_scores, 20)
-            cpt_home_wr1.s75 = numpy.percentile(cpt_home_wr1.sim_scores, 75)
-            cpt_home_wr1.s90 = numpy.percentile(cpt_home_wr1.sim_scores, 90)
-            cpt_home_wr1.save()
-        if cpt_home_wr2:
-            cpt_home_wr2.sim_scores = (numpy.round(rand_home_wr2, 2) * 1.5).tolist()
-            cpt_home_wr2.median = numpy.median(cpt_home_wr2.sim_scores)
-            cpt_home_wr2.s20 = numpy.percentile(cpt_home_wr2.sim_scores, 20)
-            cpt_home_wr2.s75 = numpy.percentile(cpt_home_wr2.sim_scores, 75)
-            cpt_home_wr2.s90 = numpy.percentile(cpt_home_wr2.sim_scores, 90)
-            cpt_home_wr2.save()
-        if cpt_home_wr3:
-            cpt_home_wr3.sim_scores = (numpy.round(rand_home_wr3, 2) * 1.5).tolist()
-            cpt_home_wr3.median = numpy.median(cpt_home_wr3.sim_scores)
-            cpt_home_wr3.s20 = numpy.percentile(cpt_home_wr3.sim_scores, 20)
-            cpt_home_wr3.s75 = numpy.percentile(cpt_home_wr3.sim_scores, 75)
-            cpt_home_wr3.s90 = numpy.percentile(cpt_home_wr3.sim_scores, 90)
-            cpt_home_wr3.save()
-        if cpt_home_wr4:
-            cpt_home_wr4.sim_scores = (numpy.round(rand_home_wr4, 2) * 1.5).tolist()
-            cpt_home_wr4.median = numpy.median(cpt_home_wr4.sim_scores)
-            cpt_home_wr4.s20 = numpy.percentile(cpt_home_wr4.sim_scores, 20)
-            cpt_home_wr4.s75 = numpy.percentile(cpt_home_wr4.sim_scores, 75)
-            cpt_home_wr4.s90 = numpy.percentile(cpt_home_wr4.sim_scores, 90)
-            cpt_home_wr4.save()
-        if cpt_home_wr5:
-            cpt_home_wr5.sim_scores = (numpy.round(rand_home_wr5, 2) * 1.5).tolist()
-            cpt_home_wr5.median = numpy.median(cpt_home_wr5.sim_scores)
-            cpt_home_wr5.s20 = numpy.percentile(cpt_home_wr5.sim_scores, 20)
-            cpt_home_wr5.s75 = numpy.percentile(cpt_home_wr5.sim_scores, 75)
-            cpt_home_wr5.s90 = numpy.percentile(cpt_home_wr5.sim_scores, 90)
-            cpt_home_wr5.save()
-        if cpt_home_te1:
-            cpt_home_te1.sim_scores = (numpy.round(rand_home_te1, 2) * 1.5).tolist()
-            cpt_home_te1.median = numpy.median(cpt_home_te1.sim_scores)
-            cpt_home_te1.s20 = numpy.percentile(cpt_home_te1.sim_scores, 20)
-            cpt_home_te1.s75 = numpy.percentile(cpt_home_te1.sim_scores, 75)
-            cpt_home_te1.s90 = numpy.percentile(cpt_home_te1.sim_scores, 90)
-            cpt_home_te1.save()
-        if cpt_home_te2:
-            cpt_home_te2.sim_scores = (numpy.round(rand_home_te2, 2) * 1.5).tolist()
-            cpt_home_te2.median = numpy.median(cpt_home_te2.sim_scores)
-            cpt_home_te2.s20 = numpy.percentile(cpt_home_te2.sim_scores, 20)
-            cpt_home_te2.s75 = numpy.percentile(cpt_home_te2.sim_scores, 75)
-            cpt_home_te2.s90 = numpy.percentile(cpt_home_te2.sim_scores, 90)
-            cpt_home_te2.save()
-        if cpt_home_k:
-            cpt_home_k.sim_scores = (numpy.round(rand_home_k, 2) * 1.5).tolist()
-            cpt_home_k.median = numpy.median(cpt_home_k.sim_scores)
-            cpt_home_k.s20 = numpy.percentile(cpt_home_k.sim_scores, 20)
-            cpt_home_k.s75 = numpy.percentile(cpt_home_k.sim_scores, 75)
-            cpt_home_k.s90 = numpy.percentile(cpt_home_k.sim_scores, 90)
-            cpt_home_k.save()
-
-        if cpt_home_dst:
-            cpt_home_dst.sim_scores = (numpy.round(rand_home_dst, 2) * 1.5).tolist()
-            cpt_home_dst.median = numpy.median(cpt_home_dst.sim_scores)
-            cpt_home_dst.s20 = numpy.percentile(cpt_home_dst.sim_scores, 20)
-            cpt_home_dst.s75 = numpy.percentile(cpt_home_dst.sim_scores, 75)
-            cpt_home_dst.s90 = numpy.percentile(cpt_home_dst.sim_scores, 90)
-            cpt_home_dst.save()
-
-        if cpt_away_qb:
-            cpt_away_qb.sim_scores = (numpy.round(rand_away_qb, 2) * 1.5).tolist()
-            cpt_away_qb.median = numpy.median(cpt_away_qb.sim_scores)
-            cpt_away_qb.s20 = numpy.percentile(cpt_away_qb.sim_scores, 20)
-            cpt_away_qb.s75 = numpy.percentile(cpt_away_qb.sim_scores, 75)
-            cpt_away_qb.s90 = numpy.percentile(cpt_away_qb.sim_scores, 90)
-            cpt_away_qb.save()
-        if cpt_away_rb1:
-            cpt_away_rb1.sim_scores = (numpy.round(rand_away_rb1, 2) * 1.5).tolist()
-            cpt_away_rb1.median = numpy.median(cpt_away_rb1.sim_scores)
-            cpt_away_rb1.s20 = numpy.percentile(cpt_away_rb1.sim_scores, 20)
-            cpt_away_rb1.s75 = numpy.percentile(cpt_away_rb1.sim_scores, 75)
-            cpt_away_rb1.s90 = numpy.percentile(cpt_away_rb1.sim_scores, 90)
-            cpt_away_rb1.save()
-        if cpt_away_rb2:
-            cpt_away_rb2.sim_scores = (numpy.round(rand_away_rb2, 2) * 1.5).tolist()
-            cpt_away_rb2.median = numpy.median(cpt_away_rb2.sim_scores)
-            cpt_away_rb2.s20 = numpy.percentile(cpt_away_rb2.sim_scores, 20)
-            cpt_away_rb2.s75 = numpy.percentile(cpt_away_rb2.sim_scores, 75)
-            cpt_away_rb2.s90 = numpy.percentile(cpt_away_rb2.sim_scores, 90)
-            cpt_away_rb2.save()
-        if cpt_away_rb3:
-            cpt_away_rb3.sim_scores = (numpy.round(rand_away_rb3, 2) * 1.5).tolist()
-            cpt_away_rb3.median = numpy.median(cpt_away_rb3.sim_scores)
-            cpt_away_rb3.s20 = numpy.percentile(cpt_away_rb3.sim_scores, 20)
-            cpt_away_rb3.s75 = numpy.percentile(cpt_away_rb3.sim_scores, 75)
-            cpt_away_rb3.s90 = numpy.percentile(cpt_away_rb3.sim_scores, 90)
-            cpt_away_rb3.save()
-        if cpt_away_wr1:
-            cpt_away_wr1.sim_scores = (numpy.round(rand_away_wr1, 2) * 1.5).tolist()
-            cpt_away_wr1.median = numpy.median(cpt_away_wr1.sim_scores)
-            cpt_away_wr1.s20 = numpy.percentile(cpt_away_wr1.sim_scores, 20)
-            cpt_away_wr1.s75 = numpy.percentile(cpt_away_wr1.sim_scores, 75)
-            cpt_away_wr1.s90 = numpy.percentile(cpt_away_wr1.sim_scores, 90)
-            cpt_away_wr1.save()
-        if cpt_away_wr2:
-            cpt_away_wr2.sim_scores = (numpy.round(rand_away_wr2, 2) * 1.5).tolist()
-            cpt_away_wr2.median = numpy.median(cpt_away_wr2.sim_scores)
-            cpt_away_wr2.s20 = numpy.percentile(cpt_away_wr2.sim_scores, 20)
-            cpt_away_wr2.s75 = numpy.percentile(cpt_away_wr2.sim_scores, 75)
-            cpt_away_wr2.s90 = numpy.percentile(cpt_away_wr2.sim_scores, 90)
-            cpt_away_wr2.save()
-        if cpt_away_wr3:
-            cpt_away_wr3.sim_scores = (numpy.round(rand_away_wr3, 2) * 1.5).tolist()
-            cpt_away_wr3.median = numpy.median(cpt_away_wr3.sim_scores)
-            cpt_away_wr3.s20 = numpy.percentile(cpt_away_wr3.sim_scores, 20)
-            cpt_away_wr3.s75 = numpy.percentile(cpt_away_wr3.sim_scores, 75)
-            cpt_away_wr3.s90 = numpy.percentile(cpt_away_wr3.sim_scores, 90)
-            cpt_away_wr3.save()
-        if cpt_away_wr4:
-            cpt_away_wr4.sim_scores = (numpy.round(rand_away_wr4, 2) * 1.5).tolist()
-            cpt_away_wr4.median = numpy.median(cpt_away_wr4.sim_scores)
-            cpt_away_wr4.s20 = numpy.percentile(cpt_away_wr4.sim_scores, 20)
-            cpt_away_wr4.s75 = numpy.percentile(cpt_away_wr4.sim_scores, 75)
-            cpt_away_wr4.s90 = numpy.percentile(cpt_away_wr4.sim_scores, 90)
-            cpt_away_wr4.save()
-        try:
-            if cpt_away_wr5:
-                cpt_away_wr5.sim_scores = (numpy.round(rand_away_wr5, 2) * 1.5).tolist()
-                cpt_away_wr5.median = numpy.median(cpt_away_wr5.sim_scores)
-                cpt_away_wr5.s20 = numpy.percentile(cpt_away_wr5.sim_scores, 20)
-                cpt_away_wr5.s75 = numpy.percentile(cpt_away_wr5.sim_scores, 75)
-                cpt_away_wr5.s90 = numpy.percentile(cpt_away_wr5.sim_scores, 90)
-                cpt_away_wr5.save()
-        except:
-            pass
-        if cpt_away_te1:
-            cpt_away_te1.sim_scores = (numpy.round(rand_away_te1, 2) * 1.5).tolist()
-            cpt_away_te1.median = numpy.median(cpt_away_te1.sim_scores)
-            cpt_away_te1.s20 = numpy.percentile(cpt_away_te1.sim_scores, 20)
-            cpt_away_te1.s75 = numpy.percentile(cpt_away_te1.sim_scores, 75)
-            cpt_away_te1.s90 = numpy.percentile(cpt_away_te1.sim_scores, 90)
-            cpt_away_te1.save()
-        if cpt_away_te2:
-            cpt_away_te2.sim_scores = (numpy.round(rand_away_te2, 2) * 1.5).tolist()
-            cpt_away_te2.median = numpy.median(cpt_away_te2.sim_scores)
-            cpt_away_te2.s20 = numpy.percentile(cpt_away_te2.sim_scores, 20)
-            cpt_away_te2.s75 = numpy.percentile(cpt_away_te2.sim_scores, 75)
-            cpt_away_te2.s90 = numpy.percentile(cpt_away_te2.sim_scores, 90)
-            cpt_away_te2.save()
-        if cpt_away_k:
-            cpt_away_k.sim_scores = (numpy.round(rand_away_k, 2) * 1.5).tolist()
-            cpt_away_k.median = numpy.median(cpt_away_k.sim_scores)
-            cpt_away_k.s20 = numpy.percentile(cpt_away_k.sim_scores, 20)
-            cpt_away_k.s75 = numpy.percentile(cpt_away_k.sim_scores, 75)
-            cpt_away_k.s90 = numpy.percentile(cpt_away_k.sim_scores, 90)
-            cpt_away_k.save()
-        if cpt_away_dst:
-            cpt_away_dst.sim_scores = (numpy.round(rand_away_dst, 2) * 1.5).tolist()
-            cpt_away_dst.median = numpy.median(cpt_away_dst.sim_scores)
-            cpt_away_dst.s20 = numpy.percentile(cpt_away_dst.sim_scores, 20)
-            cpt_away_dst.s75 = numpy.percentile(cpt_away_dst.sim_scores, 75)
-            cpt_away_dst.s90 = numpy.percentile(cpt_away_dst.sim_scores, 90)
-            cpt_away_dst.save()
+        for _, rand_U in simulation.sample_game_copulas([game.id], [r_df.to_numpy()], models.SIM_ITERATIONS, seed):
+            simulate_game_with_copula(game, rand_U)
 
         task.status = 'success'
         task.content = f'Simulation of {game} complete.'
@@ -3416,6 +1310,67 @@ def simulate_game(game_id, task_id):
         logger.exception("error info: " + str(sys.exc_info()[1]) + "\n" + str(sys.exc_info()[2]))
 
 
+@shared_task
+def simulate_games(game_ids, task_id, seed=None):
+    task = None
+
+    try:
+        try:
+            task = BackgroundTask.objects.get(id=task_id)
+        except BackgroundTask.DoesNotExist:
+            time.sleep(0.2)
+            task = BackgroundTask.objects.get(id=task_id)
+
+        games = list(models.SlateGame.objects.filter(id__in=game_ids).select_related('slate', 'game').order_by('id'))
+        failed = []
+
+        # a game whose matrix can't be built or factored is reported and the rest are still simulated
+        valid_games = []
+        corrs = []
+        for game in games:
+            try:
+                corr = get_corr_matrix(game, game.slate.is_showdown).to_numpy()
+                simulation.get_copula_factor(corr)
+            except Exception as e:
+                logger.exception(f'Could not build the correlation matrix of {game}')
+                failed.append(f'{game} ({e})')
+                continue
+
+            valid_games.append(game)
+            corrs.append(corr)
+
+        # games on the same static matrix share its copula factor and are sampled together
+        for count, (position, rand_U) in enumerate(simulation.sample_game_copulas([game.id for game in valid_games], corrs, models.SIM_ITERATIONS, seed)):
+            game = valid_games[position]
+            logger.info(game)
+
+            try:
+                simulate_game_with_copula(game, rand_U)
+            except Exception as e:
+                logger.exception(f'Could not simulate {game}')
+                failed.append(f'{game} ({e})')
+
+            task.pct_complete = (count + 1) / len(valid_games)
+            task.save(update_fields=['pct_complete'])
+
+        if len(failed) > 0:
+            task.status = 'warning'
+            task.content = f'{len(games) - len(failed)} of {len(games)} games simulated. Failed: {", ".join(failed)}'
+        else:
+            task.status = 'success'
+            task.content = f'Simulation of {len(games)} games complete.'
+        task.save()
+        
+    except Exception as e:
+        if task is not None:
+            task.status = 'error'
+            task.content = f'There was a problem simulating games: {e}'
+            task.save()
+
+        logger.error("Unexpected error: " + str(sys.exc_info()[0]))
+        logger.exception("error info: " + str(sys.exc_info()[1]) + "\n" + str(sys.exc_info()[2]))
+
+
 @shared_task
 def flatten_base_projections(slate_id, task_id):
     task = None
@@ -3586,9 +1541,9 @@ def optimize_for_ownership(projection_site, build_id, raw_projections, num_lineu
 
     # get the player outcomes
     for p in build.slate.get_projections().filter(slate_player__id__in=r_proj.values_list('slate_player__id', flat=True)):
-        player_sim_scores[p.slate_player.player_id] = p.sim_scores
-        if p.sim_scores is not None and len(p.sim_scores) > models.SIM_ITERATIONS:
-            logger.info(f'{p} has {len(p.sim_scores)} outcomes.')
+        player_sim_scores[p.slate_player.player_id] = sim_store.get_sim_outcomes(p)
+        if player_sim_scores[p.slate_player.player_id] is not None and len(player_sim_scores[p.slate_player.player_id]) > models.SIM_ITERATIONS:
+            logger.info(f'{p} has {len(player_sim_scores[p.slate_player.player_id])} outcomes.')
 
     if build.slate.is_showdown:
         lineups = optimize.optimize_for_showdown(
@@ -3616,12 +1571,12 @@ def optimize_for_ownership(projection_site, build_id, raw_projections, num_lineu
 @shared_task
 def optimize_for_mean_projection(build_id, num_lineups, add_to_field=True):
     build = models.FindWinnerBuild.objects.get(id=build_id)
-    projections = build.slate.get_projections().filter(projection__gte=0.5).exclude(sim_scores=None)
+    projections = build.slate.get_projections().filter(projection__gte=0.5).exclude(sim_scores=None, sim_outcomes=None)
     player_sim_scores = {}
 
     # get the player outcomes
     for p in projections:
-        player_sim_scores[p.slate_player.player_id] = p.sim_scores
+        player_sim_scores[p.slate_player.player_id] = sim_store.get_sim_outcomes(p)
 
     if build.slate.is_showdown:
         lineups = optimize.optimize_for_showdown(
@@ -3649,12 +1604,12 @@ def optimize_for_mean_projection(build_id, num_lineups, add_to_field=True):
 @shared_task
 def optimize_for_locked_captain(build_id, num_lineups, locked_captain_id, add_to_field=True):
     build = models.FindWinnerBuild.objects.get(id=build_id)
-    projections = build.slate.get_projections().filter(projection__gte=0.5).exclude(sim_scores=None)
+    projections = build.slate.get_projections().filter(projection__gte=0.5).exclude(sim_scores=None, sim_outcomes=None)
     player_sim_scores = {}
 
     # get the player outcomes
     for p in projections:
-        player_sim_scores[p.slate_player.player_id] = p.sim_scores
+        player_sim_scores[p.slate_player.player_id] = sim_store.get_sim_outcomes(p)
     
     lineups = optimize.optimize_for_showdown(
         build.slate.site,
@@ -3781,7 +1736,7 @@ def make_classic_lineups(build, lineups, player_sim_scores, projection_site, add
             # score the lineup
             sim_scores = numpy.array(player_sim_scores[qb], dtype=numpy.float64) + numpy.array(player_sim_scores[rb1], dtype=numpy.float64) + numpy.array(player_sim_scores[rb2], dtype=numpy.float64) + numpy.array(player_sim_scores[wr1], dtype=numpy.float64) + numpy.array(player_sim_scores[wr2], dtype=numpy.float64) + numpy.array(player_sim_scores[wr3], dtype=numpy.float64) + numpy.array(player_sim_scores[te], dtype=numpy.float64) + numpy.array(player_sim_scores[flex], dtype=numpy.float64) + numpy.array(player_sim_scores[dst], dtype=numpy.float64)
             
-            slate_lineup.sim_scores = sim_scores.tolist()
+            sim_store.set_sim_outcomes(slate_lineup, sim_scores)
             slate_lineup.save()
 
             slate_lineup = [slate_lineup]
@@ -3842,7 +1797,7 @@ def make_sd_lineups(build, lineups, player_sim_scores, add_to_field=True):
             )
             slate_lineup.simulate()
             
-            slate_lineup.sim_scores = sim_scores.tolist()
+            sim_store.set_sim_outcomes(slate_lineup, sim_scores)
             slate_lineup.save()
 
             slate_lineup = [slate_lineup]
@@ -3874,7 +1829,7 @@ def start_h2h_comparison(build_id, task_id):
         possible_lineups = models.SlateLineup.objects.filter(id__in=field_lineups).order_by('id').values_list('id', flat=True)
     logger.info(f'Filtered slate lineups took {time.time() - start}s. There are {len(possible_lineups)} lineups.')
 
-    chunk_size = 10
+    chunk_size = 250
     chord([
         compare_lineups_h2h.si(possible_lineups[i:i+chunk_size], build.id) for i in range(0, len(possible_lineups), chunk_size)
     ], complete_h2h_workflow.si(task.id))()
@@ -3891,92 +1846,35 @@ def compare_lineups_h2h(lineup_ids, build_id):
     else:
         slate_lineups = models.SlateLineup.objects.filter(id__in=lineup_ids).order_by('id')
         field_lineups = build.field_lineups_to_beat.all().order_by('id')
-    logger.info(f'Getting lineups took {time.time() - start}s')
-    
-    for l in slate_lineups:
-        if l.sim_scores is None:
-            logger.info(f'{l.id} - SIM SCORES ARE NULL')
-    
-    start = time.time()
-    df_slate_lineups = pandas.DataFrame(slate_lineups.values_list('sim_scores', flat=True), index=list(slate_lineups.values_list('id', flat=True)), dtype=numpy.float16)
-    logger.info(f'  Initial dataframe took {time.time() - start}s')
-    logger.info(df_slate_lineups)
 
-    # start = time.time()
-    # field_lineups = build.field_lineups_to_beat.all().order_by('id')
-    # logger.info(f'Getting field lineups took {time.time() - start}s.')
+    slate_lineup_ids, slate_lineup_outcomes = sim_store.load_outcome_matrix(slate_lineups)
+    field_lineup_ids, field_lineup_outcomes = sim_store.load_outcome_matrix(field_lineups, prefix='slate_lineup__')
+    logger.info(f'Getting lineups took {time.time() - start}s. There are {len(slate_lineup_ids)} lineups and {len(field_lineup_ids)} field lineups.')
 
-    start = time.time()
-    df_field_lineups = pandas.DataFrame(field_lineups.values_list('slate_lineup__sim_scores', flat=True), index=list(field_lineups.values_list('id', flat=True)), dtype=numpy.float16)
-    logger.info(f'  Initial dataframe took {time.time() - start}s')
-    logger.info(df_field_lineups)
+    if len(slate_lineup_ids) < len(lineup_ids):
+        logger.info(f'{len(lineup_ids) - len(slate_lineup_ids)} lineups have no sim scores')
 
     start = time.time()
-    matchups  = list(itertools.product(slate_lineups.values_list('id', flat=True), field_lineups.values_list('id', flat=True)))
-    df_matchups = pandas.DataFrame(matchups, columns=['slate_lineup_id', 'field_lineup_id'])
-    df_matchups['win_rate'] = df_matchups.apply(lambda x: numpy.count_nonzero((numpy.array(df_slate_lineups.loc[x['slate_lineup_id']]) - numpy.array(df_field_lineups.loc[x['field_lineup_id']])) > 0.0) / models.SIM_ITERATIONS, axis=1)
-    logger.info(df_matchups)
-    # df_matchups = df_matchups[(df_matchups.win_rate > 0.55)]
+    win_rates = matchups.win_rate_matrix(slate_lineup_outcomes, field_lineup_outcomes)
+    df_matchups = pandas.DataFrame({
+        'slate_lineup_id': numpy.repeat(slate_lineup_ids, len(field_lineup_ids)),
+        'field_lineup_id': numpy.tile(field_lineup_ids, len(slate_lineup_ids)),
+        'win_rate': win_rates.ravel(),
+    })
     df_matchups['build_id'] = build.id
-    logger.info(f'Matchups took {time.time() - start}s. There are {df_matchups.size} matchups.')
+    logger.info(f'Matchups took {time.time() - start}s. There are {len(df_matchups.index)} matchups.')
 
     start = time.time()
+    df_lineups = pandas.DataFrame(matchups.summarize_h2h(win_rates, slate_lineup_outcomes))
+    df_lineups['slate_lineup_id'] = slate_lineup_ids
+    df_lineups['build_id'] = build.id
     if build.slate.is_showdown:
         df_matchups.to_sql('nfl_lineupsdmatchup', engine, if_exists='append', index=False, chunksize=1000)
-        logger.info(f'Write matchups to db took {time.time() - start}s')
-
-        start = time.time()
-        build_lineup_ids = df_matchups.slate_lineup_id.unique()
-        for bl in build_lineup_ids:
-            try:
-                sim_scores = df_slate_lineups.loc[int(bl)].to_list()
-                opponents = list(build.field_sd_lineups_to_beat.all().values_list('opponent_handle', flat=True))
-                opponents = list(set(opponents))
-                win_rates = list(build.sd_matchups.filter(slate_lineup_id=bl).values_list('win_rate', flat=True))
-                rake_free_win_rates = list(filter(lambda wr: wr >= 0.55, win_rates))
-
-                logger.info(rake_free_win_rates)
-                models.WinningSDLineup.objects.create(
-                    build=build,
-                    slate_lineup_id=bl,
-                    median=numpy.median(sim_scores),
-                    s75=numpy.percentile(sim_scores, 75),
-                    s90=numpy.percentile(sim_scores, 90),
-                    win_rate=numpy.median(rake_free_win_rates) if len(rake_free_win_rates) > 0 else 0.0,
-                    win_count=len(rake_free_win_rates) if len(rake_free_win_rates) > 0 else 0.0,
-                    rating=numpy.median(rake_free_win_rates) * (2 * len(rake_free_win_rates)) if len(rake_free_win_rates) > 0 else 0.0
-                )
-            except KeyError:
-                pass
-        logger.info(f'Adding build lineups took {time.time() - start}s')
+        df_lineups.to_sql('nfl_winningsdlineup', engine, if_exists='append', index=False, chunksize=1000)
     else:
         df_matchups.to_sql('nfl_lineupmatchup', engine, if_exists='append', index=False, chunksize=1000)
-        logger.info(f'Write matchups to db took {time.time() - start}s')
-
-        start = time.time()
-        build_lineup_ids = df_matchups.slate_lineup_id.unique()
-        for bl in build_lineup_ids:
-            try:
-                sim_scores = df_slate_lineups.loc[int(bl)].to_list()
-                opponents = list(build.field_lineups_to_beat.all().values_list('opponent_handle', flat=True))
-                opponents = list(set(opponents))
-                win_rates = list(build.matchups.filter(slate_lineup_id=bl).values_list('win_rate', flat=True))
-                rake_free_win_rates = list(filter(lambda wr: wr >= 0.55, win_rates))
-
-                logger.info(rake_free_win_rates)
-                models.WinningLineup.objects.create(
-                    build=build,
-                    slate_lineup_id=bl,
-                    median=numpy.median(sim_scores),
-                    s75=numpy.percentile(sim_scores, 75),
-                    s90=numpy.percentile(sim_scores, 90),
-                    win_rate=numpy.median(rake_free_win_rates) if len(rake_free_win_rates) > 0 else 0.0,
-                    win_count=len(rake_free_win_rates) if len(rake_free_win_rates) > 0 else 0.0,
-                    rating=numpy.median(rake_free_win_rates) * (2 * len(rake_free_win_rates)) if len(rake_free_win_rates) > 0 else 0.0
-                )
-            except KeyError:
-                pass
-        logger.info(f'Adding build lineups took {time.time() - start}s')
+        df_lineups.to_sql('nfl_winninglineup', engine, if_exists='append', index=False, chunksize=1000)
+    logger.info(f'Write matchups and build lineups to db took {time.time() - start}s')
 
 
 @shared_task
@@ -4102,7 +2000,7 @@ def start_non_h2h_comparison(build_id, task_id):
         possible_lineups = models.SlateLineup.objects.filter(slate=build.slate).order_by('id').values_list('id', flat=True)
     logger.info(f'Filtered slate lineups took {time.time() - start}s. There are {len(possible_lineups)} lineups.')
 
-    chunk_size = 1
+    chunk_size = 2000
     chord([
         compare_lineups_se.si(possible_lineups[i:i+chunk_size], build.id) for i in range(0, len(possible_lineups), chunk_size)
     ], complete_se_workflow.si(task.id))()
@@ -4119,45 +2017,31 @@ def compare_lineups_se(lineup_ids, build_id):
     else:
         slate_lineups = models.SlateLineup.objects.filter(id__in=lineup_ids).order_by('id')
         field_lineups = build.field_lineups_to_beat.all().order_by('id')
-    logger.info(f'Getting slate lineups took {time.time() - start}s')
-    
-    for l in slate_lineups:
-        if l.sim_scores is None:
-            logger.info(f'{l.id} - SIM SCORES ARE NULL')
-    
-    start = time.time()
-    df_slate_lineups = pandas.DataFrame(slate_lineups.values_list('sim_scores', flat=True), index=list(slate_lineups.values_list('id', flat=True)), dtype=numpy.float16)
-    logger.info(f'  Initial slate lineups dataframe took {time.time() - start}s')
-    logger.info(df_slate_lineups)
 
-    start = time.time()
-    df_field_lineups = pandas.DataFrame(field_lineups.values_list('slate_lineup__sim_scores', flat=True), index=list(field_lineups.values_list('id', flat=True)), dtype=numpy.float16)
-    logger.info(f'  Initial field lineups dataframe took {time.time() - start}s')
-    logger.info(df_field_lineups)
+    slate_lineup_ids, slate_lineup_outcomes = sim_store.load_outcome_matrix(slate_lineups)
+    field_lineup_ids, field_lineup_outcomes = sim_store.load_outcome_matrix(field_lineups, prefix='slate_lineup__')
+    logger.info(f'Getting lineups took {time.time() - start}s. There are {len(slate_lineup_ids)} lineups and {len(field_lineup_ids)} field lineups.')
 
-    start = time.time()
-    df_matchups = pandas.concat([df_field_lineups, df_slate_lineups])
-    df_matchups = df_matchups.rank(method="min", ascending=False).iloc[field_lineups.count():field_lineups.count()+slate_lineups.count()] <= df_matchups.rank(method="min", ascending=False).iloc[0:field_lineups.count()].min(axis=0)
-    df_matchups['win_count'] = df_matchups.apply(lambda x: numpy.count_nonzero(x), axis=1)
-    df_matchups['win_rate'] = df_matchups['win_count'] / models.SIM_ITERATIONS
-    # df_matchups = df_matchups[(df_matchups.win_rate >= 0.20)]
-
-    df_lineups = df_matchups.filter(['win_rate'], axis=1)
-    if not df_lineups.empty:
-        df_lineups['slate_lineup_id'] = df_lineups.index
-        try:
-            df_lineups['median'] = df_lineups.apply(lambda x: numpy.median(numpy.array(df_slate_lineups.loc[x['slate_lineup_id']])), axis=1)
-            df_lineups['s75'] = df_lineups.apply(lambda x: numpy.percentile(numpy.array(df_slate_lineups.loc[x['slate_lineup_id']]), 75.0), axis=1)
-            df_lineups['s90'] = df_lineups.apply(lambda x: numpy.percentile(numpy.array(df_slate_lineups.loc[x['slate_lineup_id']]), 90.0), axis=1)
-        except:
-            df_lineups['median'] = None
-            df_lineups['s75'] = None
-            df_lineups['s90'] = None
-            logger.info(df_lineups)
-        df_lineups['build_id'] = build.id
-        df_lineups['win_count'] = 0
-        df_lineups['rating'] = 0
+    if len(slate_lineup_ids) < len(lineup_ids):
+        logger.info(f'{len(lineup_ids) - len(slate_lineup_ids)} lineups have no sim scores')
 
+    if len(slate_lineup_ids) == 0:
+        return
+
+    start = time.time()
+    win_counts = matchups.single_entry_win_counts(slate_lineup_outcomes, field_lineup_outcomes)
+    median, s75, s90 = numpy.percentile(slate_lineup_outcomes, [50, 75, 90], axis=1)
+
+    df_lineups = pandas.DataFrame({
+        'slate_lineup_id': slate_lineup_ids,
+        'win_rate': win_counts / slate_lineup_outcomes.shape[1],
+        'win_count': win_counts,
+        'median': median,
+        's75': s75,
+        's90': s90,
+    })
+    df_lineups['build_id'] = build.id
+    df_lineups['rating'] = 0
     logger.info(f'Matchups took {time.time() - start}s.')
 
     start = time.time()
@@ -4601,268 +2485,8 @@ def create_stacks_for_qb(build_id, qb_id, total_qb_projection):
     qb_lineup_count = round(float(qb.projection)/float(total_qb_projection) * float(build.total_lineups))
 
     logger.info('Making stacks for {} {} lineups...'.format(qb_lineup_count, qb.name))
-    stack_players = build.projections.filter(
-        Q(Q(slate_player__site_pos__in=build.configuration.qb_stack_positions) | Q(slate_player__site_pos__in=build.configuration.opp_qb_stack_positions))
-    ).filter(
-        Q(Q(qb_stack_only=True, slate_player__team=qb.team) | Q(opp_qb_stack_only=True, slate_player__team=qb.get_opponent()))
-    )
-
-    # team_players includes all in-play players on same team as qb, including stack-only players
-    team_players = stack_players.filter(slate_player__team=qb.team, slate_player__site_pos__in=build.configuration.qb_stack_positions).order_by('-projection')
-    # opp_players includes all in-play players on opposing team, including stack-only players that are allowed in opponent stack
-    opp_players = stack_players.filter(slate_player__slate_game=qb.game, slate_player__site_pos__in=build.configuration.opp_qb_stack_positions).exclude(slate_player__team=qb.team).order_by('-projection')
-
-    am1_players = team_players.filter(
-        stack_only=True
-    )
-    team_has_all_stack_only = (am1_players.count() == team_players.count())
-
-    if build.configuration.game_stack_size == 3 or opp_players.count() == 0:
-        # For each player, loop over opposing player to make a group for each possible stack combination
-        count = 0
-        for (index, player) in enumerate(team_players):
-            for opp_player in opp_players:
-                count += 1
-
-                # add mini stacks if configured
-                if build.configuration.use_super_stacks:
-                    for game in build.slate.games.all():
-                        if game == qb.game:
-                            continue
-                    
-                        home_players = game.get_home_players()
-                        away_players = game.get_away_players()
-
-                        # First make all mini stacks with 2 home team players
-                        for (idx, home_player_1) in enumerate(build.projections.filter(slate_player__in=home_players, in_play=True, slate_player__site_pos__in=['RB', 'WR', 'TE']).order_by('-projection', 'slate_player__site_pos')):
-                            for home_player_2 in build.projections.filter(slate_player__in=home_players, in_play=True, slate_player__site_pos__in=['RB', 'WR', 'TE']).exclude(slate_player=home_player_1.slate_player).order_by('-projection', 'slate_player__site_pos'):
-                                stack = models.SlateBuildStack.objects.create(
-                                    build=build,
-                                    game=qb.game,
-                                    mini_game=game,
-                                    build_order=count,
-                                    qb=qb,
-                                    player_1=player,
-                                    opp_player=opp_player,
-                                    mini_player_1=home_player_1,
-                                    mini_player_2=home_player_2,
-                                    salary=sum(p.slate_player.salary for p in [qb, player, opp_player, home_player_1, home_player_2]),
-                                    projection=sum(p.projection for p in [qb, player, opp_player, home_player_1, home_player_2])
-                                )
-
-                                if build.stack_construction is not None:
-                                    if build.stack_construction.passes_rule(stack):
-                                        stack.contains_top_pc = stack.contains_top_projected_pass_catcher(build.stack_construction.top_pc_margin)
-                                        stack.save()
-                                    else:
-                                        stack.delete()                                            
-
-                        # Next make all mini stacks with 2 away team players
-                        for (idx, away_player_1) in enumerate(build.projections.filter(slate_player__in=away_players, in_play=True, slate_player__site_pos__in=['RB', 'WR', 'TE']).order_by('-projection', 'slate_player__site_pos')):
-                            for away_player_2 in build.projections.filter(slate_player__in=away_players, in_play=True, slate_player__site_pos__in=['RB', 'WR', 'TE']).exclude(slate_player=away_player_1.slate_player).order_by('-projection', 'slate_player__site_pos'):
-                                stack = models.SlateBuildStack.objects.create(
-                                    build=build,
-                                    game=qb.game,
-                                    mini_game=game,
-                                    build_order=count,
-                                    qb=qb,
-                                    player_1=player,
-                                    opp_player=opp_player,
-                                    mini_player_1=away_player_1,
-                                    mini_player_2=away_player_2,
-                                    salary=sum(p.slate_player.salary for p in [qb, player, opp_player, away_player_1, away_player_2]),
-                                    projection=sum(p.projection for p in [qb, player, opp_player, away_player_1, away_player_2])
-                                )
-
-                                if build.stack_construction is not None:
-                                    if build.stack_construction.passes_rule(stack):
-                                        stack.contains_top_pc = stack.contains_top_projected_pass_catcher(build.stack_construction.top_pc_margin)
-                                        stack.save()
-                                    else:
-                                        stack.delete()                                            
-
-                        # Finally make all mini stacks with players from both teams
-                        for (idx, home_player) in enumerate(build.projections.filter(slate_player__in=home_players, in_play=True, slate_player__site_pos__in=['RB', 'WR', 'TE']).order_by('-projection', 'slate_player__site_pos')):
-                            for away_player in build.projections.filter(slate_player__in=away_players, in_play=True, slate_player__site_pos__in=['RB', 'WR', 'TE']).order_by('-projection', 'slate_player__site_pos'):
-                                stack = models.SlateBuildStack.objects.create(
-                                    build=build,
-                                    game=qb.game,
-                                    mini_game=game,
-                                    build_order=count,
-                                    qb=qb,
-                                    player_1=player,
-                                    opp_player=opp_player,
-                                    mini_player_1=home_player,
-                                    mini_player_2=away_player,
-                                    salary=sum(p.slate_player.salary for p in [qb, player, opp_player, home_player, away_player]),
-                                    projection=sum(p.projection for p in [qb, player, opp_player, home_player, away_player])
-                                )
-
-                                if build.stack_construction is not None:
-                                    if build.stack_construction.passes_rule(stack):
-                                        stack.contains_top_pc = stack.contains_top_projected_pass_catcher(build.stack_construction.top_pc_margin)
-                                        stack.save()
-                                    else:
-                                        stack.delete()                                            
-                else:
-                    stack = models.SlateBuildStack.objects.create(
-                        build=build,
-                        game=qb.game,
-                        build_order=count,
-                        qb=qb,
-                        player_1=player,
-                        opp_player=opp_player,
-                        salary=sum(p.slate_player.salary for p in [qb, player, opp_player]),
-                        projection=sum(p.projection for p in [qb, player, opp_player])
-                    )
-
-                    if build.stack_construction is not None:
-                        if build.stack_construction.passes_rule(stack):
-                            stack.contains_top_pc = stack.contains_top_projected_pass_catcher(build.stack_construction.top_pc_margin)
-                            stack.save()
-                        else:
-                            stack.delete()                                            
-
-            for player2 in team_players[index+1:]:
-                count += 1
-
-                # add mini stacks if configured
-                if build.configuration.use_super_stacks:
-                    for game in build.slate.games.all():
-                        if game == qb.game:
-                            continue
-                    
-                        home_players = game.get_home_players()
-                        away_players = game.get_away_players()
-
-                        # First make all mini stacks with 2 home team players
-                        for (idx, home_player_1) in enumerate(build.projections.filter(slate_player__in=home_players, in_play=True, slate_player__site_pos__in=['RB', 'WR', 'TE']).order_by('-projection', 'slate_player__site_pos')):
-                            for home_player_2 in build.projections.filter(slate_player__in=home_players, in_play=True, slate_player__site_pos__in=['RB', 'WR', 'TE']).exclude(slate_player=home_player_1.slate_player).order_by('-projection', 'slate_player__site_pos'):
-                                stack = models.SlateBuildStack.objects.create(
-                                    build=build,
-                                    game=qb.game,
-                                    mini_game=game,
-                                    build_order=count,
-                                    qb=qb,
-                                    player_1=player,
-                                    player_2=player2,
-                                    mini_player_1=home_player_1,
-                                    mini_player_2=home_player_2,
-                                    salary=sum(p.slate_player.salary for p in [qb, player, opp_player, home_player_1, home_player_2]),
-                                    projection=sum(p.projection for p in [qb, player, opp_player, home_player_1, home_player_2])
-                                )
-
-                                if build.stack_construction is not None:
-                                    if build.stack_construction.passes_rule(stack):
-                                        stack.contains_top_pc = stack.contains_top_projected_pass_catcher(build.stack_construction.top_pc_margin)
-                                        stack.save()
-                                    else:
-                                        stack.delete()                                            
-
-                        # Next make all mini stacks with 2 away team players
-                        for (idx, away_player_1) in enumerate(build.projections.filter(slate_player__in=away_players, in_play=True, slate_player__site_pos__in=['RB', 'WR', 'TE']).order_by('-projection', 'slate_player__site_pos')):
-                            for away_player_2 in build.projections.filter(slate_player__in=away_players, in_play=True, slate_player__site_pos__in=['RB', 'WR', 'TE']).exclude(slate_player=away_player_1.slate_player).order_by('-projection', 'slate_player__site_pos'):
-                                stack = models.SlateBuildStack.objects.create(
-                                    build=build,
-                                    game=qb.game,
-                                    mini_game=game,
-                                    build_order=count,
-                                    qb=qb,
-                                    player_1=player,
-                                    player_2=player2,
-                                    mini_player_1=away_player_1,
-                                    mini_player_2=away_player_2,
-                                    salary=sum(p.slate_player.salary for p in [qb, player, opp_player, away_player_1, away_player_2]),
-                                    projection=sum(p.projection for p in [qb, player, opp_player, away_player_1, away_player_2])
-                                )
-
-                                if build.stack_construction is not None:
-                                    if build.stack_construction.passes_rule(stack):
-                                        stack.contains_top_pc = stack.contains_top_projected_pass_catcher(build.stack_construction.top_pc_margin)
-                                        stack.save()
-                                    else:
-                                        stack.delete()                                            
-
-                        # Finally make all mini stacks with players from both teams
-                        for (idx, home_player) in enumerate(build.projections.filter(slate_player__in=home_players, in_play=True, slate_player__site_pos__in=['RB', 'WR', 'TE']).order_by('-projection', 'slate_player__site_pos')):
-                            for away_player in build.projections.filter(slate_player__in=away_players, in_play=True, slate_player__site_pos__in=['RB', 'WR', 'TE']).order_by('-projection', 'slate_player__site_pos'):
-                                stack = models.SlateBuildStack.objects.create(
-                                    build=build,
-                                    game=qb.game,
-                                    mini_game=game,
-                                    build_order=count,
-                                    qb=qb,
-                                    player_1=player,
-                                    player_2=player2,
-                                    mini_player_1=home_player,
-                                    mini_player_2=away_player,
-                                    salary=sum(p.slate_player.salary for p in [qb, player, opp_player, home_player, away_player]),
-                                    projection=sum(p.projection for p in [qb, player, opp_player, home_player, away_player])
-                                )
-
-                                if build.stack_construction is not None:
-                                    if build.stack_construction.passes_rule(stack):
-                                        stack.contains_top_pc = stack.contains_top_projected_pass_catcher(build.stack_construction.top_pc_margin)
-                                        stack.save()
-                                    else:
-                                        stack.delete()                                            
-                else:
-                    stack = models.SlateBuildStack.objects.create(
-                        build=build,
-                        game=qb.game,
-                        build_order=count,
-                        qb=qb,
-                        player_1=player,
-                        player_2=player2,
-                        salary=sum(p.slate_player.salary for p in [qb, player, player2]),
-                        projection=sum(p.projection for p in [qb, player, player2])
-                    )
-
-                    if build.stack_construction is not None:
-                        if build.stack_construction.passes_rule(stack):
-                            stack.contains_top_pc = stack.contains_top_projected_pass_catcher(build.stack_construction.top_pc_margin)
-                            stack.save()
-                        else:
-                            stack.delete()                                            
-
-    elif build.configuration.game_stack_size == 4:
-        count = 0
-        # For each player, loop over opposing player to make a group for each possible stack combination
-        for (index, player) in enumerate(team_players):
-            if team_has_all_stack_only or not player.stack_only:
-                for (index2, player2) in enumerate(team_players[index+1:]):
-                    if player2 != player:  # don't include the pivot player
-                        for opp_player in opp_players:
-                            if player.slate_player.site_pos == 'TE' and player2.slate_player.site_pos == 'TE' and opp_player.slate_player.site_pos == 'TE':  # You can't have stacks with 3 TEs
-                                continue
-                            else:
-                                count += 1
-                                mu = float(sum(p.projection for p in [qb, player, player2, opp_player]))
-                                stack = models.SlateBuildStack.objects.create(
-                                    build=build,
-                                    game=qb.game,
-                                    build_order=count,
-                                    qb=qb,
-                                    player_1=player,
-                                    player_2=player2,
-                                    opp_player=opp_player,
-                                    salary=sum(p.slate_player.salary for p in [qb, player, player2, opp_player]),
-                                    projection=sum(p.projection for p in [qb, player, player2, opp_player])
-                                )
-
-                                if build.stack_construction is not None:
-                                    if build.stack_construction.passes_rule(stack):
-                                        stack.contains_top_pc = stack.contains_top_projected_pass_catcher(build.stack_construction.top_pc_margin)
-                                        stack.save()
-                                    else:
-                                        stack.delete()                                            
-
-    total_stack_projection = models.SlateBuildStack.objects.filter(build=build, qb=qb).aggregate(total_projection=Sum('projection')).get('total_projection')
-    for stack in models.SlateBuildStack.objects.filter(build=build, qb=qb):
-        logger.info(stack, stack.projection/total_stack_projection, round(stack.projection/total_stack_projection * qb_lineup_count, 0))
-        stack.count = round(max(stack.projection/total_stack_projection * qb_lineup_count, 1), 0)
-        # stack.count = 20
-        stack.save()
+    stacks = stack_builder.create_stacks_for_qb(build, qb, qb_lineup_count)
+    logger.info('Created {} stacks for {}.'.format(len(stacks), qb.name))
 
 
 @shared_task
@@ -5895,7 +3519,7 @@ def export_projections(proj_ids, result_path, result_url, task_id):
                             proj.game_total, 
                             proj.team_total, 
                             proj.spread,
-                            numpy.median(proj.sim_scores),
+                            numpy.median(sim_store.get_sim_outcomes(proj)),
                             proj.get_percentile_sim_score(75),
                             proj.get_percentile_sim_score(90),
                             proj.slate_player.fantasy_points
@@ -5926,13 +3550,12 @@ def export_player_outcomes(proj_ids, result_path, result_url, task_id):
         except BackgroundTask.DoesNotExist:
             time.sleep(0.2)
             task = BackgroundTask.objects.get(id=task_id)
-        projections = models.SlatePlayerProjection.objects.filter(id__in=proj_ids, sim_scores__isnull=False)
-        outcomes = list(projections.values_list('sim_scores', flat=True))
-        player_names = list(projections.values_list('slate_player__name', flat=True))
-        ownerships = list(projections.values_list('slate_player__ownership', flat=True))
+        projections = models.SlatePlayerProjection.objects.filter(id__in=proj_ids).select_related('slate_player')
+        ids, outcomes = sim_store.load_outcome_matrix(projections)
+        players = projections.in_bulk(ids)
         df_outcomes = pandas.DataFrame(outcomes)
-        df_outcomes.insert(0, 'player', player_names)
-        df_outcomes.insert(1, 'ownership', ownerships)
+        df_outcomes.insert(0, 'player', [players[i].slate_player.name for i in ids])
+        df_outcomes.insert(1, 'ownership', [players[i].slate_player.ownership for i in ids])
         df_outcomes.to_csv(result_path)
 
         task.status = 'download'
@@ -5971,9 +3594,9 @@ def export_field_outcomes(slate_id, result_path, result_url, task_id):
             'flex__slate_player',
             'dst__slate_player',
         )
-        field_outcomes = list(field_lineups.values_list('sim_scores', flat=True))
+        ids, field_outcomes = sim_store.load_outcome_matrix(field_lineups.order_by('id'))
         
-        df_lineups = pandas.DataFrame.from_records(field_lineups.values('username', 'qb__slate_player__name', 'rb1__slate_player__name', 'rb2__slate_player__name', 'wr1__slate_player__name', 'wr2__slate_player__name', 'wr3__slate_player__name', 'te__slate_player__name', 'flex__slate_player__name', 'dst__slate_player__name'))
+        df_lineups = pandas.DataFrame.from_records(field_lineups.filter(id__in=ids).order_by('id').values('username', 'qb__slate_player__name', 'rb1__slate_player__name', 'rb2__slate_player__name', 'wr1__slate_player__name', 'wr2__slate_player__name', 'wr3__slate_player__name', 'te__slate_player__name', 'flex__slate_player__name', 'dst__slate_player__name'))
         df_outcomes = pandas.DataFrame(field_outcomes)
         df_outcomes = pandas.concat([df_lineups, df_outcomes], axis=1)
         df_outcomes.to_csv(result_path)
@@ -6196,26 +3819,11 @@ def create_slate_lineups(slate_id, task_id):
         ).order_by('-projection').values_list('slate_player_id', flat=True))
         logger.info(f'Filtering player positions took {time.time() - start}s')
 
-        start = time.time()
-        rb_combos = list(itertools.combinations(rbs, 2))
-        logger.info(f'RB combos took {time.time() - start}s. There are {len(rb_combos)} combinations.')
-
-        start = time.time()
-        wr_combos = list(itertools.combinations(wrs, 3))
-        logger.info(f'WR combos took {time.time() - start}s. There are {len(wr_combos)} combinations.')
-
-        start = time.time()
-        projections = slate.get_projections().filter(in_play=True).order_by('-slate_player__salary')
-        player_outcomes = {}
-        for p in projections:
-            player_outcomes[p.slate_player.id] = p.sim_scores
-        logger.info(f'Getting player outcomes took {time.time() - start}s')
-
         cycles = slate.num_cycles
         jobs = []
 
         for _ in range(0, cycles):
-            jobs = jobs + [create_lineup_combos_for_qb.si(slate.id, qb, rb_combos, wr_combos, tes, rbs + wrs, dsts, player_outcomes, slate.lineups_per_cycle) for qb in qbs]
+            jobs = jobs + [create_lineup_combos_for_qb.si(slate.id, qb, rbs, wrs, tes, rbs + wrs, dsts, slate.lineups_per_cycle) for qb in qbs]
 
         chord(jobs, complete_slate_lineups.si(task_id))()
 
@@ -6230,101 +3838,47 @@ def create_slate_lineups(slate_id, task_id):
 
 
 @shared_task
-def create_lineup_combos_for_qb(slate_id, qb_id, rb_combos, wr_combos, te_ids, flexes, dst_ids, player_outcomes, num_combos):
-    def get_random_lineup(slate, qb_id, rb_combos, wr_combos, tes, flexes, dsts):
-        random_rbs = rb_combos[random.randrange(0, len(rb_combos))]
-        random_wrs = wr_combos[random.randrange(0, len(wr_combos))]
-        random_te = tes[random.randrange(0, len(tes))]
-        random_flex = flexes[random.randrange(0, len(flexes))]
-        random_dst = dsts[random.randrange(0, len(dsts))]
-
-        l = [qb_id, random_rbs[0], random_rbs[1], random_wrs[0], random_wrs[1], random_wrs[2], random_te, random_flex, random_dst]
-        total_salary = slate.get_projections().filter(
-            slate_player_id__in=l
-        ).aggregate(total_salary=Sum('slate_player__salary')).get('total_salary')
-
-        return (l, total_salary)
-
-    def is_lineup_valid(slate, l):
-        players = slate.get_projections().filter(
-            slate_player_id__in=l
-        )
-        
-        num_qbs = players.aggregate(num_qbs=Count('slate_player__site_pos', filter=Q(slate_player__site_pos='QB'))).get('num_qbs')
-        if num_qbs > 1:
-            return False
-        
-        num_wrs = players.aggregate(num_wrs=Count('slate_player__site_pos', filter=Q(slate_player__site_pos='WR'))).get('num_wrs')
-        if num_wrs > 4:
-            return False
-        
-        num_rbs = players.aggregate(num_rbs=Count('slate_player__site_pos', filter=Q(slate_player__site_pos='RB'))).get('num_rbs')
-        if num_rbs > 3:
-            return False
-        
-        num_tes = players.aggregate(num_tes=Count('slate_player__site_pos', filter=Q(slate_player__site_pos='TE'))).get('num_tes')
-        if num_tes > 2:
-            return False
-
-        # prevent duplicate players
-        visited = set()
-        dup = [x for x in l if x in visited or (visited.add(x) or False)]
-        if len(dup) > 0:
-            return False
-
-        return True
-
+def create_lineup_combos_for_qb(slate_id, qb_id, rb_ids, wr_ids, te_ids, flex_ids, dst_ids, num_combos):
     logger.info(f'qb = {qb_id}')
     slate = models.Slate.objects.get(id=slate_id)
-    salary_thresholds = slate.salary_thresholds
-    lineups = []
 
     start = time.time()
-    for _ in range(0, num_combos):
-        l, total_salary = get_random_lineup(slate, qb_id, rb_combos, wr_combos, te_ids, flexes, dst_ids)
+    projections = slate.get_projections().filter(in_play=True)
+    player_ids, player_outcomes = sim_store.load_outcome_matrix(projections, id_field='slate_player_id')
+    players = dict((p[0], p[1:]) for p in projections.values_list('slate_player_id', 'slate_player__salary', 'slate_player__site_pos'))
+    player_index = dict((player_id, index) for index, player_id in enumerate(player_ids))
+    salaries = numpy.array([players[player_id][0] for player_id in player_ids])
+    positions = numpy.array([players[player_id][1] for player_id in player_ids])
 
-        '''
-        TODO: Add additional constraints
-            - No duplicate lineups
-        '''
-        while (total_salary < salary_thresholds[0] or total_salary > salary_thresholds[1] or not is_lineup_valid(slate, l)):
-            l, total_salary = get_random_lineup(slate, qb_id, rb_combos, wr_combos, te_ids, flexes, dst_ids)
+    def to_index(ids):
+        return [player_index[i] for i in ids if i in player_index]
+    logger.info(f'  Loading players took {time.time() - start}s')
 
-        l.append(total_salary)  ## append total salary to end of lineup array so we can make a dataframe
-        lineups.append(l)
-    logger.info(f'  Lineup selection took {time.time() - start}s')
+    start = time.time()
+    lineups = lineup_sampler.sample_lineups(
+        player_index[qb_id],
+        to_index(rb_ids),
+        to_index(wr_ids),
+        to_index(te_ids),
+        to_index(flex_ids),
+        to_index(dst_ids),
+        salaries,
+        positions,
+        slate.salary_thresholds,
+        num_combos
+    )
+    logger.info(f'  Lineup selection took {time.time() - start}s. Found {len(lineups)} of {num_combos} lineups.')
 
     start = time.time()
-    df_lineups = pandas.DataFrame(lineups, columns=[
-        'qb_id',
-        'rb1_id',
-        'rb2_id',
-        'wr1_id',
-        'wr2_id',
-        'wr3_id',
-        'te_id',
-        'flex_id',
-        'dst_id',
-        'total_salary',
-    ])
+    df_lineups = pandas.DataFrame(numpy.array(player_ids)[lineups], columns=[f'{slot}_id' for slot in lineup_sampler.LINEUP_SLOTS])
+    df_lineups['total_salary'] = salaries[lineups].sum(axis=1)
     df_lineups['slate_id'] = slate_id
-    logger.info(f'  Dataframe took {time.time() - start}s')
 
-    start = time.time()
-    df_lineups['sim_scores'] = df_lineups.apply(lambda x: list(numpy.array(player_outcomes.get(str(x['qb_id'])), numpy.float64) + numpy.array(player_outcomes.get(str(x['rb1_id'])), numpy.float64) + numpy.array(player_outcomes.get(str(x['rb2_id'])), numpy.float64) + numpy.array(player_outcomes.get(str(x['wr1_id'])), numpy.float64) + numpy.array(player_outcomes.get(str(x['wr2_id'])), numpy.float64) + numpy.array(player_outcomes.get(str(x['wr3_id'])), numpy.float64) + numpy.array(player_outcomes.get(str(x['te_id'])), numpy.float64) + numpy.array(player_outcomes.get(str(x['flex_id'])), numpy.float64) + numpy.array(player_outcomes.get(str(x['dst_id'])), numpy.float64)), axis=1)
+    sim_scores = lineup_sampler.score_lineups(lineups, player_outcomes)
+    df_lineups['sim_outcomes'] = [sim_store.encode_outcomes(scores) for scores in sim_scores]
     logger.info(f'  Sim scores took {time.time() - start}s')
 
     start = time.time()
-    # user = settings.DATABASES['default']['USER']
-    # password = settings.DATABASES['default']['PASSWORD']
-    # database_name = settings.DATABASES['default']['NAME']
-    # database_url = 'postgresql://{user}:{password}@db:5432/{database_name}'.format(
-    #     user=user,
-    #     password=password,
-    #     database_name=database_name,
-    # )
-
-    # engine = sqlalchemy.create_engine(database_url, echo=False)
     df_lineups.to_sql('nfl_slatelineup', engine, if_exists='append', index=False, chunksize=1000)
     
     logger.info(f'  Storage took {time.time() - start}s')
@@ -6355,274 +3909,19 @@ def complete_slate_lineups(task_id):
 
 
 def process_dk_classic_field_lineups(build, player_sim_scores):
-    if build.field_lineup_upload:
-        build.field_lineups_to_beat.all().delete()
-
-        with open(build.field_lineup_upload.path, mode='r') as lineups_file:
-            csv_reader = csv.reader(lineups_file)
-
-            for index, row in enumerate(csv_reader):
-                if index > 0:  # skip header
-                    handle = row[0]
-                    qb = re.findall(r'\([0-9]*\)', row[1])[0].replace('(', '').replace(')', '')
-                    rb1 = re.findall(r'\([0-9]*\)', row[2])[0].replace('(', '').replace(')', '')
-                    rb2 = re.findall(r'\([0-9]*\)', row[3])[0].replace('(', '').replace(')', '')
-                    wr1 = re.findall(r'\([0-9]*\)', row[4])[0].replace('(', '').replace(')', '')
-                    wr2 = re.findall(r'\([0-9]*\)', row[5])[0].replace('(', '').replace(')', '')
-                    wr3 = re.findall(r'\([0-9]*\)', row[6])[0].replace('(', '').replace(')', '')
-                    te = re.findall(r'\([0-9]*\)', row[7])[0].replace('(', '').replace(')', '')
-                    flex = re.findall(r'\([0-9]*\)', row[8])[0].replace('(', '').replace(')', '')
-                    dst = re.findall(r'\([0-9]*\)', row[9])[0].replace('(', '').replace(')', '')
-
-                    # score the lineup
-                    sim_scores = numpy.array(player_sim_scores[qb], dtype=numpy.float64) + numpy.array(player_sim_scores[rb1], dtype=numpy.float64) + numpy.array(player_sim_scores[rb2], dtype=numpy.float64) + numpy.array(player_sim_scores[wr1], dtype=numpy.float64) + numpy.array(player_sim_scores[wr2], dtype=numpy.float64) + numpy.array(player_sim_scores[wr3], dtype=numpy.float64) + numpy.array(player_sim_scores[te], dtype=numpy.float64) + numpy.array(player_sim_scores[flex], dtype=numpy.float64) + numpy.array(player_sim_scores[dst], dtype=numpy.float64)
-
-                    # find this lineup in all possible lineups
-                    slate_lineup = build.slate.possible_lineups.filter(
-                        qb__player_id=qb,
-                        rb1__player_id__in=[rb1, rb2, flex],
-                        rb2__player_id__in=[rb1, rb2, flex],
-                        wr1__player_id__in=[wr1, wr2, wr3, flex],
-                        wr2__player_id__in=[wr1, wr2, wr3, flex],
-                        wr3__player_id__in=[wr1, wr2, wr3, flex],
-                        te__player_id__in=[te, flex],
-                        flex__player_id__in=[rb1, rb2, wr1, wr2, wr3, te, flex],
-                        dst__player_id=dst
-                    )
-
-                    if slate_lineup.count() == 0:
-                        slate_lineup = models.SlateLineup.objects.create(
-                            slate=build.slate,
-                            qb=models.SlatePlayer.objects.get(slate=build.slate, player_id=qb),
-                            rb1=models.SlatePlayer.objects.get(slate=build.slate, player_id=rb1),
-                            rb2=models.SlatePlayer.objects.get(slate=build.slate, player_id=rb2),
-                            wr1=models.SlatePlayer.objects.get(slate=build.slate, player_id=wr1),
-                            wr2=models.SlatePlayer.objects.get(slate=build.slate, player_id=wr2),
-                            wr3=models.SlatePlayer.objects.get(slate=build.slate, player_id=wr3),
-                            te=models.SlatePlayer.objects.get(slate=build.slate, player_id=te),
-                            flex=models.SlatePlayer.objects.get(slate=build.slate, player_id=flex),
-                            dst=models.SlatePlayer.objects.get(slate=build.slate, player_id=dst)
-                        )
-                        slate_lineup.simulate()
-
-                        if slate_lineup.total_salary > build.slate.salary_thresholds[1]:
-                            raise Exception(f'Lineup for {handle} exceeds salary cap.')
-                        
-                        slate_lineup.sim_scores = sim_scores.tolist()
-                        slate_lineup.save()
-
-                        slate_lineup = [slate_lineup]
-                    elif slate_lineup.count() > 1:
-                        raise Exception(f'There were {slate_lineup.count()} duplicate lineups found for {handle} among all possible lineups.')
-
-                    lineup = models.FieldLineupToBeat.objects.create(
-                        build=build,
-                        opponent_handle=handle,
-                        slate_lineup=slate_lineup[0]
-                    )
-
-                    lineup.median = numpy.median(sim_scores)
-                    lineup.s75 = numpy.percentile(sim_scores, 75)
-                    lineup.s90 = numpy.percentile(sim_scores, 90)
-                    lineup.save()
+    field_import.import_field_lineups(build, player_sim_scores, field_import.DK_PLAYER_ID, field_import.CLASSIC_SLOTS)
 
 
 def process_dk_showdown_field_lineups(build, player_sim_scores):
-    if build.field_lineup_upload:
-        build.field_sd_lineups_to_beat.all().delete()
-
-        with open(build.field_lineup_upload.path, mode='r') as lineups_file:
-            csv_reader = csv.reader(lineups_file)
-
-            for index, row in enumerate(csv_reader):
-                if index > 0:  # skip header
-                    handle = row[0]
-                    cpt = re.findall(r'\([0-9]*\)', row[1])[0].replace('(', '').replace(')', '')
-                    flex1 = re.findall(r'\([0-9]*\)', row[2])[0].replace('(', '').replace(')', '')
-                    flex2 = re.findall(r'\([0-9]*\)', row[3])[0].replace('(', '').replace(')', '')
-                    flex3 = re.findall(r'\([0-9]*\)', row[4])[0].replace('(', '').replace(')', '')
-                    flex4 = re.findall(r'\([0-9]*\)', row[5])[0].replace('(', '').replace(')', '')
-                    flex5 = re.findall(r'\([0-9]*\)', row[6])[0].replace('(', '').replace(')', '')
-
-                    # score the lineup
-                    sim_scores = numpy.array(player_sim_scores[cpt], dtype=numpy.float64) + numpy.array(player_sim_scores[flex1], dtype=numpy.float64) + numpy.array(player_sim_scores[flex2], dtype=numpy.float64) + numpy.array(player_sim_scores[flex3], dtype=numpy.float64) + numpy.array(player_sim_scores[flex4], dtype=numpy.float64) + numpy.array(player_sim_scores[flex5], dtype=numpy.float64)
-
-                    # find this lineup in all possible lineups
-                    slate_lineup = build.slate.possible_sd_lineups.filter(
-                        cpt__player_id=cpt,
-                        flex1__player_id__in=[flex1, flex2, flex3, flex4, flex5],
-                        flex2__player_id__in=[flex1, flex2, flex3, flex4, flex5],
-                        flex3__player_id__in=[flex1, flex2, flex3, flex4, flex5],
-                        flex4__player_id__in=[flex1, flex2, flex3, flex4, flex5],
-                        flex5__player_id__in=[flex1, flex2, flex3, flex4, flex5]
-                    )
-
-                    if slate_lineup.count() == 0:
-                        slate_lineup = models.SlateSDLineup.objects.create(
-                            slate=build.slate,
-                            cpt=models.SlatePlayer.objects.get(slate=build.slate, player_id=cpt),
-                            flex1=models.SlatePlayer.objects.get(slate=build.slate, player_id=flex1),
-                            flex2=models.SlatePlayer.objects.get(slate=build.slate, player_id=flex2),
-                            flex3=models.SlatePlayer.objects.get(slate=build.slate, player_id=flex3),
-                            flex4=models.SlatePlayer.objects.get(slate=build.slate, player_id=flex4),
-                            flex5=models.SlatePlayer.objects.get(slate=build.slate, player_id=flex5)
-                        )
-                        slate_lineup.simulate()
-
-                        if slate_lineup.total_salary > build.slate.salary_thresholds[1]:
-                            raise Exception(f'Lineup for {handle} exceeds salary cap.')
-                        
-                        slate_lineup.sim_scores = sim_scores.tolist()
-                        slate_lineup.save()
-
-                        slate_lineup = [slate_lineup]
-                    elif slate_lineup.count() > 1:
-                        raise Exception(f'There were {slate_lineup.count()} duplicate lineups found for {handle} among all possible lineups.')
-
-                    lineup = models.FieldSDLineupToBeat.objects.create(
-                        build=build,
-                        opponent_handle=handle,
-                        slate_lineup=slate_lineup[0]
-                    )
-
-                    lineup.median = numpy.median(sim_scores)
-                    lineup.s75 = numpy.percentile(sim_scores, 75)
-                    lineup.s90 = numpy.percentile(sim_scores, 90)
-                    lineup.save()
+    field_import.import_field_lineups(build, player_sim_scores, field_import.DK_PLAYER_ID, field_import.DK_SHOWDOWN_SLOTS)
 
 
 def process_fd_classic_field_lineups(build, player_sim_scores):
-    if build.field_lineup_upload:
-        build.field_lineups_to_beat.all().delete()
-
-        with open(build.field_lineup_upload.path, mode='r') as lineups_file:
-            csv_reader = csv.reader(lineups_file)
-
-            for index, row in enumerate(csv_reader):
-                if index > 0:  # skip header
-                    handle = row[0]
-                    qb = re.findall(r'[0-9-]*', row[1])[0].replace('(', '').replace(')', '')
-                    rb1 = re.findall(r'[0-9-]*', row[2])[0].replace('(', '').replace(')', '')
-                    rb2 = re.findall(r'[0-9-]*', row[3])[0].replace('(', '').replace(')', '')
-                    wr1 = re.findall(r'[0-9-]*', row[4])[0].replace('(', '').replace(')', '')
-                    wr2 = re.findall(r'[0-9-]*', row[5])[0].replace('(', '').replace(')', '')
-                    wr3 = re.findall(r'[0-9-]*', row[6])[0].replace('(', '').replace(')', '')
-                    te = re.findall(r'[0-9-]*', row[7])[0].replace('(', '').replace(')', '')
-                    flex = re.findall(r'[0-9-]*', row[8])[0].replace('(', '').replace(')', '')
-                    dst = re.findall(r'[0-9-]*', row[9])[0].replace('(', '').replace(')', '')
-
-                    # score the lineup
-                    sim_scores = numpy.array(player_sim_scores[qb], dtype=numpy.float64) + numpy.array(player_sim_scores[rb1], dtype=numpy.float64) + numpy.array(player_sim_scores[rb2], dtype=numpy.float64) + numpy.array(player_sim_scores[wr1], dtype=numpy.float64) + numpy.array(player_sim_scores[wr2], dtype=numpy.float64) + numpy.array(player_sim_scores[wr3], dtype=numpy.float64) + numpy.array(player_sim_scores[te], dtype=numpy.float64) + numpy.array(player_sim_scores[flex], dtype=numpy.float64) + numpy.array(player_sim_scores[dst], dtype=numpy.float64)
-
-                    # find this lineup in all possible lineups
-                    slate_lineup = build.slate.possible_lineups.filter(
-                        qb__player_id=qb,
-                        rb1__player_id__in=[rb1, rb2, flex],
-                        rb2__player_id__in=[rb1, rb2, flex],
-                        wr1__player_id__in=[wr1, wr2, wr3, flex],
-                        wr2__player_id__in=[wr1, wr2, wr3, flex],
-                        wr3__player_id__in=[wr1, wr2, wr3, flex],
-                        te__player_id__in=[te, flex],
-                        flex__player_id__in=[rb1, rb2, wr1, wr2, wr3, te, flex],
-                        dst__player_id=dst
-                    )
-
-                    if slate_lineup.count() == 0:
-                        slate_lineup = models.SlateLineup.objects.create(
-                            slate=build.slate,
-                            qb=models.SlatePlayer.objects.get(slate=build.slate, player_id=qb),
-                            rb1=models.SlatePlayer.objects.get(slate=build.slate, player_id=rb1),
-                            rb2=models.SlatePlayer.objects.get(slate=build.slate, player_id=rb2),
-                            wr1=models.SlatePlayer.objects.get(slate=build.slate, player_id=wr1),
-                            wr2=models.SlatePlayer.objects.get(slate=build.slate, player_id=wr2),
-                            wr3=models.SlatePlayer.objects.get(slate=build.slate, player_id=wr3),
-                            te=models.SlatePlayer.objects.get(slate=build.slate, player_id=te),
-                            flex=models.SlatePlayer.objects.get(slate=build.slate, player_id=flex),
-                            dst=models.SlatePlayer.objects.get(slate=build.slate, player_id=dst)
-                        )
-                        slate_lineup.simulate()
-
-                        if slate_lineup.total_salary > build.slate.salary_thresholds[1]:
-                            raise Exception(f'Lineup for {handle} exceeds salary cap.')
-                        
-                        slate_lineup.sim_scores = sim_scores.tolist()
-                        slate_lineup.save()
-
-                        slate_lineup = [slate_lineup]
-                    elif slate_lineup.count() > 1:
-                        raise Exception(f'There were {slate_lineup.count()} duplicate lineups found for {handle} among all possible lineups.')
-
-                    lineup = models.FieldLineupToBeat.objects.create(
-                        build=build,
-                        opponent_handle=handle,
-                        slate_lineup=slate_lineup[0]
-                    )
-
-                    lineup.median = numpy.median(sim_scores)
-                    lineup.s75 = numpy.percentile(sim_scores, 75)
-                    lineup.s90 = numpy.percentile(sim_scores, 90)
-                    lineup.save()
+    field_import.import_field_lineups(build, player_sim_scores, field_import.FD_PLAYER_ID, field_import.CLASSIC_SLOTS)
 
 
 def process_fd_showdown_field_lineups(build, player_sim_scores):
-    if build.field_lineup_upload:
-        build.field_sd_lineups_to_beat.all().delete()
-
-        with open(build.field_lineup_upload.path, mode='r') as lineups_file:
-            csv_reader = csv.reader(lineups_file)
-
-            for index, row in enumerate(csv_reader):
-                if index > 0:  # skip header
-                    handle = row[0]
-                    cpt = re.findall(r'[0-9-]*', row[1])[0].replace('(', '').replace(')', '')
-                    flex1 = re.findall(r'[0-9-]*', row[2])[0].replace('(', '').replace(')', '')
-                    flex2 = re.findall(r'[0-9-]*', row[3])[0].replace('(', '').replace(')', '')
-                    flex3 = re.findall(r'[0-9-]*', row[4])[0].replace('(', '').replace(')', '')
-                    flex4 = re.findall(r'[0-9-]*', row[5])[0].replace('(', '').replace(')', '')
-
-                    # score the lineup
-                    sim_scores = numpy.array(player_sim_scores[cpt], dtype=numpy.float64) + numpy.array(player_sim_scores[flex1], dtype=numpy.float64) + numpy.array(player_sim_scores[flex2], dtype=numpy.float64) + numpy.array(player_sim_scores[flex3], dtype=numpy.float64) + numpy.array(player_sim_scores[flex4], dtype=numpy.float64)
-
-                    # find this lineup in all possible lineups
-                    slate_lineup = build.slate.possible_sd_lineups.filter(
-                        cpt__player_id=cpt,
-                        flex1__player_id__in=[flex1, flex2, flex3, flex4],
-                        flex2__player_id__in=[flex1, flex2, flex3, flex4],
-                        flex3__player_id__in=[flex1, flex2, flex3, flex4],
-                        flex4__player_id__in=[flex1, flex2, flex3, flex4]
-                    )
-
-                    if slate_lineup.count() == 0:
-                        slate_lineup = models.SlateSDLineup.objects.create(
-                            slate=build.slate,
-                            cpt=models.SlatePlayer.objects.get(slate=build.slate, player_id=cpt),
-                            flex1=models.SlatePlayer.objects.get(slate=build.slate, player_id=flex1),
-                            flex2=models.SlatePlayer.objects.get(slate=build.slate, player_id=flex2),
-                            flex3=models.SlatePlayer.objects.get(slate=build.slate, player_id=flex3),
-                            flex4=models.SlatePlayer.objects.get(slate=build.slate, player_id=flex4)
-                        )
-                        slate_lineup.simulate()
-
-                        if slate_lineup.total_salary > build.slate.salary_thresholds[1]:
-                            raise Exception(f'Lineup for {handle} exceeds salary cap.')
-                        
-                        slate_lineup.sim_scores = sim_scores.tolist()
-                        slate_lineup.save()
-
-                        slate_lineup = [slate_lineup]
-                    elif slate_lineup.count() > 1:
-                        raise Exception(f'There were {slate_lineup.count()} duplicate lineups found for {handle} among all possible lineups.')
-
-                    lineup = models.FieldSDLineupToBeat.objects.create(
-                        build=build,
-                        opponent_handle=handle,
-                        slate_lineup=slate_lineup[0]
-                    )
-
-                    lineup.median = numpy.median(sim_scores)
-                    lineup.s75 = numpy.percentile(sim_scores, 75)
-                    lineup.s90 = numpy.percentile(sim_scores, 90)
-                    lineup.save()
+    field_import.import_field_lineups(build, player_sim_scores, field_import.FD_PLAYER_ID, field_import.FD_SHOWDOWN_SLOTS)
 
 
 @shared_task
@@ -6637,11 +3936,9 @@ def process_build(build_id, task_id):
             task = BackgroundTask.objects.get(id=task_id)
 
         build = models.FindWinnerBuild.objects.get(id=build_id)
-        player_sim_scores = {}
 
         # get the player outcomes
-        for p in build.slate.get_projections():
-            player_sim_scores[p.slate_player.player_id] = p.sim_scores
+        player_sim_scores = sim_store.load_outcome_dict(build.slate.get_projections(), key_field='slate_player__player_id')
 
         if build.slate.site == 'draftkings':
             if build.slate.is_showdown:
@@ -6681,12 +3978,6 @@ def handle_projection_import(import_id, task_id):
 
         projection_import = models.SlateProjectionImport.objects.get(id=import_id)
 
-        # delete previous raw projections
-        models.SlatePlayerRawProjection.objects.filter(
-            projection_site=projection_import.projection_site,
-            slate_player__slate=projection_import.slate
-        ).delete()
-
         success_count = 0
         missing_players = []
 
@@ -6738,7 +4029,14 @@ def handle_projection_import(import_id, task_id):
                 column_headers.save()
 
         if df is not None:
-            for index, row in df.iterrows():
+            if projection_import.projection_site in ['etr', 'etr_sd', 'etr_sg', 'rg']:
+                alias_site = projection_import.slate.site
+            else:
+                alias_site = projection_import.projection_site
+            scale_ownership = projection_import.projection_site in ['etr', 'etr_sd', 'etr_sg', 'rg', 'awesemo_own', 'sabersim']
+
+            rows = []
+            for row in df.to_dict('records'):
                 player_name = row[column_headers.column_player_name].strip()
 
                 if player_name is None:
@@ -6748,12 +4046,7 @@ def handle_projection_import(import_id, task_id):
                     continue
                 
                 try:
-                    if row[column_headers.column_team] == 'JAX':
-                        team = 'JAC'
-                    elif row[column_headers.column_team] == 'LA':
-                        team = 'LAR'
-                    else:
-                        team = row[column_headers.column_team].strip()
+                    team = sheets.get_team(row[column_headers.column_team])
                 except:
                     continue
 
@@ -6764,35 +4057,24 @@ def handle_projection_import(import_id, task_id):
                 rec_projection = row[column_headers.column_rec_projection] if column_headers.column_rec_projection is not None and row[column_headers.column_rec_projection] != '' and not math.isnan(row[column_headers.column_rec_projection]) else 0.0
                 ownership_projection = float(row[column_headers.column_own_projection]) if column_headers.column_own_projection is not None and row[column_headers.column_own_projection] != '' and row[column_headers.column_own_projection] != '-' and not math.isnan(float(row[column_headers.column_own_projection])) else 0.0
 
-                if projection_import.projection_site == 'etr':
-                    ownership_projection /= 100.0
-                    alias = models.Alias.find_alias(player_name, projection_import.slate.site)
-                elif projection_import.projection_site == 'etr_sd':
-                    ownership_projection /= 100.0
-                    alias = models.Alias.find_alias(player_name, projection_import.slate.site)
-                elif projection_import.projection_site == 'etr_sg':
-                    ownership_projection /= 100.0
-                    alias = models.Alias.find_alias(player_name, projection_import.slate.site)
-                elif projection_import.projection_site == 'rg':
+                if scale_ownership:
                     ownership_projection /= 100.0
-                    alias = models.Alias.find_alias(player_name, projection_import.slate.site)
-                elif projection_import.projection_site == 'awesemo_own':
-                    ownership_projection /= 100.0
-                    alias = models.Alias.find_alias(player_name, projection_import.projection_site)
-                elif projection_import.projection_site == 'sabersim':
-                    ownership_projection /= 100.0
-                    alias = models.Alias.find_alias(player_name, projection_import.projection_site)
-                else:
-                    alias = models.Alias.find_alias(player_name, projection_import.projection_site)
-                
+
+                rows.append((player_name, team, median_projection, floor_projection, ceiling_projection, rush_att_projection, rec_projection, ownership_projection))
+
+            # resolve every name and load the slate's players up front, so rows are matched in memory
+            aliases = sheets.find_aliases([row[0] for row in rows], alias_site)
+            slate_players = sheets.get_slate_players(projection_import.slate, sheets.PLAYER_POSITIONS)
+            cpt_slate_players = sheets.get_slate_players(projection_import.slate, sheets.CAPTAIN_POSITIONS)
+            raw_projections = []
+
+            for (player_name, team, median_projection, floor_projection, ceiling_projection, rush_att_projection, rec_projection, ownership_projection), alias in zip(rows, aliases):
                 if alias is not None:
+                    slate_player = None
                     try:
-                        slate_player = models.SlatePlayer.objects.get(
-                            slate=projection_import.slate,
-                            name=alias.get_alias(projection_import.slate.site),
-                            team=team,
-                            roster_position__in=['QB', 'RB', 'WR', 'TE', 'DST', 'D', 'DEF', 'FLEX', 'UTIL']
-                        )
+                        slate_player = sheets.match_slate_player(slate_players, alias, projection_import.slate.site, team)
+                        if slate_player is None:
+                            continue
 
                         mu = 0.0
                         ceil = 0.0
@@ -6813,39 +4095,40 @@ def handle_projection_import(import_id, task_id):
                         else:
                             val = mu / (slate_player.salary / 1000)
 
-                        try:
-                            models.SlatePlayerRawProjection.objects.create(
-                                slate_player=slate_player,
-                                projection_site=projection_import.projection_site,
-                                projection=mu,
-                                value=val,
-                                floor=flr,
-                                ceiling=ceil,
-                                stdev=stdev,
-                                ownership_projection=float(ownership_projection) if float(ownership_projection) < 1.0 else float(ownership_projection)/100.0,
-                                adjusted_opportunity=float(rec_projection) * 2.75 + float(rush_att_projection) if projection_import.slate.site == 'draftkings' else float(rec_projection) * 2.0 + float(rush_att_projection)
-                            )
+                        raw_projection = models.SlatePlayerRawProjection(
+                            slate_player=slate_player,
+                            projection_site=projection_import.projection_site,
+                            projection=mu,
+                            value=val,
+                            floor=flr,
+                            ceiling=ceil,
+                            stdev=stdev,
+                            ownership_projection=float(ownership_projection) if float(ownership_projection) < 1.0 else float(ownership_projection)/100.0,
+                            adjusted_opportunity=float(rec_projection) * 2.75 + float(rush_att_projection) if projection_import.slate.site == 'draftkings' else float(rec_projection) * 2.0 + float(rush_att_projection)
+                        )
 
-                            # create captain/mvp version if necessary
-                            try:
-                                cpt_slate_player = models.SlatePlayer.objects.get(
-                                    slate=projection_import.slate,
-                                    name=alias.get_alias(projection_import.slate.site),
-                                    team=team,
-                                    roster_position__in=['CPT', 'MVP']
-                                )
+                        invalid_field = sheets.get_invalid_field(raw_projection)
+                        if invalid_field is not None:
+                            raise ValueError(f'{invalid_field} is out of range')
+
+                        raw_projections.append(raw_projection)
+                        success_count += 1
 
+                        # create captain/mvp version if necessary; a bad captain row doesn't cost the FLEX row
+                        try:
+                            cpt_slate_player = sheets.match_slate_player(cpt_slate_players, alias, projection_import.slate.site, team)
+                            if cpt_slate_player is not None:
                                 mu = 0.0
                                 ceil = 0.0
                                 flr = 0.0
                                 stdev = 0.0
 
                                 if median_projection is not None and median_projection != '' and median_projection > 0.0:
-                                    mu = float(median_projection) * 1.5
+                                    mu = float(median_projection) * sheets.CAPTAIN_MULTIPLIER
 
                                     if floor_projection is not None and ceiling_projection is not None:
-                                        ceil = float(ceiling_projection) * 1.5
-                                        flr = float(floor_projection) * 1.5
+                                        ceil = float(ceiling_projection) * sheets.CAPTAIN_MULTIPLIER
+                                        flr = float(floor_projection) * sheets.CAPTAIN_MULTIPLIER
 
                                         stdev = numpy.std([mu, ceil, flr], dtype=numpy.float64)
                                 
@@ -6854,7 +4137,7 @@ def handle_projection_import(import_id, task_id):
                                 else:
                                     val = mu / (cpt_slate_player.salary / 1000)
 
-                                models.SlatePlayerRawProjection.objects.create(
+                                cpt_projection = models.SlatePlayerRawProjection(
                                     slate_player=cpt_slate_player,
                                     projection_site=projection_import.projection_site,
                                     projection=mu,
@@ -6865,17 +4148,21 @@ def handle_projection_import(import_id, task_id):
                                     ownership_projection=float(ownership_projection) if float(ownership_projection) < 1.0 else float(ownership_projection)/100.0,
                                     adjusted_opportunity=float(rec_projection) * 2.75 + float(rush_att_projection) if projection_import.slate.site == 'draftkings' else float(rec_projection) * 2.0 + float(rush_att_projection)
                                 )
-                            except models.SlatePlayer.DoesNotExist:
-                                pass
-                                
-                            success_count += 1
+
+                                invalid_field = sheets.get_invalid_field(cpt_projection)
+                                if invalid_field is not None:
+                                    raise ValueError(f'{invalid_field} is out of range')
+
+                                raw_projections.append(cpt_projection)
                         except:
-                            logger.info(f'Could not create projection for {slate_player.name} with {projection_import.projection_site}')
-                    except models.SlatePlayer.DoesNotExist:
-                        pass
+                            logger.info(f'Could not create captain projection for {slate_player.name} with {projection_import.projection_site}')
+                    except:
+                        logger.info(f'Could not create projection for {slate_player.name if slate_player is not None else player_name} with {projection_import.projection_site}')
                 else:
                     missing_players.append(player_name)
 
+            sheets.replace_raw_projections(projection_import.slate, projection_import.projection_site, raw_projections)
+
         task.status = 'success'
         task.content = '{} projections have been successfully added to {} for {}.'.format(success_count, str(projection_import.slate), projection_import.projection_site) if len(missing_players) == 0 else '{} players have been successfully added to {} for {}. {} players could not be identified.'.format(success_count, str(projection_import.slate), projection_import.projection_site, len(missing_players))
         task.link = '/admin/nfl/missingalias/' if len(missing_players) > 0 else None
@@ -6910,12 +4197,6 @@ def process_projection_sheet(chained_result, sheet_id, task_id):
                 slate_player__slate=sheet.slate
             ).delete()
 
-        # delete previous raw projections
-        models.SlatePlayerRawProjection.objects.filter(
-            projection_site=sheet.projection_site,
-            slate_player__slate=sheet.slate
-        ).delete()
-
         with open(sheet.projection_sheet.path, mode='r') as projection_file:
             csv_reader = csv.DictReader(projection_file)
             success_count = 0
@@ -6933,18 +4214,20 @@ def process_projection_sheet(chained_result, sheet_id, task_id):
                 headers.column_player_name = csv_reader.fieldnames[0]
                 headers.save()
 
+            if sheet.projection_site in ['etr', 'rg']:
+                alias_site = sheet.slate.site
+            else:
+                alias_site = sheet.projection_site
+            scale_ownership = sheet.projection_site in ['etr', 'rg', 'sabersim']
+
+            rows = []
             for row in csv_reader:
                 player_name = row[headers.column_player_name].strip()
 
                 if player_name is None:
                     continue
 
-                if row[headers.column_team] == 'JAX':
-                    team = 'JAC'
-                elif row[headers.column_team] == 'LA':
-                    team = 'LAR'
-                else:
-                    team = row[headers.column_team].strip()
+                team = sheets.get_team(row[headers.column_team])
 
                 median_projection = row[headers.column_median_projection] if row[headers.column_median_projection] is not None else 0.0
                 floor_projection = row[headers.column_floor_projection] if headers.column_floor_projection is not None and row[headers.column_floor_projection] != '' else 0.0
@@ -6953,55 +4236,59 @@ def process_projection_sheet(chained_result, sheet_id, task_id):
                 rec_projection = row[headers.column_rec_projection] if headers.column_rec_projection is not None and row[headers.column_rec_projection] != '' else 0.0
                 ownership_projection = float(row[headers.column_own_projection]) if headers.column_own_projection is not None and row[headers.column_own_projection] != '' and row[headers.column_own_projection] != '-' else 0.0
 
-                if sheet.projection_site == 'etr':
-                    ownership_projection /= 100.0
-                    alias = models.Alias.find_alias(player_name, sheet.slate.site)
-                elif sheet.projection_site == 'rg':
+                if scale_ownership:
                     ownership_projection /= 100.0
-                    alias = models.Alias.find_alias(player_name, sheet.slate.site)
-                elif sheet.projection_site == 'sabersim':
-                    ownership_projection /= 100.0
-                    alias = models.Alias.find_alias(player_name, sheet.projection_site)
-                else:
-                    alias = models.Alias.find_alias(player_name, sheet.projection_site)
-                
-                if alias is not None:
-                    try:
-                        slate_player = models.SlatePlayer.objects.get(
-                            slate=sheet.slate,
-                            name=alias.get_alias(sheet.slate.site),
-                            team=team
-                        )
 
-                        if median_projection != '':
-                            mu = float(median_projection)
+                rows.append((player_name, team, median_projection, floor_projection, ceiling_projection, rush_att_projection, rec_projection, ownership_projection))
 
-                            if floor_projection is not None and ceiling_projection is not None:
-                                ceil = float(ceiling_projection)
-                                flr = float(floor_projection)
+        # resolve every name and load the slate's players up front, so rows are matched in memory
+        aliases = sheets.find_aliases([row[0] for row in rows], alias_site)
+        slate_players = sheets.get_slate_players(sheet.slate)
+        raw_projections = []
 
-                                stdev = numpy.std([mu, ceil, flr], dtype=numpy.float64)
-                            else:
-                                ceil = None
-                                flr = None
-                                stdev = None
+        for (player_name, team, median_projection, floor_projection, ceiling_projection, rush_att_projection, rec_projection, ownership_projection), alias in zip(rows, aliases):
+            if alias is not None:
+                try:
+                    slate_player = sheets.match_slate_player(slate_players, alias, sheet.slate.site, team)
+                except models.SlatePlayer.MultipleObjectsReturned as e:
+                    logger.info(f'Could not create projection for {player_name} with {sheet.projection_site}: {e}')
+                    continue
 
-                            models.SlatePlayerRawProjection.objects.create(
-                                slate_player=slate_player,
-                                projection_site=sheet.projection_site,
-                                projection=mu,
-                                floor=flr,
-                                ceiling=ceil,
-                                stdev=stdev,
-                                ownership_projection=float(ownership_projection) if float(ownership_projection) < 1.0 else float(ownership_projection)/100.0,
-                                adjusted_opportunity=float(rec_projection) * 2.75 + float(rush_att_projection) if sheet.slate.site == 'draftkings' else float(rec_projection) * 2.0 + float(rush_att_projection)
-                            )
-                            
-                            success_count += 1
-                    except models.SlatePlayer.DoesNotExist:
-                        pass
-                else:
-                    missing_players.append(player_name)
+                if slate_player is not None and median_projection != '':
+                    mu = float(median_projection)
+
+                    if floor_projection is not None and ceiling_projection is not None:
+                        ceil = float(ceiling_projection)
+                        flr = float(floor_projection)
+
+                        stdev = numpy.std([mu, ceil, flr], dtype=numpy.float64)
+                    else:
+                        ceil = None
+                        flr = None
+                        stdev = None
+
+                    raw_projection = models.SlatePlayerRawProjection(
+                        slate_player=slate_player,
+                        projection_site=sheet.projection_site,
+                        projection=mu,
+                        floor=flr,
+                        ceiling=ceil,
+                        stdev=stdev,
+                        ownership_projection=float(ownership_projection) if float(ownership_projection) < 1.0 else float(ownership_projection)/100.0,
+                        adjusted_opportunity=float(rec_projection) * 2.75 + float(rush_att_projection) if sheet.slate.site == 'draftkings' else float(rec_projection) * 2.0 + float(rush_att_projection)
+                    )
+
+                    invalid_field = sheets.get_invalid_field(raw_projection)
+                    if invalid_field is not None:
+                        logger.info(f'Could not create projection for {slate_player.name} with {sheet.projection_site}: {invalid_field} is out of range')
+                        continue
+
+                    raw_projections.append(raw_projection)
+                    success_count += 1
+            else:
+                missing_players.append(player_name)
+
+        sheets.replace_raw_projections(sheet.slate, sheet.projection_site, raw_projections)
 
         task.status = 'success'
         task.content = '{} projections have been successfully added to {} for {}.'.format(success_count, str(sheet.slate), sheet.projection_site) if len(missing_players) == 0 else '{} players have been successfully added to {} for {}. {} players could not be identified.'.format(success_count, str(sheet.slate), sheet.projection_site, len(missing_players))
@@ -7419,7 +4706,7 @@ def process_sim_datasheets(chained_results, slate_id, task_id):
                                 slate_player__salary=player_salary
                             )
 
-                            projection.sim_scores = outcomes
+                            sim_store.set_sim_outcomes(projection, outcomes)
                             projection.save()
 
                             success_count += 1
@@ -7703,7 +4990,8 @@ def get_field_lineup_outcomes(lineup, slate_id):
         slate_player__name__in=lineup[1:]
     )
     try:
-        outcomes = list([float(sum([p.sim_scores[i] for p in players])) for i in range(0, 10000)])
+        player_outcomes = [sim_store.get_sim_outcomes(p) for p in players]
+        outcomes = list([float(sum([float(o[i]) for o in player_outcomes])) for i in range(0, 10000)])
     except:
         outcomes = list([0.0 for i in range(0, 10000)])
     
@@ -7850,7 +5138,7 @@ def get_lineup_roi(lineup_id, slate_id, contest_id):
             return 0.0
         return float(prizes[int(x)-1])
 
-    df_lineup_outcomes = pandas.DataFrame([lineup.sim_scores])
+    df_lineup_outcomes = pandas.DataFrame([sim_store.get_sim_outcomes(lineup)])
     # df_lineup_outcomes.to_csv('/opt/lottery/data/df_lineup_outcomes.csv')
     df_ranks = pandas.concat([df_lineup_outcomes, df_bins]).rank(method='min', ascending=False)
     df_payouts = df_ranks.applymap(find_payout)
@@ -0,0 +1,23 @@
+# Generated by Django 2.2 on 2022-02-14 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nfl_sd', '0014_auto_20220211_1444'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='slatebuildlineup',
+            name='cash_rate',
+            field=models.DecimalField(decimal_places=4, default=0.0, max_digits=5),
+        ),
+        migrations.AddField(
+            model_name='slatebuildlineup',
+            name='top_one_pct_rate',
+            field=models.DecimalField(decimal_places=4, default=0.0, max_digits=5),
+        ),
+    ]
@@ -1305,6 +1305,8 @@ class SlateBuildLineup(models.Model):
     ownership_projection = models.DecimalField(max_digits=10, decimal_places=9, default=0.0)
     duplicated = models.DecimalField(max_digits=10, decimal_places=2, default=0.0)
     roi = models.DecimalField(max_digits=10, decimal_places=2, default=0.0, db_index=True)
+    cash_rate = models.DecimalField(max_digits=5, decimal_places=4, default=0.0)
+    top_one_pct_rate = models.DecimalField(max_digits=5, decimal_places=4, default=0.0)
     mean = models.DecimalField(db_index=True, max_digits=10, decimal_places=2, default=0.0)
     median = models.DecimalField(db_index=True, max_digits=10, decimal_places=2, default=0.0)
     std = models.DecimalField(db_index=True, max_digits=10, decimal_places=2, default=0.0)
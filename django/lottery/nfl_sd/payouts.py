@@ -0,0 +1,44 @@
+import math
+import numpy
+
+from configuration.payouts import block_payouts, cumulative_prizes, iteration_blocks
+
+# Lineups from a build raced against each other
+RACE_FIELD_SIZE = 500
+
+# Share of the field that counts as a top 1% finish
+TOP_PCT = 0.01
+
+
+def race_lineups(scores, prizes, cost):
+    '''
+    Races a (lineups x iterations) score matrix as a contest field paying prizes.
+
+    Every iteration is ranked highest score first with ties sharing the best rank, and
+    tied lineups split the prizes of all the ranks they cover. Returns each lineup's ROI
+    over all iterations, the share of iterations it cashed and the share it finished in
+    the top 1% of the field.
+    '''
+    num_lineups, num_iterations = scores.shape
+    cum_prizes = cumulative_prizes(prizes, num_lineups)
+    top_rank = max(1, math.ceil(num_lineups * TOP_PCT))
+
+    winnings = numpy.zeros(num_lineups)
+    cashes = numpy.zeros(num_lineups)
+    top_finishes = numpy.zeros(num_lineups)
+
+    for start, stop in iteration_blocks(num_lineups, 0, num_iterations):
+        order, group_start, paid = block_payouts(numpy.asarray(scores[:, start:stop], dtype=numpy.float64), cum_prizes)
+
+        lineups = order.ravel()
+        winnings += numpy.bincount(lineups, weights=paid.ravel(), minlength=num_lineups)
+        cashes += numpy.bincount(lineups, weights=(paid > 0).ravel(), minlength=num_lineups)
+        top_finishes += numpy.bincount(lineups, weights=(group_start < top_rank).ravel(), minlength=num_lineups)
+
+    total_cost = float(cost) * num_iterations
+    return {
+        'winnings': winnings,
+        'roi': (winnings - total_cost) / total_cost if total_cost > 0 else numpy.zeros(num_lineups),
+        'cash_rate': cashes / max(num_iterations, 1),
+        'top_one_pct_rate': top_finishes / max(num_iterations, 1),
+    }
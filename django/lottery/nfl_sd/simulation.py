@@ -0,0 +1,204 @@
+import numpy
+import scipy.stats
+
+from . import models
+
+# Roster slots simulated for each team, in the same order as the columns of the
+# correlation matrix (qb, rb1..rb3, wr1..wr5, te1, te2, k, dst). Home team first.
+SLATE_SIM_SLOTS = (
+    ('QB', 1),
+    ('RB', 3),
+    ('WR', 5),
+    ('TE', 2),
+    ('K', 1),
+    ('DST', 1),
+)
+
+NUM_ITERATIONS = 10000
+CAPTAIN_MULTIPLIER = 1.5
+
+# Percentiles saved as a lineup's median, s75 and s90, as in SlateBuildLineup.simulate
+LINEUP_PERCENTILES = [50, 75, 98]
+
+
+def get_dst_label(site):
+    if site == 'fanduel':
+        return 'D'
+    elif site == 'yahoo':
+        return 'DEF'
+    return 'DST'
+
+
+def load_sim_inputs(slate):
+    '''
+    Loads the FLEX and CPT projections of a showdown slate with a single query and lays
+    them out as simulation slots, best projection first within each team and position.
+
+    Returns the FLEX projection ids with the correlation matrix column of each, their
+    means and stdevs, and the CPT projection ids with the FLEX row each CPT mirrors.
+    Slots without a FLEX player are left out of the simulation.
+    '''
+    dst_label = get_dst_label(slate.site)
+    teams = [slate.game.home_team, slate.game.away_team]
+
+    rows = models.SlatePlayerProjection.objects.filter(
+        slate_player__slate=slate,
+        slate_player__team__in=teams,
+        slate_player__roster_position__in=[slate.flex_label, slate.captain_label]
+    ).order_by(
+        '-projection', '-slate_player__salary'
+    ).values_list(
+        'id', 'slate_player__team', 'slate_player__site_pos', 'slate_player__roster_position', 'projection', 'stdev'
+    )
+
+    by_slot = {}
+    for row in rows:
+        by_slot.setdefault((row[3], row[1], row[2]), []).append(row)
+
+    flex = []
+    columns = []
+    captains = []
+    captain_rows = []
+    column = 0
+    for team in teams:
+        for position, num_slots in SLATE_SIM_SLOTS:
+            site_pos = dst_label if position == 'DST' else position
+            flex_players = by_slot.get((slate.flex_label, team, site_pos), [])
+            cpt_players = by_slot.get((slate.captain_label, team, site_pos), [])
+
+            for index in range(num_slots):
+                if index < len(flex_players):
+                    if index < len(cpt_players):
+                        captains.append(cpt_players[index][0])
+                        captain_rows.append(len(flex))
+                    flex.append(flex_players[index])
+                    columns.append(column)
+                column += 1
+
+    return {
+        'flex_ids': [row[0] for row in flex],
+        'columns': numpy.array(columns, dtype=numpy.int64),
+        'mean': numpy.array([float(row[4]) for row in flex]),
+        'stdev': numpy.array([float(row[5]) for row in flex]),
+        'cpt_ids': captains,
+        'cpt_rows': numpy.array(captain_rows, dtype=numpy.int64),
+    }
+
+
+def simulate_players(inputs, corr, num_iterations=NUM_ITERATIONS):
+    '''
+    Simulates every FLEX player at once: correlated normals over the players' columns of
+    corr become uniforms, which are mapped through each player's gamma marginal.
+
+    Returns a (players x iterations) score matrix.
+    '''
+    columns = inputs['columns']
+    cov = corr[numpy.ix_(columns, columns)]
+
+    rand_Nmv = scipy.stats.multivariate_normal(mean=numpy.zeros(len(columns)), cov=cov).rvs(num_iterations)
+    rand_U = scipy.stats.norm.cdf(numpy.reshape(rand_Nmv, (num_iterations, len(columns))))
+
+    mean = inputs['mean']
+    stdev = inputs['stdev']
+    scores = scipy.stats.gamma.ppf(rand_U, (mean / stdev) ** 2, scale=(stdev ** 2) / mean)
+
+    return scores.T
+
+
+def save_sim_scores(inputs, scores):
+    '''
+    Saves the sim scores of the FLEX players and their captains in one bulk update. Captain
+    rows are the FLEX rows they mirror scaled by a vector of captain multipliers.
+    '''
+    ids = inputs['flex_ids'] + inputs['cpt_ids']
+    if len(ids) == 0:
+        return
+
+    rows = numpy.concatenate([numpy.arange(len(inputs['flex_ids'])), inputs['cpt_rows']])
+    multipliers = numpy.concatenate([
+        numpy.ones(len(inputs['flex_ids'])),
+        numpy.full(len(inputs['cpt_ids']), CAPTAIN_MULTIPLIER)
+    ])
+    sim_scores = numpy.round(scores[rows] * multipliers[:, None], 2)
+
+    models.SlatePlayerProjection.objects.bulk_update(
+        [models.SlatePlayerProjection(id=projection_id, sim_scores=sim_scores[index].tolist()) for index, projection_id in enumerate(ids)],
+        ['sim_scores']
+    )
+
+
+def load_build_players(projection_ids, num_iterations=NUM_ITERATIONS):
+    '''
+    Loads the build projections a captain's lineups are built from with a single query.
+
+    Returns a map of site player id to (projection id, row), the ownership projection of
+    each row, a (players x iterations) matrix of their sim scores and the site player ids
+    of the players without a full simulation.
+    '''
+    rows = list(models.BuildPlayerProjection.objects.filter(
+        id__in=projection_ids
+    ).values_list(
+        'id', 'slate_player__player_id', 'ownership_projection', 'slate_player__projection__sim_scores'
+    ))
+
+    players = {}
+    ownership = numpy.zeros(len(rows))
+    scores = numpy.zeros((len(rows), num_iterations))
+    unsimulated = set()
+    for index, (projection_id, player_id, ownership_projection, sim_scores) in enumerate(rows):
+        players[player_id] = (projection_id, index)
+        ownership[index] = float(ownership_projection)
+        if sim_scores is None or len(sim_scores) < num_iterations:
+            unsimulated.add(player_id)
+        else:
+            scores[index] = numpy.array(sim_scores[:num_iterations], dtype=numpy.float64)
+
+    return players, ownership, scores, unsimulated
+
+
+def create_captain_lineups(build, projection_ids, lineups, contest=None):
+    '''
+    Scores optimizer lineups (captain first) against the sim and saves them in one bulk
+    create. Lineup sim scores, percentiles and ownership products are computed for all
+    lineups at once from the players' rows. Raises ValueError if a lineup has a player
+    that hasn't been simulated.
+    '''
+    if len(lineups) == 0:
+        return []
+
+    players, ownership, scores, unsimulated = load_build_players(projection_ids)
+
+    missing = sorted(set(p.full_name for lineup in lineups for p in lineup.players if p.id in unsimulated))
+    if len(missing) > 0:
+        raise ValueError(f'{build} has lineups for {lineups[0].players[0].full_name} with players that have not been simulated: {", ".join(missing)}')
+
+    lineup_players = [[players[p.id] for p in lineup.players] for lineup in lineups]
+    lineup_rows = numpy.array([[row for _, row in lineup] for lineup in lineup_players], dtype=numpy.int64)
+
+    lineup_scores = numpy.round(scores[lineup_rows].sum(axis=1), 2)
+    median, s75, s90 = numpy.percentile(lineup_scores, LINEUP_PERCENTILES, axis=1)
+    ownership_projection = ownership[lineup_rows].prod(axis=1)
+    duplicated = ownership_projection * contest.max_entrants if contest is not None else numpy.zeros(len(lineups))
+
+    build_lineups = []
+    for index, lineup in enumerate(lineups):
+        projection_ids = [projection_id for projection_id, _ in lineup_players[index]]
+        build_lineups.append(models.SlateBuildLineup(
+            build=build,
+            cpt_id=projection_ids[0],
+            flex1_id=projection_ids[1],
+            flex2_id=projection_ids[2],
+            flex3_id=projection_ids[3],
+            flex4_id=projection_ids[4],
+            flex5_id=projection_ids[5] if len(projection_ids) > 5 else None,
+            salary=lineup.salary_costs,
+            projection=lineup.fantasy_points_projection,
+            ownership_projection=ownership_projection[index],
+            duplicated=duplicated[index],
+            sim_scores=lineup_scores[index].tolist(),
+            median=median[index],
+            s75=s75[index],
+            s90=s90[index]
+        ))
+
+    return models.SlateBuildLineup.objects.bulk_create(build_lineups)
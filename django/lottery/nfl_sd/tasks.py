@@ -7,7 +7,6 @@ import numpy
 import os
 import pandas
 import pandasql
-import scipy
 import sys
 import time
 import traceback
@@ -30,6 +29,8 @@ from yahoo import models as yahoo_models
 
 from . import models
 from . import optimize
+from . import payouts
+from . import simulation
 
 from lottery.celery import app
 
@@ -101,292 +102,14 @@ def simulate_slate(slate_id, task_id):
 
         slate = models.Slate.objects.get(id=slate_id)
 
-        N = 10000
-        if slate.site == 'fanduel':
-            dst_label = 'D' 
-        elif slate.site == 'yahoo':
-            dst_label = 'DEF' 
-        else:
-            dst_label = 'DST' 
-
-        r_df = get_corr_matrix(slate.site)
-        c_target = r_df.to_numpy()
-        r0 = [0] * c_target.shape[0]
-        mv_norm = scipy.stats.multivariate_normal(mean=r0, cov=c_target)
-        rand_Nmv = mv_norm.rvs(N) 
-        rand_U = scipy.stats.norm.cdf(rand_Nmv)
-
-        home_players = models.SlatePlayerProjection.objects.filter(
-            slate_player__id__in=slate.get_home_players().values_list('id', flat=True),
-            slate_player__roster_position=slate.flex_label
-        )
-        away_players = models.SlatePlayerProjection.objects.filter(
-            slate_player__id__in=slate.get_away_players().values_list('id', flat=True),
-            slate_player__roster_position=slate.flex_label
-        )
+        inputs = simulation.load_sim_inputs(slate)
+        scores = simulation.simulate_players(inputs, get_corr_matrix(slate.site).to_numpy())
 
-        home_cpt_players = models.SlatePlayerProjection.objects.filter(
-            slate_player__id__in=slate.get_home_players().values_list('id', flat=True),
-            slate_player__roster_position=slate.captain_label
-        )
-        away_cpt_players = models.SlatePlayerProjection.objects.filter(
-            slate_player__id__in=slate.get_away_players().values_list('id', flat=True),
-            slate_player__roster_position=slate.captain_label
-        )
+        slate.game_sim = json.dumps(pandas.DataFrame(scores).to_json())
+        slate.save()
 
-        home_qb = home_players.filter(slate_player__site_pos='QB').order_by('-projection', '-slate_player__salary')[0]
-        home_rb1 = home_players.filter(slate_player__site_pos='RB').order_by('-projection', '-slate_player__salary')[0]
-        home_rb2 = home_players.filter(slate_player__site_pos='RB').order_by('-projection', '-slate_player__salary')[1]
-        home_rb3 = home_players.filter(slate_player__site_pos='RB').order_by('-projection', '-slate_player__salary')[2]
-        home_wr1 = home_players.filter(slate_player__site_pos='WR').order_by('-projection', '-slate_player__salary')[0]
-        home_wr2 = home_players.filter(slate_player__site_pos='WR').order_by('-projection', '-slate_player__salary')[1]
-        home_wr3 = home_players.filter(slate_player__site_pos='WR').order_by('-projection', '-slate_player__salary')[2]
-        home_wr4 = home_players.filter(slate_player__site_pos='WR').order_by('-projection', '-slate_player__salary')[3]
-        home_wr5 = home_players.filter(slate_player__site_pos='WR').order_by('-projection', '-slate_player__salary')[4]
-        home_te1 = home_players.filter(slate_player__site_pos='TE').order_by('-projection', '-slate_player__salary')[0]
-        home_te2 = home_players.filter(slate_player__site_pos='TE').order_by('-projection', '-slate_player__salary')[1]
-        home_k = home_players.filter(slate_player__site_pos='K').order_by('-projection', '-slate_player__salary')[0]
-        home_dst = home_players.filter(slate_player__site_pos=dst_label).order_by('-projection', '-slate_player__salary')[0]
-
-        away_qb = away_players.filter(slate_player__site_pos='QB').order_by('-projection', '-slate_player__salary')[0]
-        away_rb1 = away_players.filter(slate_player__site_pos='RB').order_by('-projection', '-slate_player__salary')[0]
-        away_rb2 = away_players.filter(slate_player__site_pos='RB').order_by('-projection', '-slate_player__salary')[1]
-        away_rb3 = away_players.filter(slate_player__site_pos='RB').order_by('-projection', '-slate_player__salary')[2]
-        away_wr1 = away_players.filter(slate_player__site_pos='WR').order_by('-projection', '-slate_player__salary')[0]
-        away_wr2 = away_players.filter(slate_player__site_pos='WR').order_by('-projection', '-slate_player__salary')[1]
-        away_wr3 = away_players.filter(slate_player__site_pos='WR').order_by('-projection', '-slate_player__salary')[2]
-        away_wr4 = away_players.filter(slate_player__site_pos='WR').order_by('-projection', '-slate_player__salary')[3]
-        away_wr5 = away_players.filter(slate_player__site_pos='WR').order_by('-projection', '-slate_player__salary')[4]
-        away_te1 = away_players.filter(slate_player__site_pos='TE').order_by('-projection', '-slate_player__salary')[0]
-        away_te2 = away_players.filter(slate_player__site_pos='TE').order_by('-projection', '-slate_player__salary')[1]
-        away_k = away_players.filter(slate_player__site_pos='K').order_by('-projection', '-slate_player__salary')[0]
-        away_dst = away_players.filter(slate_player__site_pos=dst_label).order_by('-projection', '-slate_player__salary')[0]
-
-        home_qb_rv = scipy.stats.gamma((float(home_qb.projection)/float(home_qb.stdev))**2, scale=(float(home_qb.stdev)**2)/float(home_qb.projection))
-        home_rb1_rv = scipy.stats.gamma((float(home_rb1.projection)/float(home_rb1.stdev))**2, scale=(float(home_rb1.stdev)**2)/float(home_rb1.projection))
-        home_rb2_rv = scipy.stats.gamma((float(home_rb2.projection)/float(home_rb2.stdev))**2, scale=(float(home_rb2.stdev)**2)/float(home_rb2.projection))
-        home_rb3_rv = scipy.stats.gamma((float(home_rb3.projection)/float(home_rb3.stdev))**2, scale=(float(home_rb3.stdev)**2)/float(home_rb3.projection))
-        home_wr1_rv = scipy.stats.gamma((float(home_wr1.projection)/float(home_wr1.stdev))**2, scale=(float(home_wr1.stdev)**2)/float(home_wr1.projection))
-        home_wr2_rv = scipy.stats.gamma((float(home_wr2.projection)/float(home_wr2.stdev))**2, scale=(float(home_wr2.stdev)**2)/float(home_wr2.projection))
-        home_wr3_rv = scipy.stats.gamma((float(home_wr3.projection)/float(home_wr3.stdev))**2, scale=(float(home_wr3.stdev)**2)/float(home_wr3.projection))
-        home_wr4_rv = scipy.stats.gamma((float(home_wr4.projection)/float(home_wr4.stdev))**2, scale=(float(home_wr4.stdev)**2)/float(home_wr4.projection))
-        home_wr5_rv = scipy.stats.gamma((float(home_wr5.projection)/float(home_wr5.stdev))**2, scale=(float(home_wr5.stdev)**2)/float(home_wr5.projection))
-        home_te1_rv = scipy.stats.gamma((float(home_te1.projection)/float(home_te1.stdev))**2, scale=(float(home_te1.stdev)**2)/float(home_te1.projection))
-        home_te2_rv = scipy.stats.gamma((float(home_te2.projection)/float(home_te2.stdev))**2, scale=(float(home_te2.stdev)**2)/float(home_te2.projection))
-        home_k_rv = scipy.stats.gamma((float(home_k.projection)/float(home_k.stdev))**2, scale=(float(home_k.stdev)**2)/float(home_k.projection))
-        home_dst_rv = scipy.stats.gamma((float(home_dst.projection)/float(home_dst.stdev))**2, scale=(float(home_dst.stdev)**2)/float(home_dst.projection))
-        away_qb_rv = scipy.stats.gamma((float(away_qb.projection)/float(away_qb.stdev))**2, scale=(float(away_qb.stdev)**2)/float(away_qb.projection))
-        away_rb1_rv = scipy.stats.gamma((float(away_rb1.projection)/float(away_rb1.stdev))**2, scale=(float(away_rb1.stdev)**2)/float(away_rb1.projection))
-        away_rb2_rv = scipy.stats.gamma((float(away_rb2.projection)/float(away_rb2.stdev))**2, scale=(float(away_rb2.stdev)**2)/float(away_rb2.projection))
-        away_rb3_rv = scipy.stats.gamma((float(away_rb3.projection)/float(away_rb3.stdev))**2, scale=(float(away_rb3.stdev)**2)/float(away_rb3.projection))
-        away_wr1_rv = scipy.stats.gamma((float(away_wr1.projection)/float(away_wr1.stdev))**2, scale=(float(away_wr1.stdev)**2)/float(away_wr1.projection))
-        away_wr2_rv = scipy.stats.gamma((float(away_wr2.projection)/float(away_wr2.stdev))**2, scale=(float(away_wr2.stdev)**2)/float(away_wr2.projection))
-        away_wr3_rv = scipy.stats.gamma((float(away_wr3.projection)/float(away_wr3.stdev))**2, scale=(float(away_wr3.stdev)**2)/float(away_wr3.projection))
-        away_wr4_rv = scipy.stats.gamma((float(away_wr4.projection)/float(away_wr4.stdev))**2, scale=(float(away_wr4.stdev)**2)/float(away_wr4.projection))
-        away_wr5_rv = scipy.stats.gamma((float(away_wr5.projection)/float(away_wr5.stdev))**2, scale=(float(away_wr5.stdev)**2)/float(away_wr5.projection))
-        away_te1_rv = scipy.stats.gamma((float(away_te1.projection)/float(away_te1.stdev))**2, scale=(float(away_te1.stdev)**2)/float(away_te1.projection))
-        away_te2_rv = scipy.stats.gamma((float(away_te2.projection)/float(away_te2.stdev))**2, scale=(float(away_te2.stdev)**2)/float(away_te2.projection))
-        away_k_rv = scipy.stats.gamma((float(away_k.projection)/float(away_k.stdev))**2, scale=(float(away_k.stdev)**2)/float(away_k.projection))
-        away_dst_rv = scipy.stats.gamma((float(away_dst.projection)/float(away_dst.stdev))**2, scale=(float(away_dst.stdev)**2)/float(away_dst.projection))
-
-        rand_home_qb = home_qb_rv.ppf(rand_U[:, 0])
-        rand_home_rb1 = home_rb1_rv.ppf(rand_U[:, 1])
-        rand_home_rb2 = home_rb2_rv.ppf(rand_U[:, 2])
-        rand_home_rb3 = home_rb3_rv.ppf(rand_U[:, 3])
-        rand_home_wr1 = home_wr1_rv.ppf(rand_U[:, 4])
-        rand_home_wr2 = home_wr2_rv.ppf(rand_U[:, 5])
-        rand_home_wr3 = home_wr3_rv.ppf(rand_U[:, 6])
-        rand_home_wr4 = home_wr4_rv.ppf(rand_U[:, 7])
-        rand_home_wr5 = home_wr5_rv.ppf(rand_U[:, 8])
-        rand_home_te1 = home_te1_rv.ppf(rand_U[:, 9])
-        rand_home_te2 = home_te2_rv.ppf(rand_U[:, 10])
-        rand_home_k = home_k_rv.ppf(rand_U[:, 11])
-        rand_home_dst = home_dst_rv.ppf(rand_U[:, 12])
-        rand_away_qb = away_qb_rv.ppf(rand_U[:, 13])
-        rand_away_rb1 = away_rb1_rv.ppf(rand_U[:, 14])
-        rand_away_rb2 = away_rb2_rv.ppf(rand_U[:, 15])
-        rand_away_rb3 = away_rb3_rv.ppf(rand_U[:, 16])
-        rand_away_wr1 = away_wr1_rv.ppf(rand_U[:, 17])
-        rand_away_wr2 = away_wr2_rv.ppf(rand_U[:, 18])
-        rand_away_wr3 = away_wr3_rv.ppf(rand_U[:, 19])
-        rand_away_wr4 = away_wr4_rv.ppf(rand_U[:, 20])
-        rand_away_wr5 = away_wr5_rv.ppf(rand_U[:, 21])
-        rand_away_te1 = away_te1_rv.ppf(rand_U[:, 22])
-        rand_away_te2 = away_te2_rv.ppf(rand_U[:, 23])
-        rand_away_k = away_k_rv.ppf(rand_U[:, 24])
-        rand_away_dst = away_dst_rv.ppf(rand_U[:, 25])
-
-        df_scores = pandas.DataFrame([
-            rand_home_qb,
-            rand_home_rb1,
-            rand_home_rb2,
-            rand_home_rb3,
-            rand_home_wr1,
-            rand_home_wr2,
-            rand_home_wr3,
-            rand_home_wr4,
-            rand_home_wr5,
-            rand_home_te1,
-            rand_home_te2,
-            rand_home_k,
-            rand_home_dst,
-            rand_away_qb,
-            rand_away_rb1,
-            rand_away_rb2,
-            rand_away_rb3,
-            rand_away_wr1,
-            rand_away_wr2,
-            rand_away_wr3,
-            rand_away_wr4,
-            rand_away_wr5,
-            rand_away_te1,
-            rand_away_te2,
-            rand_away_k,
-            rand_away_dst,
-        ])
-        print(slate.game)
-        print(df_scores)
-
-        slate.game.game_sim = json.dumps(df_scores.to_json())
-        slate.game.save()
-        
-        # assign outcomes to flex players
-
-        home_qb.sim_scores = numpy.round(rand_home_qb, 2).tolist()
-        home_qb.save()
-        home_rb1.sim_scores = numpy.round(rand_home_rb1, 2).tolist()
-        home_rb1.save()
-        home_rb2.sim_scores = numpy.round(rand_home_rb2, 2).tolist()
-        home_rb2.save()
-        home_rb3.sim_scores = numpy.round(rand_home_rb3, 2).tolist()
-        home_rb3.save()
-        home_wr1.sim_scores = numpy.round(rand_home_wr1, 2).tolist()
-        home_wr1.save()
-        home_wr2.sim_scores = numpy.round(rand_home_wr2, 2).tolist()
-        home_wr2.save()
-        home_wr3.sim_scores = numpy.round(rand_home_wr3, 2).tolist()
-        home_wr3.save()
-        home_wr4.sim_scores = numpy.round(rand_home_wr4, 2).tolist()
-        home_wr4.save()
-        home_wr5.sim_scores = numpy.round(rand_home_wr5, 2).tolist()
-        home_wr5.save()
-        home_te1.sim_scores = numpy.round(rand_home_te1, 2).tolist()
-        home_te1.save()
-        home_te2.sim_scores = numpy.round(rand_home_te2, 2).tolist()
-        home_te2.save()
-        home_k.sim_scores = numpy.round(rand_home_k, 2).tolist()
-        home_k.save()
-        home_dst.sim_scores = numpy.round(rand_home_dst, 2).tolist()
-        home_dst.save()
-        away_qb.sim_scores = numpy.round(rand_away_qb, 2).tolist()
-        away_qb.save()
-        away_rb1.sim_scores = numpy.round(rand_away_rb1, 2).tolist()
-        away_rb1.save()
-        away_rb2.sim_scores = numpy.round(rand_away_rb2, 2).tolist()
-        away_rb2.save()
-        away_rb3.sim_scores = numpy.round(rand_away_rb3, 2).tolist()
-        away_rb3.save()
-        away_wr1.sim_scores = numpy.round(rand_away_wr1, 2).tolist()
-        away_wr1.save()
-        away_wr2.sim_scores = numpy.round(rand_away_wr2, 2).tolist()
-        away_wr2.save()
-        away_wr3.sim_scores = numpy.round(rand_away_wr3, 2).tolist()
-        away_wr3.save()
-        away_wr4.sim_scores = numpy.round(rand_away_wr4, 2).tolist()
-        away_wr4.save()
-        away_wr5.sim_scores = numpy.round(rand_away_wr5, 2).tolist()
-        away_wr5.save()
-        away_te1.sim_scores = numpy.round(rand_away_te1, 2).tolist()
-        away_te1.save()
-        away_te2.sim_scores = numpy.round(rand_away_te2, 2).tolist()
-        away_te2.save()
-        away_k.sim_scores = numpy.round(rand_away_k, 2).tolist()
-        away_k.save()
-        away_dst.sim_scores = numpy.round(rand_away_dst, 2).tolist()
-        away_dst.save()
-        
-        # assign outcomes to cpt players
-
-        home_qb = home_cpt_players.filter(slate_player__site_pos='QB').order_by('-projection', '-slate_player__salary')[0]
-        home_rb1 = home_cpt_players.filter(slate_player__site_pos='RB').order_by('-projection', '-slate_player__salary')[0]
-        home_rb2 = home_cpt_players.filter(slate_player__site_pos='RB').order_by('-projection', '-slate_player__salary')[1]
-        home_rb3 = home_cpt_players.filter(slate_player__site_pos='RB').order_by('-projection', '-slate_player__salary')[2]
-        home_wr1 = home_cpt_players.filter(slate_player__site_pos='WR').order_by('-projection', '-slate_player__salary')[0]
-        home_wr2 = home_cpt_players.filter(slate_player__site_pos='WR').order_by('-projection', '-slate_player__salary')[1]
-        home_wr3 = home_cpt_players.filter(slate_player__site_pos='WR').order_by('-projection', '-slate_player__salary')[2]
-        home_wr4 = home_cpt_players.filter(slate_player__site_pos='WR').order_by('-projection', '-slate_player__salary')[3]
-        home_wr5 = home_cpt_players.filter(slate_player__site_pos='WR').order_by('-projection', '-slate_player__salary')[4]
-        home_te1 = home_cpt_players.filter(slate_player__site_pos='TE').order_by('-projection', '-slate_player__salary')[0]
-        home_te2 = home_cpt_players.filter(slate_player__site_pos='TE').order_by('-projection', '-slate_player__salary')[1]
-        home_k = home_cpt_players.filter(slate_player__site_pos='K').order_by('-projection', '-slate_player__salary')[0]
-        home_dst = home_cpt_players.filter(slate_player__site_pos=dst_label).order_by('-projection', '-slate_player__salary')[0]
-
-        away_qb = away_cpt_players.filter(slate_player__site_pos='QB').order_by('-projection', '-slate_player__salary')[0]
-        away_rb1 = away_cpt_players.filter(slate_player__site_pos='RB').order_by('-projection', '-slate_player__salary')[0]
-        away_rb2 = away_cpt_players.filter(slate_player__site_pos='RB').order_by('-projection', '-slate_player__salary')[1]
-        away_rb3 = away_cpt_players.filter(slate_player__site_pos='RB').order_by('-projection', '-slate_player__salary')[2]
-        away_wr1 = away_cpt_players.filter(slate_player__site_pos='WR').order_by('-projection', '-slate_player__salary')[0]
-        away_wr2 = away_cpt_players.filter(slate_player__site_pos='WR').order_by('-projection', '-slate_player__salary')[1]
-        away_wr3 = away_cpt_players.filter(slate_player__site_pos='WR').order_by('-projection', '-slate_player__salary')[2]
-        away_wr4 = away_cpt_players.filter(slate_player__site_pos='WR').order_by('-projection', '-slate_player__salary')[3]
-        away_wr5 = away_cpt_players.filter(slate_player__site_pos='WR').order_by('-projection', '-slate_player__salary')[4]
-        away_te1 = away_cpt_players.filter(slate_player__site_pos='TE').order_by('-projection', '-slate_player__salary')[0]
-        away_te2 = away_cpt_players.filter(slate_player__site_pos='TE').order_by('-projection', '-slate_player__salary')[1]
-        away_k = away_cpt_players.filter(slate_player__site_pos='K').order_by('-projection', '-slate_player__salary')[0]
-        away_dst = away_cpt_players.filter(slate_player__site_pos=dst_label).order_by('-projection', '-slate_player__salary')[0]
-
-        home_qb.sim_scores = numpy.round(rand_home_qb*1.5, 2).tolist()
-        home_qb.save()
-        home_rb1.sim_scores = numpy.round(rand_home_rb1*1.5, 2).tolist()
-        home_rb1.save()
-        home_rb2.sim_scores = numpy.round(rand_home_rb2*1.5, 2).tolist()
-        home_rb2.save()
-        home_rb3.sim_scores = numpy.round(rand_home_rb3*1.5, 2).tolist()
-        home_rb3.save()
-        home_wr1.sim_scores = numpy.round(rand_home_wr1*1.5, 2).tolist()
-        home_wr1.save()
-        home_wr2.sim_scores = numpy.round(rand_home_wr2*1.5, 2).tolist()
-        home_wr2.save()
-        home_wr3.sim_scores = numpy.round(rand_home_wr3*1.5, 2).tolist()
-        home_wr3.save()
-        home_wr4.sim_scores = numpy.round(rand_home_wr4*1.5, 2).tolist()
-        home_wr4.save()
-        home_wr5.sim_scores = numpy.round(rand_home_wr5*1.5, 2).tolist()
-        home_wr5.save()
-        home_te1.sim_scores = numpy.round(rand_home_te1*1.5, 2).tolist()
-        home_te1.save()
-        home_te2.sim_scores = numpy.round(rand_home_te2*1.5, 2).tolist()
-        home_te2.save()
-        home_k.sim_scores = numpy.round(rand_home_k*1.5, 2).tolist()
-        home_k.save()
-        home_dst.sim_scores = numpy.round(rand_home_dst*1.5, 2).tolist()
-        home_dst.save()
-        away_qb.sim_scores = numpy.round(rand_away_qb*1.5, 2).tolist()
-        away_qb.save()
-        away_rb1.sim_scores = numpy.round(rand_away_rb1*1.5, 2).tolist()
-        away_rb1.save()
-        away_rb2.sim_scores = numpy.round(rand_away_rb2*1.5, 2).tolist()
-        away_rb2.save()
-        away_rb3.sim_scores = numpy.round(rand_away_rb3*1.5, 2).tolist()
-        away_rb3.save()
-        away_wr1.sim_scores = numpy.round(rand_away_wr1*1.5, 2).tolist()
-        away_wr1.save()
-        away_wr2.sim_scores = numpy.round(rand_away_wr2*1.5, 2).tolist()
-        away_wr2.save()
-        away_wr3.sim_scores = numpy.round(rand_away_wr3*1.5, 2).tolist()
-        away_wr3.save()
-        away_wr4.sim_scores = numpy.round(rand_away_wr4*1.5, 2).tolist()
-        away_wr4.save()
-        away_wr5.sim_scores = numpy.round(rand_away_wr5*1.5, 2).tolist()
-        away_wr5.save()
-        away_te1.sim_scores = numpy.round(rand_away_te1*1.5, 2).tolist()
-        away_te1.save()
-        away_te2.sim_scores = numpy.round(rand_away_te2*1.5, 2).tolist()
-        away_te2.save()
-        away_k.sim_scores = numpy.round(rand_away_k*1.5, 2).tolist()
-        away_k.save()
-        away_dst.sim_scores = numpy.round(rand_away_dst*1.5, 2).tolist()
-        away_dst.save()
+        # assign outcomes to flex and cpt players
+        simulation.save_sim_scores(inputs, scores)
 
         task.status = 'success'
         task.content = f'Simulation of {slate} complete.'
@@ -426,33 +149,7 @@ def build_lineups_for_captain(build_id, projection_ids, captain_id, task_id):
             int(contest.max_entrants * captain.ownership_projection)
         )
 
-        count = 0
-        for lineup in lineups:
-            count += 1
-            player_ids = [p.id for p in lineup.players]
-            cpt = models.BuildPlayerProjection.objects.get(slate_player__player_id=lineup.players[0].id, build=build)
-            flex1 = models.BuildPlayerProjection.objects.get(slate_player__player_id=lineup.players[1].id, build=build)
-            flex2 = models.BuildPlayerProjection.objects.get(slate_player__player_id=lineup.players[2].id, build=build)
-            flex3 = models.BuildPlayerProjection.objects.get(slate_player__player_id=lineup.players[3].id, build=build)
-            flex4 = models.BuildPlayerProjection.objects.get(slate_player__player_id=lineup.players[4].id, build=build)
-            flex5 = models.BuildPlayerProjection.objects.get(slate_player__player_id=lineup.players[5].id, build=build)
-            ownership_projection = numpy.prod([x.ownership_projection for x in models.BuildPlayerProjection.objects.filter(build=build, slate_player__player_id__in=player_ids)])
-            duplicated = numpy.prod([x.ownership_projection for x in models.BuildPlayerProjection.objects.filter(build=build, slate_player__player_id__in=player_ids)]) * contest.max_entrants if contest is not None else 0
-
-            l = models.SlateBuildLineup.objects.create(
-                build=build,
-                cpt=cpt,
-                flex1=flex1,
-                flex2=flex2,
-                flex3=flex3,
-                flex4=flex4,
-                flex5=flex5,
-                salary=lineup.salary_costs,
-                projection=lineup.fantasy_points_projection,
-                ownership_projection=ownership_projection,
-                duplicated=duplicated
-            )
-            l.simulate()
+        simulation.create_captain_lineups(build, projection_ids, lineups, contest)
 
         task.status = 'success'
         task.content = f'All possible lineups created for {captain}'
@@ -1919,62 +1616,27 @@ def get_lineup_roi(build_id, contest_id):
     build = models.SlateBuild.objects.get(id=build_id)
     contest = models.Contest.objects.get(id=contest_id)
 
-    field_lineups = build.lineups.all().order_by('-median')[:500]
-    outcomes = list(field_lineups.values_list('sim_scores', flat=True))
-    df_outcomes = pandas.DataFrame(outcomes, columns=[f'X{i}' for i in range(0, 10000)])
-    df_ranks = df_outcomes.rank(ascending=False, method='min')
-    df_outcomes['lineup_id'] = [l.id for l in field_lineups]
-    # df_ranks['lineup_id'] = [l.id for l in field_lineups]
-    print(df_outcomes)
-    print(df_ranks)
-    df_outcomes.to_csv('/opt/lottery/data/df_outcomes.csv')
-    df_ranks.to_csv('/opt/lottery/data/df_ranks.csv')
-    prize_bins = list(contest.prizes.filter(max_rank__lte=field_lineups.count()).values_list('max_rank', flat=True))
-    prizes = list(contest.prizes.filter(max_rank__lte=field_lineups.count()).values_list('prize', flat=True))
-
-    print(prize_bins)
-    print(prizes)
-
-    # np_outcomes = numpy.array(outcomes)
-    # np_outcomes.sort(axis=0)
-    # np_outcomes = np_outcomes[::-1]
-    # df_field_outcomes = pandas.DataFrame(np_outcomes)
-    # # df_field_outcomes.to_csv('/opt/lottery/data/df_field_outcomes.csv')
-    # df_bins = df_outcomes.iloc[prize_bins]
-
-    def find_split_payout(x, **kwargs):
-        s = kwargs.get('row')
-        
-        value_counts = s.value_counts()
-        total_prizes = sum([contest.get_payout(x+i) for i in range(0, value_counts.get(x))])
-        
-        return total_prizes / value_counts.get(x)
-
-    def find_payout(ranks):
-        return ranks.apply(find_split_payout, row=ranks)
-    
-    df_prizes = df_ranks.apply(find_payout)
-    print(df_prizes)
-
-    # df_lineup_outcomes = pandas.DataFrame([lineup.sim_scores])
-    # # df_lineup_outcomes.to_csv('/opt/lottery/data/df_lineup_outcomes.csv')
-    # df_ranks = pandas.concat([df_lineup_outcomes, df_bins]).rank(method='min', ascending=False)
-    # df_payouts = df_bins.applymap(find_payout)
-    # df_payouts["sum"] = df_payouts.sum(axis=1, numeric_only=True)
-
-    # # now = datetime.datetime.now()
-    # # timestamp = now.strftime('%m-%d-%Y %-I:%M %p')
-    # # result_file = f'roi export {timestamp}.csv'
-    # # result_path = '/opt/lottery/data/'
-    # # os.makedirs(result_path, exist_ok=True)
-    # # result_path = os.path.join(result_path, result_file)
-    # # df_payouts.to_csv(result_path)
-
-    # print(df_payouts)
-    # roi = (df_payouts.loc[0, "sum"]  - (float(contest.cost * 10000))) / (float(contest.cost * 10000))
-    # lineup.roi = roi
-    # lineup.save()
-    # print(f'ROI = {roi*100}%')
+    field_lineups = list(build.lineups.all().order_by('-median').values_list('id', 'sim_scores')[:payouts.RACE_FIELD_SIZE])
+    if len(field_lineups) == 0:
+        return
+
+    num_iterations = min([len(sim_scores) for _, sim_scores in field_lineups])
+    scores = numpy.array([sim_scores[:num_iterations] for _, sim_scores in field_lineups], dtype=numpy.float64)
+    results = payouts.race_lineups(
+        scores,
+        contest.prizes.all().values_list('min_rank', 'max_rank', 'prize'),
+        contest.cost
+    )
+
+    lineups = []
+    for index, (lineup_id, _) in enumerate(field_lineups):
+        lineups.append(models.SlateBuildLineup(
+            id=lineup_id,
+            roi=round(float(results.get('roi')[index]), 2),
+            cash_rate=round(float(results.get('cash_rate')[index]), 4),
+            top_one_pct_rate=round(float(results.get('top_one_pct_rate')[index]), 4)
+        ))
+    models.SlateBuildLineup.objects.bulk_update(lineups, ['roi', 'cash_rate', 'top_one_pct_rate'], batch_size=1000)
 
 
 @shared_task
@@ -6,7 +6,7 @@ import time
 
 from django.db.models.aggregates import Count, Sum, Avg
 from django.db.models import F, Q
-from nfl import models
+from nfl import models, sim_store
 
 NUM_RBS = 2
 NUM_WRS = 3
@@ -118,7 +118,7 @@ def run():
     projections = slate.get_projections().filter(in_play=True).order_by('-slate_player__salary')
     player_outcomes = {}
     for p in projections:
-        player_outcomes[p.slate_player.player_id] = np.array(p.sim_scores, dtype=np.float64)
+        player_outcomes[p.slate_player.player_id] = np.array(sim_store.get_sim_outcomes(p), dtype=np.float64)
     print(f'Getting player outcomes took {time.time() - start}s')
 
     all_stacks = []
@@ -0,0 +1,149 @@
+import numpy
+
+from django.db.models import Q, Count, Max
+from sklearn.neighbors import KDTree
+
+from . import models
+
+# Comparable matches outcomes are drawn from, per match result
+NUM_COMPARABLES = 304
+
+ODDS_FEATURES = [
+    'winner_odds',
+    'loser_odds',
+]
+
+RATE_FEATURES = ODDS_FEATURES + [
+    'winner_ace_rate',
+    'winner_df_rate',
+    'winner_firstin_rate',
+    'winner_firstwon_rate',
+    'winner_secondwon_rate',
+    'winner_hold_rate',
+    'winner_break_rate',
+    'loser_ace_rate',
+    'loser_vace_rate',
+    'loser_firstwon_rate',
+    'loser_secondwon_rate',
+    'loser_hold_rate',
+    'loser_break_rate',
+]
+
+# Player rates matching the winner_* and loser_* RATE_FEATURES, in order
+WINNER_RATES = ['ace_rate', 'df_rate', 'first_in_rate', 'first_won_rate', 'second_won_rate', 'hold_rate', 'break_rate']
+LOSER_RATES = ['ace_rate', 'v_ace_rate', 'first_won_rate', 'second_won_rate', 'hold_rate', 'break_rate']
+
+# (tour, best_of, surface, features) -> index, kept for the life of the worker
+_indexes = {}
+
+
+def get_match_pool(tour, best_of, surface):
+    return models.Match.objects.filter(
+        winner__tour=tour,
+        best_of=best_of,
+        surface=surface
+    ).exclude(Q(
+        Q(w_ace=None) | Q(w_df=None) | Q(l_ace=None) | Q(l_df=None)
+    )).exclude(
+        score__icontains='RET'
+    )
+
+
+def get_index(tour, best_of, surface, features):
+    '''
+    Returns the comparable match index of historical matches for tour, best_of and surface
+    on features: a KD-tree over the standardized float32 feature matrix plus the winner and
+    loser DK scores of each row. Indexes are cached and rebuilt when the match pool changes.
+    '''
+    matches = get_match_pool(tour, best_of, surface)
+    version = matches.aggregate(count=Count('id'), last_id=Max('id'))
+    key = (tour, best_of, surface, tuple(features))
+
+    index = _indexes.get(key)
+    if index is not None and index.get('version') == version:
+        return index
+
+    rows = numpy.array(
+        list(matches.order_by('-tourney_date', 'id').values_list(*features, 'winner_dk', 'loser_dk')),
+        dtype=numpy.float64
+    ).reshape((-1, len(features) + 2))
+    rows = rows[~numpy.isnan(rows).any(axis=1)]
+    if len(rows) == 0:
+        raise Exception(f'There are no comparable {tour} best of {best_of} matches on {surface}.')
+
+    X = rows[:, :len(features)]
+    mean = X.mean(axis=0)
+    std = X.std(axis=0)
+    std[std == 0] = 1.0
+
+    index = {
+        'version': version,
+        'mean': mean,
+        'std': std,
+        'tree': KDTree(((X - mean) / std).astype(numpy.float32)),
+        'winner_dk': rows[:, -2],
+        'loser_dk': rows[:, -1],
+    }
+    _indexes[key] = index
+    return index
+
+
+def find_comparables(index, points, k=NUM_COMPARABLES):
+    '''
+    Returns the row numbers of the k nearest comparable matches for each row of points.
+    '''
+    scaled = ((numpy.asarray(points, dtype=numpy.float64) - index.get('mean')) / index.get('std')).astype(numpy.float32)
+    _, neighbors = index.get('tree').query(scaled, k=min(k, len(index.get('winner_dk'))))
+    return neighbors
+
+
+def draw_outcomes(index, fav_comparables, dog_comparables, fav_win_pct, iterations, rng):
+    '''
+    Returns an (iterations x 2) array of favorite and underdog DK scores. Each iteration picks
+    a result by fav_win_pct and takes the scores of a random comparable match for it.
+    '''
+    fav_wins = rng.random(iterations) <= fav_win_pct
+    fav_win_rows = fav_comparables[rng.integers(len(fav_comparables), size=iterations)]
+    dog_win_rows = dog_comparables[rng.integers(len(dog_comparables), size=iterations)]
+
+    winner_dk = index.get('winner_dk')
+    loser_dk = index.get('loser_dk')
+    return numpy.column_stack([
+        numpy.where(fav_wins, winner_dk[fav_win_rows], loser_dk[dog_win_rows]),
+        numpy.where(fav_wins, loser_dk[fav_win_rows], winner_dk[dog_win_rows]),
+    ])
+
+
+def simulate_matches(queries, iterations=10000, rng=None):
+    '''
+    Simulates DK outcomes for a batch of matches. Each query is a dict of tour, best_of,
+    surface, features, fav_point, dog_point (feature vectors for a favorite and an underdog
+    win) and fav_win_pct. Matches sharing an index are searched in a single tree query.
+
+    Returns an (iterations x 2) array of favorite and underdog scores per query.
+    '''
+    if rng is None:
+        rng = numpy.random.default_rng()
+
+    groups = {}
+    for position, query in enumerate(queries):
+        key = (query.get('tour'), query.get('best_of'), query.get('surface'), tuple(query.get('features')))
+        groups.setdefault(key, []).append(position)
+
+    outcomes = [None] * len(queries)
+    for (tour, best_of, surface, features), positions in groups.items():
+        index = get_index(tour, best_of, surface, list(features))
+        points = [queries[p].get(point) for p in positions for point in ['fav_point', 'dog_point']]
+        comparables = find_comparables(index, points)
+
+        for offset, position in enumerate(positions):
+            outcomes[position] = draw_outcomes(
+                index,
+                comparables[2 * offset],
+                comparables[2 * offset + 1],
+                queries[position].get('fav_win_pct'),
+                iterations,
+                rng
+            )
+
+    return outcomes
@@ -0,0 +1,52 @@
+# Generated by Django 2.2 on 2023-01-21 10:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tennis', '0050_auto_20230120_1448'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerWeeklyStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('surface', models.CharField(blank=True, max_length=255, null=True)),
+                ('week', models.DateField()),
+                ('num_matches', models.IntegerField(default=0)),
+                ('sp_won', models.IntegerField(default=0)),
+                ('sp_points', models.IntegerField(default=0)),
+                ('rp_won', models.IntegerField(default=0)),
+                ('rp_points', models.IntegerField(default=0)),
+                ('ace_aces', models.IntegerField(default=0)),
+                ('ace_games', models.IntegerField(default=0)),
+                ('ace_points', models.IntegerField(default=0)),
+                ('vace_aces', models.IntegerField(default=0)),
+                ('vace_games', models.IntegerField(default=0)),
+                ('df_dfs', models.IntegerField(default=0)),
+                ('df_games', models.IntegerField(default=0)),
+                ('df_points', models.IntegerField(default=0)),
+                ('firstin_in', models.IntegerField(default=0)),
+                ('firstin_points', models.IntegerField(default=0)),
+                ('firstwon_won', models.IntegerField(default=0)),
+                ('firstwon_in', models.IntegerField(default=0)),
+                ('secondwon_won', models.IntegerField(default=0)),
+                ('secondwon_points', models.IntegerField(default=0)),
+                ('hold_breaks', models.IntegerField(default=0)),
+                ('hold_games', models.IntegerField(default=0)),
+                ('break_breaks', models.IntegerField(default=0)),
+                ('break_games', models.IntegerField(default=0)),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weekly_stats', to='tennis.Player')),
+            ],
+            options={
+                'verbose_name': 'Player Weekly Stats',
+                'verbose_name_plural': 'Player Weekly Stats',
+                'unique_together': {('player', 'surface', 'week')},
+                'index_together': {('surface', 'week')},
+            },
+        ),
+    ]
@@ -76,6 +76,37 @@ SURFACE_CHOICES = (
     ('Grass', 'Grass')
 )
 
+# Weekly totals kept by PlayerWeeklyStats
+PLAYER_STAT_FIELDS = [
+    'num_matches',
+    'sp_won', 'sp_points',
+    'rp_won', 'rp_points',
+    'ace_aces', 'ace_games', 'ace_points',
+    'vace_aces', 'vace_games',
+    'df_dfs', 'df_games', 'df_points',
+    'firstin_in', 'firstin_points',
+    'firstwon_won', 'firstwon_in',
+    'secondwon_won', 'secondwon_points',
+    'hold_breaks', 'hold_games',
+    'break_breaks', 'break_games',
+]
+
+# rate -> (numerator, denominator, 1 - ratio, decimal places)
+PLAYER_RATES = {
+    'serve_points_rate': ('sp_won', 'sp_points', False, 4),
+    'return_points_rate': ('rp_won', 'rp_points', False, 4),
+    'ace_rate': ('ace_aces', 'ace_games', False, 2),
+    'ace_pct': ('ace_aces', 'ace_points', False, 4),
+    'v_ace_rate': ('vace_aces', 'vace_games', False, 2),
+    'df_rate': ('df_dfs', 'df_games', False, 2),
+    'df_pct': ('df_dfs', 'df_points', False, 4),
+    'first_in_rate': ('firstin_in', 'firstin_points', False, 2),
+    'first_won_rate': ('firstwon_won', 'firstwon_in', False, 2),
+    'second_won_rate': ('secondwon_won', 'secondwon_points', False, 2),
+    'hold_rate': ('hold_breaks', 'hold_games', True, 2),
+    'break_rate': ('break_breaks', 'break_games', False, 2),
+}
+
 # Tennis Match Data
 
 class Player(models.Model):
@@ -114,468 +145,52 @@ class Player(models.Model):
     
         return age 
     
-    def get_num_matches(self, timeframe=52, startingFrom=datetime.date.today(), on_surface='Hard'):
-        endDate = startingFrom - datetime.timedelta(weeks=timeframe)
-        winning_matches = self.winning_matches.filter(
-            tourney_date__lte=startingFrom,
-            tourney_date__gte=endDate,
-            surface=on_surface
-        )
-        losing_matches = self.losing_matches.filter(
-            tourney_date__lte=startingFrom,
-            tourney_date__gte=endDate,
-            surface=on_surface
-        )
+    def get_rates(self, timeframe=52, startingFrom=datetime.date.today(), on_surface='Hard'):
+        return PlayerWeeklyStats.get_rates(
+            [self.player_id],
+            startingFrom=startingFrom,
+            on_surface=on_surface,
+            timeframe=timeframe
+        ).get(self.player_id)
 
-        return winning_matches.count() + losing_matches.count()
+    def get_num_matches(self, timeframe=52, startingFrom=datetime.date.today(), on_surface='Hard'):
+        return self.get_rates(timeframe=timeframe, startingFrom=startingFrom, on_surface=on_surface).get('num_matches')
 
     def get_serve_points_rate(self, timeframe=52, startingFrom=datetime.date.today(), on_surface='Hard'):
-        endDate = startingFrom - datetime.timedelta(weeks=timeframe)
-        winning_matches = self.winning_matches.filter(
-            tourney_date__lte=startingFrom,
-            tourney_date__gte=endDate,
-            surface=on_surface
-        ).exclude(
-           Q(Q(w_svpt=None) | Q(w_1stWon=None) | Q(w_2ndWon=None))
-        )
-        losing_matches = self.losing_matches.filter(
-            tourney_date__lte=startingFrom,
-            tourney_date__gte=endDate,
-            surface=on_surface
-        ).exclude(
-           Q(Q(l_svpt=None) | Q(l_1stWon=None) | Q(l_2ndWon=None))
-        )
-
-        w_points_data = winning_matches.aggregate(
-            num_points=Sum('w_svpt'),
-            num_1stWon=Sum('w_1stWon'),
-            num_2ndWon=Sum('w_2ndWon')
-        )
-        l_points_data = losing_matches.aggregate(
-            num_points=Sum('l_svpt'),
-            num_1stWon=Sum('l_1stWon'),
-            num_2ndWon=Sum('l_2ndWon')
-        )
-
-        if (w_points_data.get('num_points') is None or w_points_data.get('num_points') == 0) and (l_points_data.get('num_points') is None or l_points_data.get('num_points') == 0):
-            return None        
-        elif w_points_data.get('num_points') is None or w_points_data.get('num_points') == 0:
-            rate = (l_points_data.get('num_1stWon') + l_points_data.get('num_2ndWon')) / (l_points_data.get('num_points'))
-        elif l_points_data.get('num_games') is None or l_points_data.get('num_games') == 0:
-            rate = (w_points_data.get('num_1stWon') + w_points_data.get('num_2ndWon')) / (w_points_data.get('num_points'))
-        else:
-            rate = (w_points_data.get('num_1stWon') + w_points_data.get('num_2ndWon') + l_points_data.get('num_1stWon') + l_points_data.get('num_2ndWon')) / (w_points_data.get('num_points') + l_points_data.get('num_points'))
-
-        return round(rate, 4)
+        return self.get_rates(timeframe=timeframe, startingFrom=startingFrom, on_surface=on_surface).get('serve_points_rate')
 
     def get_return_points_rate(self, timeframe=52, startingFrom=datetime.date.today(), on_surface='Hard'):
-        endDate = startingFrom - datetime.timedelta(weeks=timeframe)
-        winning_matches = self.winning_matches.filter(
-            tourney_date__lte=startingFrom,
-            tourney_date__gte=endDate,
-            surface=on_surface
-        ).exclude(
-           Q(Q(l_svpt=None) | Q(l_1stWon=None) | Q(l_2ndWon=None))
-        )
-        losing_matches = self.losing_matches.filter(
-            tourney_date__lte=startingFrom,
-            tourney_date__gte=endDate,
-            surface=on_surface
-        ).exclude(
-           Q(Q(w_svpt=None) | Q(w_1stWon=None) | Q(w_2ndWon=None))
-        )
-
-        w_points_data = winning_matches.aggregate(
-            num_points=Sum('l_svpt'),
-            num_1stWon=Sum('l_1stWon'),
-            num_2ndWon=Sum('l_2ndWon')
-        )
-        l_points_data = losing_matches.aggregate(
-            num_points=Sum('w_svpt'),
-            num_1stWon=Sum('w_1stWon'),
-            num_2ndWon=Sum('w_2ndWon')
-        )
-
-        if (w_points_data.get('num_points') is None or w_points_data.get('num_points') == 0) and (l_points_data.get('num_points') is None or l_points_data.get('num_points') == 0):
-            return None        
-        elif w_points_data.get('num_points') is None or w_points_data.get('num_points') == 0:
-            rate = (l_points_data.get('num_points') - (l_points_data.get('num_1stWon') + l_points_data.get('num_2ndWon'))) / (l_points_data.get('num_points'))
-        elif l_points_data.get('num_games') is None or l_points_data.get('num_games') == 0:
-            rate = (w_points_data.get('num_points') - (w_points_data.get('num_1stWon') + w_points_data.get('num_2ndWon'))) / (w_points_data.get('num_points'))
-        else:
-            rate = ((l_points_data.get('num_points') - (l_points_data.get('num_1stWon') + l_points_data.get('num_2ndWon'))) + (w_points_data.get('num_points') - (w_points_data.get('num_1stWon') + w_points_data.get('num_2ndWon')))) / (w_points_data.get('num_points') + l_points_data.get('num_points'))
-
-        return round(rate, 4)
+        return self.get_rates(timeframe=timeframe, startingFrom=startingFrom, on_surface=on_surface).get('return_points_rate')
 
     def get_ace_rate(self, timeframe=52, startingFrom=datetime.date.today(), on_surface='Hard'):
-        endDate = startingFrom - datetime.timedelta(weeks=timeframe)
-        winning_matches = self.winning_matches.filter(
-            tourney_date__lte=startingFrom,
-            tourney_date__gte=endDate,
-            surface=on_surface
-        ).exclude(
-           Q(Q(w_SvGms=None) | Q(w_ace=None))
-        )
-        losing_matches = self.losing_matches.filter(
-            tourney_date__lte=startingFrom,
-            tourney_date__gte=endDate,
-            surface=on_surface
-        ).exclude(
-           Q(Q(l_SvGms=None) | Q(l_ace=None))
-        )
-
-        w_ace_data = winning_matches.aggregate(
-            num_aces=Sum('w_ace'),
-            num_games=Sum('w_SvGms')
-        )
-        l_ace_data = losing_matches.aggregate(
-            num_aces=Sum('l_ace'),
-            num_games=Sum('l_SvGms')
-        )
-
-        if (w_ace_data.get('num_games') is None or w_ace_data.get('num_games') == 0) and (l_ace_data.get('num_games') is None or l_ace_data.get('num_games') == 0):
-            return None        
-        elif w_ace_data.get('num_games') is None or w_ace_data.get('num_games') == 0:
-            ace_rate = (l_ace_data.get('num_aces')) / (l_ace_data.get('num_games'))
-        elif l_ace_data.get('num_games') is None or l_ace_data.get('num_games') == 0:
-            ace_rate = (w_ace_data.get('num_aces')) / (w_ace_data.get('num_games'))
-        else:
-            ace_rate = (w_ace_data.get('num_aces') + l_ace_data.get('num_aces')) / (w_ace_data.get('num_games') + l_ace_data.get('num_games'))
-
-        return round(ace_rate, 2)
+        return self.get_rates(timeframe=timeframe, startingFrom=startingFrom, on_surface=on_surface).get('ace_rate')
 
     def get_ace_pct(self, timeframe=52, startingFrom=datetime.date.today(), on_surface='Hard'):
-        endDate = startingFrom - datetime.timedelta(weeks=timeframe)
-        winning_matches = self.winning_matches.filter(
-            tourney_date__lte=startingFrom,
-            tourney_date__gte=endDate,
-            surface=on_surface
-        ).exclude(
-           Q(Q(w_SvGms=None) | Q(w_ace=None))
-        )
-        losing_matches = self.losing_matches.filter(
-            tourney_date__lte=startingFrom,
-            tourney_date__gte=endDate,
-            surface=on_surface
-        ).exclude(
-           Q(Q(l_SvGms=None) | Q(l_ace=None))
-        )
-
-        w_ace_data = winning_matches.aggregate(
-            num_aces=Sum('w_ace'),
-            num_points=Sum('w_svpt'),
-        )
-        l_ace_data = losing_matches.aggregate(
-            num_aces=Sum('l_ace'),
-            num_points=Sum('l_svpt'),
-        )
-
-        if (w_ace_data.get('num_points') is None or w_ace_data.get('num_points') == 0) and (l_ace_data.get('num_points') is None or l_ace_data.get('num_points') == 0):
-            return None        
-        elif w_ace_data.get('num_points') is None or w_ace_data.get('num_points') == 0:
-            ace_rate = (l_ace_data.get('num_aces')) / (l_ace_data.get('num_points'))
-        elif l_ace_data.get('num_points') is None or l_ace_data.get('num_points') == 0:
-            ace_rate = (w_ace_data.get('num_aces')) / (w_ace_data.get('num_points'))
-        else:
-            ace_rate = (w_ace_data.get('num_aces') + l_ace_data.get('num_aces')) / (w_ace_data.get('num_points') + l_ace_data.get('num_points'))
-
-        return round(ace_rate, 4)
+        return self.get_rates(timeframe=timeframe, startingFrom=startingFrom, on_surface=on_surface).get('ace_pct')
 
     def get_v_ace_rate(self, timeframe=52, startingFrom=datetime.date.today(), on_surface='Hard'):
-        endDate = startingFrom - datetime.timedelta(weeks=timeframe)
-        winning_matches = self.winning_matches.filter(
-            tourney_date__lte=startingFrom,
-            tourney_date__gte=endDate,
-            surface=on_surface
-        ).exclude(
-           Q(Q(w_SvGms=None) | Q(w_ace=None))
-        )
-        losing_matches = self.losing_matches.filter(
-            tourney_date__lte=startingFrom,
-            tourney_date__gte=endDate,
-            surface=on_surface
-        ).exclude(
-           Q(Q(l_SvGms=None) | Q(l_ace=None))
-        )
-
-        w_ace_data = winning_matches.aggregate(
-            num_aces=Sum('l_ace'),
-            num_games=Sum('l_SvGms')
-        )
-        l_ace_data = losing_matches.aggregate(
-            num_aces=Sum('w_ace'),
-            num_games=Sum('w_SvGms')
-        )
-
-        if (w_ace_data.get('num_games') is None or w_ace_data.get('num_games') == 0) and (l_ace_data.get('num_games') is None or l_ace_data.get('num_games') == 0):
-            return None        
-        elif w_ace_data.get('num_games') is None or w_ace_data.get('num_games') == 0:
-            ace_rate = (l_ace_data.get('num_aces')) / (l_ace_data.get('num_games'))
-        elif l_ace_data.get('num_games') is None or l_ace_data.get('num_games') == 0:
-            ace_rate = (w_ace_data.get('num_aces')) / (w_ace_data.get('num_games'))
-        else:
-            ace_rate = (w_ace_data.get('num_aces') + l_ace_data.get('num_aces')) / (w_ace_data.get('num_games') + l_ace_data.get('num_games'))
-
-        return round(ace_rate, 2)
+        return self.get_rates(timeframe=timeframe, startingFrom=startingFrom, on_surface=on_surface).get('v_ace_rate')
 
     def get_df_rate(self, timeframe=52, startingFrom=datetime.date.today(), on_surface='Hard'):
-        endDate = startingFrom - datetime.timedelta(weeks=timeframe)
-        winning_matches = self.winning_matches.filter(
-            tourney_date__lte=startingFrom,
-            tourney_date__gte=endDate,
-            surface=on_surface
-        ).exclude(
-           Q(Q(w_SvGms=None) | Q(w_df=None))
-        )
-        losing_matches = self.losing_matches.filter(
-            tourney_date__lte=startingFrom,
-            tourney_date__gte=endDate,
-            surface=on_surface
-        ).exclude(
-           Q(Q(l_SvGms=None) | Q(l_df=None))
-        )
-
-        w_df_data = winning_matches.aggregate(
-            num_dfs=Sum('w_df'),
-            num_games=Sum('w_SvGms')
-        )
-        l_df_data = losing_matches.aggregate(
-            num_dfs=Sum('l_df'),
-            num_games=Sum('l_SvGms')
-        )
-
-        if (w_df_data.get('num_games') is None or w_df_data.get('num_games') == 0) and (l_df_data.get('num_games') is None or l_df_data.get('num_games') == 0):
-            return None        
-        elif w_df_data.get('num_games') is None or w_df_data.get('num_games') == 0:
-            df_rate = (l_df_data.get('num_dfs')) / (l_df_data.get('num_games'))
-        elif l_df_data.get('num_games') is None or l_df_data.get('num_games') == 0:
-            df_rate = (w_df_data.get('num_dfs')) / (w_df_data.get('num_games'))
-        else:
-            df_rate = (w_df_data.get('num_dfs') + l_df_data.get('num_dfs')) / (w_df_data.get('num_games') + l_df_data.get('num_games'))
-
-        return round(df_rate, 2)
+        return self.get_rates(timeframe=timeframe, startingFrom=startingFrom, on_surface=on_surface).get('df_rate')
 
     def get_df_pct(self, timeframe=52, startingFrom=datetime.date.today(), on_surface='Hard'):
-        endDate = startingFrom - datetime.timedelta(weeks=timeframe)
-        winning_matches = self.winning_matches.filter(
-            tourney_date__lte=startingFrom,
-            tourney_date__gte=endDate,
-            surface=on_surface
-        ).exclude(
-           Q(Q(w_SvGms=None) | Q(w_df=None))
-        )
-        losing_matches = self.losing_matches.filter(
-            tourney_date__lte=startingFrom,
-            tourney_date__gte=endDate,
-            surface=on_surface
-        ).exclude(
-           Q(Q(l_SvGms=None) | Q(l_df=None))
-        )
-
-        w_df_data = winning_matches.aggregate(
-            num_dfs=Sum('w_df'),
-            num_points=Sum('w_svpt'),
-        )
-        l_df_data = losing_matches.aggregate(
-            num_dfs=Sum('l_df'),
-            num_points=Sum('l_svpt'),
-        )
-
-        if (w_df_data.get('num_points') is None or w_df_data.get('num_points') == 0) and (l_df_data.get('num_points') is None or l_df_data.get('num_points') == 0):
-            return None        
-        elif w_df_data.get('num_points') is None or w_df_data.get('num_points') == 0:
-            df_rate = (l_df_data.get('num_dfs')) / (l_df_data.get('num_points'))
-        elif l_df_data.get('num_points') is None or l_df_data.get('num_points') == 0:
-            df_rate = (w_df_data.get('num_dfs')) / (w_df_data.get('num_points'))
-        else:
-            df_rate = (w_df_data.get('num_dfs') + l_df_data.get('num_dfs')) / (w_df_data.get('num_points') + l_df_data.get('num_points'))
-
-        return round(df_rate, 4)
+        return self.get_rates(timeframe=timeframe, startingFrom=startingFrom, on_surface=on_surface).get('df_pct')
 
     def get_first_in_rate(self, timeframe=52, startingFrom=datetime.date.today(), on_surface='Hard'):
-        endDate = startingFrom - datetime.timedelta(weeks=timeframe)
-        winning_matches = self.winning_matches.filter(
-            tourney_date__lte=startingFrom,
-            tourney_date__gte=endDate,
-            surface=on_surface
-        ).exclude(
-           Q(Q(w_svpt=None) | Q(w_1stIn=None))
-        )
-        losing_matches = self.losing_matches.filter(
-            tourney_date__lte=startingFrom,
-            tourney_date__gte=endDate,
-            surface=on_surface
-        ).exclude(
-           Q(Q(l_svpt=None) | Q(l_1stIn=None))
-        )
-
-        w_data = winning_matches.aggregate(
-            num_1stIns=Sum('w_1stIn'),
-            num_points=Sum('w_svpt')
-        )
-        l_data = losing_matches.aggregate(
-            num_1stIns=Sum('l_1stIn'),
-            num_points=Sum('l_svpt')
-        )
-
-        if (w_data.get('num_points') is None or w_data.get('num_points') == 0) and (l_data.get('num_points') is None or l_data.get('num_points') == 0):
-            return None        
-        elif w_data.get('num_points') is None or w_data.get('num_points') == 0:
-            first_in_rate = (l_data.get('num_1stIns')) / (l_data.get('num_points'))
-        elif l_data.get('num_points') is None or l_data.get('num_points') == 0:
-            first_in_rate = (w_data.get('num_1stIns')) / (w_data.get('num_points'))
-        else:
-            first_in_rate = (w_data.get('num_1stIns') + l_data.get('num_1stIns')) / (w_data.get('num_points') + l_data.get('num_points'))
-
-        return round(first_in_rate, 2)
+        return self.get_rates(timeframe=timeframe, startingFrom=startingFrom, on_surface=on_surface).get('first_in_rate')
 
     def get_first_won_rate(self, timeframe=52, startingFrom=datetime.date.today(), on_surface='Hard'):
-        endDate = startingFrom - datetime.timedelta(weeks=timeframe)
-        winning_matches = self.winning_matches.filter(
-            tourney_date__lte=startingFrom,
-            tourney_date__gte=endDate,
-            surface=on_surface
-        ).exclude(
-           Q(Q(w_1stIn=None) | Q(w_1stWon=None))
-        )
-        losing_matches = self.losing_matches.filter(
-            tourney_date__lte=startingFrom,
-            tourney_date__gte=endDate,
-            surface=on_surface
-        ).exclude(
-           Q(Q(l_1stIn=None) | Q(l_1stWon=None))
-        )
-
-        w_data = winning_matches.aggregate(
-            num_1stWons=Sum('w_1stWon'),
-            num_points=Sum('w_1stIn')
-        )
-        l_data = losing_matches.aggregate(
-            num_1stWons=Sum('l_1stWon'),
-            num_points=Sum('l_1stIn')
-        )
-
-        if (w_data.get('num_points') is None or w_data.get('num_points') == 0) and (l_data.get('num_points') is None or l_data.get('num_points') == 0):
-            return None        
-        elif w_data.get('num_points') is None or w_data.get('num_points') == 0:
-            first_won_rate = (l_data.get('num_1stWons')) / (l_data.get('num_points'))
-        elif l_data.get('num_points') is None or l_data.get('num_points') == 0:
-            first_won_rate = (w_data.get('num_1stWons')) / (w_data.get('num_points'))
-        else:
-            first_won_rate = (w_data.get('num_1stWons') + l_data.get('num_1stWons')) / (w_data.get('num_points') + l_data.get('num_points'))
-
-        return round(first_won_rate, 2)
+        return self.get_rates(timeframe=timeframe, startingFrom=startingFrom, on_surface=on_surface).get('first_won_rate')
 
     def get_second_won_rate(self, timeframe=52, startingFrom=datetime.date.today(), on_surface='Hard'):
-        endDate = startingFrom - datetime.timedelta(weeks=timeframe)
-        winning_matches = self.winning_matches.filter(
-            tourney_date__lte=startingFrom,
-            tourney_date__gte=endDate,
-            surface=on_surface
-        ).exclude(
-           Q(Q(w_svpt=None) | Q(w_1stIn=None) | Q(w_2ndWon=None))
-        )
-        losing_matches = self.losing_matches.filter(
-            tourney_date__lte=startingFrom,
-            tourney_date__gte=endDate,
-            surface=on_surface
-        ).exclude(
-           Q(Q(l_svpt=None) | Q(l_1stIn=None) | Q(l_2ndWon=None))
-        )
-
-        w_data = winning_matches.aggregate(
-            num_2ndWons=Sum('w_2ndWon'),
-            num_points=Sum('w_svpt')- Sum('w_1stIn')
-        )
-        l_data = losing_matches.aggregate(
-            num_2ndWons=Sum('l_2ndWon'),
-            num_points=Sum('l_svpt')- Sum('l_1stIn')
-        )
-
-        if (w_data.get('num_points') is None or w_data.get('num_points') == 0) and (l_data.get('num_points') is None or l_data.get('num_points') == 0):
-            return None        
-        elif w_data.get('num_points') is None or w_data.get('num_points') == 0:
-            second_won_rate = (l_data.get('num_2ndWons')) / (l_data.get('num_points'))
-        elif l_data.get('num_points') is None or l_data.get('num_points') == 0:
-            second_won_rate = (w_data.get('num_2ndWons')) / (w_data.get('num_points'))
-        else:
-            second_won_rate = (w_data.get('num_2ndWons') + l_data.get('num_2ndWons')) / (w_data.get('num_points') + l_data.get('num_points'))
-
-        return round(second_won_rate, 2)
+        return self.get_rates(timeframe=timeframe, startingFrom=startingFrom, on_surface=on_surface).get('second_won_rate')
 
     def get_hold_rate(self, timeframe=52, startingFrom=datetime.date.today(), on_surface='Hard'):
-        endDate = startingFrom - datetime.timedelta(weeks=timeframe)
-        winning_matches = self.winning_matches.filter(
-            tourney_date__lte=startingFrom,
-            tourney_date__gte=endDate,
-            surface=on_surface
-        ).exclude(
-           Q(Q(w_bpFaced=None) | Q(w_bpSaved=None) | Q(w_SvGms=None))
-        )
-        losing_matches = self.losing_matches.filter(
-            tourney_date__lte=startingFrom,
-            tourney_date__gte=endDate,
-            surface=on_surface
-        ).exclude(
-           Q(Q(l_bpFaced=None) | Q(l_bpSaved=None) | Q(l_SvGms=None))
-        )
-
-        w_data = winning_matches.aggregate(
-            num_breaks=Sum('w_bpFaced') - Sum('w_bpSaved'),
-            num_chances=Sum('w_SvGms')
-        )
-        l_data = losing_matches.aggregate(
-            num_breaks=Sum('l_bpFaced') - Sum('l_bpSaved'),
-            num_chances=Sum('l_SvGms')
-        )
-
-        if (w_data.get('num_chances') is None or w_data.get('num_chances') == 0) and (l_data.get('num_chances') is None or l_data.get('num_chances') == 0):
-            return None        
-        elif w_data.get('num_chances') is None or w_data.get('num_chances') == 0:
-            hold_rate = 1.0 - (l_data.get('num_breaks')) / (l_data.get('num_chances'))
-        elif l_data.get('num_chances') is None or l_data.get('num_chances') == 0:
-            hold_rate = 1.0 - (w_data.get('num_breaks')) / (w_data.get('num_chances'))
-        else:
-            hold_rate = 1.0 - (w_data.get('num_breaks') + l_data.get('num_breaks')) / (w_data.get('num_chances') + l_data.get('num_chances'))
-
-        return round(hold_rate, 2)
+        return self.get_rates(timeframe=timeframe, startingFrom=startingFrom, on_surface=on_surface).get('hold_rate')
 
     def get_break_rate(self, timeframe=52, startingFrom=datetime.date.today(), on_surface='Hard'):
-        endDate = startingFrom - datetime.timedelta(weeks=timeframe)
-        winning_matches = self.winning_matches.filter(
-            tourney_date__lte=startingFrom,
-            tourney_date__gte=endDate,
-            surface=on_surface
-        ).exclude(
-           Q(Q(l_bpFaced=None) | Q(l_bpSaved=None) | Q(l_SvGms=None))
-        )
-        losing_matches = self.losing_matches.filter(
-            tourney_date__lte=startingFrom,
-            tourney_date__gte=endDate,
-            surface=on_surface
-        ).exclude(
-           Q(Q(w_bpFaced=None) | Q(w_bpSaved=None) | Q(w_SvGms=None))
-        )
-
-        w_data = winning_matches.aggregate(
-            num_breaks=Sum('l_bpFaced') - Sum('l_bpSaved'),
-            num_chances=Sum('l_SvGms')
-        )
-        l_data = losing_matches.aggregate(
-            num_breaks=Sum('w_bpFaced') - Sum('w_bpSaved'),
-            num_chances=Sum('w_SvGms')
-        )
-
-        if (w_data.get('num_chances') is None or w_data.get('num_chances') == 0) and (l_data.get('num_chances') is None or l_data.get('num_chances') == 0):
-            return None        
-        elif w_data.get('num_chances') is None or w_data.get('num_chances') == 0:
-            break_rate = (l_data.get('num_breaks')) / (l_data.get('num_chances'))
-        elif l_data.get('num_chances') is None or l_data.get('num_chances') == 0:
-            break_rate = (w_data.get('num_breaks')) / (w_data.get('num_chances'))
-        else:
-            break_rate = (w_data.get('num_breaks') + l_data.get('num_breaks')) / (w_data.get('num_chances') + l_data.get('num_chances'))
-
-        return round(break_rate, 2)
+        return self.get_rates(timeframe=timeframe, startingFrom=startingFrom, on_surface=on_surface).get('break_rate')
 
     def get_rank(self, as_of=datetime.date.today()):
         ranking_history = self.ranking_history.filter(ranking_date__lte=as_of).order_by('-ranking_date')
@@ -1120,6 +735,86 @@ class Match(models.Model):
         return self.loser.get_break_rate(timeframe=timeframe, startingFrom=self.tourney_date, on_surface=self.surface)        
 
 
+class PlayerWeeklyStats(models.Model):
+    '''
+    Serve and return totals of a player's matches on a surface, one row per tournament week,
+    rebuilt from Match by tasks.update_player_weekly_stats. Rolling rates over any window
+    are sums over the weeks it covers.
+    '''
+    player = models.ForeignKey(Player, related_name='weekly_stats', on_delete=models.CASCADE)
+    surface = models.CharField(max_length=255, null=True, blank=True)
+    week = models.DateField()
+
+    num_matches = models.IntegerField(default=0)
+    sp_won = models.IntegerField(default=0)
+    sp_points = models.IntegerField(default=0)
+    rp_won = models.IntegerField(default=0)
+    rp_points = models.IntegerField(default=0)
+    ace_aces = models.IntegerField(default=0)
+    ace_games = models.IntegerField(default=0)
+    ace_points = models.IntegerField(default=0)
+    vace_aces = models.IntegerField(default=0)
+    vace_games = models.IntegerField(default=0)
+    df_dfs = models.IntegerField(default=0)
+    df_games = models.IntegerField(default=0)
+    df_points = models.IntegerField(default=0)
+    firstin_in = models.IntegerField(default=0)
+    firstin_points = models.IntegerField(default=0)
+    firstwon_won = models.IntegerField(default=0)
+    firstwon_in = models.IntegerField(default=0)
+    secondwon_won = models.IntegerField(default=0)
+    secondwon_points = models.IntegerField(default=0)
+    hold_breaks = models.IntegerField(default=0)
+    hold_games = models.IntegerField(default=0)
+    break_breaks = models.IntegerField(default=0)
+    break_games = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Player Weekly Stats'
+        verbose_name_plural = 'Player Weekly Stats'
+        unique_together = ['player', 'surface', 'week']
+        index_together = ['surface', 'week']
+
+    def __str__(self):
+        return f'{self.player} {self.surface} {self.week}'
+
+    @classmethod
+    def get_rates(clz, player_ids, startingFrom=datetime.date.today(), on_surface='Hard', timeframe=52):
+        '''
+        Returns a dict of player id -> num_matches and every rate in PLAYER_RATES for the
+        timeframe weeks up to startingFrom, for all players in one query. Rates are None
+        when a player has nothing to divide by.
+        '''
+        endDate = startingFrom - datetime.timedelta(weeks=timeframe)
+        totals = {
+            row.get('player_id'): row for row in clz.objects.filter(
+                player_id__in=player_ids,
+                surface=on_surface,
+                week__lte=startingFrom,
+                week__gte=endDate
+            ).values('player_id').annotate(**{
+                f'total_{field}': Sum(field) for field in PLAYER_STAT_FIELDS
+            })
+        }
+
+        rates = {}
+        for player_id in player_ids:
+            row = totals.get(player_id, {})
+            player_rates = {
+                'num_matches': row.get('total_num_matches') or 0
+            }
+            for rate, (numerator, denominator, complement, digits) in PLAYER_RATES.items():
+                num = row.get(f'total_{numerator}') or 0
+                den = row.get(f'total_{denominator}') or 0
+                if den == 0:
+                    player_rates[rate] = None
+                else:
+                    player_rates[rate] = round(1.0 - num / den if complement else num / den, digits)
+            rates[player_id] = player_rates
+
+        return rates
+
+
 # Alias
 
 
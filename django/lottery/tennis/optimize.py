@@ -12,6 +12,10 @@ from pydfs_lineup_optimizer.solvers.mip_solver import MIPSolver
 
 GameInfo = namedtuple('GameInfo', ['home_team', 'away_team', 'starts_at', 'game_started'])
 
+# DraftKings tennis classic roster
+DK_ROSTER_SIZE = 6
+DK_SALARY_CAP = 50000
+
 
 def find_optimal_from_sims(site, projections, sim_iteration=0):
     if site == 'draftkings':
@@ -41,6 +45,76 @@ def find_optimal_from_sims(site, projections, sim_iteration=0):
     return lineups
 
 
+def find_optimal_lineup(scores, salaries, salary_cap=DK_SALARY_CAP, roster_size=DK_ROSTER_SIZE):
+    '''
+    Returns the indices of the highest scoring roster_size players whose salaries fit under
+    salary_cap, or None when no roster fits.
+
+    Players are searched depth-first in descending score order. A branch is cut when the
+    best scores left cannot beat the best roster found, or the cheapest salaries on the
+    slate cannot fill the remaining spots under the cap.
+    '''
+    num_players = len(scores)
+    if num_players < roster_size:
+        return None
+
+    order = numpy.argsort(-numpy.asarray(scores, dtype=numpy.float64), kind='stable')
+    sorted_scores = numpy.asarray(scores, dtype=numpy.float64)[order].tolist()
+    sorted_salaries = numpy.asarray(salaries)[order].tolist()
+
+    score_sums = [0.0]
+    for score in sorted_scores:
+        score_sums.append(score_sums[-1] + score)
+
+    # cheapest[k] = lowest possible salary of k more players
+    cheapest = [0] + numpy.cumsum(numpy.sort(numpy.asarray(salaries))[:roster_size]).tolist()
+
+    best_score = float('-inf')
+    best = None
+    chosen = []
+
+    def search(start, score, salary):
+        nonlocal best_score, best
+        need = roster_size - len(chosen)
+        if need == 0:
+            if score > best_score:
+                best_score = score
+                best = list(chosen)
+            return
+
+        for i in range(start, num_players - need + 1):
+            if score + score_sums[i + need] - score_sums[i] <= best_score:
+                break  # later players score less, so no later branch can do better
+
+            if salary + sorted_salaries[i] + cheapest[need - 1] > salary_cap:
+                continue
+
+            chosen.append(i)
+            search(i + 1, score + sorted_scores[i], salary + sorted_salaries[i])
+            chosen.pop()
+
+    search(0, 0.0, 0)
+    if best is None:
+        return None
+    return sorted(order[i] for i in best)
+
+
+def find_optimal_exposures(score_matrix, salaries, salary_cap=DK_SALARY_CAP, roster_size=DK_ROSTER_SIZE):
+    '''
+    Solves the optimal roster of every iteration of a (players x iterations) score matrix.
+    Returns how many iterations each player was in the optimal roster, and the number of
+    iterations that had one.
+    '''
+    optimals = []
+    for iteration in range(score_matrix.shape[1]):
+        lineup = find_optimal_lineup(score_matrix[:, iteration], salaries, salary_cap, roster_size)
+        if lineup is not None:
+            optimals.extend(lineup)
+
+    counts = numpy.bincount(numpy.array(optimals, dtype=numpy.int64), minlength=score_matrix.shape[0])
+    return counts, len(optimals) // roster_size
+
+
 # def optimize(site, projections, config, num_lineups=150):
 #     players_list = get_player_list(
 #         projections, 
@@ -16,7 +16,7 @@ import uuid
 
 from random import random
 
-from celery import shared_task, chord, group, chain
+from celery import shared_task, group, chain
 from contextlib import contextmanager
 
 from django.conf import settings
@@ -631,35 +631,138 @@ def update_matches_from_ta():
 
         df_merged.to_sql('tennis_match', engine, if_exists='append', index=False, chunksize=1000)
 
+    update_player_weekly_stats()
+
     # cache rates and scores
     group([
         cache_rates_and_scores.si(m.id) for m in models.Match.objects.all()
     ])()
 
 
+def player_stat_columns(own, opp):
+    '''
+    Returns the SELECT columns of one side of tennis_match as PlayerWeeklyStats totals, own
+    and opp being the column prefixes of the player and their opponent. Each total only
+    counts matches with every stat it needs.
+    '''
+    def when(columns, value):
+        conditions = ' AND '.join([f'"{c}" IS NOT NULL' for c in columns])
+        return f'CASE WHEN {conditions} THEN {value} END'
+
+    return [
+        ('num_matches', '1'),
+        ('sp_won', when([f'{own}svpt', f'{own}1stWon', f'{own}2ndWon'], f'"{own}1stWon" + "{own}2ndWon"')),
+        ('sp_points', when([f'{own}svpt', f'{own}1stWon', f'{own}2ndWon'], f'"{own}svpt"')),
+        ('rp_won', when([f'{opp}svpt', f'{opp}1stWon', f'{opp}2ndWon'], f'"{opp}svpt" - "{opp}1stWon" - "{opp}2ndWon"')),
+        ('rp_points', when([f'{opp}svpt', f'{opp}1stWon', f'{opp}2ndWon'], f'"{opp}svpt"')),
+        ('ace_aces', when([f'{own}SvGms', f'{own}ace'], f'"{own}ace"')),
+        ('ace_games', when([f'{own}SvGms', f'{own}ace'], f'"{own}SvGms"')),
+        ('ace_points', when([f'{own}SvGms', f'{own}ace', f'{own}svpt'], f'"{own}svpt"')),
+        ('vace_aces', when([f'{own}SvGms', f'{own}ace', f'{opp}ace'], f'"{opp}ace"')),
+        ('vace_games', when([f'{own}SvGms', f'{own}ace', f'{opp}SvGms'], f'"{opp}SvGms"')),
+        ('df_dfs', when([f'{own}SvGms', f'{own}df'], f'"{own}df"')),
+        ('df_games', when([f'{own}SvGms', f'{own}df'], f'"{own}SvGms"')),
+        ('df_points', when([f'{own}SvGms', f'{own}df', f'{own}svpt'], f'"{own}svpt"')),
+        ('firstin_in', when([f'{own}svpt', f'{own}1stIn'], f'"{own}1stIn"')),
+        ('firstin_points', when([f'{own}svpt', f'{own}1stIn'], f'"{own}svpt"')),
+        ('firstwon_won', when([f'{own}1stIn', f'{own}1stWon'], f'"{own}1stWon"')),
+        ('firstwon_in', when([f'{own}1stIn', f'{own}1stWon'], f'"{own}1stIn"')),
+        ('secondwon_won', when([f'{own}svpt', f'{own}1stIn', f'{own}2ndWon'], f'"{own}2ndWon"')),
+        ('secondwon_points', when([f'{own}svpt', f'{own}1stIn', f'{own}2ndWon'], f'"{own}svpt" - "{own}1stIn"')),
+        ('hold_breaks', when([f'{own}bpFaced', f'{own}bpSaved', f'{own}SvGms'], f'"{own}bpFaced" - "{own}bpSaved"')),
+        ('hold_games', when([f'{own}bpFaced', f'{own}bpSaved', f'{own}SvGms'], f'"{own}SvGms"')),
+        ('break_breaks', when([f'{opp}bpFaced', f'{opp}bpSaved', f'{opp}SvGms'], f'"{opp}bpFaced" - "{opp}bpSaved"')),
+        ('break_games', when([f'{opp}bpFaced', f'{opp}bpSaved', f'{opp}SvGms'], f'"{opp}SvGms"')),
+    ]
+
+
+@shared_task
+def update_player_weekly_stats():
+    '''
+    Brings tennis_playerweeklystats in line with tennis_match. Weekly totals are aggregated
+    in one query and compared with the stored rows; only new and changed weeks are written
+    and weeks that no longer have matches are removed.
+    '''
+    key = ['player_id', 'surface', 'week']
+    sides = []
+    for player, own, opp in [('winner_id', 'w_', 'l_'), ('loser_id', 'l_', 'w_')]:
+        columns = ', '.join([f'{value} AS {name}' for name, value in player_stat_columns(own, opp)])
+        sides.append(f'SELECT {player} AS player_id, surface, tourney_date AS week, {columns} FROM tennis_match WHERE tourney_date IS NOT NULL')
+
+    totals = ', '.join([f'COALESCE(SUM({field}), 0) AS {field}' for field in models.PLAYER_STAT_FIELDS])
+    df_new = pandas.read_sql(
+        f'SELECT player_id, surface, week, {totals} FROM ({" UNION ALL ".join(sides)}) AS sides GROUP BY player_id, surface, week',
+        engine
+    )
+    df_old = pandas.read_sql(
+        f'SELECT id, {", ".join(key + models.PLAYER_STAT_FIELDS)} FROM tennis_playerweeklystats',
+        engine
+    )
+    for df in [df_new, df_old]:
+        df['week'] = pandas.to_datetime(df['week']).dt.date
+        df['surface'] = df['surface'].fillna('')
+
+    df = df_new.merge(df_old, on=key, how='outer', suffixes=('', '_old'), indicator=True)
+    changed = numpy.zeros(len(df), dtype=bool)
+    for field in models.PLAYER_STAT_FIELDS:
+        changed |= (df[field] != df[f'{field}_old']).to_numpy()
+    changed &= (df['_merge'] == 'both').to_numpy()
+
+    stale_ids = df.loc[changed | (df['_merge'] == 'right_only').to_numpy(), 'id'].astype(int).tolist()
+
+    df_write = df.loc[changed | (df['_merge'] == 'left_only').to_numpy(), key + models.PLAYER_STAT_FIELDS].copy()
+    df_write['surface'] = df_write['surface'].where(df_write['surface'] != '', None)
+    df_write[models.PLAYER_STAT_FIELDS] = df_write[models.PLAYER_STAT_FIELDS].astype(int)
+
+    # stale weeks are only removed together with the rows replacing them
+    with transaction.atomic():
+        for start in range(0, len(stale_ids), 1000):
+            models.PlayerWeeklyStats.objects.filter(id__in=stale_ids[start:start + 1000]).delete()
+
+        models.PlayerWeeklyStats.objects.bulk_create(
+            [models.PlayerWeeklyStats(
+                player_id=int(row['player_id']),
+                surface=row['surface'],
+                week=row['week'],
+                **{field: int(row[field]) for field in models.PLAYER_STAT_FIELDS}
+            ) for row in df_write.to_dict('records')],
+            batch_size=1000
+        )
+
+    logger.info(f'Player weekly stats: {len(df_write)} weeks written, {len(stale_ids)} replaced or removed.')
+
+
 @shared_task
 def cache_rates_and_scores(match_id):
     m = models.Match.objects.get(id=match_id)
+    rates = models.PlayerWeeklyStats.get_rates(
+        [m.winner_id, m.loser_id],
+        startingFrom=m.tourney_date,
+        on_surface=m.surface
+    )
+    winner_rates = rates.get(m.winner_id)
+    loser_rates = rates.get(m.loser_id)
+
     m.winner_dk = m.winner_dk_points
-    m.winner_num_matches = m.get_winner_num_matches()
-    m.winner_ace_rate = m.get_winner_ace_rate()
-    m.winner_vace_rate = m.get_winner_v_ace_rate()
-    m.winner_df_rate = m.get_winner_df_rate()
-    m.winner_firstin_rate = m.get_winner_first_in_rate()
-    m.winner_firstwon_rate = m.get_winner_first_won_rate()
-    m.winner_secondwon_rate = m.get_winner_second_won_rate()
-    m.winner_hold_rate = m.get_winner_hold_rate()
-    m.winner_break_rate = m.get_winner_break_rate()
+    m.winner_num_matches = winner_rates.get('num_matches')
+    m.winner_ace_rate = winner_rates.get('ace_rate')
+    m.winner_vace_rate = winner_rates.get('v_ace_rate')
+    m.winner_df_rate = winner_rates.get('df_rate')
+    m.winner_firstin_rate = winner_rates.get('first_in_rate')
+    m.winner_firstwon_rate = winner_rates.get('first_won_rate')
+    m.winner_secondwon_rate = winner_rates.get('second_won_rate')
+    m.winner_hold_rate = winner_rates.get('hold_rate')
+    m.winner_break_rate = winner_rates.get('break_rate')
     m.loser_dk = m.loser_dk_points
-    m.loser_num_matches = m.get_loser_num_matches()
-    m.loser_ace_rate = m.get_loser_ace_rate()
-    m.loser_vace_rate = m.get_loser_v_ace_rate()
-    m.loser_df_rate = m.get_loser_df_rate()
-    m.loser_firstin_rate = m.get_loser_first_in_rate()
-    m.loser_firstwon_rate = m.get_loser_first_won_rate()
-    m.loser_secondwon_rate = m.get_loser_second_won_rate()
-    m.loser_hold_rate = m.get_loser_hold_rate()
-    m.loser_break_rate = m.get_loser_break_rate()
+    m.loser_num_matches = loser_rates.get('num_matches')
+    m.loser_ace_rate = loser_rates.get('ace_rate')
+    m.loser_vace_rate = loser_rates.get('v_ace_rate')
+    m.loser_df_rate = loser_rates.get('df_rate')
+    m.loser_firstin_rate = loser_rates.get('first_in_rate')
+    m.loser_firstwon_rate = loser_rates.get('first_won_rate')
+    m.loser_secondwon_rate = loser_rates.get('second_won_rate')
+    m.loser_hold_rate = loser_rates.get('hold_rate')
+    m.loser_break_rate = loser_rates.get('break_rate')
     m.save()
 
 
@@ -901,98 +1004,32 @@ def calculate_slate_structure(slate_id, task_id):
             time.sleep(0.2)
             task = BackgroundTask.objects.get(id=task_id)
 
-        # Task implementation goes here
         slate = models.Slate.objects.get(id=slate_id)
-        chord(
-            [find_optimal_for_sim.s(slate.id, i) for i in range(0, 10000)],
-            complile_sim_optimals.s(slate_id, task_id)
-        )()
-    except Exception as e:
-        if task is not None:
-            task.status = 'error'
-            task.content = f'There was a problem calculating slate structure: {e}'
-            task.save()
-
-        logger.error("Unexpected error: " + str(sys.exc_info()[0]))
-        logger.exception("error info: " + str(sys.exc_info()[1]) + "\n" + str(sys.exc_info()[2]))
+        projections = list(models.SlatePlayerProjection.objects.filter(
+            slate_player__slate=slate,
+            sim_scores__isnull=False
+        ).select_related('slate_player'))
+        if len(projections) == 0:
+            raise Exception(f'{slate} has no simulated players.')
+
+        # load the slate's sim matrix once and solve every iteration in process
+        num_iterations = min([len(p.sim_scores) for p in projections])
+        score_matrix = numpy.array([p.sim_scores[:num_iterations] for p in projections], dtype=numpy.float64)
+        salaries = numpy.array([p.slate_player.salary for p in projections], dtype=numpy.int64)
+
+        counts, num_optimals = optimize.find_optimal_exposures(score_matrix, salaries)
+
+        for projection, count in zip(projections, counts.tolist()):
+            projection.optimal_exposure = count / num_optimals if num_optimals > 0 else 0.0
+
+        # players without a sim can't be in an optimal, so no exposure from an earlier run is kept
+        with transaction.atomic():
+            models.SlatePlayerProjection.objects.bulk_update(projections, ['optimal_exposure'])
+            models.SlatePlayerProjection.objects.filter(
+                slate_player__slate=slate,
+                sim_scores__isnull=True
+            ).update(optimal_exposure=0)
 
-
-@shared_task
-def find_optimal_for_sim(slate_id, sim_iteration):
-    slate = models.Slate.objects.get(id=slate_id)
-    optimal = optimize.find_optimal_from_sims(
-        slate.site,
-        models.SlatePlayerProjection.objects.filter(slate_player__slate=slate),
-        sim_iteration=sim_iteration
-    )[0]
-    return [p.id for p in optimal.players]
-
-
-@shared_task
-def complile_sim_optimals(results, slate_id, task_id):
-    task = None
-
-    try:
-        try:
-            task = BackgroundTask.objects.get(id=task_id)
-        except BackgroundTask.DoesNotExist:
-            time.sleep(0.2)
-            task = BackgroundTask.objects.get(id=task_id)
-
-        # Task implementation goes here
-        slate = models.Slate.objects.get(id=slate_id)
-        df_opt = pandas.DataFrame(results)
-        
-        # s_0 = df_opt[0].value_counts()
-        # s_1 = df_opt[1].value_counts()
-        # s_2 = df_opt[2].value_counts()
-        # s_3 = df_opt[3].value_counts()
-        # s_4 = df_opt[4].value_counts()
-        # s_5 = df_opt[5].value_counts()
-        
-        # print(s_0)
-        # print(s_1)
-        # print(s_2)
-        # print(s_3)
-        # print(s_4)
-        # print(s_5)
-
-        for projection in models.SlatePlayerProjection.objects.filter(slate_player__slate=slate):
-            count = 0
-            try:
-                count += df_opt[0].value_counts()[projection.slate_player.slate_player_id]
-            except KeyError:
-                pass
-
-            try:
-                count += df_opt[1].value_counts()[projection.slate_player.slate_player_id]
-            except KeyError:
-                pass
-
-            try:
-                count += df_opt[2].value_counts()[projection.slate_player.slate_player_id]
-            except KeyError:
-                pass
-
-            try:
-                count += df_opt[3].value_counts()[projection.slate_player.slate_player_id]
-            except KeyError:
-                pass
-
-            try:
-                count += df_opt[4].value_counts()[projection.slate_player.slate_player_id]
-            except KeyError:
-                pass
-
-            try:
-                count += df_opt[5].value_counts()[projection.slate_player.slate_player_id]
-            except KeyError:
-                pass
-
-            print(f'{projection.slate_player}: {count}')
-            projection.optimal_exposure = count / 10000
-            projection.save()
-                
         task.status = 'success'
         task.content = f'Slate structure calculated'
         task.save()
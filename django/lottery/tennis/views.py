@@ -2,7 +2,6 @@ import logging
 import numpy
 import pandas
 import time
-from django.db.models import Q
 
 from rest_framework import status, viewsets
 from rest_framework.response import Response
@@ -11,9 +10,8 @@ from rest_framework.views import APIView
 
 from sklearn.model_selection import train_test_split, GridSearchCV
 from sklearn.neighbors import KNeighborsRegressor
-from random import random
 
-from . import serializers, models
+from . import comparables, serializers, models
 
 logger = logging.getLogger(__name__)
 
@@ -46,61 +44,14 @@ class SlateMatch:
             return (self.home_player, self.odds1)
         return (self.away_player, self.odds2)
 
-    def simple_simulate(self, iterations=10000):
-        best_of = 3
-        surface = 'Hard'
+    @property
+    def best_of(self):
         if 'Australian Open' in self.tournament_name or 'French Open' in self.tournament_name or 'Wimbledon Open' in self.tournament_name or 'US Open' in self.tournament_name:
             if self.home_player.tour == 'atp':
-                best_of = 5
-
-        all_matches = models.Match.objects.filter(
-            winner__tour=self.home_player.tour,
-            best_of=best_of,
-            surface=surface
-        ).exclude(Q(
-            Q(w_ace=None) | Q(w_df=None) | Q(l_ace=None) | Q(l_df=None)
-        )).exclude(
-            score__icontains='RET'
-        ).order_by('-tourney_date')
-
-        df_all_matches = pandas.DataFrame.from_records(
-            all_matches.values(
-                'winner_name',
-                'winner_odds',
-                'loser_name',
-                'loser_odds',
-                'winner_dk',
-                'loser_dk',
-            ),
-            index=all_matches.values_list('id', flat=True)
-        )
-        df_all_matches.dropna(inplace=True)
-
-        X = df_all_matches.drop([
-            'winner_name', 
-            'loser_name',
-            'winner_dk',
-            'loser_dk',
-        ], axis=1)
-        y = df_all_matches['winner_dk'].values
-        
-        # start = time.time()
-        # X_train, X_test, y_train, y_test = train_test_split(
-        #     X, y, test_size=0.2, random_state=12345
-        # )
-        # parameters = {"n_neighbors": range(1, 500)}
-        # gridsearch = GridSearchCV(KNeighborsRegressor(), parameters)
-        # gridsearch.fit(X_train, y_train)
-        # k = gridsearch.best_params_.get('n_neighbors')
-        # logger.info(f'Finding k took {time.time() - start}s')
-
-        k = 304
-        fav = self.favorite[0]
-        dog = self.underdog[0]
-
-        # logger.info(f'fav = {fav}')
-        # logger.info(f'dog = {dog}')
-        
+                return 5
+        return 3
+
+    def get_fav_win_pct(self):
         if self.favorite[1] > 0:
             fav_implied = 100/(100+self.favorite[1])
         else:
@@ -112,211 +63,56 @@ class SlateMatch:
             dog_implied = -self.underdog[1]/(-self.underdog[1]+100)
 
         # remove the vig
-        total_implied = fav_implied + dog_implied
-        fav_implied = fav_implied / total_implied
-        dog_implied = dog_implied / total_implied
-
-        # Find comp for this outcome (favorite wins)
-        start = time.time()
-        new_dp = numpy.array([
-            float(self.favorite[1]),
-            float(self.underdog[1]),
-        ])
-        distances = numpy.linalg.norm(X - new_dp, axis=1)
-
-        # k = 50
-        nearest_neighbor_ids = distances.argsort()[:k]
-        fav_win_scores = df_all_matches.iloc[nearest_neighbor_ids]
-        logger.info(f'Finding {k} fav-win comps took {time.time() - start}s')
-
-        # Find comp for other outcome (favorite loses)
-        start = time.time()
-        new_dp = numpy.array([
-            float(self.underdog[1]),
-            float(self.favorite[1]),
-        ])
-        distances = numpy.linalg.norm(X - new_dp, axis=1)
-
-        # k = 50
-        nearest_neighbor_ids = distances.argsort()[:k]
-        dog_win_scores = df_all_matches.iloc[nearest_neighbor_ids]
-        logger.info(f'Finding {k} dog-win comps took {time.time() - start}s')
-
-        # find outcomes based on odds 
-        start = time.time()
-        outcomes = []
-        for _ in range(0, iterations):
-            if random() <= fav_implied:
-                outcome = fav_win_scores.sample(1)
-                outcomes.append([outcome['winner_dk'].values[0], outcome['loser_dk'].values[0]])
+        return fav_implied / (fav_implied + dog_implied)
+
+    def get_comparable_query(self, use_rates=True):
+        '''
+        Returns this match as a comparables.simulate_matches query. Comparables are found on
+        odds and both players' rates, or on odds alone when use_rates is off or either
+        player is missing rates on the surface.
+        '''
+        surface = 'Hard'
+        fav, fav_odds = self.favorite
+        dog, dog_odds = self.underdog
+
+        query = {
+            'tour': fav.tour,
+            'best_of': self.best_of,
+            'surface': surface,
+            'features': comparables.ODDS_FEATURES,
+            'fav_point': [float(fav_odds), float(dog_odds)],
+            'dog_point': [float(dog_odds), float(fav_odds)],
+            'fav_win_pct': self.get_fav_win_pct(),
+            'fav_is_player1': fav == self.home_player,
+            'columns': [fav.full_name, dog.full_name],
+        }
+
+        if use_rates:
+            rates = models.PlayerWeeklyStats.get_rates([fav.player_id, dog.player_id], on_surface=surface)
+            fav_rates = rates.get(fav.player_id)
+            dog_rates = rates.get(dog.player_id)
+
+            fav_win = [fav_rates.get(r) for r in comparables.WINNER_RATES] + [dog_rates.get(r) for r in comparables.LOSER_RATES]
+            dog_win = [dog_rates.get(r) for r in comparables.WINNER_RATES] + [fav_rates.get(r) for r in comparables.LOSER_RATES]
+
+            if None in fav_win or None in dog_win:
+                logger.info('SIMPLE')
             else:
-                outcome = dog_win_scores.sample(1)
-                outcomes.append([outcome['loser_dk'].values[0], outcome['winner_dk'].values[0]])
+                query['features'] = comparables.RATE_FEATURES
+                query['fav_point'] += fav_win
+                query['dog_point'] += dog_win
 
-        df_outcomes = pandas.DataFrame(outcomes, columns=[fav.full_name, dog.full_name])
-        logger.info(df_outcomes)
-        # df_outcomes.to_csv('data/tennis_sim.csv')
-        logger.info(f'Simulating 10k outcomes took {time.time() - start}s')
+        return query
 
-        return df_outcomes
+    def simple_simulate(self, iterations=10000):
+        query = self.get_comparable_query(use_rates=False)
+        outcomes = comparables.simulate_matches([query], iterations)[0]
+        return pandas.DataFrame(outcomes, columns=query.get('columns'))
 
     def simulate(self, iterations=10000):
-        best_of = 3
-        surface = 'Hard'
-        if 'Australian Open' in self.tournament_name or 'French Open' in self.tournament_name or 'Wimbledon Open' in self.tournament_name or 'US Open' in self.tournament_name:
-            if self.home_player.tour == 'atp':
-                best_of = 5
-
-        if self.home_player.get_num_matches(on_surface=surface) == 0 or self.away_player.get_num_matches(on_surface=surface) == 0:
-            logger.info('SIMPLE')
-            return self.simple_simulate(iterations)
-
-
-        all_matches = models.Match.objects.filter(
-            winner__tour=self.home_player.tour,
-            best_of=best_of,
-            surface=surface
-        ).exclude(Q(
-            Q(w_ace=None) | Q(w_df=None) | Q(l_ace=None) | Q(l_df=None)
-        )).exclude(
-            score__icontains='RET'
-        ).order_by('-tourney_date')
-
-        df_all_matches = pandas.DataFrame.from_records(
-            all_matches.values(
-                'winner_name',
-                'winner_odds',
-                'loser_name',
-                'loser_odds',
-                'winner_dk',
-                'loser_dk',
-                'winner_ace_rate',
-                'winner_df_rate',
-                'winner_firstin_rate',
-                'winner_firstwon_rate',
-                'winner_secondwon_rate',
-                'winner_hold_rate',
-                'winner_break_rate',
-                'loser_ace_rate',
-                'loser_vace_rate',
-                'loser_firstwon_rate',
-                'loser_secondwon_rate',
-                'loser_hold_rate',
-                'loser_break_rate',
-            ),
-            index=all_matches.values_list('id', flat=True)
-        )
-        df_all_matches.dropna(inplace=True)
-
-        X = df_all_matches.drop([
-            'winner_name', 
-            'loser_name',
-            'winner_dk',
-            'loser_dk',
-        ], axis=1)
-        y = df_all_matches['winner_dk'].values
-        
-        # start = time.time()
-        # X_train, X_test, y_train, y_test = train_test_split(
-        #     X, y, test_size=0.2, random_state=12345
-        # )
-        # parameters = {"n_neighbors": range(1, 500)}
-        # gridsearch = GridSearchCV(KNeighborsRegressor(), parameters)
-        # gridsearch.fit(X_train, y_train)
-        # k = gridsearch.best_params_.get('n_neighbors')
-        # logger.info(f'Finding k took {time.time() - start}s')
-
-        k = 304
-        fav = self.favorite[0]
-        dog = self.underdog[0]
-
-        # logger.info(f'fav = {fav}')
-        # logger.info(f'dog = {dog}')
-        
-        if self.favorite[1] > 0:
-            fav_implied = 100/(100+self.favorite[1])
-        else:
-            fav_implied = -self.favorite[1]/(-self.favorite[1]+100)
-        
-        if self.underdog[1] > 0:
-            dog_implied = 100/(100+self.underdog[1])
-        else:
-            dog_implied = -self.underdog[1]/(-self.underdog[1]+100)
-
-        # remove the vig
-        total_implied = fav_implied + dog_implied
-        fav_implied = fav_implied / total_implied
-        dog_implied = dog_implied / total_implied
-
-        # Find comp for this outcome (favorite wins)
-        start = time.time()
-        new_dp = numpy.array([
-            float(self.favorite[1]),
-            float(self.underdog[1]),
-            float(fav.get_ace_rate(on_surface=surface)),
-            float(fav.get_df_rate(on_surface=surface)),
-            float(fav.get_first_in_rate(on_surface=surface)),
-            float(fav.get_first_won_rate(on_surface=surface)),
-            float(fav.get_second_won_rate(on_surface=surface)),
-            float(fav.get_hold_rate(on_surface=surface)),
-            float(fav.get_break_rate(on_surface=surface)),
-            float(dog.get_ace_rate(on_surface=surface)),
-            float(dog.get_v_ace_rate(on_surface=surface)),
-            float(dog.get_first_won_rate(on_surface=surface)),
-            float(dog.get_second_won_rate(on_surface=surface)),
-            float(dog.get_hold_rate(on_surface=surface)),
-            float(dog.get_break_rate(on_surface=surface))
-        ])
-        distances = numpy.linalg.norm(X - new_dp, axis=1)
-
-        # k = 50
-        nearest_neighbor_ids = distances.argsort()[:k]
-        fav_win_scores = df_all_matches.iloc[nearest_neighbor_ids]
-        logger.info(f'Finding {k} fav-win comps took {time.time() - start}s')
-
-        # Find comp for other outcome (favorite loses)
-        start = time.time()
-        new_dp = numpy.array([
-            float(self.underdog[1]),
-            float(self.favorite[1]),
-            float(dog.get_ace_rate(on_surface=surface)),
-            float(dog.get_df_rate(on_surface=surface)),
-            float(dog.get_first_in_rate(on_surface=surface)),
-            float(dog.get_first_won_rate(on_surface=surface)),
-            float(dog.get_second_won_rate(on_surface=surface)),
-            float(dog.get_hold_rate(on_surface=surface)),
-            float(dog.get_break_rate(on_surface=surface)),
-            float(fav.get_ace_rate(on_surface=surface)),
-            float(fav.get_v_ace_rate(on_surface=surface)),
-            float(fav.get_first_won_rate(on_surface=surface)),
-            float(fav.get_second_won_rate(on_surface=surface)),
-            float(fav.get_hold_rate(on_surface=surface)),
-            float(fav.get_break_rate(on_surface=surface))
-        ])
-        distances = numpy.linalg.norm(X - new_dp, axis=1)
-
-        # k = 50
-        nearest_neighbor_ids = distances.argsort()[:k]
-        dog_win_scores = df_all_matches.iloc[nearest_neighbor_ids]
-        logger.info(f'Finding {k} dog-win comps took {time.time() - start}s')
-
-        # find outcomes based on odds 
-        start = time.time()
-        outcomes = []
-        for _ in range(0, iterations):
-            if random() <= fav_implied:
-                outcome = fav_win_scores.sample(1)
-                outcomes.append([outcome['winner_dk'].values[0], outcome['loser_dk'].values[0]])
-            else:
-                outcome = dog_win_scores.sample(1)
-                outcomes.append([outcome['loser_dk'].values[0], outcome['winner_dk'].values[0]])
-
-        df_outcomes = pandas.DataFrame(outcomes, columns=[fav.full_name, dog.full_name])
-        logger.info(df_outcomes)
-        # df_outcomes.to_csv('data/tennis_sim.csv')
-        logger.info(f'Simulating 10k outcomes took {time.time() - start}s')
-
-        return df_outcomes
+        query = self.get_comparable_query()
+        outcomes = comparables.simulate_matches([query], iterations)[0]
+        return pandas.DataFrame(outcomes, columns=query.get('columns'))
 
 
 class PlayerProjection(dict):
@@ -339,7 +135,7 @@ class SlateSimulatorViewSet(viewsets.GenericViewSet):
         logger.info(df_csv)
 
         # create matches
-        projections = []
+        slate_matches = []
         used_players = []
         for index, row in df_csv.iterrows():
             player = index
@@ -348,16 +144,28 @@ class SlateSimulatorViewSet(viewsets.GenericViewSet):
             opponent_odds = row['opponent_odds']
 
             if player not in used_players:
-                m = SlateMatch(player, opponent, player_odds, opponent_odds)
+                slate_matches.append(SlateMatch(player, opponent, player_odds, opponent_odds))
                 logger.info(f'{player} ({player_odds}) v. {opponent} ({opponent_odds})')
-                
-                median_proj = m.simulate(10000).median().to_numpy()
-                projections.append(PlayerProjection(m.player1, median_proj[0]))
-                projections.append(PlayerProjection(m.player2, median_proj[1]))
 
                 used_players.append(player)
                 used_players.append(opponent)
-                
+
+        # simulate every match on the slate in one batch
+        start = time.time()
+        queries = [m.get_comparable_query() for m in slate_matches]
+        outcomes = comparables.simulate_matches(queries, 10000)
+        logger.info(f'Simulating {len(slate_matches)} matches took {time.time() - start}s')
+
+        projections = []
+        for m, query, match_outcomes in zip(slate_matches, queries, outcomes):
+            fav_median, dog_median = numpy.median(match_outcomes, axis=0)
+            if query.get('fav_is_player1'):
+                projections.append(PlayerProjection(m.player1, fav_median))
+                projections.append(PlayerProjection(m.player2, dog_median))
+            else:
+                projections.append(PlayerProjection(m.player1, dog_median))
+                projections.append(PlayerProjection(m.player2, fav_median))
+
 
         pandas.DataFrame(projections).to_csv('data/tennis_projections.csv')
         return Response(projections,
@@ -1,11 +1,10 @@
 import datetime
-import math
 import os
 
 from django.contrib import admin, messages
 from django.conf import settings
 
-from celery import chain, group, chord
+from celery import chain, chord
 from configuration.models import BackgroundTask
 
 from . import models
@@ -71,12 +70,19 @@ class ContestAdmin(admin.ModelAdmin):
 
         contest = queryset[0]
 
-        if contest.last_page_processed == 0:
+        if contest.last_page_processed == 0 and not contest.harvest_cursor:
             contest.entries.all().delete()
 
-        group([
-            tasks.get_entries_page_for_contest.si(contest.id, page, min(math.ceil(contest.num_entries/50), 1000)) for page in range(contest.last_page_processed, min(math.ceil(contest.num_entries/50), 1000))
-        ])()
+        tasks.harvest_contest_entries.delay(
+            contest.id,
+            BackgroundTask.objects.create(user=request.user, name='Get Contest Entries').id
+        )
+
+        messages.add_message(
+            request,
+            messages.WARNING,
+            f'Getting entries for {contest.name}'
+        )
     get_entries.short_description = 'Get Entries For Selected Contests'
 
     def export_contests(self, request, queryset):
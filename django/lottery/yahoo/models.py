@@ -3,6 +3,8 @@ import pandas
 
 from django.db import models
 
+API_URL = 'https://dfyql-ro.sports.yahoo.com/v2'
+
 GET_CONTEST_HEADERS = {
 }
 
@@ -25,16 +27,17 @@ class Contest(models.Model):
     num_entries = models.PositiveIntegerField(default=0)
     contest_json = models.TextField(blank=True, null=True)
     last_page_processed = models.IntegerField(default=0)
+    harvest_cursor = models.TextField(blank=True, null=True)
 
     def __str__(self):
         return f'{self.name}'
 
     @property
     def url(self):
-        return f'https://dfyql-ro.sports.yahoo.com/v2/contest/{self.contest_id}?lang=en-US&region=US&device=desktop'
+        return f'{API_URL}/contest/{self.contest_id}?lang=en-US&region=US&device=desktop'
 
     def entries_url(self, for_page=0):
-        return f'https://dfyql-ro.sports.yahoo.com/v2/contestEntries?lang=en-US&region=US&device=desktop&sort=rank&contestId={self.contest_id}&start={(for_page)*50}&limit=50'
+        return f'{API_URL}/contestEntries?lang=en-US&region=US&device=desktop&sort=rank&contestId={self.contest_id}&start={(for_page)*50}&limit=50'
 
     def get_payout(self, rank):
         try:
@@ -134,7 +137,7 @@ class ContestEntry(models.Model):
 
     @property
     def entry_url(self):
-        return f'https://dfyql-ro.sports.yahoo.com/v2/contestEntry/{self.entry_id}?lang=en-US&region=US&device=desktop&slateTypes=SINGLE_GAME&slateTypes=MULTI_GAME'
+        return f'{API_URL}/contestEntry/{self.entry_id}?lang=en-US&region=US&device=desktop&slateTypes=SINGLE_GAME&slateTypes=MULTI_GAME'
 
 
 class ContestPrize(models.Model):